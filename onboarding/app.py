@@ -3,35 +3,109 @@ from flask_cors import CORS
 from dotenv import load_dotenv
 import xmlrpc.client
 import anthropic
-import requests as http_requests
+import httpx
 import os
 
 load_dotenv(override=True)
+import asyncio
 import json
 import re
 import uuid
 import copy
+import queue
+import random
+import threading
+import time
 from datetime import datetime
 from templates.registry import detect_template_type, get_template
-from templates.beauty_body import get_template_as_prompt_json
+from templates.customizer import customize_template
 from templates.website_sections import build_website_data, get_template_key
+from config_store import get_config_store, VersionConflict
+from config_cache import LRUCache, file_validator
+from config_layout import start_background_compactor
+from transcripts import append_messages, load_transcript, split_legacy_transcript
+from json_patch import JSON_PATCH, MERGE_PATCH, PatchError, apply_delta
+import website_store
+from website_copy import AsyncSpeculativeCopy, extract_business_name
+from prompts import (CONFIG_MODEL, FAST_MODEL, PROMPT_CACHE_STATS, PROMPT_VERSIONS,
+                     analyze_business_request, chat_limit_reached, chat_request, check_input_request,
+                     continuation_request, is_detailed, strip_code_fences, template_request, website_copy_request)
+from conversation import configure_description
+from response_cache import ResponseCache, fingerprint
+from copy_corpus import CopyCorpus
+from stream_json import JSONTabStream
+from config_dsl import ConfigDSLParser, parse_config_dsl
+from llm_calls import AttemptTimeout, CallFailed, CallPolicy
+from llm_metrics import LLMMetrics
+from json_repair import extract_json, is_truncated
+from input_classifier import INPUT_CLASSIFIER_STATS, classify_input
 
 app = Flask(__name__, static_folder='static', static_url_path='/static')
-CORS(app, origins=[
+CORS_ORIGINS = [
     'http://localhost:3000',
     'https://redpine-systems.vercel.app',
     os.environ.get('DASHBOARD_URL', ''),
-])
+]
+CORS(app, origins=CORS_ORIGINS)
 
-# Config storage - individual JSON files in configs folder
+# Config storage - CONFIG_STORE=sqlite (indexed, default) or file (one JSON per config)
 CONFIGS_FOLDER = os.path.join(os.path.dirname(__file__), 'configs')
+config_store = get_config_store(CONFIGS_FOLDER)
+
+# File backend: pack configs untouched for CONFIG_PACK_COLD_DAYS into per-shard
+# segment files every CONFIG_PACK_INTERVAL seconds (0 disables)
+if config_store.name == 'file':
+    start_background_compactor(
+        config_store,
+        int(os.environ.get('CONFIG_PACK_INTERVAL', 3600)),
+        float(os.environ.get('CONFIG_PACK_COLD_DAYS', 30)),
+    )
 
-def ensure_configs_folder():
-    if not os.path.exists(CONFIGS_FOLDER):
-        os.makedirs(CONFIGS_FOLDER)
+# Per-worker read caches, bounded by serialized bytes (CONFIG_CACHE_MAX_BYTES / WEBSITE_CACHE_MAX_BYTES).
+# website_cache only holds legacy payloads — current ones are streamed pre-serialized from disk.
+config_cache = LRUCache('config', int(os.environ.get('CONFIG_CACHE_MAX_BYTES', 16 * 1024 * 1024)))
+website_cache = LRUCache('website', int(os.environ.get('WEBSITE_CACHE_MAX_BYTES', 32 * 1024 * 1024)))
+
+# Model responses keyed by normalized description, shared across workers.
+# RESPONSE_CACHE=0 disables it; a request with Cache-Control: no-cache skips the lookup.
+# Identical calls already in flight are coalesced into one (RESPONSE_COALESCE=0 disables).
+response_cache = ResponseCache(
+    os.environ.get('RESPONSE_CACHE_PATH') or os.path.join(CONFIGS_FOLDER, 'response_cache.db'),
+    ttl_seconds=float(os.environ.get('RESPONSE_CACHE_TTL', 7 * 24 * 3600)),
+    max_bytes=int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+    enabled=os.environ.get('RESPONSE_CACHE', '1') != '0',
+    coalesce=os.environ.get('RESPONSE_COALESCE', '1') != '0',
+)
+
+# Website copy pre-generated per business type by copy_corpus.py, used before
+# any model call (COPY_CORPUS=0 disables it; Cache-Control: no-cache skips it)
+COPY_CORPUS = CopyCorpus(
+    os.environ.get('COPY_CORPUS_PATH') or os.path.join(CONFIGS_FOLDER, 'copy_corpus.db'),
+    enabled=os.environ.get('COPY_CORPUS', '1') != '0',
+)
+
+# PATCH deltas are folded into the base document once this many are pending
+CONFIG_COMPACT_EVERY = int(os.environ.get('CONFIG_COMPACT_EVERY', 20))
+
+# /configure starts website copy alongside the config call (0 = one after the other)
+CONFIGURE_PARALLEL_COPY = os.environ.get('CONFIGURE_PARALLEL_COPY', '1') != '0'
+
+# Threads serving the Flask routes per worker (a2wsgi's pool under asgi.py)
+FLASK_THREADS = int(os.environ.get('FLASK_THREADS', 10))
+
+# Template matches are customized by local rules when they're at least this
+# sure of the result, and by the model otherwise (above 1 = always the model)
+TEMPLATE_RULES_MIN_CONFIDENCE = float(os.environ.get('TEMPLATE_RULES_MIN_CONFIDENCE', 0.7))
+
+# /check-input answers clear cases with the local classifier (0 = always the
+# model), and re-checks this share of those with the model for the agreement rate
+CHECK_INPUT_LOCAL = os.environ.get('CHECK_INPUT_LOCAL', '1') != '0'
+CHECK_INPUT_SHADOW_RATE = float(os.environ.get('CHECK_INPUT_SHADOW_RATE', 0.05))
+
+# /configure/stream sends a comment line after this long without an event
+SSE_KEEPALIVE_SECONDS = 15
 
 def save_config(config, conversation_history=None):
-    ensure_configs_folder()
     config_id = str(uuid.uuid4())[:8]
 
     # New config format with tabs array
@@ -44,11 +118,10 @@ def save_config(config, conversation_history=None):
         'colors': config.get('colors', {}),
         'platform_tabs': ['site', 'analytics', 'settings'],
         'summary': config.get('summary'),
-        'conversation_history': conversation_history or []
+        # Chat lives in its own append-only segment; the config keeps a pointer
+        'transcript': append_messages(CONFIGS_FOLDER, config_id, conversation_history or []),
     }
-    config_path = os.path.join(CONFIGS_FOLDER, f'{config_id}.json')
-    with open(config_path, 'w') as f:
-        json.dump(config_data, f, indent=2)
+    config_store.put(config_id, config_data)
     return config_id
 
 # Industry-specific color defaults — used when AI generates defaults or missing colors
@@ -130,11 +203,19 @@ def validate_colors(config):
     return config
 
 def load_config(config_id):
-    config_path = os.path.join(CONFIGS_FOLDER, f'{config_id}.json')
-    if os.path.exists(config_path):
-        with open(config_path, 'r') as f:
-            return json.load(f)
-    return None
+    """Load a config through the per-worker cache, validated by store version.
+    Returns a shared cached object — copy it before mutating."""
+    version = config_store.version(config_id)
+    if version is not None:
+        cached = config_cache.get(config_id, version)
+        if cached is not None:
+            return cached
+    config, version, size = config_store.get_versioned(config_id)
+    if config is None:
+        config_cache.invalidate(config_id)
+        return None
+    config_cache.put(config_id, config, version, size)
+    return config
 
 ODOO_URL = 'http://localhost:8069'
 ODOO_DB = 'redpine_dev'
@@ -144,7 +225,77 @@ ODOO_PASS = 'admin'
 api_key = os.environ.get('ANTHROPIC_API_KEY', '')
 print(f"API Key loaded: {api_key[:20]}..." if api_key else "NO API KEY FOUND")
 
-claude = anthropic.Anthropic(api_key=api_key)
+# Model backend: 'anthropic', or 'fake' for the local stand-in in fake_llm.py
+# (load tests and benchmarks without network access or token cost)
+LLM_BACKEND = os.environ.get('LLM_BACKEND', 'anthropic')
+# Where the fake backend is served (python fake_llm.py)
+FAKE_LLM_URL = os.environ.get('FAKE_LLM_URL', 'http://127.0.0.1:8787')
+
+
+def llm_client_kwargs():
+    """Anthropic client kwargs for LLM_BACKEND."""
+    if LLM_BACKEND == 'anthropic':
+        return {'api_key': api_key}
+    if LLM_BACKEND == 'fake':
+        return {'api_key': 'fake', 'base_url': FAKE_LLM_URL}
+    raise ValueError(f"Unknown LLM_BACKEND {LLM_BACKEND!r} (expected 'anthropic' or 'fake')")
+
+
+if LLM_BACKEND != 'anthropic':
+    print(f"LLM backend: {LLM_BACKEND} at {FAKE_LLM_URL}")
+
+# No SDK retries — llm_calls retries within each call's latency budget
+aclaude = anthropic.AsyncAnthropic(max_retries=0, **llm_client_kwargs())
+
+# Shared connection pool for dashboard and Supabase calls (asgi.py's lifespan closes both clients)
+http_client = httpx.AsyncClient()
+
+# The model-bound routes are coroutines. asgi.py awaits them on its own event
+# loop; the Flask routes (python app.py) run them on this process's pipeline
+# loop, a thread started on first use so forked workers each get their own.
+_pipeline_loop = None
+_pipeline_loop_lock = threading.Lock()
+# Tasks that outlive their request (/configure/stream pipelines, /check-input shadow checks)
+_background_tasks = set()
+
+
+def pipeline_loop():
+    global _pipeline_loop
+    with _pipeline_loop_lock:
+        if _pipeline_loop is None:
+            _pipeline_loop = asyncio.new_event_loop()
+            threading.Thread(target=_pipeline_loop.run_forever, name='pipeline-loop', daemon=True).start()
+        return _pipeline_loop
+
+
+def run_async(coro):
+    """coro's result, run on the pipeline loop — how a Flask route awaits."""
+    return asyncio.run_coroutine_threadsafe(coro, pipeline_loop()).result()
+
+
+def spawn(coro):
+    """Run coro on the running loop without waiting for it."""
+    task = asyncio.ensure_future(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+# Tokens, cost and latency of every model call, for /metrics. With a path set,
+# each call is also appended to this JSONL ledger for offline analysis.
+LLM_METRICS = LLMMetrics(os.environ.get('LLM_LEDGER_PATH') or None)
+
+# Continuation requests allowed per attempt to finish a reply cut off at max_tokens
+LLM_MAX_CONTINUATIONS = int(os.environ.get('LLM_MAX_CONTINUATIONS', 2))
+
+# Latency budget (seconds) per kind of model call. Retries and hedged requests
+# fit inside it; past it, or with the circuit open, the caller falls back.
+LLM_POLICIES = {
+    'config': CallPolicy('config', float(os.environ.get('LLM_BUDGET_CONFIG', 45)), retries=1, metrics=LLM_METRICS),
+    'website_copy': CallPolicy(
+        'website_copy', float(os.environ.get('LLM_BUDGET_WEBSITE_COPY', 15)), metrics=LLM_METRICS),
+    'check_input': CallPolicy('check_input', float(os.environ.get('LLM_BUDGET_CHECK_INPUT', 8)), metrics=LLM_METRICS),
+    'chat': CallPolicy('chat', float(os.environ.get('LLM_BUDGET_CHAT', 15)), metrics=LLM_METRICS),
+}
 
 def get_odoo_connection():
     common = xmlrpc.client.ServerProxy(f'{ODOO_URL}/xmlrpc/2/common')
@@ -403,62 +554,120 @@ def transform_pipeline_stages(config):
     return config
 
 
-def analyze_with_template(description, template, business_type):
+async def stream_config_text(prompt_name, on_tab, tab_stream, timeout, **request_kwargs):
+    """Stream a config call, calling on_tab(index, tab) as tab_stream sees each
+    tab close. Returns (the full response text, stop reason)."""
+    # The SDK timeout only bounds the gaps between chunks
+    deadline = time.monotonic() + timeout
+    attempt = LLM_METRICS.attempt(prompt_name, request_kwargs['model'])
+    async with aclaude.messages.stream(timeout=timeout, **request_kwargs) as stream:
+        async for text in stream.text_stream:
+            attempt.first_token()
+            for index, tab in tab_stream.feed(text):
+                on_tab(index, tab)
+            if time.monotonic() > deadline:
+                raise AttemptTimeout(f"{prompt_name}: stream ran past {timeout:.0f}s")
+        message = await stream.get_final_message()
+    attempt.done(message.usage)
+    PROMPT_CACHE_STATS.record(prompt_name, message.usage)
+    return tab_stream.text, message.stop_reason
+
+
+async def create_message(prompt_name, timeout, **request_kwargs):
+    """messages.create(), with the response's tokens and timing recorded in LLM_METRICS."""
+    attempt = LLM_METRICS.attempt(prompt_name, request_kwargs['model'])
+    response = await aclaude.messages.create(timeout=timeout, **request_kwargs)
+    attempt.done(response.usage)
+    return response
+
+
+def reply_cut_off(text, stop_reason, json_reply):
+    """True if the reply stopped at max_tokens, or is JSON that never closes."""
+    return stop_reason == 'max_tokens' or (json_reply and is_truncated(text))
+
+
+async def continue_truncated(prompt_name, deadline, text, stop_reason, json_reply, on_tail=None, **request_kwargs):
+    """text, finished by up to LLM_MAX_CONTINUATIONS continuation requests while
+    the reply stops at max_tokens (or, for JSON, ends with the value still
+    open). Each asks only for the missing tail; on_tail(tail) sees each one."""
+    for _ in range(LLM_MAX_CONTINUATIONS):
+        if not reply_cut_off(text, stop_reason, json_reply):
+            break
+        timeout = deadline - time.monotonic()
+        if timeout < 1:
+            raise AttemptTimeout(f"{prompt_name}: no time left to finish a cut-off reply")
+        print(f"{prompt_name}: reply cut off after {len(text)} chars — asking for the rest")
+        LLM_METRICS.continued()
+        response = await create_message(prompt_name, timeout, **continuation_request(request_kwargs, text))
+        tail = response.content[0].text
+        if on_tail:
+            on_tail(tail)
+        text, stop_reason = text.rstrip() + tail, response.stop_reason
+    return text
+
+
+def parse_model_json(text):
+    """The JSON value in a model reply, repaired where needed (repairs are
+    counted in LLM_METRICS). Raises JSONRepairError, a ValueError."""
+    value, repairs = extract_json(text)
+    if repairs:
+        print(f"Repaired model JSON: {', '.join(repairs)}")
+        LLM_METRICS.repaired(repairs)
+    return value
+
+
+async def request_config_text(prompt_name, timeout, on_tab=None, tab_stream=None, json_reply=True,
+                              **request_kwargs):
+    """Response text of a config call — streamed when on_tab wants tabs as they close.
+    tab_stream finds tabs in the streamed text (default: config JSON). A reply
+    cut off at max_tokens is finished rather than requested again."""
+    deadline = time.monotonic() + timeout
+    on_tail = None
+    if on_tab:
+        tab_stream = tab_stream or JSONTabStream()
+        text, stop_reason = await stream_config_text(prompt_name, on_tab, tab_stream, timeout, **request_kwargs)
+
+        def on_tail(tail):
+            for index, tab in tab_stream.feed(tail):
+                on_tab(index, tab)
+    else:
+        response = await create_message(prompt_name, timeout, **request_kwargs)
+        PROMPT_CACHE_STATS.record(prompt_name, response.usage)
+        text, stop_reason = response.content[0].text, response.stop_reason
+    return await continue_truncated(prompt_name, deadline, text, stop_reason, json_reply, on_tail, **request_kwargs)
+
+
+async def request_json(prompt_name, timeout, **request_kwargs):
+    """The parsed JSON reply to a create() call, finished if it was cut off and
+    repaired if malformed. Raises JSONRepairError if it still won't parse."""
+    deadline = time.monotonic() + timeout
+    response = await create_message(prompt_name, timeout, **request_kwargs)
+    text = await continue_truncated(
+        prompt_name, deadline, response.content[0].text, response.stop_reason, True, **request_kwargs)
+    return parse_model_json(text)
+
+
+async def analyze_with_template(description, template, business_type, bypass_cache=False, on_tab=None):
     """Use AI to customize a template for a specific business.
-    Much shorter prompt than analyze_business since the template provides the skeleton."""
+    Much shorter prompt than analyze_business since the template provides the skeleton.
+    on_tab(index, tab) is called as each tab arrives (not on cache hits).
+    Raises CallFailed once the config budget is spent."""
     print(f"Template path: customizing {business_type} template")
+    async def attempt(timeout):
+        raw_response = await request_config_text(
+            'analyze_with_template', timeout, on_tab,
+            model=CONFIG_MODEL,
+            max_tokens=2000,
+            **template_request(description, template, business_type)
+        )
+        print(f"Template customization response: {raw_response[:200]}...")
+        return parse_model_json(raw_response)
 
-    template_json = json.dumps(template, indent=2)
-
-    prompt = f"""You are customizing a business platform template for a specific business.
-
-Business description: {description}
-Business type: {business_type}
-
-Here is the starting template (JSON):
-{template_json}
-
-Your job is to CUSTOMIZE this template for the specific business described above. Return ONLY valid JSON.
-
-## RULES:
-1. **NEVER remove components with "_locked": true** — these are essential and must stay
-2. **You CAN remove tabs marked "_removable": true** if the business is solo (no staff/team mentioned)
-3. **Customize labels** to match the business (e.g. "Staff" → "Barbers", "Clients" → "Pets & Owners")
-4. **Add components** the user specifically mentioned that aren't in the template
-5. **Remove unlocked components** the user clearly doesn't need
-6. **Keep the tab structure** — don't reorganize tabs, just add/remove within them
-7. **Set pipeline stages** if the user described specific progression (belt ranks, loyalty tiers, etc.)
-8. **Extract the business name** from the description — keep it in the SAME LANGUAGE the user wrote in
-9. **Tab and component labels should be in English** — the dashboard UI is English, only business_name stays in the user's language
-
-## OUTPUT FORMAT:
-Return the FULL config as JSON (same structure as template):
-{{
-    "business_name": "extracted business name",
-    "business_type": "{business_type}",
-    "tabs": [ ... customized tabs ... ],
-    "summary": "one sentence about what was configured"
-}}
-
-Do NOT include "colors" — colors are handled separately.
-Keep "_locked" and "_removable" flags on components — they'll be stripped later.
-Every component MUST have a "view" field."""
-
-    response = claude.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=2000,
-        messages=[{"role": "user", "content": prompt}]
+    return await response_cache.aget_or_compute(
+        'analyze_with_template', CONFIG_MODEL, PROMPT_VERSIONS['analyze_with_template'], description,
+        lambda: LLM_POLICIES['config'].acall(attempt, hedge=not on_tab),
+        extra=(business_type, fingerprint(template)), bypass=bypass_cache,
     )
-    raw_response = response.content[0].text
-    print(f"Template customization response: {raw_response[:200]}...")
-
-    # Strip markdown code blocks if present
-    cleaned = raw_response.strip()
-    if cleaned.startswith("```"):
-        cleaned = re.sub(r'^```json?\n?', '', cleaned)
-        cleaned = re.sub(r'\n?```$', '', cleaned)
-
-    return json.loads(cleaned)
 
 
 def validate_locked_components(config, template, locked_ids):
@@ -523,518 +732,57 @@ def strip_locked_flags(config):
     return config
 
 
-def analyze_business(description):
+async def analyze_business(description, bypass_cache=False, on_tab=None):
+    """Build a config from scratch. Raises CallFailed once the config budget is spent."""
     print(f"Analyzing: {description}")
+    async def attempt(timeout):
+        raw_response = await request_config_text(
+            'analyze_business', timeout, on_tab, ConfigDSLParser(), json_reply=False,
+            model=CONFIG_MODEL,
+            max_tokens=1000,
+            **analyze_business_request(description)
+        )
+        print(f"Claude response: {raw_response}")
+
+        return parse_config_dsl(strip_code_fences(raw_response))
 
-    prompt = f"""Analyze this business and create a custom dashboard configuration.
-
-Business description: {description}
-
-LANGUAGE: The description may be in any language. Extract the business_name in the user's original language. All tab labels and component labels should be in English (the dashboard UI is English).
-
-Return ONLY valid JSON (no markdown, no code blocks):
-{{
-    "business_name": "extracted or generated name",
-    "business_type": "barber, barbershop, salon, hair_salon, nail_salon, lash_brow, makeup_artist, med_spa, landscaping, restaurant, cafe, retail, fitness, auto, cleaning, photography, tutoring, pet_grooming, dental, construction, real_estate, freelancer, martial_arts, legal, professional, accounting, consulting, medical, veterinary, plumbing, electrical, catering, event_planning, hotel, spa, bakery, florist, daycare, moving, pest_control, hvac, roofing, tattoo, music_studio, dance_studio, yoga, crossfit, coworking, property_management, insurance, recruiting, other",
-    "colors": {{
-        "sidebar_bg": "#1A1A2E",
-        "sidebar_icons": "#A0AEC0",
-        "sidebar_buttons": "#3B82F6",
-        "sidebar_text": "#E2E8F0",
-        "background": "#F5F5F5",
-        "buttons": "#3B82F6",
-        "cards": "#FFFFFF",
-        "text": "#1A1A1A",
-        "headings": "#111827",
-        "borders": "#E5E7EB"
-    }},
-    "tabs": [
-        {{
-            "id": "tab_1",
-            "label": "Dashboard",
-            "icon": "home",
-            "components": [{{ "id": "calendar", "label": "Today", "view": "calendar" }}]
-        }},
-        ... more tabs (each component MUST include "view" field) ...
-    ],
-    "summary": "one sentence describing what was configured"
-}}
-
-## COLOR GENERATION RULES
-
-Generate a cohesive color palette that matches the business personality. The sidebar_bg is the dominant brand color.
-
-**Industry color guidance:**
-- Barber/tattoo/auto: Dark & bold — sidebar_bg: #1A1A2E or #0F172A, buttons: electric blue/red
-- Salon/spa/yoga: Soft & elegant — sidebar_bg: #2D2B3D or #1E293B, buttons: rose/purple/teal
-- Medical/dental: Clean & trustworthy — sidebar_bg: #1E3A5F or #0F4C81, buttons: #3B82F6 blue
-- Landscaping/garden: Natural & earthy — sidebar_bg: #1B4332 or #14532D, buttons: #22C55E green
-- Restaurant/bakery/cafe: Warm & inviting — sidebar_bg: #3C1518 or #1C1917, buttons: #F59E0B amber
-- Construction/electrical/plumbing: Industrial & sturdy — sidebar_bg: #1E293B or #0C1222, buttons: #F59E0B or #EF4444
-- Legal/accounting/consulting: Professional & refined — sidebar_bg: #1E293B or #0F172A, buttons: #6366F1 indigo
-- Fitness/martial arts/crossfit: Energetic & bold — sidebar_bg: #0F172A or #1A1A2E, buttons: #EF4444 red or #F97316 orange
-- Photography/creative: Modern & minimal — sidebar_bg: #18181B or #1C1917, buttons: #8B5CF6 purple
-- Real estate: Sophisticated — sidebar_bg: #1E293B, buttons: #0EA5E9 sky blue
-- Retail: Inviting & commercial — sidebar_bg: #1E1B4B or #0F172A, buttons: #8B5CF6 or #EC4899
-- Pet/vet: Friendly & warm — sidebar_bg: #1E3A3A or #164E63, buttons: #14B8A6 teal
-- Events/catering: Celebratory — sidebar_bg: #2D1B4E or #1E1B4B, buttons: #A855F7 purple or #EC4899 pink
-- Moving/cleaning: Dependable — sidebar_bg: #1E293B, buttons: #3B82F6 blue
-- Education/tutoring/dance: Inspiring — sidebar_bg: #1E293B or #1B2E4B, buttons: #6366F1 indigo
-- Property management: Professional — sidebar_bg: #1E293B, buttons: #0EA5E9
-
-**Rules:**
-- NEVER use #ce0707, #DC2626, or #EF4444 as the buttons color — these are generic defaults. Each business MUST get a unique, industry-appropriate accent color from the guidance above.
-- sidebar_bg should ALWAYS be dark (near-black with a color tint)
-- sidebar_text should ALWAYS be light (#E2E8F0 or #F1F5F9)
-- sidebar_icons should be muted light (#A0AEC0 or #94A3B8)
-- background should be light gray (#F5F5F5 or #F8FAFC)
-- cards should be white (#FFFFFF)
-- text should be dark (#1A1A1A or #111827)
-- buttons should be the ONE accent color that defines the brand — pick from the industry guidance above, do NOT default to red
-- sidebar_buttons should match or complement the buttons color
-
-## VIEW ASSIGNMENT RULES
-
-Every component in a tab MUST have a "view" field. Use these defaults:
-- **pipeline**: clients, leads, jobs, workflows, cases, tickets, waivers, memberships (when tracking status flow). Clients should ALWAYS default to pipeline — every business has a client journey (new → active → loyal, belt stages, rewards tiers, etc.). Use "contacts" component with "list" view for the general address book. Memberships pipeline: stages = plan names (e.g. Basic, Premium, VIP), cards = members.
-- **calendar**: calendar, appointments, schedules, shifts, classes, reservations, social_media
-- **cards**: staff, equipment, fleet, tables, rooms, menus, recipes, courses, packages, venues, portfolios, galleries, listings, images, reviews
-- **list**: contacts, todos, messages, notes, announcements, checklists, knowledge, community, chat_widget
-- **route**: routes (map view with territory polygons and stop lists — only for field service businesses like landscaping, plumbing, cleaning, pest control, delivery)
-- **table**: everything else (products, inventory, invoices, payments, expenses, payroll, estimates, vendors, assets, contracts, documents, uploads, forms, signatures, orders, attendance, inspections, permits, prescriptions, treatments, properties, guests, campaigns, loyalty, surveys, subscriptions, time_tracking, reputation, portal)
-
-## PIPELINE STAGES
-
-When a component uses "view": "pipeline", also include a "stages" array with 3-6 industry-specific stage names.
-
-**clients pipeline stages by industry (REQUIRED — every clients component must have stages):**
-- Martial arts: ["White Belt", "Yellow Belt", "Orange Belt", "Green Belt", "Blue Belt", "Brown Belt", "Black Belt"]
-- Salon/spa: ["New Client", "Regular", "VIP", "Ambassador"]
-- Fitness/gym: ["Trial", "New Member", "Active", "Loyal", "Champion"]
-- Retail: ["First Purchase", "Returning", "Regular", "Gold Member", "VIP"]
-- Restaurant/cafe: ["First Visit", "Returning", "Regular", "Loyalty Member"]
-- Real estate: ["Prospect", "Showing", "Offer", "Under Contract", "Closed"]
-- Medical/dental: ["New Patient", "Active", "Ongoing Care", "Recall"]
-- Contractor/landscaping: ["Estimate", "Scheduled", "In Progress", "Complete", "Recurring"]
-- Legal/accounting: ["Prospect", "Onboarding", "Active Client", "Retainer"]
-- Pet grooming/vet: ["New Pet", "Regular", "Frequent", "Premium"]
-- Photography: ["Inquiry", "Booked", "Shoot Complete", "Delivered"]
-- Education/tutoring: ["Enrolled", "In Progress", "Advanced", "Graduated"]
-- General: ["New", "Active", "Loyal", "VIP"]
-
-**leads stages by industry:**
-- General: ["New", "Contacted", "Qualified", "Proposal", "Won"]
-- Contractor: ["Inquiry", "Estimate Sent", "Approved", "Scheduled", "Complete"]
-- Salon/fitness: ["Inquiry", "Consulted", "Trial", "Member"]
-- Real estate: ["New Lead", "Showing", "Offer", "Under Contract", "Closed"]
-
-**jobs/work orders stages:**
-- General: ["New", "In Progress", "Review", "Complete", "Invoiced"]
-- Contractor: ["Estimated", "Approved", "Scheduled", "In Progress", "Complete", "Invoiced"]
-
-**cases stages:**
-- Legal: ["Filed", "Discovery", "Negotiation", "Trial", "Closed"]
-- Recruiting: ["Sourced", "Screening", "Interview", "Offer", "Placed"]
-
-**tickets stages:**
-- General: ["New", "In Progress", "Waiting", "Resolved"]
-
-**waivers stages:**
-- General: ["Draft", "Sent", "Viewed", "Signed"]
-
-Example component with pipeline:
-{{ "id": "clients", "label": "Students", "view": "pipeline", "stages": ["White Belt", "Yellow Belt", "Green Belt", "Blue Belt", "Brown Belt", "Black Belt"] }}
-{{ "id": "leads", "label": "Prospects", "view": "pipeline", "stages": ["Inquiry", "Consulted", "Trial", "Member"] }}
-
-## COMPONENT REGISTRY (68 components available)
-
-**People - Managing contacts and relationships:**
-- clients: Client pipeline — tracks client journey through stages (belt ranks, loyalty tiers, sales stages). Use this for your PRIMARY customer/member/student/patient list.
-- contacts: Contact directory — every name, phone number, and email in your CRM. Use this as the general address book alongside the clients pipeline.
-- leads: Leads pipeline, prospect tracking, conversion funnel
-- staff: Staff cards, employee management, roles
-- vendors: Vendor list, supplier contacts, ordering
-- guests: Guest list with RSVP status, party size, dietary preferences
-
-**Things - Physical items and inventory:**
-- products: Product catalog with SKU, stock levels, pricing
-- inventory: Stock tracking, low stock alerts, reorder points
-- equipment: Equipment list, maintenance tracking, assignments
-- assets: Asset management, depreciation, location tracking
-- listings: Property listings with address, price, bedrooms, status
-- properties: Rental property management, tenants, leases
-- venues: Venue management with capacity, address, amenities
-
-**Time - Scheduling and calendar:**
-- calendar: Calendar view (day/week/month), event management
-- appointments: Appointment booking, availability, confirmations
-- schedules: Schedule grid, recurring events, team schedules
-- shifts: Shift scheduler, staff assignments, coverage
-- time_tracking: Employee hours, billable time, project tracking
-
-**Money - Financial management:**
-- invoices: Invoice creation, tracking, payment status
-- payments: Payment processing, transaction history
-- expenses: Expense logging, categories, receipts
-- payroll: Payroll management, pay periods, deductions
-- estimates: Quotes, proposals, estimate-to-invoice conversion
-- packages: Service menu — bookable services customers see during booking. Each service has a name, price, and duration
-- subscriptions: Recurring subscription management, billing cycles
-
-**Tasks - Work management:**
-- todos: Task checklists, due dates, priorities
-- jobs: Job cards, work orders, job tracking
-- projects: Project boards, milestones, team assignments
-- workflows: Workflow automation, process templates
-- cases: Legal case management, case tracking, court dates
-- checklists: Task checklists with completion tracking, assignees
-
-**Communication - Messaging and notes:**
-- messages: Message inbox, client communication
-- notes: Notes editor, internal memos
-- announcements: Announcement feed, team updates
-- reviews: Review management, reputation tracking
-- campaigns: Marketing campaigns (email/social/ad), reach, conversions
-- loyalty: Loyalty programs, points, tiers, rewards
-- surveys: Customer surveys, responses, completion rates
-- tickets: Support tickets with priority, status, assignee
-- knowledge: FAQ articles, help docs, categories
-- community: Member forum, discussions, events
-- chat_widget: Website live chat, lead capture, auto-responses
-- social_media: Social media scheduling, content calendar, analytics
-- reputation: Review aggregation from Google, Yelp, Facebook
-
-**Files - Document management:**
-- documents: File manager, folders, sharing
-- contracts: Contract management, signatures, renewals
-- images: Image gallery, before/after photos
-- uploads: Upload manager, file attachments
-- portfolios: Portfolio showcase, case studies, project gallery
-- galleries: Photo galleries with client access, proofing
-
-**Signing & Compliance:**
-- waivers: Waiver templates, digital signatures, print copies, expiry tracking
-- forms: Custom forms, intake forms, questionnaires, submissions
-- signatures: E-signature tracking, signed documents, countersigning
-
-**Hospitality & Food:**
-- reservations: Table/room/resource reservations with date/time
-- tables: Restaurant table status (open/occupied/reserved), capacity
-- menus: Menu items, categories, pricing, dietary flags
-- orders: Order management, customer, items, total, status
-- rooms: Room management for hotels/spas/studios, hourly rates
-- recipes: Recipe management, ingredients, portions, cost, prep time
-
-**Education & Programs:**
-- classes: Class schedules, enrollment, instructors, capacity
-- membership_plans: Plan management — name, price, description, features, interval. Use cards view. Always paired with `memberships` as sub-tabs.
-- memberships: Members pipeline — stages ARE the plans (e.g. Basic, Premium, VIP), cards ARE the members. Move member = change plan. Use pipeline view. Always paired with `membership_plans` in a "Memberships" tab.
-- courses: Course catalog, modules, duration, progress
-- attendance: Check-in logs, participation tracking
-
-**Field Service:**
-- inspections: Inspection checklists, inspector, pass/fail results
-- routes: Service routes, stops, driver, vehicle, ETAs
-- fleet: Vehicle fleet, make/model, mileage, next service
-- permits: Building/work permits, authority, status, expiry
-
-**Health & Medical:**
-- prescriptions: Medication prescriptions, dosage, frequency, refills
-- treatments: Treatment plans, provider, follow-up care
-
-**Digital & Online:**
-- client_portal: Client-facing portal for schedule, billing, progress, documents, account
-
-## AVAILABLE ICONS
-
-home, people, box, clock, dollar, check, chat, folder, briefcase, star, tool, calendar, mail, file, target, truck, users, grid, calculator, wallet, edit, megaphone, image, upload, layout, clipboard, archive, rotate, settings, chart, zap, heart, shield, globe, package, book, shopping-cart, map
-
-## INDUSTRY TEMPLATES (use as starting points, customize based on details)
-
-**Barber/Salon:**
-- Dashboard: (empty — platform-managed)
-- Clients: clients (Clients, view: pipeline, stages: ["New Client", "Regular", "VIP", "Ambassador"]), loyalty (Rewards)
-- Schedule: calendar (Schedule, view: calendar)
-- Services: packages (Service Menu, view: cards)
-- Staff: staff (Barbers/Stylists), shifts (Shifts, view: table) [if multiple staff]
-- Payments: payments (Payments), invoices (Receipts)
-
-**Landscaping:**
-- Dashboard: (empty — platform-managed)
-- Customers: clients (Customers, view: pipeline, stages: ["Estimate", "Scheduled", "In Progress", "Complete", "Recurring"]), leads (Leads)
-- Jobs: calendar (Schedule, view: calendar), jobs (Jobs), estimates (Estimates), routes (Routes)
-- Crew: staff (Crew), shifts (Assignments, view: table), equipment (Equipment), fleet (Vehicles)
-- Billing: invoices (Invoices), payments (Payments), expenses (Expenses)
-
-**Restaurant/Cafe:**
-- Dashboard: (empty — platform-managed)
-- Reservations: calendar (Schedule, view: calendar), tables (Table Layout), waitlist (Waitlist)
-- Menu: menus (Menu Items), recipes (Recipes), inventory (Inventory)
-- Orders: orders (Online Orders), loyalty (Loyalty Program)
-- Team: staff (Staff, view: cards), shifts (Shifts, view: table), tip_pools (Tips)
-- Finances: payments (Sales), invoices (Invoices), expenses (Expenses), suppliers (Suppliers)
-
-**Martial Arts Studio:**
-- Dashboard: (empty — platform-managed)
-- Students: clients (Students, view: pipeline, stages: use belt stages user provides e.g. ["White Belt", "Yellow Belt", "Orange Belt", "Green Belt", "Blue Belt", "Brown Belt", "Black Belt"]), contacts (Families, view: list)
-- Schedule: calendar (Schedule, view: calendar)
-- Memberships: membership_plans (Plans, view: cards), memberships (Members, view: pipeline, stages: ["Basic", "Advanced", "Elite", "Cancelled"])
-- Programs: classes (Class Types, view: cards), waivers (Waivers, view: pipeline), client_portal (Client Portal)
-- Team: staff (Instructors), shifts (Staff Shifts, view: table)
-- Billing: payments (Payments), invoices (Invoices)
-
-**Fitness Studio/Gym:**
-- Dashboard: (empty — platform-managed)
-- Members: clients (Members, view: pipeline, stages: ["Trial", "New Member", "Active", "Loyal", "Champion"]), leads (Prospects)
-- Memberships: membership_plans (Plans, view: cards), memberships (Members, view: pipeline, stages: ["Day Pass", "Basic", "Premium", "VIP", "Cancelled"])
-- Schedule: calendar (Schedule, view: calendar)
-- Programs: classes (Class Types, view: cards), waivers (Waivers), client_portal (Client Portal)
-- Team: staff (Trainers), shifts (Staff Schedule, view: table)
-- Billing: payments (Payments), invoices (Invoices)
-
-**Real Estate:**
-- Dashboard: (empty — platform-managed)
-- Leads: leads (Leads), clients (Clients)
-- Properties: listings (Listings), properties (Properties), images (Photos)
-- Pipeline: jobs (Deals), todos (Tasks)
-- Documents: documents (Documents), contracts (Contracts), signatures (Signatures)
-
-**Freelancer/Consultant:**
-- Dashboard: (empty — platform-managed)
-- Clients: clients (Clients), leads (Prospects), client_portal (Client Portal)
-- Projects: projects (Projects), time_tracking (Time Tracking)
-- Billing: invoices (Invoices), payments (Payments), estimates (Quotes)
-- Files: documents (Documents), contracts (Contracts)
-
-**Retail Store:**
-- Dashboard: (empty — platform-managed)
-- Products: products (Products), inventory (Inventory), orders (Orders)
-- Customers: clients (Customers, view: pipeline, stages: ["First Purchase", "Returning", "Regular", "Gold Member", "VIP"]), leads (Leads), loyalty (Loyalty Program)
-- Sales: invoices (Invoices), payments (Payments)
-- Staff: staff (Staff), shifts (Shifts)
-
-**Auto Shop:**
-- Dashboard: (empty — platform-managed)
-- Customers: clients (Customers)
-- Schedule: calendar (Schedule, view: calendar), jobs (Work Orders)
-- Parts: inventory (Parts), products (Products), inspections (Inspections)
-- Billing: invoices (Invoices), payments (Payments), estimates (Estimates)
-
-**Cleaning Service:**
-- Dashboard: (empty — platform-managed)
-- Clients: clients (Clients), leads (Leads)
-- Jobs: jobs (Jobs), routes (Routes), checklists (Checklists)
-- Team: staff (Cleaners), shifts (Assignments), fleet (Vehicles)
-- Billing: invoices (Invoices), payments (Payments), subscriptions (Subscriptions)
-
-**Photography/Creative:**
-- Dashboard: (empty — platform-managed)
-- Clients: clients (Clients), leads (Inquiries)
-- Schedule: calendar (Schedule, view: calendar)
-- Gallery: galleries (Client Galleries), portfolios (Portfolio), images (Photos)
-- Business: invoices (Invoices), contracts (Contracts), payments (Payments)
-
-**Tutoring/Education:**
-- Dashboard: (empty — platform-managed)
-- Students: clients (Students), leads (Inquiries), attendance (Attendance), client_portal (Student Portal)
-- Schedule: calendar (Schedule, view: calendar)
-- Materials: documents (Curriculum), notes (Session Notes), courses (Courses)
-- Memberships: membership_plans (Plans, view: cards), memberships (Enrolled Students, view: pipeline, stages: ["Trial", "Monthly", "Semester", "Annual", "Cancelled"])
-- Billing: invoices (Invoices), payments (Payments)
-
-**Pet Grooming/Veterinary:**
-- Dashboard: (empty — platform-managed)
-- Clients: clients (Pet Parents), notes (Pet Profiles)
-- Schedule: calendar (Schedule, view: calendar)
-- Medical: treatments (Treatments), prescriptions (Prescriptions) [vet only]
-- Team: staff (Groomers/Vets), shifts (Schedule, view: table)
-- Payments: payments (Payments), invoices (Receipts)
-
-**Dental/Medical:**
-- Dashboard: (empty — platform-managed)
-- Patients: clients (Patients), forms (Intake Forms), client_portal (Patient Portal)
-- Schedule: calendar (Schedule, view: calendar)
-- Clinical: treatments (Treatment Plans), prescriptions (Prescriptions), notes (Notes)
-- Records: documents (Records), waivers (Consent Forms), signatures (Signatures)
-- Billing: invoices (Invoices), payments (Payments)
-- Staff: staff (Staff), shifts (Schedule, view: table)
-
-**Construction/Electrical/Plumbing:**
-- Dashboard: (empty — platform-managed)
-- Clients: clients (Clients), leads (Leads)
-- Projects: jobs (Work Orders), schedules (Timeline), estimates (Estimates)
-- Resources: staff (Crew), equipment (Equipment), fleet (Vehicles), inventory (Materials)
-- Compliance: inspections (Inspections), permits (Permits), checklists (Safety Checklists)
-- Billing: invoices (Invoices), payments (Payments), expenses (Expenses)
-
-**Event Planning/Catering:**
-- Dashboard: (empty — platform-managed)
-- Clients: clients (Clients), leads (Inquiries), guests (Guest Lists)
-- Events: calendar (Schedule, view: calendar), venues (Venues)
-- Vendors: vendors (Vendors), menus (Menus) [catering]
-- Business: invoices (Invoices), payments (Payments), contracts (Contracts)
-
-**Legal/Accounting:**
-- Dashboard: (empty — platform-managed)
-- Clients: clients (Clients), leads (Prospects), client_portal (Client Portal)
-- Cases: cases (Cases), documents (Documents), contracts (Contracts)
-- Work: time_tracking (Time Tracking), todos (Tasks)
-- Billing: invoices (Invoices), payments (Payments), estimates (Proposals)
-
-**Hotel/Spa:**
-- Dashboard: (empty — platform-managed)
-- Guests: clients (Guests), reservations (Reservations, view: table), client_portal (Guest Portal)
-- Schedule: calendar (Schedule, view: calendar), rooms (Rooms)
-- Services: treatments (Treatments), packages (Packages)
-- Staff: staff (Staff), shifts (Shifts, view: table)
-- Billing: invoices (Invoices), payments (Payments)
-
-## RULES FOR GOOD CONFIGS
-
-1. **ONE universal calendar — NO redundant sub-tabs.** The calendar component has built-in filter chips (All | Appointments | Classes | Shifts) and a view toggle (calendar/list). It already shows ALL time-based events with color coding (Appointment=blue, Class=purple, Shift=green).
-   Do NOT add appointments, classes, shifts, schedules, or reservations as sub-components on the same tab as a calendar — they are REDUNDANT because the calendar already displays them via filter chips.
-   Non-time entities (rooms, tables, equipment, venues, jobs) are fine alongside the calendar.
-   The ONLY component that should have view: "calendar" is the "calendar" component itself.
-   If you need a class-type catalog or shift management, put them on a SEPARATE tab (e.g., Programs for class types, Team for shifts).
-   Example for a fitness Schedule tab — just the calendar, nothing else:
-   - {{"id": "calendar", "label": "Schedule", "view": "calendar"}}
-2. **ALWAYS start with a Dashboard tab** but with EMPTY components: `[]`. Dashboard is platform-managed and will be populated by the system. The AI should include the Dashboard tab entry (for nav) but with no components.
-3. **Use 3-5 user tabs** (plus Dashboard = 4-6 total) - small businesses need simplicity
-4. **Each tab should have 1-4 components** - don't overwhelm
-5. **Use industry-appropriate labels:**
-   - Barber: "Clients" not "Customers"
-   - Restaurant: "Guests" or "Reservations" not "Clients"
-   - Fitness: "Members" not "Clients"
-   - Medical: "Patients" not "Clients"
-   - Construction: "Projects" not "Jobs"
-6. **Solo operators don't need Staff tabs** - only add if they mention employees/team
-7. **Match complexity to business size (tab counts EXCLUDE Dashboard):**
-   - Solo: 3 tabs + Dashboard = 4 total, 4-6 components
-   - Small team (2-5): 4 tabs + Dashboard = 5 total, 6-10 components
-   - Larger team: 5-6 tabs + Dashboard = 6-7 total, 8-14 components
-8. **Group logically by workflow, not by component category**
-9. **Use industry-specific components when relevant:**
-   - Restaurant/cafe: reservations, tables, menus, orders, recipes
-   - Fitness/martial arts: classes, memberships, waivers, attendance
-   - Medical/dental: treatments, prescriptions, forms (intake)
-   - Construction/electrical/plumbing: inspections, permits, fleet, checklists
-   - Real estate: listings, properties
-   - Photography/creative: galleries, portfolios
-   - Events/catering: venues, guests, menus
-   - Legal: cases, time_tracking
-   - Salon/barber: loyalty, packages, galleries (showcase cuts/styles)
-   - Nail tech/lash/brows: galleries (showcase work)
-   - Tattoo artist: portfolios or galleries (showcase art)
-   - Landscaping/cleaning/detailing: galleries (before/after photos)
-   - Restaurant/bakery/food truck: galleries (food photos)
-   - Florist/wedding planner: galleries (arrangements/events)
-   - Interior design/architecture: portfolios (project showcase)
-   - Service businesses with vehicles: fleet, routes
-10. **Waivers are important for physical activities** - martial arts, fitness, sports, adventure
-11. **ALWAYS prefer industry-specific components over generic ones:**
-    - Restaurant with food = MUST use menus, recipes (not just products)
-    - Hotel with spa = MUST use rooms, treatments (not just appointments)
-    - Moving company = MUST use fleet, routes, checklists (not just jobs)
-    - Catering = MUST use menus, recipes, guests (not just products, clients)
-    - Property mgmt = MUST use properties, inspections (not just clients, tickets)
-    - Recruiting = MUST use cases for placements, time_tracking for billing
-    - Tattoo/piercing = MUST use waivers, portfolios or galleries
-    - Nail tech/lash/brows/salon/barber = MUST use galleries (to showcase work on website)
-    - Landscaping/cleaning/auto detailing = MUST use galleries (before/after photos)
-    - Restaurant/bakery/food truck = MUST use galleries (food photos)
-    - Florist/wedding/event planner = MUST use galleries (arrangements/events)
-    - Interior design/architecture = MUST use portfolios (project showcase)
-    - Any business that showcases visual work = MUST use galleries or portfolios (connects to website gallery widget automatically)
-    - Any business with vehicles/trucks = MUST use fleet
-    - Any business with food/cooking = MUST use recipes
-    - Any business with class schedules = MUST use classes (not just appointments)
-12. **Pipeline stages MUST reflect what the user describes:**
-    - If user mentions belt stages (white, yellow, orange, green, blue, brown, black) → use THOSE as stages, not generic CRM stages
-    - If user mentions tiers (Bronze, Silver, Gold) → use those
-    - If user describes their own process → use their words
-    - The system auto-colors stages based on color words in the name (e.g. "White Belt" → white, "Gold Plan" → gold, "Black Belt" → black)
-    - Generic CRM stages (New, Active, Loyal, VIP) are ONLY for businesses with no specific progression described
-    - ALWAYS include the stages array on pipeline components: {{"id": "clients", "label": "Students", "view": "pipeline", "stages": ["White Belt", "Yellow Belt", "Orange Belt", "Green Belt", "Blue Belt", "Brown Belt", "Black Belt"]}}
-13. **Membership program uses TWO sub-tabs in its own "Memberships" tab:**
-    - `membership_plans` (label: "Plans", view: cards) — create/manage plans with name, price, description, features
-    - `memberships` (label: "Members", view: pipeline) — stages = plan names, cards = members
-    - ALWAYS give memberships its own tab labeled "Memberships" — never nest inside another tab.
-    - Any business with recurring memberships (fitness, martial arts, salon, spa, tutoring, yoga, dance) should use this.
-    - Example: {{"id": "membership_plans", "label": "Plans", "view": "cards"}}, {{"id": "memberships", "label": "Members", "view": "pipeline", "stages": ["Basic", "Premium", "VIP", "Cancelled"]}}
-14. **Kids/family businesses need Families, not Prospects:**
-    - Kids martial arts, daycare, tutoring, dance → use contacts as "Families" or "Parents & Guardians" (view: list)
-    - Do NOT add leads/prospects pipeline for businesses that primarily serve families with children
-    - The parent/guardian is the one paying, signing waivers, and communicating — so family contact info is essential
-    - Only add leads/prospects if the user specifically mentions needing a sales pipeline
-15. **Client Portal sub-tab for client-facing businesses:**
-    - Studios (martial arts, dance, yoga, fitness, boxing, music) → add `client_portal` sub-tab in the Programs tab
-    - Professional services (legal, accounting, consulting, medical, dental, spa) → add `client_portal` sub-tab in the Clients tab
-    - DO NOT add portal for: restaurants, cafes, retail, food trucks, bars (no repeat-client portal needed)
-    - The portal lets clients view their schedule, billing, progress, documents, and account
-    - Example: {{"id": "client_portal", "label": "Client Portal", "view": "route"}}
-16. **Programs tab should default to pipeline view:**
-    - Programs represent client journeys (belt progression, membership tiers, course levels)
-    - Use pipeline view as the default for the main component in Programs tab
-    - Example for martial arts: {{"id": "programs", "label": "Programs", "view": "pipeline", "stages": ["White Belt", "Yellow Belt", "Green Belt", "Blue Belt", "Red Belt", "Black Belt"]}}
-17. **Maximum 7 user-configured tabs** (+ Dashboard = 8 total). If more are needed, consolidate related functions into one tab with sub-components.
-18. **Services + Calendar + Staff family group:**
-    - `packages` (Service Menu), `calendar`, and `staff` form a logical unit for appointment-based businesses
-    - If a business offers bookable services, ensure it has all three: packages (Service Menu) + calendar + staff
-    - The booking flow connects them: customer picks service → picks date/time → optionally picks staff member
-    - Appointment-based businesses: salon, barber, spa, med spa, lash/brow, tattoo, pet grooming, massage, dental, chiropractic, photography
-
-## GOOD vs BAD CONFIG EXAMPLES
-
-**GOOD - Solo Barber "Tony's Cuts":**
-{{
-    "tabs": [
-        {{ "id": "tab_1", "label": "Dashboard", "icon": "home", "components": [] }},
-        {{ "id": "tab_2", "label": "Clients", "icon": "people", "components": [{{ "id": "clients", "label": "Clients", "view": "pipeline" }}] }},
-        {{ "id": "tab_3", "label": "Schedule", "icon": "calendar", "components": [{{ "id": "calendar", "label": "Schedule", "view": "calendar" }}] }},
-        {{ "id": "tab_4", "label": "Payments", "icon": "dollar", "components": [{{ "id": "payments", "label": "Payments", "view": "table" }}] }}
-    ]
-}}
-Why it's good: Simple, 4 tabs, Dashboard empty (platform-managed), ONE calendar on Schedule (no redundant appointments sub-tab), all views explicit.
-
-**BAD - Same barber:**
-{{
-    "tabs": [
-        {{ "id": "tab_1", "label": "People", "icon": "people", "components": [{{ "id": "clients", "label": "Clients" }}, {{ "id": "leads", "label": "Leads" }}, {{ "id": "staff", "label": "Staff" }}, {{ "id": "vendors", "label": "Vendors" }}] }},
-        {{ "id": "tab_2", "label": "Money", "icon": "dollar", "components": [{{ "id": "invoices", "label": "Invoices" }}, {{ "id": "payments", "label": "Payments" }}, {{ "id": "expenses", "label": "Expenses" }}, {{ "id": "payroll", "label": "Payroll" }}, {{ "id": "estimates", "label": "Estimates" }}] }}
-    ]
-}}
-Why it's bad: Generic labels, too many components, includes Staff/Payroll for a solo barber, no Dashboard tab.
-
-**GOOD - Landscaping company with 5 crew:**
-{{
-    "tabs": [
-        {{ "id": "tab_1", "label": "Dashboard", "icon": "home", "components": [] }},
-        {{ "id": "tab_2", "label": "Customers", "icon": "people", "components": [{{ "id": "clients", "label": "Customers", "view": "pipeline" }}, {{ "id": "leads", "label": "Leads", "view": "pipeline" }}] }},
-        {{ "id": "tab_3", "label": "Jobs", "icon": "briefcase", "components": [{{ "id": "calendar", "label": "Schedule", "view": "calendar" }}, {{ "id": "jobs", "label": "Jobs", "view": "pipeline" }}, {{ "id": "estimates", "label": "Estimates", "view": "table" }}] }},
-        {{ "id": "tab_4", "label": "Crew", "icon": "users", "components": [{{ "id": "staff", "label": "Crew", "view": "cards" }}, {{ "id": "shifts", "label": "Assignments", "view": "table" }}] }},
-        {{ "id": "tab_5", "label": "Billing", "icon": "dollar", "components": [{{ "id": "invoices", "label": "Invoices", "view": "table" }}, {{ "id": "payments", "label": "Payments", "view": "table" }}] }}
-    ]
-}}
-Why it's good: Dashboard empty (platform-managed), ONE calendar on Jobs tab, no redundant sub-tabs alongside calendar, shifts on Crew tab (not calendar tab), all views explicit.
-
-Now analyze the business description and create a perfect config."""
-
-    response = claude.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=2000,
-        messages=[{"role": "user", "content": prompt}]
+    return await response_cache.aget_or_compute(
+        'analyze_business', CONFIG_MODEL, PROMPT_VERSIONS['analyze_business'], description,
+        lambda: LLM_POLICIES['config'].acall(attempt, hedge=not on_tab), bypass=bypass_cache,
     )
-    raw_response = response.content[0].text
-    print(f"Claude response: {raw_response}")
 
-    # Strip markdown code blocks if present
-    cleaned = raw_response.strip()
-    if cleaned.startswith("```"):
-        cleaned = re.sub(r'^```json?\n?', '', cleaned)
-        cleaned = re.sub(r'\n?```$', '', cleaned)
 
-    print(f"Cleaned JSON: {cleaned}")
-    return json.loads(cleaned)
+# The fallback dashboard when the config call fails and no template matched,
+# in config_dsl's line format
+FALLBACK_CONFIG_TEXT = """tab: Dashboard | home
+tab: Clients | people
+clients | Clients | p | New, Active, Loyal, VIP
+contacts | Contacts | l
+tab: Schedule | calendar
+calendar | Schedule | c
+tab: Billing | dollar
+invoices | Invoices | t
+payments | Payments | t
+"""
+
+
+def template_rules_config(description, conversation_history, template, business_type):
+    """(config, confident): the rule-based customization of a matched template,
+    and whether it clears TEMPLATE_RULES_MIN_CONFIDENCE (else ask the model)."""
+    config, confidence, reasons = customize_template(description, template, business_type, conversation_history)
+    confident = confidence >= TEMPLATE_RULES_MIN_CONFIDENCE
+    print(f"Template rules: confidence {confidence}" + ('' if confident else f" — asking the model ({'; '.join(reasons)})"))
+    return config, confident
+
+
+def fallback_config(description, conversation_history, business_type, template=None):
+    """Deterministic config for when the model call fails: the raw template if
+    the description matched one, else a generic dashboard."""
+    config = copy.deepcopy(template) if template else parse_config_dsl(FALLBACK_CONFIG_TEXT)
+    config['business_name'] = extract_business_name(description, conversation_history) or 'My Business'
+    config['business_type'] = business_type or 'other'
+    config['summary'] = 'Standard setup — customize tabs and components from the dashboard.'
+    return config
 
 @app.route('/')
 def home():
@@ -1048,282 +796,529 @@ def form():
 def examples():
     return render_template('examples.html')
 
+# The 400 reply to a POST body that isn't a JSON object
+BAD_JSON_BODY = {'success': False, 'error': 'Request body must be a JSON object.'}
+
+
+def json_body():
+    """The Flask request's body if it's a JSON object, else None."""
+    data = request.get_json(force=True, silent=True)
+    return data if isinstance(data, dict) else None
+
+
+async def chat_reply(messages):
+    """The /chat payload: Haiku's next clarifying question (~10x cheaper than
+    Sonnet), or READY_TO_BUILD once the chat is long enough."""
+    # Cap at 10 user messages — force READY_TO_BUILD after that
+    if chat_limit_reached(messages):
+        return {'success': True, 'response': 'READY_TO_BUILD'}
+
+    async def attempt(timeout):
+        response = await create_message(
+            'chat', timeout,
+            model=FAST_MODEL,
+            max_tokens=256,
+            **chat_request(messages)
+        )
+        PROMPT_CACHE_STATS.record('chat', response.usage)
+        return response.content[0].text
+
+    try:
+        return {'success': True, 'response': await LLM_POLICIES['chat'].acall(attempt)}
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+
 @app.route('/chat', methods=['POST'])
 def chat():
     """Handle chat messages for clarifying vague business descriptions.
-    Uses Haiku for cost efficiency (~10x cheaper than Sonnet).
     Capped at 10 messages to prevent runaway conversations."""
-    data = request.json
-    messages = data.get('messages', [])
+    data = json_body()
+    if data is None:
+        return jsonify(BAD_JSON_BODY), 400
+    return jsonify(run_async(chat_reply(data.get('messages', []))))
+
+def response_cache_bypassed(headers=None):
+    """True if the client asked for fresh model output (Cache-Control: no-cache).
+    headers defaults to the current Flask request's."""
+    headers = request.headers if headers is None else headers
+    return 'no-cache' in headers.get('Cache-Control', '').lower()
+
+async def request_check_input(description, bypass_cache=False):
+    """The model's DETAILED/VAGUE verdict (or its cached response). Raises CallFailed."""
+    async def attempt(timeout):
+        response = await create_message(
+            'check_input', timeout,
+            model=FAST_MODEL,
+            max_tokens=10,
+            **check_input_request(description)
+        )
+        return is_detailed(response.content[0].text)
 
-    # Cap at 10 user messages — force READY_TO_BUILD after that
-    user_message_count = sum(1 for m in messages if m.get('role') == 'user')
-    if user_message_count >= 10:
-        return jsonify({'success': True, 'response': 'READY_TO_BUILD'})
-
-    system_prompt = """You're a CTO helping someone build their business platform. Short, casual, helpful.
-
-LANGUAGE RULE: Always respond in the SAME LANGUAGE the user writes in. If they write in Spanish, respond in Spanish. If they write in French, respond in French. If they write in English, respond in English. Match their language exactly throughout the entire conversation.
-
-You need to gather these details (ask about them one at a time, across multiple messages):
-1. Business name
-2. What they do — specific services, products, or programs they offer
-3. Who their customers are (clients, students, patients, members, pet owners, etc.)
-4. Team size — solo, small team, or larger. Who works there? (instructors, techs, stylists, etc.)
-5. What's their biggest headache right now? (scheduling chaos, lost leads, manual invoicing, etc.)
-6. Do they track any kind of progression or stages? (client journey, belt ranks, loyalty tiers, project phases, etc.)
-
-Your style:
-- One short question at a time — never ask multiple questions in the same message
-- Show genuine interest in their business. Relate to what they share.
-- If they mention a pain point, briefly explain how the platform fixes it, then move to the next question
-- If they're just starting out, help them think through what they'll need
-- No fluff, no corporate talk
-- NEVER rush — ask at least 4 questions before deciding you have enough info
-
-IMPORTANT: Do NOT say READY_TO_BUILD until you have gathered at least 5 of the 6 details above. The more context you gather, the better system you can build. Be thorough.
-
-When you genuinely have enough detail (at least 5 items covered across the conversation), respond with EXACTLY: "READY_TO_BUILD"
-
-Examples:
-- "Nice! What's the business called?"
-- "Cool — so what kind of services do you offer there?"
-- "And who are your typical customers? Families, individuals, businesses?"
-- "Got it. Is it just you running things, or do you have a team?"
-- "What's the biggest pain point right now? Like what takes up too much of your time?"
-- "Do your clients go through any kind of stages or progression? Like new → regular → VIP, or belt ranks, or anything like that?"
-"""
+    return await response_cache.aget_or_compute(
+        'check_input', FAST_MODEL, PROMPT_VERSIONS['check_input'], description,
+        lambda: LLM_POLICIES['check_input'].acall(attempt),
+        bypass=bypass_cache,
+    )
 
+
+def local_check_input(description):
+    """(detailed, lean, missing) from the local classifier — detailed is None
+    when the model should decide."""
+    detailed, lean, missing = classify_input(description)
+    return (detailed if CHECK_INPUT_LOCAL else None), lean, missing
+
+
+def record_check_input(source, detailed, missing):
+    INPUT_CLASSIFIER_STATS.record(source, detailed)
+    print(f"Check input: {'DETAILED' if detailed else 'VAGUE'} from {source} (missing: {', '.join(missing) or 'none'})")
+
+
+async def shadow_check_input(description, local_detailed):
+    """Ask the model about an input the classifier already answered, for the agreement rate."""
     try:
-        response = claude.messages.create(
-            model="claude-haiku-4-5-20251001",
-            max_tokens=256,
-            system=system_prompt,
-            messages=messages
-        )
-        return jsonify({'success': True, 'response': response.content[0].text})
+        INPUT_CLASSIFIER_STATS.record_agreement('shadow', local_detailed, await request_check_input(description))
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+        print(f"Check input shadow call failed: {e}")
+
+
+async def check_input_reply(description, bypass_cache=False):
+    """The /check-input payload. Clear cases are answered locally; borderline
+    ones go to the model."""
+    detailed, lean, missing = local_check_input(description)
+    source = 'local'
+    if detailed is not None:
+        if random.random() < CHECK_INPUT_SHADOW_RATE:
+            spawn(shadow_check_input(description, detailed))
+    else:
+        try:
+            detailed = await request_check_input(description, bypass_cache)
+            source = 'model'
+            INPUT_CLASSIFIER_STATS.record_agreement('borderline', lean, detailed)
+        except CallFailed:
+            detailed, source = lean, 'fallback'
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+    record_check_input(source, detailed, missing)
+    return {'success': True, 'detailed': detailed}
+
 
 @app.route('/check-input', methods=['POST'])
 def check_input():
-    """Check if input is detailed enough or needs clarification"""
-    data = request.json
-    description = data.get('description', '')
+    """Check if input is detailed enough or needs clarification."""
+    data = json_body()
+    if data is None:
+        return jsonify(BAD_JSON_BODY), 400
+    return jsonify(run_async(check_input_reply(data.get('description', ''), response_cache_bypassed())))
+
+async def request_website_copy(business_name, business_type, description, bypass_cache=False):
+    """Website copy from the pre-generated corpus, or one Haiku 4.5 call (or its
+    cached response). Raises on any failure. business_type may be None and
+    business_name may be NAME_PLACEHOLDER when the call runs speculatively,
+    before the config is known."""
+    if not bypass_cache:
+        corpus_copy = await asyncio.to_thread(COPY_CORPUS.lookup, business_name, business_type, description)
+        if corpus_copy is not None:
+            return corpus_copy
+
+    async def attempt(timeout):
+        return await request_json(
+            'website_copy', timeout,
+            model=FAST_MODEL,
+            max_tokens=800,
+            **website_copy_request(business_name, business_type, description)
+        )
+
+    return await response_cache.aget_or_compute(
+        'website_copy', FAST_MODEL, PROMPT_VERSIONS['website_copy'], description,
+        lambda: LLM_POLICIES['website_copy'].acall(attempt),
+        extra=(business_name, business_type), bypass=bypass_cache,
+    )
 
-    prompt = f"""Analyze this business description and determine if it has enough detail to configure a business platform.
+async def generate_website_copy(business_name, business_type, description, bypass_cache=False):
+    """Generate personalized website copy using Haiku 4.5. Returns dict with text fields."""
+    try:
+        return await request_website_copy(business_name, business_type, description, bypass_cache)
+    except Exception as e:
+        print(f"Website copy generation failed, using defaults: {e}")
+        return default_website_copy(business_name, business_type)
+
+def default_website_copy(business_name, business_type):
+    """Template copy used when the model call fails."""
+    return {
+        'hero_headline': f'Welcome to {business_name}',
+        'hero_subheadline': f'{business_name} — your trusted {business_type.replace("_", " ")} partner.',
+        'hero_cta': 'Get Started',
+        'about_title': f'About {business_name}',
+        'about_text': f'{business_name} is dedicated to providing exceptional {business_type.replace("_", " ")} services. We pride ourselves on quality, reliability, and customer satisfaction.',
+        'features_title': 'Why Choose Us',
+        'features': ['Professional & experienced team', 'Committed to quality service', 'Customer satisfaction guaranteed'],
+        'cta_headline': 'Ready to Get Started?',
+        'cta_text': 'Contact us today to learn more.',
+        'cta_button': 'Contact Us',
+    }
+
+
+class TabPreview:
+    """Post-processes tabs as they stream in and emits each as a 'tab' event.
+
+    consolidate_calendars only looks at earlier tabs when deciding a tab's
+    calendar, and transform_pipeline_stages works per component, so running
+    them over the tabs seen so far gives each tab its final form (until the
+    whole-config passes — tab limit, gallery, locked components — which can
+    still add, move or drop tabs; the final config event is authoritative)."""
+
+    def __init__(self, emit):
+        self.emit = emit
+        self.tabs = []
+
+    def add(self, index, tab):
+        if index != len(self.tabs):
+            return
+        preview = {'tabs': self.tabs + [copy.deepcopy(tab)]}
+        strip_locked_flags(preview)
+        consolidate_calendars(preview)
+        transform_pipeline_stages(preview)
+        self.tabs = preview['tabs']
+        self.emit('tab', {'index': index, 'tab': self.tabs[-1]})
+
+    def flush(self, tabs):
+        """Emit whatever the stream didn't (cache hits, a truncated final tab)."""
+        for index in range(len(self.tabs), len(tabs)):
+            self.add(index, tabs[index])
+
+
+def finalize_config(config):
+    """Whole-config fixes applied to every model-generated config."""
+    config = validate_colors(config)
+    config = consolidate_calendars(config)
+    config = enforce_tab_limit(config)
+    config = ensure_gallery(config)
+    config = transform_pipeline_stages(config)
+    print(f"Config: {config}")
+    return config
+
+
+def website_identity(config):
+    """(business_name, business_type) the website copy is written for."""
+    return config.get('business_name', 'My Business'), config.get('business_type', 'service')
+
+
+def build_website(config, website_copy):
+    bname, btype = website_identity(config)
+    print(f"Website copy generated: {list(website_copy.keys())}")
+    website_data = build_website_data(bname, btype, website_copy, config.get('colors', {}))
+    print(f"Website data built: {len(website_data.get('pages', []))} pages, {len(website_data.get('elements', []))} elements")
+    return website_data
 
-Description: "{description}"
 
-A DETAILED description must include ALL of these:
-- Business name (a specific name, not just the type)
-- Specific services or products offered
-- Who their customers are
-- Team size or structure
-- At least one workflow detail (how they handle clients, scheduling, billing, etc.)
+def dashboard_base_url():
+    return os.environ.get('DASHBOARD_URL', 'http://localhost:3000')
 
-If ANY of these is missing, respond "VAGUE". Only respond "DETAILED" if the description is truly comprehensive with all 5 elements.
 
-Most single-sentence descriptions should be "VAGUE" — we want to ask follow-up questions to build a better system.
+def dashboard_post_body(config, website_data):
+    post_body = {
+        'businessName': config.get('business_name'),
+        'businessType': config.get('business_type'),
+        'tabs': config.get('tabs', []),
+        'colors': config.get('colors', {}),
+    }
+    if website_data:
+        post_body['websiteData'] = website_data
+    return post_body
 
-Respond with ONLY one word: "DETAILED" or "VAGUE" """
 
+def dashboard_config_id(dashboard_data, fallback_id):
+    """The Supabase config ID from a dashboard /api/config reply, or fallback_id."""
+    if dashboard_data.get('success') and dashboard_data.get('data', {}).get('id'):
+        config_id = dashboard_data['data']['id']
+        print(f"Saved to Supabase with ID: {config_id}")
+        return config_id
+    print(f"Dashboard API returned: {dashboard_data}")
+    return fallback_id
+
+
+def store_website_data(config_id, website_data):
+    """Save website_data locally, keyed by the Supabase config_id for retrieval."""
     try:
-        response = claude.messages.create(
-            model="claude-haiku-4-5-20251001",
-            max_tokens=10,
-            messages=[{"role": "user", "content": prompt}]
+        # Serialized, compressed and hashed once here — GET /website-data streams the bytes
+        website_store.save_website_data(CONFIGS_FOLDER, config_id, website_data)
+        website_cache.invalidate(config_id)
+        print(f"Website data saved locally for {config_id}")
+    except Exception as e:
+        print(f"Failed to save website data locally: {e}")
+
+
+def configure_response(config, config_id, website_data, dashboard_base, config_path=None):
+    """The /configure success payload. config_path says how the config was
+    made: rules, template_model, model or fallback."""
+    redirect_url = f'{dashboard_base}/dashboard'
+
+    response_data = {
+        'success': True,
+        'config': config,
+        'config_id': config_id,
+        'redirect_url': redirect_url,
+        'config_path': config_path,
+    }
+    if website_data:
+        response_data['website_data'] = {
+            'pages': len(website_data.get('pages', [])),
+            'elements': len(website_data.get('elements', [])),
+            'template_key': get_template_key(config.get('business_type', '')),
+        }
+    return response_data
+
+
+async def run_configure(description, conversation_history, bypass_cache=False, emit=None):
+    """The /configure pipeline. Returns the response payload; raises on failure.
+    emit(event, data), if given, receives streamed tabs and stage progress."""
+    def stage(name, status, **extra):
+        if emit:
+            emit('stage', dict(extra, stage=name, status=status))
+
+    preview = TabPreview(emit) if emit else None
+    on_tab = preview.add if preview else None
+
+    # What the chat gathered (name, team, ...) as labelled lines for the model;
+    # the template rules read the facts from the chat itself
+    own_description = description
+    description = configure_description(description, conversation_history)
+
+    # Try template path first — Beauty & Body industries get consistent configs
+    business_type, family = detect_template_type(description)
+
+    # Website copy doesn't depend on the config — start it now on guessed
+    # name/type and reconcile once the config is back
+    speculative_copy = None
+    if CONFIGURE_PARALLEL_COPY:
+        speculative_copy = AsyncSpeculativeCopy(
+            lambda name, type_, desc: request_website_copy(name, type_, desc, bypass_cache),
+            description, business_type,
+            extract_business_name(description, conversation_history),
         )
-        result = response.content[0].text.strip().upper()
-        is_detailed = "DETAILED" in result
-        return jsonify({'success': True, 'detailed': is_detailed})
+    stage('config', 'started', template=business_type if family else None)
+    template = locked_ids = None
+    if business_type and family:
+        print(f"Template matched: {business_type} (family: {family})")
+        template, locked_ids = get_template(business_type, family)
+    # How the config was made: rules | template_model | model | fallback
+    config_path, rules_config = 'model', None
+    try:
+        if template:
+            rules_config, confident = template_rules_config(own_description, conversation_history, template, business_type)
+            if confident:
+                config, config_path = rules_config, 'rules'
+            else:
+                config_path = 'template_model'
+                config = await analyze_with_template(description, template, business_type, bypass_cache, on_tab)
+        else:
+            # No template for this type (or no match) — build from scratch
+            config = await analyze_business(description, bypass_cache, on_tab)
+    except CallFailed:
+        # The rules' attempt beats the raw template as a fallback
+        config = fallback_config(description, conversation_history, business_type, rules_config or template)
+        config_path = 'fallback'
+    if template:
+        config = validate_locked_components(config, template, locked_ids)
+        config = strip_locked_flags(config)
+    if preview:
+        preview.flush(config.get('tabs', []))
+
+    config = finalize_config(config)
+    if emit:
+        emit('config', config)
+    stage('config', 'done', path=config_path)
+
+    # Generate website data (sections + AI copy)
+    website_data = None
+    stage('website', 'started')
+    try:
+        bname, btype = website_identity(config)
+        print(f"Generating website for {bname} ({btype})...")
+
+        def regenerate(name, type_):
+            return generate_website_copy(name, type_, description, bypass_cache)
+
+        if speculative_copy:
+            website_copy = await speculative_copy.resolve(bname, btype, regenerate)
+        else:
+            website_copy = await regenerate(bname, btype)
+        website_data = build_website(config, website_copy)
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+        print(f"Website generation failed (continuing without): {e}")
+    stage('website', 'done' if website_data else 'failed')
 
-def generate_website_copy(business_name, business_type, description):
-    """Generate personalized website copy using Haiku 4.5. Returns dict with text fields."""
+    # Save config to local JSON file (backup)
+    stage('save', 'started')
+    local_config_id = await asyncio.to_thread(save_config, config, conversation_history)
+    print(f"Saved local config with ID: {local_config_id}")
+
+    # Also save to dashboard's Supabase via API
+    dashboard_base = dashboard_base_url()
+    config_id = local_config_id  # fallback
     try:
-        response = claude.messages.create(
-            model="claude-haiku-4-5-20251001",
-            max_tokens=800,
-            system="You generate website marketing copy for small businesses. Return ONLY valid JSON, no markdown.",
-            messages=[{
-                "role": "user",
-                "content": f"""Business: {business_name} (Type: {business_type})
-Description: {description}
-
-Return JSON:
-{{
-  "hero_headline": "powerful headline, 4-8 words, no quotes",
-  "hero_subheadline": "one compelling sentence about the business",
-  "hero_cta": "call to action button text, 2-4 words",
-  "about_title": "about section heading",
-  "about_text": "2-3 engaging sentences about what makes this business special",
-  "features_title": "section heading for key selling points",
-  "features": ["selling point 1 (1-2 sentences)", "selling point 2 (1-2 sentences)", "selling point 3 (1-2 sentences)"],
-  "cta_headline": "motivating call to action heading",
-  "cta_text": "short persuasive sentence",
-  "cta_button": "action button text, 2-4 words"
-}}"""
-            }]
+        dashboard_resp = await http_client.post(
+            f'{dashboard_base}/api/config',
+            json=dashboard_post_body(config, website_data),
+            timeout=15,
         )
-        text = response.content[0].text.strip()
-        # Strip markdown code fences if present
-        if text.startswith('```'):
-            text = text.split('\n', 1)[1] if '\n' in text else text[3:]
-            if text.endswith('```'):
-                text = text[:-3]
-            text = text.strip()
-        return json.loads(text)
+        config_id = dashboard_config_id(dashboard_resp.json(), local_config_id)
     except Exception as e:
-        print(f"Website copy generation failed, using defaults: {e}")
-        return {
-            'hero_headline': f'Welcome to {business_name}',
-            'hero_subheadline': f'{business_name} — your trusted {business_type.replace("_", " ")} partner.',
-            'hero_cta': 'Get Started',
-            'about_title': f'About {business_name}',
-            'about_text': f'{business_name} is dedicated to providing exceptional {business_type.replace("_", " ")} services. We pride ourselves on quality, reliability, and customer satisfaction.',
-            'features_title': 'Why Choose Us',
-            'features': ['Professional & experienced team', 'Committed to quality service', 'Customer satisfaction guaranteed'],
-            'cta_headline': 'Ready to Get Started?',
-            'cta_text': 'Contact us today to learn more.',
-            'cta_button': 'Contact Us',
-        }
+        print(f"Failed to save to dashboard API (using local ID): {e}")
 
+    if website_data and config_id:
+        await asyncio.to_thread(store_website_data, config_id, website_data)
+    stage('save', 'done', config_id=config_id)
 
-@app.route('/configure', methods=['POST'])
-def configure():
-    data = request.json
+    return configure_response(config, config_id, website_data, dashboard_base, config_path)
+
+
+async def configure_reply(data, bypass_cache=False):
+    """The /configure payload for a request body."""
     description = data.get('description', '')
-    conversation_history = data.get('conversation_history', [])
     print(f"Received request: {description}")
-
     try:
-        # Try template path first — Beauty & Body industries get consistent configs
-        business_type, family = detect_template_type(description)
-        if business_type and family:
-            print(f"Template matched: {business_type} (family: {family})")
-            template, locked_ids = get_template(business_type, family)
-            if template:
-                config = analyze_with_template(description, template, business_type)
-                config = validate_locked_components(config, template, locked_ids)
-                config = strip_locked_flags(config)
-            else:
-                # Template family matched but no template for this type — fallback
-                config = analyze_business(description)
-        else:
-            # No template match — use original build-from-scratch
-            config = analyze_business(description)
-
-        config = validate_colors(config)
-        config = consolidate_calendars(config)
-        config = enforce_tab_limit(config)
-        config = ensure_gallery(config)
-        config = transform_pipeline_stages(config)
-        print(f"Config: {config}")
-
-        # Generate website data (sections + AI copy)
-        website_data = None
-        try:
-            bname = config.get('business_name', 'My Business')
-            btype = config.get('business_type', 'service')
-            bcolors = config.get('colors', {})
-            print(f"Generating website for {bname} ({btype})...")
-            website_copy = generate_website_copy(bname, btype, description)
-            print(f"Website copy generated: {list(website_copy.keys())}")
-            website_data = build_website_data(bname, btype, website_copy, bcolors)
-            print(f"Website data built: {len(website_data.get('pages', []))} pages, {len(website_data.get('elements', []))} elements")
-        except Exception as e:
-            print(f"Website generation failed (continuing without): {e}")
+        return await run_configure(description, data.get('conversation_history', []), bypass_cache)
+    except Exception as e:
+        print(f"Error: {e}")
+        return {'success': False, 'error': str(e)}
 
-        # Save config to local JSON file (backup)
-        local_config_id = save_config(config, conversation_history)
-        print(f"Saved local config with ID: {local_config_id}")
 
-        # Also save to dashboard's Supabase via API
-        dashboard_base = os.environ.get('DASHBOARD_URL', 'http://localhost:3000')
-        config_id = local_config_id  # fallback
-        try:
-            post_body = {
-                'businessName': config.get('business_name'),
-                'businessType': config.get('business_type'),
-                'tabs': config.get('tabs', []),
-                'colors': config.get('colors', {}),
-            }
-            if website_data:
-                post_body['websiteData'] = website_data
-            dashboard_resp = http_requests.post(
-                f'{dashboard_base}/api/config',
-                json=post_body,
-                timeout=15
-            )
-            dashboard_data = dashboard_resp.json()
-            if dashboard_data.get('success') and dashboard_data.get('data', {}).get('id'):
-                config_id = dashboard_data['data']['id']
-                print(f"Saved to Supabase with ID: {config_id}")
-            else:
-                print(f"Dashboard API returned: {dashboard_data}")
-        except Exception as e:
-            print(f"Failed to save to dashboard API (using local ID): {e}")
+@app.route('/configure', methods=['POST'])
+def configure():
+    data = json_body()
+    if data is None:
+        return jsonify(BAD_JSON_BODY), 400
+    return jsonify(run_async(configure_reply(data, response_cache_bypassed())))
 
-        # Save website_data to local file (keyed by Supabase config_id for retrieval)
-        if website_data and config_id:
-            try:
-                ensure_configs_folder()
-                wd_path = os.path.join(CONFIGS_FOLDER, f'{config_id}_website.json')
-                with open(wd_path, 'w') as f:
-                    json.dump(website_data, f)
-                print(f"Website data saved locally: {wd_path}")
-            except Exception as e:
-                print(f"Failed to save website data locally: {e}")
-
-        # Build redirect URL with business info in params (fallback if Supabase config not found)
-        from urllib.parse import quote
-        biz_name = quote(config.get('business_name', ''))
-        biz_type = quote(config.get('business_type', ''))
-        redirect_url = f'{dashboard_base}/dashboard'
-
-        response_data = {
-            'success': True,
-            'config': config,
-            'config_id': config_id,
-            'redirect_url': redirect_url
-        }
-        if website_data:
-            response_data['website_data'] = {
-                'pages': len(website_data.get('pages', [])),
-                'elements': len(website_data.get('elements', [])),
-                'template_key': get_template_key(config.get('business_type', '')),
-            }
-        return jsonify(response_data)
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_configure(data, bypass_cache, put):
+    """Run /configure for a request body, handing put() each (event, data) —
+    the last one done or error — and then None."""
+    description = data.get('description', '')
+    print(f"Received streaming request: {description}")
+    try:
+        result = await run_configure(description, data.get('conversation_history', []), bypass_cache,
+                                     emit=lambda event, payload: put((event, payload)))
+        put(('done', result))
     except Exception as e:
         print(f"Error: {e}")
-        return jsonify({'success': False, 'error': str(e)})
+        put(('error', {'success': False, 'error': str(e)}))
+    put(None)
+
+
+@app.route('/configure/stream', methods=['POST'])
+def configure_stream():
+    """/configure as Server-Sent Events. Events, in order:
+        stage  {stage: config|website|save, status: started|done|failed, ...}
+        tab    {index, tab}   — each tab as soon as the model closes it, post-processed
+        config {...}          — the final config, after whole-config fixes
+        done   — the same payload /configure returns
+        error  {success: false, error}
+    The pipeline runs on the pipeline loop, so a client that disconnects
+    mid-stream still gets its config saved."""
+    data = json_body()
+    if data is None:
+        return jsonify(BAD_JSON_BODY), 400
+
+    events = queue.Queue()
+    pipeline_loop().call_soon_threadsafe(spawn, stream_configure(data, response_cache_bypassed(), events.put))
+
+    def generate():
+        while True:
+            try:
+                item = events.get(timeout=SSE_KEEPALIVE_SECONDS)
+            except queue.Empty:
+                yield ': keepalive\n\n'
+                continue
+            if item is None:
+                return
+            yield sse_event(*item)
+
+    return app.response_class(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',  # don't let a proxy buffer the stream
+    })
+
+def not_modified(etag):
+    """Empty 304 for a conditional GET whose If-None-Match matched."""
+    response = app.response_class(status=304)
+    response.set_etag(etag)
+    return response
 
 @app.route('/website-data/<config_id>', methods=['GET'])
 def get_website_data(config_id):
-    """Retrieve generated website data by Supabase config ID."""
-    wd_path = os.path.join(CONFIGS_FOLDER, f'{config_id}_website.json')
-    if os.path.exists(wd_path):
+    """Retrieve generated website data by Supabase config ID.
+    Sends the stored response body in the best Content-Encoding the client
+    accepts. Supports If-None-Match: a matching ETag gets a 304 without
+    reading the payload."""
+    variant = website_store.choose_variant(CONFIGS_FOLDER, config_id, request.accept_encodings)
+    etag = website_store.read_etag(CONFIGS_FOLDER, config_id)
+    if variant and etag:
+        path, encoding = variant
+        stored_etag = website_store.variant_etag(etag, encoding)
+        if request.if_none_match.contains(stored_etag):
+            return not_modified(stored_etag)
+        # The ETag comes from the bytes sent, so a racing save can't mismatch them
+        body, etag = website_store.read_variant(path, encoding)
+        response = app.response_class(body, mimetype='application/json')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.set_etag(etag)
+        return response
+
+    # Legacy payload: bare website_data JSON, parsed and re-encoded per request
+    wd_path = website_store.legacy_path(CONFIGS_FOLDER, config_id)
+    validator = file_validator(wd_path)
+    if validator is None:
+        website_cache.invalidate(config_id)
+        return jsonify({'success': False, 'error': 'Not found'}), 404
+
+    cached = website_cache.get(config_id, validator)
+    if cached:
+        etag = cached[1]
+    if etag and request.if_none_match.contains(etag):
+        return not_modified(etag)
+
+    if cached is None:
         with open(wd_path, 'r') as f:
-            return jsonify({'success': True, 'data': json.load(f)})
-    return jsonify({'success': False, 'error': 'Not found'}), 404
+            data = json.load(f)
+        cached = (data, etag)
+        website_cache.put(config_id, cached, validator, validator[1])
+    response = jsonify({'success': True, 'data': cached[0]})
+    if etag:
+        response.set_etag(etag)
+    return response
 
 @app.route('/config/<config_id>', methods=['GET'])
 def get_config(config_id):
-    """Retrieve a saved config by ID"""
+    """Retrieve a saved config by ID.
+    Supports If-None-Match against the content hash recorded at write time."""
+    etag = config_store.etag(config_id)
+    if etag and request.if_none_match.contains(etag):
+        return not_modified(etag)
     config = load_config(config_id)
     if config:
-        return jsonify({'success': True, 'config': config})
+        response = jsonify({'success': True, 'config': config})
+        if etag:
+            response.set_etag(etag)
+        return response
     return jsonify({'success': False, 'error': 'Config not found'}), 404
 
 @app.route('/config/<config_id>', methods=['PUT'])
 def update_config(config_id):
     """Update an existing config by ID"""
-    # Load existing config
+    # Load existing config (copy — the loaded one is shared with the cache)
     config = load_config(config_id)
     if not config:
         return jsonify({'success': False, 'error': 'Config not found'}), 404
+    config = copy.deepcopy(config)
 
     # Get changes from request
     changes = request.json or {}
@@ -1346,103 +1341,307 @@ def update_config(config_id):
     if 'sub_items' in changes:
         config['sub_items'] = changes['sub_items']
 
-    # Save back to file
-    config_path = os.path.join(CONFIGS_FOLDER, f'{config_id}.json')
-    with open(config_path, 'w') as f:
-        json.dump(config, f, indent=2)
+    # Configs saved before transcripts were split out still embed the chat
+    split_legacy_transcript(CONFIGS_FOLDER, config_id, config)
 
-    return jsonify({'success': True, 'config': config})
+    # Save back to the config store
+    config_store.put(config_id, config)
+    config_cache.invalidate(config_id)
+
+    response = jsonify({'success': True, 'config': config})
+    etag = config_store.etag(config_id)
+    if etag:
+        response.set_etag(etag)
+    return response
 
-@app.route('/signup', methods=['POST'])
-def signup():
-    """Create a Supabase auth user for the onboarding flow.
-    Returns auth tokens so the frontend can redirect with a live session.
-    Accepts optional config_id to link config after signup."""
-    data = request.json or {}
-    name = data.get('name', '').strip()
-    email = data.get('email', '').strip()
-    password = data.get('password', '')
-    config_id = data.get('config_id', '').strip()  # Optional: link config after signup
+
+PATCH_CONTENT_TYPES = {
+    'application/json-patch+json': JSON_PATCH,
+    'application/merge-patch+json': MERGE_PATCH,
+    'application/json': MERGE_PATCH,
+}
+
+# Fields a patch may not change
+IMMUTABLE_CONFIG_FIELDS = ('id', 'created_at')
+
+@app.route('/config/<config_id>', methods=['PATCH'])
+def patch_config(config_id):
+    """Apply a partial update to a config without rewriting it.
+    Body is an RFC 6902 JSON Patch (Content-Type: application/json-patch+json)
+    or an RFC 7396 merge patch (application/merge-patch+json or application/json).
+    The patch is stored as a small delta record; deltas are compacted into the
+    base document every CONFIG_COMPACT_EVERY patches."""
+    kind = PATCH_CONTENT_TYPES.get(request.mimetype)
+    if kind is None:
+        return jsonify({'success': False, 'error': f'Unsupported patch type: {request.mimetype}'}), 415
+    patch = request.get_json(force=True, silent=True)
+    if patch is None:
+        return jsonify({'success': False, 'error': 'Invalid JSON body'}), 400
+
+    version = config_store.version(config_id)
+    config = load_config(config_id)
+    if version is None or not config:
+        return jsonify({'success': False, 'error': 'Config not found'}), 404
+
+    delta = {'kind': kind, 'patch': patch}
+    try:
+        patched = apply_delta(config, delta)
+    except PatchError as e:
+        return jsonify({'success': False, 'error': str(e)}), 422
+    if not isinstance(patched, dict) or any(patched.get(f) != config.get(f) for f in IMMUTABLE_CONFIG_FIELDS):
+        return jsonify({'success': False, 'error': 'Patch may not replace the document, id or created_at'}), 422
+
+    try:
+        pending = config_store.append_delta(config_id, delta, version, patched)
+    except VersionConflict:
+        return jsonify({'success': False, 'error': 'Config changed, reload and retry'}), 409
+    config_cache.invalidate(config_id)
+
+    if pending >= CONFIG_COMPACT_EVERY:
+        config_store.compact(config_id)
+        print(f"Compacted {pending} deltas into config {config_id}")
+
+    response = jsonify({'success': True})
+    etag = config_store.etag(config_id)
+    if etag:
+        response.set_etag(etag)
+    return response
+
+@app.route('/config/<config_id>/transcript', methods=['GET'])
+def get_config_transcript(config_id):
+    """Retrieve the onboarding chat for a config — only loaded when asked for."""
+    config = load_config(config_id)
+    if not config:
+        return jsonify({'success': False, 'error': 'Config not found'}), 404
+    if 'conversation_history' in config:
+        # Legacy config with the chat embedded in the document
+        messages = config['conversation_history'] or []
+    else:
+        messages = load_transcript(CONFIGS_FOLDER, config_id)
+    return jsonify({'success': True, 'messages': messages})
+
+
+def is_admin_request():
+    """True if the request carries the X-Admin-Key matching ADMIN_API_KEY."""
+    admin_key = os.environ.get('ADMIN_API_KEY')
+    return bool(admin_key) and request.headers.get('X-Admin-Key') == admin_key
+
+
+@app.route('/configs', methods=['GET'])
+def list_configs():
+    """Admin listing of saved configs, newest first, paginated by cursor.
+    Filters: business_type, owner_id, created_after, created_before (ISO timestamps).
+    Requires the X-Admin-Key header to match ADMIN_API_KEY."""
+    if not is_admin_request():
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 401
+
+    try:
+        page = config_store.list_configs(
+            business_type=request.args.get('business_type'),
+            owner_id=request.args.get('owner_id'),
+            created_after=request.args.get('created_after'),
+            created_before=request.args.get('created_before'),
+            limit=request.args.get('limit'),
+            cursor=request.args.get('cursor'),
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'success': True, 'configs': page['items'], 'next_cursor': page['next_cursor']})
+
+
+@app.route('/cache-stats', methods=['GET'])
+def cache_stats():
+    """Hit rates and byte usage of this worker's read caches and the shared model-response
+    cache, website-copy corpus hits, coalesced duplicate model calls, plus Anthropic
+    prompt-cache reads/writes for the config prompts (admin only)."""
+    if not is_admin_request():
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 401
+    return jsonify({
+        'success': True,
+        'pid': os.getpid(),
+        'caches': [config_cache.stats(), website_cache.stats(), response_cache.stats(), COPY_CORPUS.stats()],
+        'singleflight': response_cache.flight.stats(),
+        'prompt_cache': PROMPT_CACHE_STATS.stats(),
+    })
+
+
+@app.route('/storage-stats', methods=['GET'])
+def storage_stats():
+    """Durability mode and config commit-latency histogram for this worker (admin only)."""
+    if not is_admin_request():
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 401
+    return jsonify({'success': True, 'pid': os.getpid(), 'storage': config_store.storage_stats()})
+
+
+@app.route('/llm-stats', methods=['GET'])
+def llm_stats():
+    """Budgets, retries, hedges and circuit-breaker state per kind of model call,
+    cost and mean latency per prompt, and /check-input's local/model split, for
+    this worker (admin only)."""
+    if not is_admin_request():
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 401
+    return jsonify({
+        'success': True,
+        'pid': os.getpid(),
+        'calls': [p.stats() for p in LLM_POLICIES.values()],
+        'usage': LLM_METRICS.summary(),
+        'check_input': INPUT_CLASSIFIER_STATS.stats(),
+    })
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Per-prompt model call counters and token/latency histograms for this
+    worker, in the Prometheus text format (admin only)."""
+    if not is_admin_request():
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 401
+    return app.response_class(LLM_METRICS.render(), mimetype='text/plain; version=0.0.4')
+
+def signup_fields(data):
+    """(fields, None) for a valid /signup body, or (None, (error payload, status))."""
+    fields = {
+        'name': data.get('name', '').strip(),
+        'email': data.get('email', '').strip(),
+        'password': data.get('password', ''),
+        'config_id': data.get('config_id', '').strip(),  # Optional: link config after signup
+    }
 
     # Name is optional in the new simplified flow (business name is used)
-    if not email or not password:
-        return jsonify({'success': False, 'error': 'Email and password are required.'}), 400
+    if not fields['email'] or not fields['password']:
+        return None, ({'success': False, 'error': 'Email and password are required.'}, 400)
 
-    if len(password) < 6:
-        return jsonify({'success': False, 'error': 'Password must be at least 6 characters.'}), 400
+    if len(fields['password']) < 6:
+        return None, ({'success': False, 'error': 'Password must be at least 6 characters.'}, 400)
 
+    return fields, None
+
+
+def supabase_settings():
+    """(url, service role key, anon key); the first two are None if unset."""
     supabase_url = os.environ.get('NEXT_PUBLIC_SUPABASE_URL')
     supabase_key = os.environ.get('SUPABASE_SERVICE_ROLE_KEY')
+    anon_key = os.environ.get('NEXT_PUBLIC_SUPABASE_ANON_KEY', supabase_key)
+    return supabase_url, supabase_key, anon_key
+
+
+def signup_create_user_request(supabase_url, supabase_key, fields):
+    """Keyword arguments for the Supabase admin create-user POST."""
+    return {
+        'url': f'{supabase_url}/auth/v1/admin/users',
+        'headers': {
+            'Authorization': f'Bearer {supabase_key}',
+            'apikey': supabase_key,
+            'Content-Type': 'application/json',
+        },
+        'json': {
+            'email': fields['email'],
+            'password': fields['password'],
+            'email_confirm': True,  # Auto-confirm since they're signing up right now
+            'user_metadata': {'full_name': fields['name'] or 'Business Owner'},
+        },
+    }
+
+
+def signup_create_user_error(create_resp):
+    """(error payload, status) if creating the user failed, else None."""
+    if create_resp.status_code == 422:
+        return {'success': False, 'error': 'An account with this email already exists.'}, 409
+
+    if create_resp.status_code not in (200, 201):
+        err_msg = create_resp.json().get('msg', create_resp.text[:200])
+        return {'success': False, 'error': f'Failed to create account: {err_msg}'}, 500
+    return None
+
+
+def link_config_owner(config_id, user_id):
+    """Record ownership on the local config so it can be listed by owner."""
+    if config_id and user_id:
+        try:
+            config_store.set_owner(config_id, user_id)
+        except Exception as e:
+            print(f'Failed to link config {config_id} to owner: {e}')
+
+
+def signup_token_request(supabase_url, anon_key, fields):
+    """Keyword arguments for the Supabase password sign-in POST."""
+    return {
+        'url': f'{supabase_url}/auth/v1/token?grant_type=password',
+        'headers': {
+            'apikey': anon_key,
+            'Content-Type': 'application/json',
+        },
+        'json': {
+            'email': fields['email'],
+            'password': fields['password'],
+        },
+    }
+
+
+def signup_result(user_id, signin_resp):
+    """(payload, status) for /signup once the user exists."""
+    if signin_resp.status_code != 200:
+        # User was created but sign-in failed — return error so frontend shows message
+        return {
+            'success': False,
+            'error': 'Account created but login failed. Please try logging in at the dashboard.',
+        }, 500
+
+    tokens = signin_resp.json()
+
+    return {
+        'success': True,
+        'auth': {
+            'user_id': user_id,
+            'access_token': tokens.get('access_token'),
+            'refresh_token': tokens.get('refresh_token'),
+        },
+    }, 200
+
 
+async def signup_reply(data):
+    """(payload, status) for a /signup body."""
+    fields, error = signup_fields(data)
+    if error:
+        return error
+
+    supabase_url, supabase_key, anon_key = supabase_settings()
     if not supabase_url or not supabase_key:
-        return jsonify({'success': False, 'error': 'Server misconfiguration.'}), 500
+        return {'success': False, 'error': 'Server misconfiguration.'}, 500
 
     try:
         # 1. Create Supabase auth user via admin API
-        create_resp = http_requests.post(
-            f'{supabase_url}/auth/v1/admin/users',
-            headers={
-                'Authorization': f'Bearer {supabase_key}',
-                'apikey': supabase_key,
-                'Content-Type': 'application/json',
-            },
-            json={
-                'email': email,
-                'password': password,
-                'email_confirm': True,  # Auto-confirm since they're signing up right now
-                'user_metadata': {'full_name': name or 'Business Owner'},
-            },
+        create_resp = await http_client.post(
+            **signup_create_user_request(supabase_url, supabase_key, fields),
             timeout=10,
         )
+        error = signup_create_user_error(create_resp)
+        if error:
+            return error
 
-        if create_resp.status_code == 422:
-            return jsonify({'success': False, 'error': 'An account with this email already exists.'}), 409
-
-        if create_resp.status_code not in (200, 201):
-            err_msg = create_resp.json().get('msg', create_resp.text[:200])
-            return jsonify({'success': False, 'error': f'Failed to create account: {err_msg}'}), 500
-
-        user_data = create_resp.json()
-        user_id = user_data.get('id')
+        user_id = create_resp.json().get('id')
+        await asyncio.to_thread(link_config_owner, fields['config_id'], user_id)
 
         # 2. Sign in to get auth tokens
-        anon_key = os.environ.get('NEXT_PUBLIC_SUPABASE_ANON_KEY', supabase_key)
-        signin_resp = http_requests.post(
-            f'{supabase_url}/auth/v1/token?grant_type=password',
-            headers={
-                'apikey': anon_key,
-                'Content-Type': 'application/json',
-            },
-            json={
-                'email': email,
-                'password': password,
-            },
+        signin_resp = await http_client.post(
+            **signup_token_request(supabase_url, anon_key, fields),
             timeout=10,
         )
+        return signup_result(user_id, signin_resp)
 
-        if signin_resp.status_code != 200:
-            # User was created but sign-in failed — return error so frontend shows message
-            return jsonify({
-                'success': False,
-                'error': 'Account created but login failed. Please try logging in at the dashboard.',
-            }), 500
-
-        tokens = signin_resp.json()
-
-        return jsonify({
-            'success': True,
-            'auth': {
-                'user_id': user_id,
-                'access_token': tokens.get('access_token'),
-                'refresh_token': tokens.get('refresh_token'),
-            },
-        })
-
-    except http_requests.Timeout:
-        return jsonify({'success': False, 'error': 'Request timed out. Please try again.'}), 504
+    except httpx.TimeoutException:
+        return {'success': False, 'error': 'Request timed out. Please try again.'}, 504
     except Exception as e:
         print(f'Signup error: {e}')
-        return jsonify({'success': False, 'error': 'An unexpected error occurred.'}), 500
+        return {'success': False, 'error': 'An unexpected error occurred.'}, 500
+
+
+@app.route('/signup', methods=['POST'])
+def signup():
+    """Create a Supabase auth user for the onboarding flow.
+    Returns auth tokens so the frontend can redirect with a live session.
+    Accepts optional config_id to link config after signup."""
+    payload, status = run_async(signup_reply(json_body() or {}))
+    return jsonify(payload), status
 
 
 if __name__ == '__main__':
@@ -0,0 +1,131 @@
+"""ASGI entry point: the LLM-bound endpoints on asyncio, everything else on Flask.
+
+Under gunicorn's sync workers every /chat, /check-input and /configure call
+held a whole worker for its Anthropic round trip, so two slow onboardings
+saturated the service. Here those routes — plus /configure/stream, and
+/signup, which waits on Supabase — run app.py's async pipeline on the
+server's event loop, so one worker process keeps hundreds of model calls in
+flight. The Flask versions of these routes wrap the same coroutines; this
+module only adapts Starlette requests to them. Every other route is the
+unchanged Flask app, run on a2wsgi's thread pool (FLASK_THREADS).
+
+Run:
+    gunicorn asgi:app -k uvicorn_worker.UvicornWorker --bind 0.0.0.0:$PORT --workers 2 --timeout 120
+"""
+
+import asyncio
+import contextlib
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+import app as onboarding
+from app import (BAD_JSON_BODY, CORS_ORIGINS, FLASK_THREADS, SSE_KEEPALIVE_SECONDS, chat_reply, check_input_reply,
+                 configure_reply, response_cache_bypassed, signup_reply, spawn, sse_event, stream_configure)
+
+
+# ============================================================
+# ROUTES
+# ============================================================
+
+async def json_body(request):
+    """The request's body if it's a JSON object, else None."""
+    try:
+        data = await request.json()
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+async def chat(request):
+    data = await json_body(request)
+    if data is None:
+        return JSONResponse(BAD_JSON_BODY, 400)
+    return JSONResponse(await chat_reply(data.get('messages', [])))
+
+
+async def check_input(request):
+    data = await json_body(request)
+    if data is None:
+        return JSONResponse(BAD_JSON_BODY, 400)
+    return JSONResponse(await check_input_reply(data.get('description', ''), response_cache_bypassed(request.headers)))
+
+
+async def configure(request):
+    data = await json_body(request)
+    if data is None:
+        return JSONResponse(BAD_JSON_BODY, 400)
+    return JSONResponse(await configure_reply(data, response_cache_bypassed(request.headers)))
+
+
+async def configure_stream(request):
+    """Same events as the Flask /configure/stream."""
+    data = await json_body(request)
+    if data is None:
+        return JSONResponse(BAD_JSON_BODY, 400)
+
+    events = asyncio.Queue()
+    spawn(stream_configure(data, response_cache_bypassed(request.headers), events.put_nowait))
+
+    async def generate():
+        while True:
+            try:
+                item = await asyncio.wait_for(events.get(), SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            if item is None:
+                return
+            yield sse_event(*item)
+
+    return StreamingResponse(generate(), media_type='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',  # don't let a proxy buffer the stream
+    })
+
+
+async def signup(request):
+    return JSONResponse(*await signup_reply(await json_body(request) or {}))
+
+
+# ============================================================
+# APPLICATION
+# ============================================================
+
+@contextlib.asynccontextmanager
+async def lifespan(_app):
+    try:
+        yield
+    finally:
+        await onboarding.http_client.aclose()
+        await onboarding.aclaude.close()
+
+
+async_app = Starlette(
+    routes=[
+        Route('/chat', chat, methods=['POST']),
+        Route('/check-input', check_input, methods=['POST']),
+        Route('/configure', configure, methods=['POST']),
+        Route('/configure/stream', configure_stream, methods=['POST']),
+        Route('/signup', signup, methods=['POST']),
+    ],
+    # Same policy flask-cors applies to the Flask routes
+    middleware=[Middleware(CORSMiddleware, allow_origins=[o for o in CORS_ORIGINS if o],
+                           allow_methods=['*'], allow_headers=['*'])],
+    lifespan=lifespan,
+)
+ASYNC_PATHS = frozenset(route.path for route in async_app.routes)
+
+wsgi_app = WSGIMiddleware(onboarding.app, workers=FLASK_THREADS)
+
+
+async def app(scope, receive, send):
+    """Async routes (and lifespan) to Starlette, everything else to Flask."""
+    if scope['type'] == 'lifespan' or scope.get('path') in ASYNC_PATHS:
+        await async_app(scope, receive, send)
+    else:
+        await wsgi_app(scope, receive, send)
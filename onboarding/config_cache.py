@@ -0,0 +1,99 @@
+"""In-process LRU cache for parsed configs and website payloads.
+
+Each gunicorn worker keeps its own cache. Entries carry a validator — the
+store version for configs, (mtime_ns, size) for files — and a lookup only
+hits when the caller's current validator matches, so writes from other
+workers are picked up on the next read. Capacity is a byte budget (the
+serialized size of each entry), not an entry count, so a few large website
+payloads can't crowd out hundreds of small configs unnoticed.
+
+Cached values are shared objects: callers must copy before mutating.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+def file_validator(path):
+    """(mtime_ns, size) for a file, or None if it doesn't exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class LRUCache:
+    """Byte-bounded, validator-checked LRU. Thread-safe."""
+
+    def __init__(self, name, max_bytes=DEFAULT_MAX_BYTES):
+        self.name = name
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key → (value, validator, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    def get(self, key, validator):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, cached_validator, size = entry
+            if cached_validator != validator:
+                self.stale += 1
+                self.misses += 1
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, validator, size):
+        if size > self.max_bytes:
+            return  # Never worth evicting everything for one oversized entry
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, validator, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            }
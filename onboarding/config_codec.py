@@ -0,0 +1,290 @@
+"""Compact on-disk encoding for config documents.
+
+Stored configs repeat the same keys and values in every tab and component
+("id", "label", "view", "icon", "components", "Dashboard", ...). With
+CONFIG_CODEC=zdict, documents are stored as compact JSON deflated against a
+preset dictionary trained from the template corpus (beauty_body _TEMPLATES)
+and, once `train` has run, from real configs. The dictionary primes the
+compressor with exactly those strings, so even a single small document
+compresses well.
+
+Encoded documents start with a magic header naming their dictionary:
+
+    b'\\x00RPZ' + 8 hex chars (dictionary id) + raw deflate stream
+
+No JSON document starts with a NUL byte, so decode() tells the two apart and
+plain JSON configs keep reading transparently. Dictionaries are immutable
+files in <data folder>/codec/dict-<id>.zdict; `current` names the one new
+writes use. Old dictionaries are kept so older documents stay readable.
+
+Usage:
+    python config_codec.py train [--samples 500]
+    python config_codec.py bench
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+
+from config_cache import file_validator
+from durable_io import atomic_write
+
+CODECS = ('json', 'zdict')
+
+MAGIC = b'\x00RPZ'
+_DICT_ID_LEN = 8
+
+# zlib only looks back 32KB, so that's all of the dictionary it can use
+MAX_DICT_BYTES = 32 * 1024
+
+
+def _compact(config):
+    return json.dumps(config, separators=(',', ':'))
+
+
+# ============================================================
+# DICTIONARY TRAINING
+# ============================================================
+
+def template_samples():
+    """Config-shaped documents for every built-in template — the seed corpus."""
+    from templates.beauty_body import _TEMPLATES
+
+    samples = []
+    for business_type, template in sorted(_TEMPLATES.items()):
+        tabs = json.loads(json.dumps(template.get('tabs', [])))
+        for tab in tabs:
+            for comp in tab.get('components', []):
+                # Saved configs never carry template-only flags
+                for flag in [k for k in comp if k.startswith('_')]:
+                    comp.pop(flag)
+        samples.append({
+            'id': '00000000',
+            'created_at': '2026-01-01T00:00:00.000000',
+            'business_name': '',
+            'business_type': business_type,
+            'tabs': tabs,
+            'colors': {'sidebar_bg': '#1a1a2e', 'sidebar_text': '#ffffff', 'primary_accent': '#000000',
+                       'secondary_accent': '#000000', 'background': '#f5f5f5', 'cards': '#ffffff',
+                       'text': '#1a1a1a', 'buttons': '#000000'},
+            'platform_tabs': ['site', 'analytics', 'settings'],
+            'summary': '',
+            'transcript': {'path': '00000000.transcript.jsonl', 'message_count': 0},
+        })
+    return samples
+
+
+def _units(config):
+    """The pieces configs share: the document skeleton, each tab, each component."""
+    skeleton = dict(config)
+    tabs = skeleton.pop('tabs', None) or []
+    units = [_compact(skeleton)]
+    for tab in tabs:
+        units.append(_compact(tab))
+        units.extend(_compact(comp) for comp in tab.get('components', []))
+    return units
+
+
+def build_dictionary(samples):
+    """Preset dictionary from sample documents.
+
+    If the whole (deduplicated) corpus fits in the window it is used as-is —
+    whole documents also capture which tabs follow which. Otherwise tabs,
+    components and skeletons are ranked by how many documents share them,
+    most common last, since deflate reaches the end of the dictionary cheapest.
+    """
+    documents = list(dict.fromkeys(_compact(sample) for sample in samples))
+    if sum(len(d.encode('utf-8')) for d in documents) <= MAX_DICT_BYTES:
+        return ''.join(documents).encode('utf-8')
+
+    counts = {}
+    for sample in samples:
+        for unit in set(_units(sample)):
+            counts[unit] = counts.get(unit, 0) + 1
+
+    ranked = sorted(counts.items(), key=lambda item: (item[1], len(item[0]), item[0]))
+    chunks, size = [], 0
+    for unit, _ in reversed(ranked):
+        encoded = unit.encode('utf-8')
+        if size + len(encoded) > MAX_DICT_BYTES:
+            continue
+        chunks.append(encoded)
+        size += len(encoded)
+    return b''.join(reversed(chunks))
+
+
+def dictionary_id(zdict):
+    return hashlib.sha1(zdict).hexdigest()[:_DICT_ID_LEN]
+
+
+# ============================================================
+# CODEC
+# ============================================================
+
+class ConfigCodec:
+    """Encodes and decodes stored config documents.
+
+    With codec='json', encode() returns JSON text in whatever layout the
+    backend asks for. With 'zdict' it returns compressed bytes. decode()
+    accepts either, whatever the codec setting, so switching back and forth
+    never strands data.
+    """
+
+    def __init__(self, dict_folder, codec='json'):
+        if codec not in CODECS:
+            raise ValueError(f'Unknown config codec: {codec}')
+        self.dict_folder = dict_folder
+        self.codec = codec
+        self._dicts = {}
+        self._current = (None, None)  # (validator of the `current` file, dictionary id)
+        self._lock = threading.Lock()
+
+    # ── dictionaries ──────────────────────────────────────────────────
+
+    def _dict_path(self, dict_id):
+        return os.path.join(self.dict_folder, f'dict-{dict_id}.zdict')
+
+    def load_dictionary(self, dict_id):
+        zdict = self._dicts.get(dict_id)
+        if zdict is None:
+            with open(self._dict_path(dict_id), 'rb') as f:
+                zdict = f.read()
+            self._dicts[dict_id] = zdict
+        return zdict
+
+    def install_dictionary(self, zdict):
+        """Persist a dictionary and make it the one new writes use. Returns its id."""
+        dict_id = dictionary_id(zdict)
+        if not os.path.exists(self._dict_path(dict_id)):
+            atomic_write(self._dict_path(dict_id), zdict)
+        atomic_write(self._current_path(), dict_id)
+        with self._lock:
+            self._dicts[dict_id] = zdict
+        return dict_id
+
+    def _current_path(self):
+        return os.path.join(self.dict_folder, 'current')
+
+    def current_dictionary(self):
+        """(id, bytes) of the dictionary for new writes, seeding one from the
+        templates on first use. Re-read when `train` installs a new one."""
+        validator = file_validator(self._current_path())
+        if validator is None:
+            # Deterministic, so workers racing here install the same file
+            self.install_dictionary(build_dictionary(template_samples()))
+            validator = file_validator(self._current_path())
+        cached_validator, dict_id = self._current
+        if validator != cached_validator:
+            with open(self._current_path(), 'r') as f:
+                dict_id = f.read().strip()
+            self._current = (validator, dict_id)
+        return dict_id, self.load_dictionary(dict_id)
+
+    # ── encode / decode ───────────────────────────────────────────────
+
+    def encode(self, config, **json_kwargs):
+        """Serialize for storage. json_kwargs shape the plain-JSON layout."""
+        if self.codec == 'json':
+            return json.dumps(config, **json_kwargs)
+        dict_id, zdict = self.current_dictionary()
+        compressor = zlib.compressobj(9, zlib.DEFLATED, -15, zdict=zdict)
+        body = compressor.compress(_compact(config).encode('utf-8')) + compressor.flush()
+        return MAGIC + dict_id.encode('ascii') + body
+
+    def decode(self, raw):
+        """Inverse of encode() for either codec; plain JSON str/bytes pass through json.loads."""
+        if isinstance(raw, (bytes, bytearray, memoryview)):
+            raw = bytes(raw)
+            if raw.startswith(MAGIC):
+                start = len(MAGIC)
+                dict_id = raw[start:start + _DICT_ID_LEN].decode('ascii')
+                decompressor = zlib.decompressobj(-15, zdict=self.load_dictionary(dict_id))
+                text = decompressor.decompress(raw[start + _DICT_ID_LEN:]) + decompressor.flush()
+                return json.loads(text)
+        return json.loads(raw)
+
+
+# ============================================================
+# BENCHMARK
+# ============================================================
+
+def benchmark(configs, codec, rounds=20):
+    """Size and per-document encode/decode time for each storage format."""
+    def zlib_plain(config):
+        return zlib.compress(_compact(config).encode('utf-8'), 9)
+
+    formats = {
+        'json indent=2': (lambda c: json.dumps(c, indent=2).encode('utf-8'), json.loads),
+        'json compact': (lambda c: _compact(c).encode('utf-8'), json.loads),
+        'zlib (no dict)': (zlib_plain, lambda raw: json.loads(zlib.decompress(raw))),
+        'zlib + dict': (codec.encode, codec.decode),
+    }
+    results = []
+    for name, (encode, decode) in formats.items():
+        encoded = [encode(c) for c in configs]
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for c in configs:
+                encode(c)
+        encode_us = (time.perf_counter() - started) / (rounds * len(configs)) * 1e6
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for raw in encoded:
+                decode(raw)
+        decode_us = (time.perf_counter() - started) / (rounds * len(configs)) * 1e6
+        results.append({
+            'format': name,
+            'avg_bytes': sum(len(e) for e in encoded) / len(encoded),
+            'encode_us': encode_us,
+            'decode_us': decode_us,
+        })
+    return results
+
+
+def _sample_configs(store, limit):
+    configs, cursor = [], None
+    while len(configs) < limit:
+        page = store.list_configs(limit=min(500, limit - len(configs)), cursor=cursor)
+        for item in page['items']:
+            config = store.get(item['id'])
+            if config:
+                configs.append(config)
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+    return configs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Train or benchmark the compact config codec.')
+    parser.add_argument('command', choices=['train', 'bench'])
+    parser.add_argument('--samples', type=int, default=500, help='real configs to sample')
+    args = parser.parse_args()
+
+    from app import config_store
+
+    real = _sample_configs(config_store, args.samples)
+    if args.command == 'train':
+        dict_id = config_store.codec.install_dictionary(build_dictionary(template_samples() + real))
+        print(f"Installed dictionary {dict_id} from {len(real)} configs + templates "
+              f"in {config_store.codec.dict_folder}")
+        return
+
+    corpus = real or template_samples()
+    codec = ConfigCodec(config_store.codec.dict_folder, 'zdict')
+    if real:
+        print(f"{len(corpus)} stored configs")
+    else:
+        print(f"{len(corpus)} template documents — no stored configs yet; these seed the "
+              f"dictionary, so compressed sizes are a lower bound")
+    print(f"{'format':<16}{'avg bytes':>11}{'encode µs':>12}{'decode µs':>12}")
+    for row in benchmark(corpus, codec):
+        print(f"{row['format']:<16}{row['avg_bytes']:>11.0f}{row['encode_us']:>12.1f}{row['decode_us']:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
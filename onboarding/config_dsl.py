@@ -0,0 +1,293 @@
+"""Compact line format for the analyze_business model output.
+
+Output tokens dominate the config call's latency, and most of the verbose
+config JSON is keys, quotes, braces and values the server already knows (a
+component's standard label, its default view, tab ids). The model writes one
+short line per fact instead, and this module expands it into the config
+shape the rest of the pipeline expects:
+
+    name: Tony's Cuts
+    type: barbershop
+    colors: 1A1A2E A0AEC0 3B82F6 E2E8F0 F5F5F5 3B82F6 FFFFFF 1A1A1A 111827 E5E7EB
+    tab: Dashboard | home
+    tab: Clients | people
+    clients | | p | New Client, Regular, VIP
+    galleries | Our Cuts | k
+    tab: Schedule | calendar
+    calendar | Schedule | c
+    summary: Solo barber setup with a client journey and one calendar.
+
+Component lines are `id | label | view | stages`; trailing fields may be
+left off, an empty label means the registry's standard label and an empty
+view the registry's default view. View codes: p pipeline, c calendar,
+k cards, l list, t table, r route (full view names are accepted too).
+colors lists the ten palette values in COLOR_KEYS order; tab ids are
+numbered in order.
+
+Components are checked against COMPONENTS, mirrored from the dashboard's
+component and view registries. Unknown ids are kept only with an explicit
+label and view (the templates use custom entities too); anything invalid is
+dropped or defaulted, and the problems are logged rather than failing the
+config.
+
+ConfigDSLParser is fed streamed chunks and reports each tab as soon as the
+next tab (or the summary) line starts, for /configure/stream's previews.
+"""
+
+import json
+import re
+
+# id → (standard label, default view), from dashboard/src/lib/component-registry.ts
+# and view-registry.ts, plus the ids the analyze_business prompt adds
+COMPONENTS = {
+    # People
+    'clients': ('Clients', 'pipeline'),
+    'contacts': ('Contacts', 'list'),
+    'leads': ('Leads', 'pipeline'),
+    'staff': ('Staff', 'cards'),
+    'vendors': ('Vendors', 'table'),
+    'guests': ('Guest List', 'table'),
+    # Things
+    'products': ('Products', 'table'),
+    'inventory': ('Inventory', 'table'),
+    'equipment': ('Equipment', 'cards'),
+    'assets': ('Assets', 'table'),
+    'listings': ('Listings', 'cards'),
+    'properties': ('Properties', 'table'),
+    'venues': ('Venues', 'cards'),
+    # Time
+    'calendar': ('Calendar', 'calendar'),
+    'appointments': ('Appointments', 'calendar'),
+    'schedules': ('Schedules', 'calendar'),
+    'shifts': ('Shifts', 'calendar'),
+    'time_tracking': ('Time Tracking', 'table'),
+    # Money
+    'invoices': ('Invoices', 'table'),
+    'payments': ('Payments', 'table'),
+    'expenses': ('Expenses', 'table'),
+    'payroll': ('Payroll', 'table'),
+    'estimates': ('Estimates', 'table'),
+    'packages': ('Services', 'cards'),
+    'subscriptions': ('Subscriptions', 'table'),
+    # Tasks
+    'todos': ('To-dos', 'list'),
+    'jobs': ('Jobs', 'pipeline'),
+    'projects': ('Projects', 'cards'),
+    'workflows': ('Workflows', 'pipeline'),
+    'cases': ('Cases', 'pipeline'),
+    'checklists': ('Checklists', 'list'),
+    # Communication
+    'messages': ('Messages', 'list'),
+    'notes': ('Notes', 'list'),
+    'announcements': ('Announcements', 'list'),
+    'reviews': ('Reviews', 'cards'),
+    'campaigns': ('Campaigns', 'table'),
+    'loyalty': ('Loyalty', 'table'),
+    'surveys': ('Surveys', 'table'),
+    'tickets': ('Tickets', 'pipeline'),
+    'knowledge': ('Knowledge Base', 'list'),
+    'community': ('Community', 'list'),
+    'chat_widget': ('Live Chat', 'list'),
+    'social_media': ('Social Media', 'cards'),
+    'reputation': ('Reputation', 'table'),
+    # Files
+    'documents': ('Documents', 'table'),
+    'contracts': ('Contracts', 'table'),
+    'images': ('Images', 'cards'),
+    'uploads': ('Uploads', 'table'),
+    'portfolios': ('Portfolio', 'cards'),
+    'galleries': ('Galleries', 'cards'),
+    # Signing & compliance
+    'waivers': ('Waivers', 'pipeline'),
+    'forms': ('Forms', 'table'),
+    'signatures': ('Signatures', 'table'),
+    # Hospitality & food
+    'reservations': ('Reservations', 'calendar'),
+    'tables': ('Table Management', 'cards'),
+    'menus': ('Menus', 'cards'),
+    'orders': ('Orders', 'table'),
+    'rooms': ('Rooms', 'cards'),
+    'recipes': ('Recipes', 'cards'),
+    'waitlist': ('Waitlist', 'list'),
+    'tip_pools': ('Tip Pool', 'table'),
+    'waste_log': ('Waste Log', 'table'),
+    'suppliers': ('Suppliers', 'table'),
+    'purchase_orders': ('Purchase Orders', 'table'),
+    # Education & programs
+    'classes': ('Classes', 'calendar'),
+    'membership_plans': ('Plans', 'cards'),
+    'memberships': ('Members', 'pipeline'),
+    'courses': ('Courses', 'cards'),
+    'attendance': ('Attendance', 'table'),
+    'programs': ('Programs', 'pipeline'),
+    # Field service
+    'inspections': ('Inspections', 'table'),
+    'routes': ('Routes', 'route'),
+    'fleet': ('Fleet', 'cards'),
+    'permits': ('Permits', 'table'),
+    # Health & medical
+    'prescriptions': ('Prescriptions', 'table'),
+    'treatments': ('Treatments', 'table'),
+    # Digital & online
+    'portal': ('Client Portal', 'table'),
+    'client_portal': ('Client Portal', 'route'),
+}
+
+VIEW_CODES = {'p': 'pipeline', 'c': 'calendar', 'k': 'cards', 'l': 'list', 't': 'table', 'r': 'route'}
+VIEWS = set(VIEW_CODES.values())
+
+ICONS = {
+    'home', 'people', 'box', 'clock', 'dollar', 'check', 'chat', 'folder', 'briefcase', 'star', 'tool',
+    'calendar', 'mail', 'file', 'target', 'truck', 'users', 'grid', 'calculator', 'wallet', 'edit',
+    'megaphone', 'image', 'upload', 'layout', 'clipboard', 'archive', 'rotate', 'settings', 'chart', 'zap',
+    'heart', 'shield', 'globe', 'package', 'book', 'shopping-cart', 'map',
+}
+DEFAULT_ICON = 'folder'
+
+COLOR_KEYS = (
+    'sidebar_bg', 'sidebar_icons', 'sidebar_buttons', 'sidebar_text', 'background',
+    'buttons', 'cards', 'text', 'headings', 'borders',
+)
+
+_HEADER = re.compile(r'^(name|type|colors|tab|summary)\s*:\s*(.*)$', re.IGNORECASE)
+# A line starting like this ends the current tab before it is complete
+_TAB_END = re.compile(r'^\s*(tab|summary)\s*:', re.IGNORECASE)
+_COMPONENT_ID = re.compile(r'^[a-z][a-z0-9_]*$')
+_HEX = re.compile(r'^#?([0-9a-fA-F]{6}|[0-9a-fA-F]{3})$')
+
+
+class DSLError(ValueError):
+    pass
+
+
+class ConfigDSLParser:
+    """Line-at-a-time expander. feed() returns [(index, tab)] for tabs that
+    closed in the chunk; close() finishes and returns the config."""
+
+    def __init__(self):
+        self.text = ''
+        self.config = {'tabs': []}
+        self.problems = []
+        self._buffer = ''
+        self._tab = None
+        self._tab_ids = set()
+
+    def feed(self, chunk):
+        self.text += chunk
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split('\n')
+        completed = []
+        for line in lines:
+            self._line(line, completed)
+        if _TAB_END.match(self._buffer):
+            self._close_tab(completed)
+        return completed
+
+    def close(self):
+        if self._buffer:
+            self._line(self._buffer, [])
+            self._buffer = ''
+        self._close_tab([])
+        if not self.config['tabs']:
+            raise DSLError('no tabs in config output')
+        if self.problems:
+            print(f"Config DSL: {len(self.problems)} line(s) fixed up: {'; '.join(self.problems)}")
+        return self.config
+
+    def _line(self, line, completed):
+        line = line.strip()
+        if not line or line.startswith(('```', '#')):
+            return
+        header = _HEADER.match(line)
+        if not header:
+            self._component(line.lstrip('-* ').strip())
+            return
+        key, value = header.group(1).lower(), header.group(2).strip()
+        if key == 'tab':
+            self._close_tab(completed)
+            self._open_tab(value)
+        elif key == 'summary':
+            self._close_tab(completed)
+            self.config['summary'] = value
+        elif key == 'colors':
+            self.config['colors'] = self._colors(value)
+        elif key == 'name':
+            self.config['business_name'] = value
+        else:
+            self.config['business_type'] = value.lower()
+
+    def _open_tab(self, value):
+        label, _, icon = (part.strip() for part in value.partition('|'))
+        icon = icon.lower()
+        if icon not in ICONS:
+            if icon:
+                self.problems.append(f"unknown icon {icon!r} on tab {label!r}")
+            icon = DEFAULT_ICON
+        self._tab = {
+            'id': f"tab_{len(self.config['tabs']) + 1}",
+            'label': label or 'Tab',
+            'icon': icon,
+            'components': [],
+        }
+        self._tab_ids = set()
+
+    def _close_tab(self, completed):
+        if self._tab is None:
+            return
+        index = len(self.config['tabs'])
+        self.config['tabs'].append(self._tab)
+        completed.append((index, self._tab))
+        self._tab = None
+
+    def _component(self, line):
+        fields = [field.strip() for field in line.split('|')]
+        fields += [''] * (4 - len(fields))
+        comp_id, label, view, stages = fields[0].lower(), fields[1], fields[2].lower(), fields[3]
+        if self._tab is None:
+            self.problems.append(f"component {comp_id!r} before any tab")
+            return
+        if not _COMPONENT_ID.match(comp_id):
+            self.problems.append(f"unreadable line {line[:40]!r}")
+            return
+        if comp_id in self._tab_ids:
+            self.problems.append(f"duplicate {comp_id!r} in tab {self._tab['label']!r}")
+            return
+
+        view = VIEW_CODES.get(view, view)
+        if view and view not in VIEWS:
+            self.problems.append(f"unknown view {view!r} for {comp_id!r}")
+            view = ''
+        standard = COMPONENTS.get(comp_id)
+        if standard is None:
+            if not (label and view):
+                self.problems.append(f"unknown component {comp_id!r} dropped")
+                return
+            standard = (label, view)
+
+        comp = {'id': comp_id, 'label': label or standard[0], 'view': view or standard[1]}
+        stage_names = [name.strip() for name in stages.split(',') if name.strip()]
+        if stage_names and comp['view'] == 'pipeline':
+            comp['stages'] = stage_names
+        self._tab['components'].append(comp)
+        self._tab_ids.add(comp_id)
+
+    def _colors(self, value):
+        colors = {}
+        for key, raw in zip(COLOR_KEYS, re.split(r'[\s,]+', value)):
+            match = _HEX.match(raw)
+            if match:
+                colors[key] = '#' + match.group(1).upper()
+            else:
+                self.problems.append(f"bad color {raw!r} for {key}")
+        return colors
+
+
+def parse_config_dsl(text):
+    """Full config dict from the model's line-format output. A response
+    that came back as config JSON anyway is accepted as-is."""
+    stripped = text.strip()
+    if stripped.startswith('{'):
+        return json.loads(stripped)
+    parser = ConfigDSLParser()
+    parser.feed(text)
+    return parser.close()
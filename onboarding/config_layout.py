@@ -0,0 +1,346 @@
+"""Sharded directory layout for CONFIGS_FOLDER.
+
+Every per-config file (config JSON, deltas, etag, transcript, website payload)
+lives under a two-level hash fan-out instead of one flat directory:
+
+    configs/<h[0:2]>/<h[2:4]>/<id>.json        h = sha1(config_id)
+
+so no directory grows past a few hundred entries. Reads try the shard
+directory first and fall back to the old flat location, which means configs
+written before the switch keep working while `migrate` moves them over
+online. New writes always go to the shard directory and remove the flat copy.
+
+Cold configs (untouched for --cold-days, no pending deltas) are packed by the
+compactor into one segment file per top-level shard:
+
+    configs/<h[0:2]>/pack-<generation>.seg     documents back to back
+    configs/<h[0:2]>/pack.idx                  {id: [offset, length, etag]}
+
+A loose <id>.json always wins over a packed copy, so writes never touch packs.
+
+Usage:
+    python config_layout.py migrate
+    python config_layout.py compact [--cold-days 30]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+
+from config_cache import LRUCache, file_validator
+from durable_io import atomic_write
+
+PACK_INDEX = 'pack.idx'
+
+# Per-config file suffixes, longest first so '_website.json' wins over '.json'
+CONFIG_FILE_SUFFIXES = (
+    '.transcript.jsonl', '.deltas.jsonl',
+    '_website.body.gz', '_website.body.br', '_website.body', '_website.etag', '_website.json',
+    '.etag', '.json',
+)
+
+# Flat files in CONFIGS_FOLDER that look like config files but aren't
+RESERVED_NAMES = {'configs.json'}
+
+DEFAULT_COLD_DAYS = 30
+
+_pack_indexes = LRUCache('pack-index', max_bytes=8 * 1024 * 1024)
+
+
+# ============================================================
+# PATHS
+# ============================================================
+
+def shard_prefix(config_id):
+    digest = hashlib.sha1(config_id.encode('utf-8')).hexdigest()
+    return digest[:2], digest[2:4]
+
+
+def shard_dir(folder, config_id):
+    return os.path.join(folder, *shard_prefix(config_id))
+
+
+def sharded_path(folder, config_id, filename):
+    """Where new writes of this config's file go."""
+    return os.path.join(shard_dir(folder, config_id), filename)
+
+
+def candidate_paths(folder, config_id, filename):
+    """Lookup order for an existing file: shard directory, then the flat folder."""
+    return [sharded_path(folder, config_id, filename), os.path.join(folder, filename)]
+
+
+def locate(folder, config_id, filename):
+    """Path of the existing copy of this file, or None."""
+    for path in candidate_paths(folder, config_id, filename):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def config_id_for(filename):
+    """Config id a flat file belongs to, or None if it isn't a per-config file."""
+    if filename in RESERVED_NAMES or filename.startswith('.'):
+        return None
+    for suffix in CONFIG_FILE_SUFFIXES:
+        if filename.endswith(suffix) and len(filename) > len(suffix):
+            return filename[:-len(suffix)]
+    return None
+
+
+def iter_config_dirs(folder):
+    """The flat folder plus every existing shard directory."""
+    if not os.path.isdir(folder):
+        return
+    yield folder
+    for top in sorted(os.listdir(folder)):
+        top_path = os.path.join(folder, top)
+        if len(top) != 2 or not os.path.isdir(top_path):
+            continue
+        for sub in sorted(os.listdir(top_path)):
+            sub_path = os.path.join(top_path, sub)
+            if len(sub) == 2 and os.path.isdir(sub_path):
+                yield sub_path
+
+
+# ============================================================
+# PACKED SEGMENTS
+# ============================================================
+
+def _pack_dir(folder, config_id):
+    return os.path.join(folder, shard_prefix(config_id)[0])
+
+
+def read_pack_index(pack_dir):
+    """Parsed pack.idx for one top-level shard ({} if there is none), cached by stat."""
+    path = os.path.join(pack_dir, PACK_INDEX)
+    validator = file_validator(path)
+    if validator is None:
+        return {}
+    index = _pack_indexes.get(path, validator)
+    if index is None:
+        with open(path, 'rb') as f:
+            index = json.load(f)
+        _pack_indexes.put(path, index, validator, validator[1])
+    return index
+
+
+def packed_entry(folder, config_id):
+    """(segment path, offset, length, etag, validator) for a packed config, or None."""
+    pack_dir = _pack_dir(folder, config_id)
+    index = read_pack_index(pack_dir)
+    entry = index.get('entries', {}).get(config_id)
+    if entry is None:
+        return None
+    offset, length, etag = entry
+    segment = os.path.join(pack_dir, index['segment'])
+    return segment, offset, length, etag, ('pack', index['segment'], offset)
+
+
+def read_packed(folder, config_id):
+    """Raw bytes of a packed config document, or None."""
+    for _ in range(2):
+        entry = packed_entry(folder, config_id)
+        if entry is None:
+            return None
+        segment, offset, length = entry[:3]
+        try:
+            with open(segment, 'rb') as f:
+                f.seek(offset)
+                return f.read(length)
+        except FileNotFoundError:
+            # The compactor replaced the segment after we read the index — retry once
+            continue
+    return None
+
+
+def _is_cold(folder, config_id, path, cutoff):
+    try:
+        if os.path.getmtime(path) >= cutoff:
+            return False
+    except FileNotFoundError:
+        return False
+    return locate(folder, config_id, f'{config_id}.deltas.jsonl') is None
+
+
+def pack_cold_configs(store, cold_days=DEFAULT_COLD_DAYS, log=print):
+    """Move loose configs untouched for cold_days into their shard's segment file.
+
+    store is the FileConfigStore owning the folder. The scan runs unlocked;
+    each segment rewrite then takes the store's write lock, re-checks its
+    candidates, and checkpoints the journal first so a replay can't resurrect
+    the loose files removed here. Returns the number of configs packed.
+    """
+    folder = store.folder
+    cutoff = time.time() - cold_days * 86400
+
+    cold_by_pack = {}
+    for directory in iter_config_dirs(folder):
+        if directory == folder:
+            continue  # flat configs are migrated first, then packed
+        for name in os.listdir(directory):
+            config_id = config_id_for(name)
+            if config_id is None or name != f'{config_id}.json':
+                continue
+            path = os.path.join(directory, name)
+            if _is_cold(folder, config_id, path, cutoff):
+                cold_by_pack.setdefault(_pack_dir(folder, config_id), []).append((config_id, path))
+
+    packed = 0
+    for pack_dir, candidates in sorted(cold_by_pack.items()):
+        with store.journal.lock:
+            store.journal.checkpoint()
+            cold = [(config_id, path) for config_id, path in candidates
+                    if _is_cold(folder, config_id, path, cutoff)]
+            if cold:
+                packed += _rewrite_pack(folder, pack_dir, cold)
+
+    if packed:
+        log(f"Packed {packed} cold configs in {folder}")
+    return packed
+
+
+def _rewrite_pack(folder, pack_dir, cold):
+    index = read_pack_index(pack_dir)
+    old_segment = index.get('segment')
+    generation = index.get('generation', 0) + 1
+    segment_name = f'pack-{generation}.seg'
+    cold_ids = {config_id for config_id, _ in cold}
+
+    chunks, entries, offset = [], {}, 0
+
+    # Keep packed entries that no loose file has shadowed since
+    if old_segment:
+        with open(os.path.join(pack_dir, old_segment), 'rb') as f:
+            for config_id, (old_offset, length, etag) in index.get('entries', {}).items():
+                if config_id in cold_ids or locate(folder, config_id, f'{config_id}.json'):
+                    continue
+                f.seek(old_offset)
+                chunks.append(f.read(length))
+                entries[config_id] = [offset, length, etag]
+                offset += length
+
+    for config_id, path in cold:
+        with open(path, 'rb') as f:
+            raw = f.read()
+        etag_path = locate(folder, config_id, f'{config_id}.etag')
+        etag = None
+        if etag_path:
+            with open(etag_path, 'r') as f:
+                etag = f.read().strip() or None
+        chunks.append(raw)
+        entries[config_id] = [offset, len(raw), etag]
+        offset += len(raw)
+
+    # Segment, then index (both fsynced), then drop the loose copies
+    atomic_write(os.path.join(pack_dir, segment_name), b''.join(chunks))
+    atomic_write(os.path.join(pack_dir, PACK_INDEX), json.dumps({
+        'generation': generation,
+        'segment': segment_name,
+        'entries': entries,
+    }, separators=(',', ':')))
+    for config_id, path in cold:
+        for stale in (path, sharded_path(folder, config_id, f'{config_id}.etag')):
+            if os.path.exists(stale):
+                os.remove(stale)
+    if old_segment and old_segment != segment_name:
+        os.remove(os.path.join(pack_dir, old_segment))
+    return len(cold)
+
+
+# ============================================================
+# ONLINE MIGRATION — flat folder → shard directories
+# ============================================================
+
+def migrate_flat_files(store, log=print):
+    """Move every per-config file in the flat folder into its shard directory.
+
+    Safe while the app is serving: each file is hard-linked into place before
+    the flat name is removed, so readers always find one of the two, and all
+    moves happen under the store's write lock. Returns the number of files moved.
+    """
+    folder = store.folder
+    if not os.path.isdir(folder):
+        return 0
+    moved = 0
+    started = time.monotonic()
+
+    with store.journal.lock:
+        # Journal frames name flat paths — don't let a replay recreate them
+        store.journal.checkpoint()
+        by_config = {}
+        for name in os.listdir(folder):
+            config_id = config_id_for(name)
+            if config_id is not None and os.path.isfile(os.path.join(folder, name)):
+                by_config.setdefault(config_id, []).append(name)
+
+        for config_id, names in sorted(by_config.items()):
+            # Etag files mark a complete set — link them last, unlink them first
+            names.sort(key=lambda n: n.endswith('.etag'))
+            linked = []
+            for name in names:
+                target = sharded_path(folder, config_id, name)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                try:
+                    os.link(os.path.join(folder, name), target)
+                except FileExistsError:
+                    # A newer sharded copy already exists — except transcripts,
+                    # where readers concatenate both, the flat one is stale
+                    if name.endswith('.transcript.jsonl'):
+                        continue
+                linked.append(name)
+            for name in sorted(linked, key=lambda n: not n.endswith('.etag')):
+                os.remove(os.path.join(folder, name))
+                moved += 1
+
+    log(f"Migrated {moved} files into shard directories in {time.monotonic() - started:.1f}s")
+    return moved
+
+
+# ============================================================
+# BACKGROUND COMPACTOR
+# ============================================================
+
+def start_background_compactor(store, interval_seconds, cold_days=DEFAULT_COLD_DAYS):
+    """Run pack_cold_configs() every interval_seconds in a daemon thread.
+    Returns the thread, or None when disabled (interval_seconds <= 0)."""
+    if interval_seconds <= 0:
+        return None
+
+    def loop():
+        while True:
+            time.sleep(interval_seconds)
+            try:
+                pack_cold_configs(store, cold_days)
+            except Exception as e:
+                print(f"Config compactor error: {e}")
+
+    thread = threading.Thread(target=loop, name='config-compactor', daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage the sharded CONFIGS_FOLDER layout.')
+    parser.add_argument('command', choices=['migrate', 'compact'])
+    parser.add_argument('--cold-days', type=float, default=DEFAULT_COLD_DAYS,
+                        help='pack configs untouched for this many days (compact)')
+    args = parser.parse_args()
+
+    from app import CONFIGS_FOLDER
+    from config_store import FileConfigStore
+
+    # Website payloads and transcripts live in CONFIGS_FOLDER whichever backend
+    # holds the config documents, so always operate on the folder directly
+    store = FileConfigStore(CONFIGS_FOLDER)
+    if args.command == 'migrate':
+        migrate_flat_files(store)
+    else:
+        pack_cold_configs(store, args.cold_days)
+
+
+if __name__ == '__main__':
+    main()
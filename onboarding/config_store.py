@@ -0,0 +1,656 @@
+"""Config storage backends — pluggable persistence for onboarding configs.
+
+FileConfigStore keeps the original layout: one JSON file per config in
+CONFIGS_FOLDER. It needs no setup but every listing query opens every file.
+
+SQLiteConfigStore keeps all configs in one embedded WAL-mode database with
+secondary indexes on business_type, owner_id and created_at, so admin and
+analytics queries are index lookups instead of directory scans. Configs that
+still only exist as legacy JSON files are imported on first read.
+
+Both backends accept small delta records (JSON Patch / merge patch, see
+json_patch.py) next to the base document. Reads apply pending deltas on top
+of the base; compact() folds them back in.
+
+Writes are crash-safe in both backends: the file backend commits through a
+group-commit journal (durable_io.py), SQLite through its WAL.
+CONFIG_DURABILITY=full|relaxed|off picks how much of that to wait for.
+
+Pick a backend with CONFIG_STORE=sqlite|file (default: sqlite).
+"""
+
+import base64
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from config_cache import file_validator
+from config_codec import CODECS, ConfigCodec
+from config_layout import (
+    config_id_for, iter_config_dirs, locate, packed_entry, read_pack_index, read_packed, sharded_path,
+)
+from durable_io import DURABILITY_MODES, GroupCommitJournal, LatencyHistogram
+from json_patch import apply_delta
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Fields returned by list_configs() — full documents are fetched with get()
+SUMMARY_FIELDS = ('id', 'business_name', 'business_type', 'owner_id', 'created_at')
+
+
+def encode_cursor(created_at, config_id):
+    """Opaque pagination cursor pointing at the last item of a page."""
+    raw = f'{created_at}|{config_id}'.encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor(). Raises ValueError on a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        created_at, config_id = raw.split('|', 1)
+    except Exception:
+        raise ValueError('Invalid cursor')
+    return created_at, config_id
+
+
+def _clamp_limit(limit):
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        limit = DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def _summary(config):
+    return {field: config.get(field) for field in SUMMARY_FIELDS}
+
+
+def content_etag(raw):
+    """Strong ETag value (unquoted) for a serialized payload."""
+    if isinstance(raw, str):
+        raw = raw.encode('utf-8')
+    return hashlib.sha256(raw).hexdigest()[:32]
+
+
+def config_etag(config):
+    """ETag of a config document, independent of how the backend lays it out on disk."""
+    return content_etag(json.dumps(config, sort_keys=True, separators=(',', ':')))
+
+
+def _materialize(config, deltas):
+    for delta in deltas:
+        config = apply_delta(config, delta)
+    return config
+
+
+class VersionConflict(Exception):
+    """The config changed between read and a conditional write."""
+
+
+class ConfigStore:
+    """Interface implemented by every config backend.
+
+    Documents are plain dicts in the save_config() format. Listing returns
+    lightweight summaries newest-first with keyset pagination:
+    {'items': [...], 'next_cursor': str or None}.
+    """
+
+    name = 'base'
+
+    def get(self, config_id):
+        raise NotImplementedError
+
+    def get_versioned(self, config_id):
+        """Return (config, version, size_bytes), or (None, None, 0) if missing."""
+        raise NotImplementedError
+
+    def version(self, config_id):
+        """Cheap change token for cache validation — no document parse."""
+        raise NotImplementedError
+
+    def etag(self, config_id):
+        """Content hash recorded at write time, or None. Never reads the document."""
+        raise NotImplementedError
+
+    def put(self, config_id, config):
+        """Replace the whole document (drops any pending deltas)."""
+        raise NotImplementedError
+
+    def put_many(self, items):
+        """Write [(config_id, config), ...]. Backends that can, do it in one transaction."""
+        for config_id, config in items:
+            self.put(config_id, config)
+
+    def append_delta(self, config_id, delta, expected_version, patched):
+        """Append a delta record if the config is still at expected_version.
+        patched is the document with the delta applied — used to keep indexed
+        fields current without re-materializing. Returns the number of pending
+        deltas; raises VersionConflict if the config moved on."""
+        raise NotImplementedError
+
+    def compact(self, config_id):
+        """Fold pending deltas into the base document."""
+        raise NotImplementedError
+
+    def list_configs(self, business_type=None, owner_id=None,
+                     created_after=None, created_before=None,
+                     limit=DEFAULT_PAGE_SIZE, cursor=None):
+        raise NotImplementedError
+
+    def storage_stats(self):
+        """Durability mode and commit-latency histogram for this worker."""
+        return {'backend': self.name}
+
+    def set_owner(self, config_id, owner_id):
+        """Attach an owner (Supabase user id) to a config. Returns False if missing."""
+        config = self.get(config_id)
+        if config is None:
+            return False
+        config['owner_id'] = owner_id
+        self.put(config_id, config)
+        return True
+
+
+# ──────────────────────────────────────────────────────────────────────
+# File backend — one JSON file per config (original layout)
+# ──────────────────────────────────────────────────────────────────────
+
+class FileConfigStore(ConfigStore):
+    """One pretty-printed JSON file per config in the sharded layout.
+    Listing scans the folder."""
+
+    name = 'file'
+
+    def __init__(self, folder, durability='full', group_commit_ms=2.0, codec=None):
+        self.folder = folder
+        self.codec = codec or ConfigCodec(os.path.join(folder, 'codec'))
+        # Every write goes through the journal; it also owns the folder-wide
+        # lock that serializes writers across gunicorn workers
+        self.journal = GroupCommitJournal(folder, mode=durability, window_ms=group_commit_ms)
+
+    # Writes go to the shard directory; reads also find flat and packed copies
+    # (see config_layout.py)
+
+    def path_for(self, config_id):
+        return sharded_path(self.folder, config_id, f'{config_id}.json')
+
+    def delta_path_for(self, config_id):
+        return sharded_path(self.folder, config_id, f'{config_id}.deltas.jsonl')
+
+    def etag_path_for(self, config_id):
+        return sharded_path(self.folder, config_id, f'{config_id}.etag')
+
+    def _flat_paths(self, config_id, *suffixes):
+        return [os.path.join(self.folder, f'{config_id}{suffix}') for suffix in suffixes]
+
+    def _read_deltas(self, config_id):
+        path = locate(self.folder, config_id, f'{config_id}.deltas.jsonl')
+        if path is None:
+            return [], 0
+        with open(path, 'rb') as f:
+            raw = f.read()
+        deltas = []
+        for line in raw.splitlines():
+            if line.strip():
+                try:
+                    deltas.append(json.loads(line))
+                except ValueError:
+                    print(f"Skipping unreadable delta for {config_id}")
+        return deltas, len(raw)
+
+    def _read_base(self, config_id):
+        path = locate(self.folder, config_id, f'{config_id}.json')
+        if path is not None:
+            try:
+                with open(path, 'rb') as f:
+                    return f.read()
+            except FileNotFoundError:
+                pass  # moved by the migration or packed — fall through
+        return read_packed(self.folder, config_id)
+
+    def get(self, config_id):
+        return self.get_versioned(config_id)[0]
+
+    def get_versioned(self, config_id):
+        self.journal.recover()
+        version = self.version(config_id)
+        if version is None:
+            return None, None, 0
+        raw = self._read_base(config_id)
+        if raw is None:
+            return None, None, 0
+        deltas, delta_size = self._read_deltas(config_id)
+        return _materialize(self.codec.decode(raw), deltas), version, len(raw) + delta_size
+
+    @staticmethod
+    def _path_validator(path):
+        # The path is part of the validator: a migrated file keeps its stat
+        validator = file_validator(path) if path else None
+        return (path, validator) if validator else None
+
+    def version(self, config_id):
+        base = self._path_validator(locate(self.folder, config_id, f'{config_id}.json'))
+        if base is None:
+            entry = packed_entry(self.folder, config_id)
+            if entry is None:
+                return None
+            base = entry[4]
+        return (base, self._path_validator(locate(self.folder, config_id, f'{config_id}.deltas.jsonl')))
+
+    def etag(self, config_id):
+        path = locate(self.folder, config_id, f'{config_id}.etag')
+        if path is not None:
+            try:
+                with open(path, 'r') as f:
+                    return f.read().strip() or None
+            except FileNotFoundError:
+                pass
+        entry = packed_entry(self.folder, config_id)
+        return entry[3] if entry else None
+
+    def _base_ops(self, config_id, config):
+        # Deltas go first: a reader racing this commit may briefly see the old
+        # base without its deltas, but never the new base with deltas applied twice.
+        # Flat copies are removed last, once the sharded ones shadow them.
+        return (
+            [('delete', self.delta_path_for(config_id))]
+            + [('delete', p) for p in self._flat_paths(config_id, '.deltas.jsonl')]
+            + [
+                ('write', self.path_for(config_id), self.codec.encode(config, indent=2)),
+                ('write', self.etag_path_for(config_id), config_etag(config)),
+            ]
+            + [('delete', p) for p in self._flat_paths(config_id, '.json', '.etag')]
+        )
+
+    def put(self, config_id, config):
+        self.put_many([(config_id, config)])
+
+    def put_many(self, items):
+        ops = [op for config_id, config in items for op in self._base_ops(config_id, config)]
+        if ops:
+            self.journal.commit(ops)
+
+    def append_delta(self, config_id, delta, expected_version, patched):
+        existing_path = locate(self.folder, config_id, f'{config_id}.deltas.jsonl')
+        existing = b''
+        if existing_path is not None:
+            with open(existing_path, 'rb') as f:
+                existing = f.read()
+        if existing and not existing.endswith(b'\n'):
+            existing += b'\n'
+        # The delta file is rewritten whole, so replaying the journal is idempotent
+        content = existing.decode('utf-8') + json.dumps(delta, separators=(',', ':')) + '\n'
+
+        def unchanged():
+            # The version covers the delta file's stat, so `existing` is still current
+            if self.version(config_id) != expected_version:
+                raise VersionConflict(config_id)
+
+        self.journal.commit(
+            [
+                ('write', self.delta_path_for(config_id), content),
+                ('write', self.etag_path_for(config_id), config_etag(patched)),
+            ] + [('delete', p) for p in self._flat_paths(config_id, '.deltas.jsonl', '.etag')],
+            precondition=unchanged,
+        )
+        return sum(1 for line in content.splitlines() if line.strip())
+
+    def compact(self, config_id):
+        config, version, _ = self.get_versioned(config_id)
+        if config is None:
+            return
+
+        def unchanged():
+            if self.version(config_id) != version:
+                raise VersionConflict(config_id)
+
+        try:
+            self.journal.commit(self._base_ops(config_id, config), precondition=unchanged)
+        except VersionConflict:
+            pass  # a newer write landed first; the next PATCH compacts again
+
+    def storage_stats(self):
+        return dict(self.journal.stats(), backend=self.name)
+
+    def _iter_config_ids(self):
+        seen = set()
+        for directory in iter_config_dirs(self.folder):
+            for name in os.listdir(directory):
+                # Skip website payloads and anything that isn't a config document
+                config_id = config_id_for(name)
+                if config_id and name == f'{config_id}.json' and config_id not in seen:
+                    seen.add(config_id)
+                    yield config_id
+        # Packed configs, one index per top-level shard
+        for top in os.listdir(self.folder) if os.path.isdir(self.folder) else []:
+            if len(top) != 2:
+                continue
+            for config_id in read_pack_index(os.path.join(self.folder, top)).get('entries', {}):
+                if config_id not in seen:
+                    seen.add(config_id)
+                    yield config_id
+
+    def _iter_configs(self):
+        for config_id in self._iter_config_ids():
+            try:
+                config = self.get(config_id)
+            except (OSError, ValueError):
+                continue
+            if isinstance(config, dict) and config.get('id'):
+                yield config
+
+    def list_configs(self, business_type=None, owner_id=None,
+                     created_after=None, created_before=None,
+                     limit=DEFAULT_PAGE_SIZE, cursor=None):
+        limit = _clamp_limit(limit)
+        after_key = decode_cursor(cursor) if cursor else None
+
+        matches = []
+        for config in self._iter_configs():
+            created_at = config.get('created_at') or ''
+            if business_type and config.get('business_type') != business_type:
+                continue
+            if owner_id and config.get('owner_id') != owner_id:
+                continue
+            if created_after and created_at < created_after:
+                continue
+            if created_before and created_at >= created_before:
+                continue
+            if after_key and (created_at, config['id']) >= after_key:
+                continue
+            matches.append(config)
+
+        matches.sort(key=lambda c: (c.get('created_at') or '', c['id']), reverse=True)
+        page = matches[:limit]
+        next_cursor = None
+        if len(matches) > limit:
+            last = page[-1]
+            next_cursor = encode_cursor(last.get('created_at') or '', last['id'])
+        return {'items': [_summary(c) for c in page], 'next_cursor': next_cursor}
+
+
+# ──────────────────────────────────────────────────────────────────────
+# SQLite backend — embedded, WAL mode, indexed
+# ──────────────────────────────────────────────────────────────────────
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS configs (
+    id            TEXT PRIMARY KEY,
+    business_name TEXT,
+    business_type TEXT,
+    owner_id      TEXT,
+    created_at    TEXT NOT NULL,
+    updated_at    TEXT NOT NULL,
+    version       INTEGER NOT NULL DEFAULT 1,
+    etag          TEXT,
+    doc           TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_configs_business_type ON configs (business_type, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_configs_owner_id ON configs (owner_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_configs_created_at ON configs (created_at, id);
+CREATE TABLE IF NOT EXISTS config_deltas (
+    config_id  TEXT NOT NULL,
+    seq        INTEGER NOT NULL,
+    delta      TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (config_id, seq)
+);
+"""
+
+_UPSERT = """
+INSERT INTO configs (id, business_name, business_type, owner_id, created_at, updated_at, etag, doc)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    business_name = excluded.business_name,
+    business_type = excluded.business_type,
+    owner_id = excluded.owner_id,
+    updated_at = excluded.updated_at,
+    version = configs.version + 1,
+    etag = excluded.etag,
+    doc = excluded.doc
+"""
+
+# Columns added after the first release — (name, ALTER TABLE definition)
+_ADDED_COLUMNS = (
+    ('version', 'version INTEGER NOT NULL DEFAULT 1'),
+    ('etag', 'etag TEXT'),
+)
+
+
+class SQLiteConfigStore(ConfigStore):
+    """All configs in one SQLite database.
+
+    Connections are per-thread (sqlite3 objects can't be shared across
+    threads); WAL mode lets readers in other gunicorn workers proceed while
+    one worker writes. If legacy_folder is set, a config missing from the
+    database is looked up there once and imported.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, db_path, legacy_folder=None, durability='full', codec=None):
+        self.db_path = db_path
+        self.codec = codec or ConfigCodec(os.path.join(os.path.dirname(db_path), 'codec'))
+        # Legacy JSON files are only read, so they share this store's codec
+        self.legacy = FileConfigStore(legacy_folder, codec=self.codec) if legacy_folder else None
+        self.durability = durability
+        self.commit_latency = LatencyHistogram()
+        self._local = threading.local()
+
+    def _conn(self):
+        # Opened lazily so importing app.py never touches the volume
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            folder = os.path.dirname(self.db_path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=5.0)
+            conn.execute('PRAGMA journal_mode=WAL')
+            # WAL already batches commits into one log; FULL adds the fsync per
+            # commit, NORMAL defers it to checkpoints (consistent, not durable)
+            conn.execute(f"PRAGMA synchronous={'FULL' if self.durability == 'full' else 'NORMAL'}")
+            conn.executescript(_SCHEMA)
+            self._add_missing_columns(conn)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _add_missing_columns(conn):
+        """Bring databases created by older versions of this module up to date."""
+        existing = {row[1] for row in conn.execute('PRAGMA table_info(configs)')}
+        for column, ddl in _ADDED_COLUMNS:
+            if column not in existing:
+                with conn:
+                    conn.execute(f'ALTER TABLE configs ADD COLUMN {ddl}')
+
+    def get(self, config_id):
+        return self.get_versioned(config_id)[0]
+
+    def _load(self, conn, config_id):
+        row = conn.execute(
+            'SELECT doc, version FROM configs WHERE id = ?', (config_id,)
+        ).fetchone()
+        if not row:
+            return None
+        deltas = [r[0] for r in conn.execute(
+            'SELECT delta FROM config_deltas WHERE config_id = ? ORDER BY seq', (config_id,)
+        )]
+        config = _materialize(self.codec.decode(row[0]), [json.loads(d) for d in deltas])
+        return config, row[1], len(row[0]) + sum(len(d) for d in deltas)
+
+    def get_versioned(self, config_id):
+        loaded = self._load(self._conn(), config_id)
+        if loaded:
+            return loaded
+
+        # Lazy migration: configs written before the switch live as JSON files
+        if self.legacy:
+            config = self.legacy.get(config_id)
+            if config is not None:
+                self.put(config_id, config)
+                return self.get_versioned(config_id)
+        return None, None, 0
+
+    def version(self, config_id):
+        row = self._conn().execute(
+            'SELECT version FROM configs WHERE id = ?', (config_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def etag(self, config_id):
+        row = self._conn().execute(
+            'SELECT etag FROM configs WHERE id = ?', (config_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _row(self, config_id, config, now):
+        return (
+            config_id,
+            config.get('business_name'),
+            config.get('business_type'),
+            config.get('owner_id'),
+            config.get('created_at') or now,
+            now,
+            config_etag(config),
+            self.codec.encode(config, separators=(',', ':')),
+        )
+
+    def put(self, config_id, config):
+        self.put_many([(config_id, config)])
+
+    def put_many(self, items):
+        now = datetime.now().isoformat()
+        rows = [self._row(config_id, config, now) for config_id, config in items]
+        started = time.monotonic()
+        with self._conn() as conn:
+            conn.executemany(_UPSERT, rows)
+            conn.executemany(
+                'DELETE FROM config_deltas WHERE config_id = ?', [(row[0],) for row in rows]
+            )
+        self.commit_latency.observe((time.monotonic() - started) * 1000)
+
+    def append_delta(self, config_id, delta, expected_version, patched):
+        started = time.monotonic()
+        try:
+            return self._append_delta(config_id, delta, expected_version, patched)
+        finally:
+            self.commit_latency.observe((time.monotonic() - started) * 1000)
+
+    def _append_delta(self, config_id, delta, expected_version, patched):
+        with self._conn() as conn:
+            bumped = conn.execute(
+                """UPDATE configs SET version = version + 1, updated_at = ?, etag = ?,
+                       business_name = ?, business_type = ?, owner_id = ?
+                   WHERE id = ? AND version = ?""",
+                (datetime.now().isoformat(), config_etag(patched), patched.get('business_name'),
+                 patched.get('business_type'), patched.get('owner_id'),
+                 config_id, expected_version),
+            )
+            if bumped.rowcount != 1:
+                raise VersionConflict(config_id)
+            conn.execute(
+                """INSERT INTO config_deltas (config_id, seq, delta, created_at)
+                   VALUES (?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM config_deltas WHERE config_id = ?), ?, ?)""",
+                (config_id, config_id, json.dumps(delta, separators=(',', ':')), datetime.now().isoformat()),
+            )
+            return conn.execute(
+                'SELECT COUNT(*) FROM config_deltas WHERE config_id = ?', (config_id,)
+            ).fetchone()[0]
+
+    def compact(self, config_id):
+        conn = self._conn()
+        started = time.monotonic()
+        with conn:
+            # BEGIN IMMEDIATE so no delta lands between the read and the rewrite
+            conn.execute('BEGIN IMMEDIATE')
+            loaded = self._load(conn, config_id)
+            if loaded is None:
+                return
+            config = loaded[0]
+            conn.execute(
+                'UPDATE configs SET doc = ?, etag = ?, version = version + 1, updated_at = ? WHERE id = ?',
+                (self.codec.encode(config, separators=(',', ':')), config_etag(config),
+                 datetime.now().isoformat(), config_id),
+            )
+            conn.execute('DELETE FROM config_deltas WHERE config_id = ?', (config_id,))
+        self.commit_latency.observe((time.monotonic() - started) * 1000)
+
+    def storage_stats(self):
+        return {
+            'backend': self.name,
+            'mode': self.durability,
+            'commit_latency_ms': self.commit_latency.snapshot(),
+        }
+
+    def list_configs(self, business_type=None, owner_id=None,
+                     created_after=None, created_before=None,
+                     limit=DEFAULT_PAGE_SIZE, cursor=None):
+        limit = _clamp_limit(limit)
+        clauses, params = [], []
+        if business_type:
+            clauses.append('business_type = ?')
+            params.append(business_type)
+        if owner_id:
+            clauses.append('owner_id = ?')
+            params.append(owner_id)
+        if created_after:
+            clauses.append('created_at >= ?')
+            params.append(created_after)
+        if created_before:
+            clauses.append('created_at < ?')
+            params.append(created_before)
+        if cursor:
+            clauses.append('(created_at, id) < (?, ?)')
+            params.extend(decode_cursor(cursor))
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        rows = self._conn().execute(
+            f"""SELECT id, business_name, business_type, owner_id, created_at
+                FROM configs {where}
+                ORDER BY created_at DESC, id DESC
+                LIMIT ?""",
+            params + [limit + 1],
+        ).fetchall()
+
+        items = [dict(zip(SUMMARY_FIELDS, row)) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = items[-1]
+            next_cursor = encode_cursor(last['created_at'], last['id'])
+        return {'items': items, 'next_cursor': next_cursor}
+
+
+def get_config_store(configs_folder):
+    """Build the backend selected by CONFIG_STORE (sqlite by default).
+
+    CONFIG_DB_PATH overrides the database location (default: configs/configs.db).
+    CONFIG_DURABILITY (full|relaxed|off) trades crash durability for commit
+    latency; CONFIG_GROUP_COMMIT_MS is how long the file backend waits to
+    batch concurrent writes into one fsync.
+    CONFIG_CODEC=zdict stores documents compressed against a trained dictionary
+    (config_codec.py); reads handle both encodings whatever the setting.
+    """
+    codec_name = os.environ.get('CONFIG_CODEC', 'json').lower()
+    if codec_name not in CODECS:
+        print(f"Unknown CONFIG_CODEC '{codec_name}', falling back to json")
+        codec_name = 'json'
+    durability = os.environ.get('CONFIG_DURABILITY', 'full').lower()
+    if durability not in DURABILITY_MODES:
+        print(f"Unknown CONFIG_DURABILITY '{durability}', falling back to full")
+        durability = 'full'
+    backend = os.environ.get('CONFIG_STORE', 'sqlite').lower()
+    if backend == 'file':
+        group_commit_ms = float(os.environ.get('CONFIG_GROUP_COMMIT_MS', 2))
+        return FileConfigStore(configs_folder, durability=durability, group_commit_ms=group_commit_ms,
+                               codec=ConfigCodec(os.path.join(configs_folder, 'codec'), codec_name))
+    if backend != 'sqlite':
+        print(f"Unknown CONFIG_STORE '{backend}', falling back to sqlite")
+    db_path = os.environ.get('CONFIG_DB_PATH') or os.path.join(configs_folder, 'configs.db')
+    codec = ConfigCodec(os.path.join(os.path.dirname(db_path), 'codec'), codec_name)
+    return SQLiteConfigStore(db_path, legacy_folder=configs_folder, durability=durability, codec=codec)
@@ -0,0 +1,155 @@
+"""Onboarding chat state: the facts gathered so far, and compaction of older turns.
+
+The frontend resends the whole conversation on every /chat turn, so input
+tokens grew with every exchange. The chat asks one question per turn — name,
+services, customers, team, biggest headache, stages — and the reply after
+each question answers it, so the conversation reduces to a handful of facts:
+
+    chat_facts()      {fact: answer} read from question/answer pairs, plus
+                      the opening message and any business name mentioned
+    compact_chat()    past CHAT_COMPACT_AFTER messages, everything but the
+                      recent turns is replaced by a summary of those facts
+                      (what's known, what's still to ask, how many questions
+                      so far), so each turn's input stays about the same size
+
+Compaction advances two exchanges at a time, so the summary — the cacheable
+prefix after the system prompt — stays the same for two turns running.
+
+/configure reuses the same facts: configure_description() adds them to the
+description as labelled lines, the business name quoted so
+extract_business_name() finds it.
+"""
+
+import re
+
+from website_copy import extract_business_name
+
+# fact → label, in the order the chat asks about them
+FACTS = {
+    'name': 'Business name',
+    'services': 'Services',
+    'customers': 'Customers',
+    'team': 'Team',
+    'pain_point': 'Biggest headache',
+    'stages': 'Stages',
+}
+# Replies to questions that match none of the above
+OTHER_LABEL = 'Also mentioned'
+
+# What an assistant question is asking about. Checked in order — "do your
+# clients go through stages?" is about stages, not customers.
+_QUESTION_FACTS = [
+    ('stages', re.compile(r"\b(?:stages?|progression|tiers?|ranks?|journey|phases?|levels?)\b", re.IGNORECASE)),
+    ('pain_point', re.compile(
+        r"\b(?:pain|headache|struggl\w*|frustrat\w*|hardest|too much of your time|biggest challenge)\b",
+        re.IGNORECASE)),
+    ('team', re.compile(r"\b(?:team|just you|solo|staff|by yourself|who works|employees)\b", re.IGNORECASE)),
+    ('name', re.compile(r"\b(?:called|name)\b", re.IGNORECASE)),
+    ('customers', re.compile(r"\b(?:customers?|clients?|who (?:comes|are your|do you serve))\b", re.IGNORECASE)),
+    ('services', re.compile(r"\b(?:services?|offer|products?|programs?|what (?:do|kind))\b", re.IGNORECASE)),
+]
+
+# Compact once the chat is longer than this many messages (four exchanges)
+CHAT_COMPACT_AFTER = 8
+# Messages at the end of the chat always sent verbatim (at least)
+CHAT_KEEP_RECENT = 4
+# The compaction point moves this many messages (two exchanges) at a time
+_COMPACT_STEP = 4
+
+_MAX_NAME_WORDS = 5
+
+
+def _text(message):
+    content = message.get('content')
+    return content if isinstance(content, str) else ''
+
+
+def _question_fact(question):
+    return next((fact for fact, pattern in _QUESTION_FACTS if pattern.search(question)), None)
+
+
+def chat_facts(messages):
+    """{'opening': first user message, fact: answer, ..., 'other': ...} for
+    the facts the user has answered, in FACTS order."""
+    answers = {}
+    opening = None
+    question = None
+    for message in messages or []:
+        text = _text(message).strip()
+        if message.get('role') == 'assistant':
+            question = _question_fact(text)
+            continue
+        if not text:
+            continue
+        if opening is None:
+            opening = text
+        else:
+            answers.setdefault(question or 'other', []).append(text)
+        question = None
+
+    facts = {'opening': opening} if opening else {}
+    user_texts = [_text(m) for m in messages or [] if m.get('role') == 'user']
+    name = extract_business_name(' '.join(answers.get('name', [])))
+    if not name and answers.get('name'):
+        reply = answers['name'][0].strip(' .!?"\'')
+        name = reply if len(reply.split()) <= _MAX_NAME_WORDS else None
+    name = name or extract_business_name('', [{'role': 'user', 'content': t} for t in user_texts])
+    if name:
+        facts['name'] = name
+    for fact in list(FACTS) + ['other']:
+        if fact != 'name' and fact in answers:
+            facts[fact] = '; '.join(answers[fact])
+    return facts
+
+
+def facts_lines(facts):
+    """'Label: value' lines for the gathered facts (the name quoted)."""
+    lines = []
+    for fact, label in list(FACTS.items()) + [('other', OTHER_LABEL)]:
+        if fact in facts:
+            value = f'"{facts[fact]}"' if fact == 'name' else facts[fact]
+            lines.append(f"{label}: {value}")
+    return lines
+
+
+def _compaction_point(count):
+    """Index of the first verbatim message, or 0 to send the chat as-is. Always
+    an assistant turn (odd index), so the summary → assistant → user order holds."""
+    if count <= CHAT_COMPACT_AFTER:
+        return 0
+    cut = 1 + (count - CHAT_KEEP_RECENT - 1) // _COMPACT_STEP * _COMPACT_STEP
+    return cut if cut > 1 else 0
+
+
+def compact_chat(messages):
+    """(summary, recent): the summary text standing in for the older turns
+    (None when the chat is short enough to send whole) and the turns to send
+    verbatim after it."""
+    if not messages or messages[0].get('role') != 'user':
+        return None, messages
+    cut = _compaction_point(len(messages))
+    if not cut:
+        return None, messages
+
+    # Only the older turns go into the summary, so it stays byte-identical
+    # (and cached) until the compaction point next moves
+    older = messages[:cut]
+    facts = chat_facts(older)
+    questions = sum(1 for m in older if m.get('role') == 'assistant')
+    still_to_ask = [label for fact, label in FACTS.items() if fact not in facts]
+    lines = ["(Summary of the earlier conversation — the older messages are left out.)"]
+    if 'opening' in facts:
+        lines.append(f"My first message: {facts['opening']}")
+    lines += facts_lines(facts)
+    lines.append(f"Questions you asked before the messages below: {questions}")
+    if still_to_ask:
+        lines.append(f"Not covered before the messages below: {', '.join(still_to_ask)}")
+    return '\n'.join(lines), messages[cut:]
+
+
+def configure_description(description, conversation_history):
+    """description plus the facts gathered in the chat, as labelled lines."""
+    lines = facts_lines(chat_facts(conversation_history))
+    if not lines:
+        return description
+    return description + '\n\nFrom the chat:\n' + '\n'.join(f'- {line}' for line in lines)
@@ -0,0 +1,290 @@
+"""Pre-generated website copy, personalized at /configure time.
+
+Every /configure used to wait on a Haiku call for the website copy, yet for
+the business types in BUSINESS_TYPE_MAP the copy is mostly predictable. This
+module keeps a corpus of copy sets written ahead of time, a few per type:
+
+    offline     python copy_corpus.py sends one Message Batch (half price,
+                no latency budget) asking for every missing (type, variant)
+                copy set, written around NAME_PLACEHOLDER and with nothing
+                true of only one business, validates each reply and stores
+                it in SQLite under the current website_copy prompt version
+    /configure  request_website_copy() asks lookup() first: the variant whose
+                tone keywords best match the description (a stable hash of it
+                breaks ties), with the business name filled in. A miss —
+                unknown type, empty corpus, older prompt version — falls
+                through to the model call as before
+
+A speculative copy call whose type wasn't guessed still goes to the model,
+alongside the config call. The backend is whatever llm_client_kwargs()
+selects, so LLM_BACKEND=fake fills a corpus offline for tests. Corpus
+failures are logged and treated as misses.
+
+Usage:
+    python copy_corpus.py [--types plumbing,bakery] [--variants warm,premium] [--model MODEL]
+                          [--refresh] [--poll 30] [--dry-run]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from json_repair import extract_json
+from llm_metrics import TOKEN_KINDS, call_cost
+from prompts import CONFIG_MODEL, PROMPT_VERSIONS, website_copy_request
+from response_cache import normalize_description
+from templates.website_sections import BUSINESS_TYPE_MAP
+from website_copy import NAME_PLACEHOLDER, replace_business_name
+
+# Variant → (tone asked for in the prompt, description words that pick it)
+VARIANTS = {
+    'warm': ('warm and welcoming, like a neighbourhood favourite',
+             ('family', 'friendly', 'community', 'local', 'neighborhood', 'neighbourhood', 'cozy', 'kids')),
+    'premium': ('polished and premium, for clients who expect the best',
+                ('luxury', 'premium', 'upscale', 'high', 'boutique', 'exclusive', 'vip', 'bespoke')),
+    'practical': ('straightforward and practical: reliable, quick to book, fairly priced',
+                  ('fast', 'affordable', 'reliable', 'quick', 'emergency', 'budget', 'honest')),
+}
+
+COPY_FIELDS = ('hero_headline', 'hero_subheadline', 'hero_cta', 'about_title', 'about_text', 'features_title',
+               'features', 'cta_headline', 'cta_text', 'cta_button')
+
+# Message Batches are billed at half the Messages API price
+BATCH_PRICE_FACTOR = 0.5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS copy_variants (
+    business_type TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    prompt_version INTEGER NOT NULL,
+    model TEXT NOT NULL,
+    created REAL NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (business_type, variant, prompt_version)
+);
+"""
+
+
+def check_copy(copy):
+    """copy if it's a complete copy set written around NAME_PLACEHOLDER; raises ValueError otherwise."""
+    if not isinstance(copy, dict):
+        raise ValueError('copy is not an object')
+    missing = [field for field in COPY_FIELDS if not copy.get(field)]
+    if missing:
+        raise ValueError(f"copy is missing {', '.join(missing)}")
+    features = copy['features']
+    if not isinstance(features, list) or not all(isinstance(f, str) for f in features):
+        raise ValueError('features is not a list of strings')
+    if any(not isinstance(copy[field], str) for field in COPY_FIELDS if field != 'features'):
+        raise ValueError('copy fields must be strings')
+    text = json.dumps(copy)
+    if NAME_PLACEHOLDER not in text:
+        raise ValueError(f'copy never uses {NAME_PLACEHOLDER}')
+    if text.count('[[') != text.count(NAME_PLACEHOLDER):
+        raise ValueError('copy has an unknown placeholder')
+    return copy
+
+
+def pick_variant(variants, description):
+    """The variant name for description out of variants (names)."""
+    words = set(normalize_description(description).split())
+    names = sorted(variants)
+    scores = {name: len(words.intersection(VARIANTS.get(name, ('', ()))[1])) for name in names}
+    best = max(scores.values())
+    if best:
+        names = [name for name in names if scores[name] == best]
+    digest = hashlib.sha1(normalize_description(description).encode('utf-8')).digest()
+    return names[digest[0] % len(names)]
+
+
+def corpus_description(business_type, variant):
+    """The synthetic description a corpus copy set is written from."""
+    label = business_type.replace('_', ' ')
+    return (f"A typical {label} business. Write the copy {VARIANTS[variant][0]}. It will be reused for many "
+            f"{label} businesses, so don't mention a city, people's names, prices or years in business.")
+
+
+class CopyCorpus:
+    """Copy sets per (business type, variant, prompt version) in SQLite. Thread-safe."""
+
+    name = 'copy_corpus'
+
+    def __init__(self, db_path, enabled=True):
+        self.db_path = db_path
+        self.enabled = enabled
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _conn(self):
+        # Opened lazily so importing app.py never touches the volume
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            folder = os.path.dirname(self.db_path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=2.0)
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def add(self, business_type, variant, copy, model, prompt_version=None):
+        version = PROMPT_VERSIONS['website_copy'] if prompt_version is None else prompt_version
+        with self._conn() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO copy_variants (business_type, variant, prompt_version, model, created, value) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (business_type, variant, version, model, time.time(), json.dumps(copy)),
+            )
+
+    def variants(self, business_type, prompt_version=None):
+        """{variant: copy} stored for business_type under prompt_version (the current one by default)."""
+        version = PROMPT_VERSIONS['website_copy'] if prompt_version is None else prompt_version
+        rows = self._conn().execute(
+            'SELECT variant, value FROM copy_variants WHERE business_type = ? AND prompt_version = ?',
+            (business_type, version),
+        ).fetchall()
+        return {variant: json.loads(value) for variant, value in rows}
+
+    def lookup(self, business_name, business_type, description):
+        """Copy for business_name from the best-matching variant, or None on a miss."""
+        if not self.enabled or not business_type:
+            return None
+        try:
+            # Nothing generated yet — don't create an empty database on every lookup
+            variants = self.variants(business_type) if os.path.exists(self.db_path) else {}
+        except sqlite3.Error as e:
+            print(f"Copy corpus read failed ({e}) — treating as a miss")
+            self._count('errors')
+            variants = {}
+        if not variants:
+            self._count('misses')
+            return None
+        self._count('hits')
+        variant = pick_variant(variants, description)
+        print(f"Copy corpus hit: {business_type}/{variant}")
+        return replace_business_name(variants[variant], NAME_PLACEHOLDER, business_name)
+
+    def stats(self):
+        entries = None
+        if self.enabled and os.path.exists(self.db_path):
+            try:
+                entries = self._conn().execute(
+                    'SELECT COUNT(*) FROM copy_variants WHERE prompt_version = ?', (PROMPT_VERSIONS['website_copy'],),
+                ).fetchone()[0]
+            except sqlite3.Error:
+                pass
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'enabled': self.enabled,
+                'entries': entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'errors': self.errors,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+# ============================================================
+# OFFLINE GENERATION — one Message Batch per run
+# ============================================================
+
+def batch_requests(pairs, model=CONFIG_MODEL):
+    """Message Batch requests for [(business_type, variant)]; custom_id is "type--variant"."""
+    return [{
+        'custom_id': f'{business_type}--{variant}',
+        'params': {
+            'model': model,
+            'max_tokens': 800,
+            **website_copy_request(NAME_PLACEHOLDER, business_type, corpus_description(business_type, variant)),
+        },
+    } for business_type, variant in pairs]
+
+
+async def run_batch(client, corpus, requests, poll_seconds=30):
+    """Send requests as one batch, wait for it to end and store every valid
+    copy set. Returns (stored, failed)."""
+    batch = await client.messages.batches.create(requests=requests)
+    print(f"Batch {batch.id}: {len(requests)} requests")
+    while batch.processing_status != 'ended':
+        await asyncio.sleep(poll_seconds)
+        batch = await client.messages.batches.retrieve(batch.id)
+        counts = batch.request_counts
+        print(f"  {counts.processing} processing, {counts.succeeded} succeeded, {counts.errored} errored")
+
+    models = {request['custom_id']: request['params']['model'] for request in requests}
+    tokens = {}
+    stored = failed = 0
+    async for result in await client.messages.batches.results(batch.id):
+        business_type, variant = result.custom_id.split('--', 1)
+        if result.result.type != 'succeeded':
+            print(f"  {result.custom_id}: {result.result.type}")
+            failed += 1
+            continue
+        message = result.result.message
+        model_tokens = tokens.setdefault(models[result.custom_id], dict.fromkeys(TOKEN_KINDS, 0))
+        usage = message.usage
+        model_tokens['input'] += usage.input_tokens
+        model_tokens['output'] += usage.output_tokens
+        model_tokens['cache_read'] += usage.cache_read_input_tokens or 0
+        model_tokens['cache_creation'] += usage.cache_creation_input_tokens or 0
+        try:
+            copy = check_copy(extract_json(message.content[0].text)[0])
+        except ValueError as e:
+            print(f"  {result.custom_id}: unusable reply ({e})")
+            failed += 1
+            continue
+        corpus.add(business_type, variant, copy, message.model)
+        stored += 1
+
+    cost = sum(call_cost(model, counts) for model, counts in tokens.items()) * BATCH_PRICE_FACTOR
+    print(f"Stored {stored} copy sets, {failed} failed, about ${cost:.4f}")
+    return stored, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pre-generate website copy for each business type in one batch.')
+    parser.add_argument('--types', help='comma-separated business types (default: all of BUSINESS_TYPE_MAP)')
+    parser.add_argument('--variants', help=f"comma-separated variants (default: {','.join(VARIANTS)})")
+    parser.add_argument('--model', default=CONFIG_MODEL)
+    parser.add_argument('--refresh', action='store_true', help='regenerate copy sets that already exist')
+    parser.add_argument('--poll', type=float, default=30, help='seconds between batch status checks')
+    parser.add_argument('--dry-run', action='store_true', help='list what would be generated')
+    args = parser.parse_args()
+
+    # The app's corpus path and LLM backend settings
+    import anthropic
+    from app import COPY_CORPUS, llm_client_kwargs
+
+    business_types = args.types.split(',') if args.types else sorted(BUSINESS_TYPE_MAP)
+    variants = args.variants.split(',') if args.variants else list(VARIANTS)
+    unknown = [v for v in variants if v not in VARIANTS]
+    if unknown:
+        parser.error(f"unknown variants: {', '.join(unknown)}")
+    pairs = [(business_type, variant) for business_type in business_types for variant in variants
+             if args.refresh or variant not in COPY_CORPUS.variants(business_type)]
+    print(f"{len(pairs)} copy sets to generate into {COPY_CORPUS.db_path}")
+    if args.dry_run or not pairs:
+        for business_type, variant in pairs:
+            print(f"  {business_type}--{variant}")
+        return
+
+    client = anthropic.AsyncAnthropic(**llm_client_kwargs())
+    asyncio.run(run_batch(client, COPY_CORPUS, batch_requests(pairs, args.model), args.poll))
+
+
+if __name__ == '__main__':
+    main()
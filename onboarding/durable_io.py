@@ -0,0 +1,443 @@
+"""Durable file writes — atomic replace and a group-commit write-ahead journal.
+
+atomic_write() writes to a temp file in the same directory and renames it over
+the target, so readers see either the old or the new file, never a torn one.
+
+GroupCommitJournal makes config writes crash-safe without one fsync per
+request. Request threads hand their file operations to a per-process
+committer thread, which waits CONFIG_GROUP_COMMIT_MS for concurrent writes to
+pile up. It then takes the folder lock (shared with the other gunicorn
+workers), appends the whole batch to journal.wal as one checksummed frame,
+fsyncs once, and materializes every file with atomic_write(). After a crash,
+complete frames are replayed on the next start. Once the journal grows past a threshold, the
+files it mentions are fsynced and the journal is truncated (checkpoint).
+
+Durability modes (CONFIG_DURABILITY):
+    full     commit returns after the batch's journal fsync (default)
+    relaxed  no fsync per batch — the committer checkpoints once the oldest
+             unsynced frame is RELAXED_SYNC_SECONDS old (or the journal
+             reaches its size threshold), so a crash can lose writes from
+             the last RELAXED_SYNC_SECONDS, never tear a file
+    off      no journal; atomic rename only
+"""
+
+import base64
+import fcntl
+import json
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+
+DURABILITY_MODES = ('full', 'relaxed', 'off')
+
+JOURNAL_NAME = 'journal.wal'
+LOCK_NAME = '.write.lock'
+
+# Frame header: payload length, crc32 of payload
+_FRAME_HEADER = struct.Struct('>II')
+
+DEFAULT_CHECKPOINT_BYTES = 4 * 1024 * 1024
+
+# Relaxed mode: longest a journaled write waits for its checkpoint fsync
+RELAXED_SYNC_SECONDS = 5.0
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+def _fsync_dir(folder):
+    fd = os.open(folder, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path, data, durable=True):
+    """Replace path with data (bytes or str) via temp file + rename.
+    durable=True fsyncs the file and its directory before returning."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    folder = os.path.dirname(path) or '.'
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=folder, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    if durable:
+        _fsync_dir(folder)
+
+
+class FolderLock:
+    """Exclusive flock on a lock file, shared by every process using the folder.
+    Re-entrant within a thread so a holder can call helpers that lock again."""
+
+    def __init__(self, folder):
+        self.path = os.path.join(folder, LOCK_NAME)
+        self._local = threading.local()
+        self._thread_lock = threading.Lock()
+
+    def __enter__(self):
+        depth = getattr(self._local, 'depth', 0)
+        if depth == 0:
+            # flock is per open file, so serialize threads of this process first
+            self._thread_lock.acquire()
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._local.f = open(self.path, 'a')
+            fcntl.flock(self._local.f, fcntl.LOCK_EX)
+        self._local.depth = depth + 1
+        return self
+
+    def __exit__(self, *exc):
+        self._local.depth -= 1
+        if self._local.depth == 0:
+            self._local.f.close()  # releases the flock
+            self._thread_lock.release()
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram, milliseconds by default. Thread-safe.
+    Percentiles are reported as the upper bound of the bucket they fall in
+    (the largest value seen, for the open-ended last bucket)."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.max = None
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            self.counts[index] += 1
+            self.total += value
+            self.count += 1
+            if self.max is None or value > self.max:
+                self.max = value
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile (None if empty)."""
+        with self._lock:
+            if not self.count:
+                return None
+            target = self.count * p / 100.0
+            seen = 0
+            for i, n in enumerate(self.counts):
+                seen += n
+                if seen >= target:
+                    return self.buckets[i] if i < len(self.buckets) else round(self.max, 3)
+        return None
+
+    def snapshot(self):
+        with self._lock:
+            buckets = {f'le_{b}': n for b, n in zip(self.buckets, self.counts)}
+            buckets['le_inf'] = self.counts[-1]
+            count, total = self.count, self.total
+        return {
+            'count': count,
+            'mean': round(total / count, 3) if count else None,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'buckets': buckets,
+        }
+
+
+class _Pending:
+    __slots__ = ('ops', 'precondition', 'done', 'error')
+
+    def __init__(self, ops, precondition):
+        self.ops = ops
+        self.precondition = precondition
+        self.done = threading.Event()
+        self.error = None
+
+
+class GroupCommitJournal:
+    """Batches file writes from concurrent threads into one journal fsync.
+
+    commit(ops) takes a list of ('write', path, str|bytes) and ('delete', path)
+    operations that must land together. An optional precondition() runs under
+    the folder lock just before the batch is written; raising from it rejects
+    only that commit (used for compare-and-swap on config versions). A
+    precondition never runs ahead of earlier writes to the same paths in its
+    batch: those are written first, as a frame of their own.
+    """
+
+    def __init__(self, folder, mode='full', window_ms=2.0,
+                 checkpoint_bytes=DEFAULT_CHECKPOINT_BYTES, lock=None, sync_seconds=RELAXED_SYNC_SECONDS):
+        if mode not in DURABILITY_MODES:
+            raise ValueError(f'Unknown durability mode: {mode}')
+        self.folder = folder
+        self.mode = mode
+        self.window = max(window_ms, 0) / 1000.0
+        self.checkpoint_bytes = checkpoint_bytes
+        self.sync_seconds = sync_seconds
+        self.lock = lock or FolderLock(folder)
+        self.journal_path = os.path.join(folder, JOURNAL_NAME)
+        self.commit_latency = LatencyHistogram()
+        self.batch_sizes = LatencyHistogram(buckets=(1, 2, 4, 8, 16, 32, 64))
+        self.fsyncs = 0
+        self.checkpoints = 0
+        self._queue = []
+        self._cond = threading.Condition()
+        self._thread = None
+        self._thread_pid = None
+        self._recovered = False
+        # Journal size after this process's last append or checkpoint; any
+        # other size means another worker wrote since, maybe a torn frame
+        self._journal_end = None
+        # Relaxed mode: when the oldest frame not yet fsynced was appended
+        self._unsynced_since = None
+
+    # ── public API ────────────────────────────────────────────────────
+
+    def commit(self, ops, precondition=None):
+        started = time.monotonic()
+        if self.mode == 'off':
+            with self.lock:
+                if precondition:
+                    precondition()
+                self._materialize(ops, durable=False)
+            self.commit_latency.observe((time.monotonic() - started) * 1000)
+            return
+
+        pending = _Pending(ops, precondition)
+        with self._cond:
+            self._ensure_thread()
+            self._queue.append(pending)
+            self._cond.notify()
+        pending.done.wait()
+        self.commit_latency.observe((time.monotonic() - started) * 1000)
+        if pending.error is not None:
+            raise pending.error
+
+    def recover(self):
+        """Replay complete journal frames once per process (before the first read or write)."""
+        if self._recovered or self.mode == 'off':
+            return
+        with self.lock:
+            if not self._recovered:
+                self._replay()
+                self._recovered = True
+
+    def checkpoint(self):
+        """Make every journaled write durable on its own and empty the journal.
+        Call before moving or removing files the journal may name."""
+        if self.mode == 'off':
+            return
+        with self.lock:
+            if not self._recovered:
+                self._replay()
+                self._recovered = True
+            self._checkpoint()
+
+    def stats(self):
+        return {
+            'mode': self.mode,
+            'window_ms': self.window * 1000,
+            'fsyncs': self.fsyncs,
+            'checkpoints': self.checkpoints,
+            'commit_latency_ms': self.commit_latency.snapshot(),
+            'batch_size': self.batch_sizes.snapshot(),
+        }
+
+    # ── committer thread ──────────────────────────────────────────────
+
+    def _ensure_thread(self):
+        # Threads don't survive fork — gunicorn workers each start their own
+        if self._thread is None or self._thread_pid != os.getpid() or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='config-group-commit', daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._sync_due():
+                    self._cond.wait(self._sync_wait())
+                idle = not self._queue
+            if idle:
+                self._timed_checkpoint()
+                continue
+            if self.window:
+                time.sleep(self.window)  # let concurrent writers join this batch
+            with self._cond:
+                batch, self._queue = self._queue, []
+            self._commit_batch(batch)
+
+    def _sync_wait(self):
+        """Seconds until the unsynced frames are due a checkpoint (None = nothing unsynced)."""
+        if self._unsynced_since is None:
+            return None
+        return max(0.0, self._unsynced_since + self.sync_seconds - time.monotonic())
+
+    def _sync_due(self):
+        return self._sync_wait() == 0.0
+
+    def _timed_checkpoint(self):
+        try:
+            with self.lock:
+                self._checkpoint()
+        except Exception as e:
+            print(f"Journal checkpoint in {self.folder} failed: {e}")
+            self._unsynced_since = time.monotonic()  # try again after another interval
+
+    def _commit_batch(self, batch):
+        try:
+            with self.lock:
+                if not self._recovered:
+                    self._replay()
+                    self._recovered = True
+
+                accepted, written = [], set()
+                for pending in batch:
+                    paths = {op[1] for op in pending.ops}
+                    if pending.precondition and not paths.isdisjoint(written):
+                        # Its precondition must see the writes accepted before it
+                        # (two PATCHes with the same expected version) — write those first
+                        self._write_accepted(accepted)
+                        accepted, written = [], set()
+                    try:
+                        if pending.precondition:
+                            pending.precondition()
+                        accepted.append(pending)
+                        written |= paths
+                    except Exception as e:
+                        pending.error = e
+                self._write_accepted(accepted)
+        except Exception as e:
+            for pending in batch:
+                if pending.error is None and not pending.done.is_set():
+                    pending.error = e
+        finally:
+            for pending in batch:
+                pending.done.set()
+
+    def _write_accepted(self, accepted):
+        """Journal and materialize the accepted commits as one frame, then release their callers."""
+        if not accepted:
+            return
+        ops = [op for pending in accepted for op in pending.ops]
+        self._append_frame(ops)
+        self._materialize(ops, durable=False)
+        if self.mode == 'relaxed' and self._unsynced_since is None:
+            self._unsynced_since = time.monotonic()
+        self.batch_sizes.observe(len(accepted))
+        if os.path.getsize(self.journal_path) >= self.checkpoint_bytes:
+            self._checkpoint()
+        for pending in accepted:
+            pending.done.set()
+
+    # ── journal frames ────────────────────────────────────────────────
+
+    def _relative(self, path):
+        return os.path.relpath(path, self.folder)
+
+    def _frame_op(self, op):
+        if op[0] == 'write' and isinstance(op[2], bytes):
+            # Binary documents (compact codec) ride in the JSON frame as base64
+            return ['write64', self._relative(op[1]), base64.b64encode(op[2]).decode('ascii')]
+        return [op[0], self._relative(op[1])] + list(op[2:])
+
+    def _append_frame(self, ops):
+        payload = json.dumps([self._frame_op(op) for op in ops], separators=(',', ':')).encode('utf-8')
+        frame = _FRAME_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+        os.makedirs(self.folder, exist_ok=True)
+        with open(self.journal_path, 'ab') as f:
+            size = f.seek(0, os.SEEK_END)
+            if size != self._journal_end:
+                # Frames after a torn one would never be replayed or checkpointed
+                _, good_end = self._read_frames()
+                if good_end < size:
+                    print(f"Dropping {size - good_end} bytes of torn journal frame in {self.folder}")
+                    f.truncate(good_end)
+            f.write(frame)
+            f.flush()
+            if self.mode == 'full':
+                os.fsync(f.fileno())
+                self.fsyncs += 1
+            self._journal_end = f.tell()
+
+    def _read_frames(self):
+        """Complete frames in order, plus the byte offset where valid data ends."""
+        frames, good_end = [], 0
+        if not os.path.exists(self.journal_path):
+            return frames, good_end
+        with open(self.journal_path, 'rb') as f:
+            data = f.read()
+        pos = 0
+        while pos + _FRAME_HEADER.size <= len(data):
+            length, crc = _FRAME_HEADER.unpack_from(data, pos)
+            start, end = pos + _FRAME_HEADER.size, pos + _FRAME_HEADER.size + length
+            if end > len(data) or zlib.crc32(data[start:end]) != crc:
+                break  # torn tail from a crash mid-append
+            frames.append(json.loads(data[start:end]))
+            pos = good_end = end
+        return frames, good_end
+
+    def _replay(self):
+        frames, good_end = self._read_frames()
+        if not frames and not good_end:
+            return
+        for frame in frames:
+            ops = []
+            for op in frame:
+                path = os.path.join(self.folder, op[1])
+                if op[0] == 'write64':
+                    ops.append(('write', path, base64.b64decode(op[2])))
+                else:
+                    ops.append([op[0], path] + op[2:])
+            self._materialize(ops, durable=False)
+        print(f"Replayed {len(frames)} journal frames in {self.folder}")
+        self._checkpoint()
+
+    def _checkpoint(self):
+        """fsync every file the journal mentions, then truncate the journal."""
+        frames, _ = self._read_frames()
+        paths = {op[1] for frame in frames for op in frame if op[0] in ('write', 'write64')}
+        for rel in paths:
+            path = os.path.join(self.folder, rel)
+            if os.path.exists(path):
+                fd = os.open(path, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+        for folder in {os.path.dirname(os.path.join(self.folder, rel)) for rel in paths} | {self.folder}:
+            if os.path.isdir(folder):
+                _fsync_dir(folder)
+        with open(self.journal_path, 'wb') as f:
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_end = 0
+        self._unsynced_since = None
+        self.checkpoints += 1
+
+    @staticmethod
+    def _materialize(ops, durable):
+        for op in ops:
+            if op[0] == 'write':
+                atomic_write(op[1], op[2], durable=durable)
+            elif op[0] == 'delete':
+                if os.path.exists(op[1]):
+                    os.remove(op[1])
+            else:
+                raise ValueError(f'Unknown journal op: {op[0]}')
@@ -0,0 +1,446 @@
+"""Local stand-in for the Anthropic Messages API, for load tests and benchmarks.
+
+With LLM_BACKEND=fake the app's clients talk to this server (FAKE_LLM_URL)
+instead of Anthropic, so /configure, /chat and /check-input can be load-
+tested offline at no per-token cost. It serves POST /v1/messages, plain and
+streamed (the same SSE events the SDK parses), and answers each of the app's
+prompts with something the app can use:
+
+    analyze_with_template   the template from the system block, customized
+                            by the local rules (templates/customizer.py)
+    analyze_business        the matched template written out in the config
+                            line format, or a generic dashboard
+    website copy            copy JSON naming the business
+    check_input             DETAILED/VAGUE from the local classifier's lean
+    chat                    the next onboarding question, READY_TO_BUILD
+                            after CHAT_READY_AFTER questions
+
+A request ending in an assistant turn is a continuation (prompts.
+continuation_request) and gets the rest of that reply.
+
+POST /v1/messages/batches takes a Message Batch (copy_corpus.py's offline
+jobs). Every request in it is answered at once, with the same profiles —
+an error_rate roll makes it an errored result — and the batch is ended when
+it's created; GET /v1/messages/batches/{id} and .../results serve it back.
+
+Timing and failures come from a per-model profile, matched on the longest
+model-name prefix (DEFAULT_PROFILES, overridden by --profile):
+
+    ttft            median seconds to the first token
+    ttft_spread     lognormal sigma around that median (0 = fixed)
+    tokens_per_second, tps_spread   output speed, likewise
+    error_rate      share of requests answered 529 overloaded_error
+    malformed_rate  share of JSON/config replies cut off part-way
+
+Output tokens are counted as len(text) / 4 and capped at max_tokens. Cached
+system blocks report cache_creation_input_tokens the first time and
+cache_read_input_tokens after, so PROMPT_CACHE_STATS behaves as it would.
+GET /stats returns per-model counts.
+
+Usage:
+    python fake_llm.py [--port 8787] [--profile profiles.json] [--seed 1] [--time-scale 0]
+
+then start the app with LLM_BACKEND=fake. --time-scale multiplies every
+delay (0 answers immediately, for CI).
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from config_dsl import COLOR_KEYS
+from input_classifier import classify_input
+from prompts import ANALYZE_BUSINESS_SYSTEM, CHAT_SYSTEM_PROMPT, TEMPLATE_SYSTEM, WEBSITE_COPY_SYSTEM
+from templates.customizer import customize_template
+from templates.registry import detect_template_type, get_template
+from website_copy import extract_business_name
+
+DEFAULT_PORT = 8787
+
+# Model-name prefix → profile; '' applies to any model not matched
+DEFAULT_PROFILES = {
+    '': {
+        'ttft': 0.8, 'ttft_spread': 0.3, 'tokens_per_second': 80, 'tps_spread': 0.2,
+        'error_rate': 0.0, 'malformed_rate': 0.0,
+    },
+    'claude-sonnet': {'ttft': 1.2, 'tokens_per_second': 60},
+    'claude-haiku': {'ttft': 0.4, 'tokens_per_second': 150},
+}
+
+# Chat questions in the order the onboarding prompt asks them
+CHAT_QUESTIONS = [
+    "Nice! What's the business called?",
+    "Cool — so what kind of services do you offer?",
+    "And who are your typical customers?",
+    "Is it just you running things, or do you have a team?",
+    "What's the one thing that takes up too much of your time right now?",
+    "Do your clients go through any kind of stages or progression?",
+]
+CHAT_READY_AFTER = 5
+
+GENERIC_CONFIG_LINES = [
+    'tab: Dashboard | home',
+    'tab: Clients | people',
+    'clients | Clients | p | New, Active, Loyal, VIP',
+    'contacts | Contacts | l',
+    'tab: Schedule | calendar',
+    'calendar | Schedule | c',
+    'tab: Billing | dollar',
+    'invoices | Invoices | t',
+    'payments | Payments | t',
+]
+_COLORS = '1A1A2E A0AEC0 3B82F6 E2E8F0 F5F5F5 3B82F6 FFFFFF 1A1A1A 111827 E5E7EB'.split()
+
+_CHARS_PER_TOKEN = 4
+# Output tokens per streamed text delta
+_TOKENS_PER_DELTA = 3
+
+_DESCRIPTION = re.compile(
+    r'^Business description: (.*?)\n(?:Business type: .*\n\nCustomize|\nNow analyze)', re.DOTALL | re.MULTILINE)
+_CHECK_DESCRIPTION = re.compile(r'^Description: "(.*)"$', re.DOTALL | re.MULTILINE)
+_COPY_BUSINESS = re.compile(r'^Business: (.*) \(Type: (.*)\)$', re.MULTILINE)
+_TEMPLATE_JSON = 'Here is the starting template (JSON):\n'
+_QUESTIONS_SO_FAR = re.compile(r'Questions you asked before the messages below: (\d+)')
+
+
+def _tokens(text):
+    return max(1, math.ceil(len(text) / _CHARS_PER_TOKEN)) if text else 0
+
+
+def _text_blocks(content):
+    """[(text, cached)] for a system or message content value."""
+    if isinstance(content, str):
+        return [(content, False)]
+    return [(block.get('text', ''), 'cache_control' in block) for block in content or [] if isinstance(block, dict)]
+
+
+def _user_text(body):
+    messages = body.get('messages') or []
+    return ''.join(text for text, _ in _text_blocks(messages[-1].get('content'))) if messages else ''
+
+
+# ============================================================
+# Replies
+# ============================================================
+def _template_reply(body, system_texts):
+    template_text = next((t for t in system_texts if t.startswith(_TEMPLATE_JSON)), None)
+    match = _DESCRIPTION.search(_user_text(body))
+    description = match.group(1) if match else ''
+    business_type = re.search(r'^Business type: (.*)$', _user_text(body), re.MULTILINE)
+    template = json.loads(template_text[len(_TEMPLATE_JSON):]) if template_text else {'tabs': []}
+    config, _, _ = customize_template(description, template, business_type.group(1) if business_type else 'other')
+    return json.dumps(config, indent=2)
+
+
+def _config_lines(description):
+    """The matched template (or a generic dashboard) in the config line format."""
+    business_type, family = detect_template_type(description)
+    template, _ = get_template(business_type, family) if business_type else (None, None)
+    lines = [
+        f"name: {extract_business_name(description) or 'My Business'}",
+        f"type: {business_type or 'other'}",
+        f"colors: {' '.join(_COLORS[:len(COLOR_KEYS)])}",
+    ]
+    if not template:
+        return lines + GENERIC_CONFIG_LINES + ['summary: Standard setup with clients, a schedule and billing.']
+    for tab in template['tabs']:
+        lines.append(f"tab: {tab['label']} | {tab.get('icon', 'home')}")
+        for comp in tab['components']:
+            fields = [comp['id'], comp.get('label', ''), comp.get('view', ''), ', '.join(comp.get('stages', []))]
+            lines.append(' | '.join(fields).rstrip(' |'))
+    return lines + [f"summary: {business_type.replace('_', ' ').title()} setup from the standard template."]
+
+
+def _copy_reply(body):
+    match = _COPY_BUSINESS.search(_user_text(body))
+    name = match.group(1) if match else 'Your Business'
+    return json.dumps({
+        'hero_headline': f'Welcome to {name}',
+        'hero_subheadline': f'{name} takes care of you, start to finish.',
+        'hero_cta': 'Book Now',
+        'about_title': f'About {name}',
+        'about_text': f'{name} is a local business built on care and craft. We know our regulars by name.',
+        'features_title': f'Why {name}',
+        'features': [
+            'Friendly, experienced people who listen first.',
+            'Easy booking and clear pricing, no surprises.',
+            'A space you will look forward to coming back to.',
+        ],
+        'cta_headline': 'Ready when you are',
+        'cta_text': 'Book your first visit today.',
+        'cta_button': 'Get Started',
+    })
+
+
+def _chat_reply(body):
+    messages = body.get('messages') or []
+    asked = sum(1 for m in messages if m.get('role') == 'assistant')
+    first = ''.join(text for text, _ in _text_blocks(messages[0].get('content'))) if messages else ''
+    match = _QUESTIONS_SO_FAR.search(first)
+    if match:
+        asked += int(match.group(1))
+    if asked >= CHAT_READY_AFTER:
+        return 'READY_TO_BUILD'
+    return CHAT_QUESTIONS[asked]
+
+
+def reply_for(body):
+    """(text, structured): the reply to a Messages API request body, and whether
+    it's JSON or config lines (the replies malformed_rate applies to). A request
+    ending in a prefilled assistant turn gets the rest of the reply after it."""
+    messages = body.get('messages') or []
+    if messages and messages[-1].get('role') == 'assistant':
+        prefill = ''.join(text for text, _ in _text_blocks(messages[-1].get('content')))
+        text, structured = reply_for({**body, 'messages': messages[:-1]})
+        return (text[len(prefill):] if text.startswith(prefill) else text), structured
+    system_texts = [text for text, _ in _text_blocks(body.get('system'))]
+    system = system_texts[0] if system_texts else ''
+    if system == TEMPLATE_SYSTEM:
+        return _template_reply(body, system_texts), True
+    if system == ANALYZE_BUSINESS_SYSTEM:
+        match = _DESCRIPTION.search(_user_text(body))
+        return '\n'.join(_config_lines(match.group(1) if match else '')), True
+    if system == WEBSITE_COPY_SYSTEM:
+        return _copy_reply(body), True
+    if system == CHAT_SYSTEM_PROMPT:
+        return _chat_reply(body), False
+    match = _CHECK_DESCRIPTION.search(_user_text(body))
+    if match:
+        _, lean, _ = classify_input(match.group(1))
+        return ('DETAILED' if lean else 'VAGUE'), False
+    return 'OK', False
+
+
+# ============================================================
+# Server
+# ============================================================
+class FakeLLM:
+    """Profiles, the seeded RNG, the prompt cache and per-model counts. Thread-safe."""
+
+    def __init__(self, profiles=None, seed=None, time_scale=1.0):
+        self.profiles = {prefix: dict(profile) for prefix, profile in DEFAULT_PROFILES.items()}
+        for prefix, profile in (profiles or {}).items():
+            self.profiles.setdefault(prefix, {}).update(profile)
+        self.time_scale = time_scale
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._cached = set()
+        self._stats = {}
+        self._batches = {}
+
+    def profile(self, model):
+        prefix = max((p for p in self.profiles if (model or '').startswith(p)), key=len)
+        return {**self.profiles[''], **self.profiles[prefix]}
+
+    def _lognormal(self, median, spread):
+        with self._lock:
+            return median * math.exp(self._random.gauss(0, spread)) if spread else median
+
+    def _roll(self, rate):
+        with self._lock:
+            return self._random.random() < rate
+
+    def _count(self, model, key, amount=1):
+        with self._lock:
+            counts = self._stats.setdefault(model, {'requests': 0, 'errors': 0, 'malformed': 0, 'output_tokens': 0})
+            counts[key] += amount
+
+    def stats(self):
+        with self._lock:
+            return {model: dict(counts) for model, counts in self._stats.items()}
+
+    def usage(self, body):
+        """Input token counts, splitting cached system blocks into created/read."""
+        usage = {'input_tokens': 0, 'cache_creation_input_tokens': 0, 'cache_read_input_tokens': 0}
+        blocks = _text_blocks(body.get('system'))
+        for message in body.get('messages') or []:
+            blocks += _text_blocks(message.get('content'))
+        for text, cached in blocks:
+            if not cached:
+                usage['input_tokens'] += _tokens(text)
+                continue
+            key = hashlib.sha256(text.encode()).digest()
+            with self._lock:
+                seen = key in self._cached
+                self._cached.add(key)
+            usage['cache_read_input_tokens' if seen else 'cache_creation_input_tokens'] += _tokens(text)
+        return usage
+
+    def plan(self, body):
+        """Everything about one response, decided up front: (error, message, ttft,
+        seconds per token). error is an error body, or None."""
+        model = body.get('model', '')
+        profile = self.profile(model)
+        self._count(model, 'requests')
+        ttft = self._lognormal(profile['ttft'], profile.get('ttft_spread', 0)) * self.time_scale
+        per_token = self.time_scale / self._lognormal(profile['tokens_per_second'], profile.get('tps_spread', 0))
+        if self._roll(profile.get('error_rate', 0)):
+            self._count(model, 'errors')
+            return {'type': 'error', 'error': {'type': 'overloaded_error', 'message': 'Overloaded'}}, None, ttft, 0
+
+        text, structured = reply_for(body)
+        if structured and self._roll(profile.get('malformed_rate', 0)):
+            self._count(model, 'malformed')
+            with self._lock:
+                text = text[:self._random.randint(len(text) // 4, len(text) * 3 // 4)]
+        stop_reason = 'end_turn'
+        max_tokens = body.get('max_tokens')
+        if max_tokens and _tokens(text) > max_tokens:
+            text, stop_reason = text[:max_tokens * _CHARS_PER_TOKEN], 'max_tokens'
+        self._count(model, 'output_tokens', _tokens(text))
+        message = {
+            'id': f'msg_fake_{uuid.uuid4().hex[:24]}',
+            'type': 'message',
+            'role': 'assistant',
+            'model': model,
+            'content': [{'type': 'text', 'text': text}],
+            'stop_reason': stop_reason,
+            'stop_sequence': None,
+            'usage': {**self.usage(body), 'output_tokens': _tokens(text)},
+        }
+        return None, message, ttft, per_token
+
+    def create_batch(self, requests):
+        """Answer every {custom_id, params} request now. Returns the batch's id."""
+        results = []
+        for request in requests:
+            error, message, _, _ = self.plan(request['params'])
+            result = {'type': 'errored', 'error': error} if error else {'type': 'succeeded', 'message': message}
+            results.append({'custom_id': request['custom_id'], 'result': result})
+        batch_id = f'msgbatch_fake_{uuid.uuid4().hex[:24]}'
+        with self._lock:
+            self._batches[batch_id] = (time.time(), results)
+        return batch_id
+
+    def batch(self, batch_id, results_url):
+        """The MessageBatch object for batch_id, or None."""
+        with self._lock:
+            if batch_id not in self._batches:
+                return None
+            created, results = self._batches[batch_id]
+        stamp = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(created))
+        succeeded = sum(1 for r in results if r['result']['type'] == 'succeeded')
+        return {
+            'id': batch_id,
+            'type': 'message_batch',
+            'processing_status': 'ended',
+            'request_counts': {'processing': 0, 'succeeded': succeeded, 'errored': len(results) - succeeded,
+                               'canceled': 0, 'expired': 0},
+            'created_at': stamp,
+            'ended_at': stamp,
+            'expires_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(created + 24 * 3600)),
+            'archived_at': None,
+            'cancel_initiated_at': None,
+            'results_url': results_url,
+        }
+
+    def batch_results(self, batch_id):
+        with self._lock:
+            return self._batches[batch_id][1] if batch_id in self._batches else None
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _stream(message, ttft, per_token):
+    text = message['content'][0]['text']
+    start = {**message, 'content': [], 'stop_reason': None, 'usage': {**message['usage'], 'output_tokens': 1}}
+    await asyncio.sleep(ttft)
+    yield _sse('message_start', {'type': 'message_start', 'message': start})
+    yield _sse('content_block_start', {'type': 'content_block_start', 'index': 0,
+                                       'content_block': {'type': 'text', 'text': ''}})
+    step = _TOKENS_PER_DELTA * _CHARS_PER_TOKEN
+    for i in range(0, len(text), step):
+        chunk = text[i:i + step]
+        await asyncio.sleep(_tokens(chunk) * per_token)
+        yield _sse('content_block_delta', {'type': 'content_block_delta', 'index': 0,
+                                           'delta': {'type': 'text_delta', 'text': chunk}})
+    yield _sse('content_block_stop', {'type': 'content_block_stop', 'index': 0})
+    yield _sse('message_delta', {'type': 'message_delta',
+                                 'delta': {'stop_reason': message['stop_reason'], 'stop_sequence': None},
+                                 'usage': {'output_tokens': message['usage']['output_tokens']}})
+    yield _sse('message_stop', {'type': 'message_stop'})
+
+
+def create_app(fake=None):
+    """Starlette app serving the Messages API from fake (a default FakeLLM if None)."""
+    fake = fake or FakeLLM()
+
+    async def messages(request):
+        body = await request.json()
+        error, message, ttft, per_token = fake.plan(body)
+        if error:
+            await asyncio.sleep(ttft)
+            return JSONResponse(error, status_code=529)
+        if body.get('stream'):
+            return StreamingResponse(_stream(message, ttft, per_token), media_type='text/event-stream')
+        await asyncio.sleep(ttft + message['usage']['output_tokens'] * per_token)
+        return JSONResponse(message)
+
+    def batch_response(request, batch_id):
+        batch = fake.batch(batch_id, str(request.url_for('batch_results', batch_id=batch_id)))
+        if batch is None:
+            return JSONResponse({'type': 'error', 'error': {'type': 'not_found_error', 'message': batch_id}},
+                                status_code=404)
+        return JSONResponse(batch)
+
+    async def create_batch(request):
+        body = await request.json()
+        return batch_response(request, fake.create_batch(body.get('requests') or []))
+
+    async def batch(request):
+        return batch_response(request, request.path_params['batch_id'])
+
+    async def batch_results(request):
+        results = fake.batch_results(request.path_params['batch_id'])
+        if results is None:
+            return JSONResponse({'type': 'error', 'error': {'type': 'not_found_error', 'message': 'no batch'}},
+                                status_code=404)
+        return Response(''.join(json.dumps(r) + '\n' for r in results), media_type='application/binary')
+
+    async def stats(request):
+        return JSONResponse(fake.stats())
+
+    app = Starlette(routes=[
+        Route('/v1/messages', messages, methods=['POST']),
+        Route('/v1/messages/batches', create_batch, methods=['POST']),
+        Route('/v1/messages/batches/{batch_id}', batch),
+        Route('/v1/messages/batches/{batch_id}/results', batch_results, name='batch_results'),
+        Route('/stats', stats),
+    ])
+    app.state.fake = fake
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a local stand-in for the Anthropic Messages API.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--profile', help='JSON file of {model prefix: profile overrides}')
+    parser.add_argument('--seed', type=int, help='seed for latencies, errors and malformed replies')
+    parser.add_argument('--time-scale', type=float, default=1.0, help='multiplier for every delay (0 = none)')
+    args = parser.parse_args()
+
+    profiles = None
+    if args.profile:
+        with open(args.profile) as f:
+            profiles = json.load(f)
+
+    import uvicorn
+    uvicorn.run(create_app(FakeLLM(profiles, args.seed, args.time_scale)), host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,315 @@
+"""Streaming importer for the legacy monolithic configs.json.
+
+configs.json is one big object keyed by config id, in the pre-tabs format
+(modules_needed, labels, sample_contacts). This reads it one record at a
+time — memory stays flat no matter how large the file is — upgrades each
+record to the tabs-based format save_config() writes, and bulk-inserts the
+results into the config store in batched transactions.
+
+Progress is checkpointed (byte offset + counters) after every committed
+batch, so an interrupted run resumes where it stopped.
+
+Usage:
+    python import_legacy_configs.py [configs.json] [--batch-size 500] [--restart]
+"""
+
+import argparse
+import codecs
+import json
+import os
+import time
+from datetime import datetime
+
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = ' \t\n\r'
+
+
+# ============================================================
+# STREAMING PARSER — yields top-level members one at a time
+# ============================================================
+
+class _Reader:
+    """Text buffer over a binary file that knows the byte offset of its cursor."""
+
+    def __init__(self, f, offset):
+        self.f = f
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buf = ''
+        self.pos = 0
+        self.offset = offset  # byte offset of buf[pos]
+        self.eof = False
+        self.chunk_size = CHUNK_SIZE
+
+    def fill(self):
+        """Read another chunk. Returns False at end of file."""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            self.buf += self.decoder.decode(b'', final=True)
+            return False
+        # Drop consumed text so the buffer only ever holds the current record
+        self.buf = self.buf[self.pos:] + self.decoder.decode(chunk)
+        self.pos = 0
+        return True
+
+    def advance(self, new_pos):
+        self.offset += len(self.buf[self.pos:new_pos].encode('utf-8'))
+        self.pos = new_pos
+
+    def skip_whitespace(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.advance(self.pos + 1)
+            if self.pos < len(self.buf) or not self.fill():
+                return
+
+    def peek(self):
+        self.skip_whitespace()
+        if self.pos >= len(self.buf):
+            raise ValueError(f'Unexpected end of file at byte {self.offset}')
+        return self.buf[self.pos]
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f'Expected {char!r} at byte {self.offset}, got {self.buf[self.pos]!r}')
+        self.advance(self.pos + 1)
+
+    def decode_value(self, decoder):
+        self.skip_whitespace()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Most likely the value continues past the buffer — read more
+                if not self.fill():
+                    raise
+                self.chunk_size = min(self.chunk_size * 2, 16 * 1024 * 1024)
+                continue
+            # A number could continue in the next chunk — only trust it if more text follows
+            if end == len(self.buf) and not self.eof and self.fill():
+                continue
+            self.advance(end)
+            return value
+
+
+def iter_legacy_records(f, offset=0):
+    """Yield (config_id, record, end_offset) for each member of the top-level object.
+
+    f is a binary file. offset=0 starts from the opening brace; any other offset
+    must be an end_offset previously yielded (resume from a checkpoint).
+    """
+    f.seek(offset)
+    reader = _Reader(f, offset)
+    decoder = json.JSONDecoder()
+
+    if offset == 0:
+        reader.expect('{')
+        if reader.peek() == '}':
+            return
+    else:
+        # Resuming right after a member: either another one follows or the object ends
+        if reader.peek() == '}':
+            return
+        reader.expect(',')
+
+    while True:
+        key = reader.decode_value(decoder)
+        if not isinstance(key, str):
+            raise ValueError(f'Expected a string key at byte {reader.offset}')
+        reader.expect(':')
+        value = reader.decode_value(decoder)
+        yield key, value, reader.offset
+
+        if reader.peek() == '}':
+            return
+        reader.expect(',')
+
+
+# ============================================================
+# LEGACY → TABS UPGRADE
+# ============================================================
+
+# Odoo-era module names → (tab label, icon, [(component id, label, view), ...])
+LEGACY_MODULE_TABS = {
+    'crm': ('Clients', 'people', [('clients', 'Clients', 'pipeline'), ('leads', 'Leads', 'pipeline')]),
+    'contacts': ('Clients', 'people', [('clients', 'Clients', 'pipeline'), ('contacts', 'Contacts', 'list')]),
+    'calendar': ('Schedule', 'calendar', [('calendar', 'Calendar', 'calendar')]),
+    'appointment': ('Schedule', 'calendar', [('calendar', 'Calendar', 'calendar')]),
+    'sale_management': ('Sales', 'dollar', [('estimates', 'Quotes', 'table'), ('invoices', 'Invoices', 'table')]),
+    'sale': ('Sales', 'dollar', [('estimates', 'Quotes', 'table'), ('invoices', 'Invoices', 'table')]),
+    'account': ('Billing', 'dollar', [('invoices', 'Invoices', 'table'), ('payments', 'Payments', 'table')]),
+    'invoicing': ('Billing', 'dollar', [('invoices', 'Invoices', 'table'), ('payments', 'Payments', 'table')]),
+    'point_of_sale': ('Sales', 'dollar', [('orders', 'Orders', 'table'), ('payments', 'Payments', 'table')]),
+    'stock': ('Inventory', 'box', [('inventory', 'Inventory', 'table'), ('products', 'Products', 'table')]),
+    'purchase': ('Inventory', 'box', [('vendors', 'Vendors', 'table')]),
+    'project': ('Jobs', 'briefcase', [('jobs', 'Jobs', 'pipeline')]),
+    'hr': ('Team', 'users', [('staff', 'Staff', 'cards')]),
+    'hr_timesheet': ('Team', 'users', [('time_tracking', 'Timesheets', 'table')]),
+}
+
+# Legacy label keys → the component they renamed
+LEGACY_LABEL_TARGETS = {
+    'contacts': 'clients',
+    'people': 'clients',
+    'customers': 'clients',
+    'calendar': 'calendar',
+    'time': 'calendar',
+    'appointments': 'calendar',
+    'leads': 'leads',
+    'invoices': 'invoices',
+    'money': 'invoices',
+    'staff': 'staff',
+    'jobs': 'jobs',
+}
+
+
+def upgrade_legacy_record(config_id, record):
+    """Convert a pre-tabs config into the tabs format written by save_config().
+    Returns (config, conversation_history) — history goes to the transcript segment."""
+    tabs = [{'id': 'tab_1', 'label': 'Dashboard', 'icon': 'home', 'components': []}]
+    tabs_by_label = {}
+    seen_components = set()
+
+    for module in record.get('modules_needed') or []:
+        spec = LEGACY_MODULE_TABS.get(module)
+        if not spec:
+            continue
+        label, icon, components = spec
+        tab = tabs_by_label.get(label)
+        if tab is None:
+            tab = {'id': f'tab_{len(tabs) + 1}', 'label': label, 'icon': icon, 'components': []}
+            tabs.append(tab)
+            tabs_by_label[label] = tab
+        for comp_id, comp_label, view in components:
+            if comp_id not in seen_components:
+                seen_components.add(comp_id)
+                tab['components'].append({'id': comp_id, 'label': comp_label, 'view': view})
+
+    # Apply custom labels; relabeling a tab's first component renames the tab too
+    for key, custom_label in (record.get('labels') or {}).items():
+        target = LEGACY_LABEL_TARGETS.get(key, key)
+        for tab in tabs[1:]:
+            for i, comp in enumerate(tab['components']):
+                if comp['id'] == target:
+                    comp['label'] = custom_label
+                    if i == 0:
+                        tab['label'] = custom_label
+
+    config = {
+        'id': config_id,
+        'created_at': record.get('created_at') or datetime.now().isoformat(),
+        'business_name': record.get('business_name'),
+        'business_type': record.get('business_type'),
+        'tabs': tabs,
+        'colors': record.get('colors') or {},
+        'platform_tabs': ['site', 'analytics', 'settings'],
+        'summary': record.get('summary'),
+        'imported_from': 'configs.json',
+    }
+    return config, record.get('conversation_history') or []
+
+
+# ============================================================
+# IMPORT RUN
+# ============================================================
+
+def _load_checkpoint(path):
+    if path and os.path.exists(path):
+        with open(path, 'r') as f:
+            return json.load(f)
+    return {'offset': 0, 'imported': 0, 'skipped': 0}
+
+
+def _save_checkpoint(path, state):
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def import_legacy_configs(source_path, store, configs_folder, batch_size=500,
+                          checkpoint_path=None, postprocess=None, log=print):
+    """Stream source_path into store. Returns the final checkpoint state.
+
+    postprocess(config) → config runs on every upgraded record (the app passes
+    validate_colors + transform_pipeline_stages). Configs already in the store
+    are skipped, so re-running after a crash never clobbers newer edits.
+    """
+    from transcripts import append_messages, count_messages
+
+    state = _load_checkpoint(checkpoint_path)
+    if state['offset']:
+        log(f"Resuming at byte {state['offset']} ({state['imported']} imported so far)")
+
+    total_bytes = os.path.getsize(source_path)
+    started = time.monotonic()
+    start_offset = state['offset']
+    batch = []
+
+    def flush(end_offset):
+        if batch:
+            store.put_many(batch)
+            state['imported'] += len(batch)
+            batch.clear()
+        state['offset'] = end_offset
+        if checkpoint_path:
+            _save_checkpoint(checkpoint_path, state)
+        elapsed = max(time.monotonic() - started, 1e-6)
+        done = end_offset - start_offset
+        log(f"{state['imported']} imported, {state['skipped']} skipped — "
+            f"{end_offset / max(total_bytes, 1):.0%} of file, "
+            f"{done / elapsed / 1024 / 1024:.2f} MB/s")
+
+    with open(source_path, 'rb') as f:
+        end_offset = state['offset']
+        for config_id, record, end_offset in iter_legacy_records(f, state['offset']):
+            if not isinstance(record, dict) or store.version(config_id) is not None:
+                state['skipped'] += 1
+                continue
+            config, history = upgrade_legacy_record(config_id, record)
+            if postprocess:
+                config = postprocess(config)
+            # A crash after this append but before the batch commits re-runs the
+            # record — don't append its history twice
+            if count_messages(configs_folder, config_id):
+                history = []
+            config['transcript'] = append_messages(configs_folder, config_id, history)
+            batch.append((config_id, config))
+            if len(batch) >= batch_size:
+                flush(end_offset)
+        flush(end_offset)
+
+    elapsed = max(time.monotonic() - started, 1e-6)
+    log(f"Done: {state['imported']} imported, {state['skipped']} skipped in {elapsed:.1f}s "
+        f"({state['imported'] / elapsed:.0f} configs/s)")
+    return state
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import legacy configs.json into the config store.')
+    parser.add_argument('source', nargs='?', default=os.path.join(os.path.dirname(__file__), 'configs.json'))
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--checkpoint', help='checkpoint file (default: <source>.checkpoint)')
+    parser.add_argument('--restart', action='store_true', help='ignore an existing checkpoint')
+    args = parser.parse_args()
+
+    # Same store, colors and stage handling the running app uses
+    from app import CONFIGS_FOLDER, config_store, validate_colors, transform_pipeline_stages
+
+    checkpoint = args.checkpoint or f'{args.source}.checkpoint'
+    if args.restart and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+    import_legacy_configs(
+        args.source, config_store, CONFIGS_FOLDER,
+        batch_size=args.batch_size,
+        checkpoint_path=checkpoint,
+        postprocess=lambda c: transform_pipeline_stages(validate_colors(c)),
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""Local DETAILED/VAGUE pre-classifier for /check-input.
+
+/check-input runs at the start of every onboarding, and most inputs are
+obviously one way or the other — "barber" is vague, a paragraph naming the
+business, its services, customers, team and how it books clients is
+detailed. classify_input() scores a description on the five elements the
+check_input prompt asks for, using keyword tables and length:
+
+    name        a quoted name or "called ..." (extract_business_name), or
+                a capitalised multi-word name
+    services    what the business offers or sells
+    customers   who it serves
+    team        solo or team size
+    workflow    how work is booked, scheduled, billed or tracked
+
+Clear cases are answered locally; only borderline ones go to the model.
+InputClassifierStats counts where each decision came from, and how often
+the local guess agreed with the model — on borderline inputs, and on a
+sample of local decisions re-checked by the model in the background — so
+the thresholds can be tuned.
+"""
+
+import re
+import threading
+
+from website_copy import extract_business_name
+
+ELEMENTS = ('name', 'services', 'customers', 'team', 'workflow')
+
+_KEYWORDS = {
+    'services': (
+        r"offer|offers|offering|provide|provides|specializ\w*|specialis\w*|sell|sells|selling|services?|menu"
+        r"|products?|packages?|treatments?|repairs?|install\w*|lessons?|classes|sessions|cuts|haircuts|color"
+        r"|colou?ring|manicures?|pedicures?|facials?|massages?|tattoos?|grooming|cleaning|catering|coaching"
+        r"|tutoring|consulting|we do|i do"
+    ),
+    'customers': (
+        r"customers?|clients?|clientele|patients?|guests?|members?|students?|families|parents|kids|children"
+        r"|homeowners?|businesses|companies|locals?|tourists?|seniors|professionals|athletes|brides?"
+        r"|pet owners|dog owners|women|men|teens|adults|residents|tenants|serve|serving"
+    ),
+    'team': (
+        r"team|staff|employees?|employ|crew|partners?|co-?owners?|solo|just me|by myself|on my own|alone"
+        r"|one[- ](?:person|woman|man)|independent|contractors?|assistants?|hire|hiring"
+        r"|(?:\d+|two|three|four|five|six|seven|eight|nine|ten|a few|several)\s+(?:\w+\s+)?"
+        r"(?:people|employees|stylists|barbers|techs|technicians|artists|therapists|groomers|instructors"
+        r"|trainers|teachers|drivers|cooks|chefs|servers|nurses|doctors|associates|workers|chairs|stations)"
+    ),
+    'workflow': (
+        r"book\w*|appointments?|schedul\w*|calendar|walk-?ins?|reservations?|invoic\w*"
+        r"|bill|bills|billed|billing|payments?|pays?|paid|deposits?|quotes?|estimates?|follow[- ]?ups?|reminders?|track|tracking"
+        r"|intake|check[- ]?ins?|waitlist|spreadsheets?|paper|pipeline|onboard\w*|subscriptions?|recurring"
+        r"|orders?|deliver\w*|dispatch\w*"
+    ),
+}
+_PATTERNS = {element: re.compile(rf"\b(?:{words})\b", re.IGNORECASE) for element, words in _KEYWORDS.items()}
+# "Tony's Cuts", "Green Acres Landscaping" — two or more capitalised words, not
+# starting with one that merely opens a sentence
+_PROPER_NAME = re.compile(
+    r"\b(?!(?:I|I'm|We|We're|My|Our|It|It's|This|A|An|The|Hi|Hello|Hey)\b)"
+    r"[A-Z][\w'’&-]+(?:\s+(?:&\s+)?[A-Z][\w'’&-]+)+"
+)
+_SENTENCE_END = re.compile(r"[.!?]+(?:\s|$)")
+
+# Fewer words than this is vague whatever it mentions
+VAGUE_MAX_WORDS = 8
+# This many elements or fewer is vague — the prompt needs all five, and a
+# wrong "vague" only costs the user one more chat question
+VAGUE_MAX_ELEMENTS = 3
+# Detailed locally only with every element, this many words and more than one sentence
+DETAILED_MIN_WORDS = 25
+
+
+def input_elements(description):
+    """{element: bool} for the five elements the check_input prompt requires."""
+    found = {element: bool(pattern.search(description)) for element, pattern in _PATTERNS.items()}
+    found['name'] = bool(extract_business_name(description) or _PROPER_NAME.search(description))
+    return {element: found[element] for element in ELEMENTS}
+
+
+def classify_input(description):
+    """(detailed, lean, missing).
+
+    detailed is True or False when the description is clearly one or the
+    other, and None when it's borderline and the model should decide. lean
+    is the local best guess either way; missing lists absent elements."""
+    elements = input_elements(description)
+    missing = [element for element in ELEMENTS if not elements[element]]
+    words = len(description.split())
+    sentences = len(_SENTENCE_END.findall(description.strip() + ' '))
+    lean = not missing
+    if words < VAGUE_MAX_WORDS or len(ELEMENTS) - len(missing) <= VAGUE_MAX_ELEMENTS:
+        return False, lean, missing
+    if not missing and words >= DETAILED_MIN_WORDS and sentences > 1:
+        return True, lean, missing
+    return None, lean, missing
+
+
+class InputClassifierStats:
+    """Decision sources and local/model agreement for /check-input. Thread-safe.
+
+    A decision's source is local, model (borderline input) or fallback (the
+    model call failed, so the local guess was used). Agreement compares the
+    local guess with the model's answer on borderline inputs and on shadow
+    re-checks of local decisions."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sources = {'local': 0, 'model': 0, 'fallback': 0}
+        self.local_detailed = 0
+        self.compared = {'borderline': 0, 'shadow': 0}
+        self.agreed = {'borderline': 0, 'shadow': 0}
+
+    def record(self, source, detailed):
+        with self._lock:
+            self.sources[source] += 1
+            if source == 'local' and detailed:
+                self.local_detailed += 1
+
+    def record_agreement(self, kind, lean, model_detailed):
+        with self._lock:
+            self.compared[kind] += 1
+            if lean == model_detailed:
+                self.agreed[kind] += 1
+
+    def stats(self):
+        with self._lock:
+            total = sum(self.sources.values())
+            return {
+                'decisions': total,
+                'sources': dict(self.sources),
+                'local_rate': round(self.sources['local'] / total, 3) if total else None,
+                'local_detailed': self.local_detailed,
+                'agreement': {
+                    kind: {
+                        'compared': self.compared[kind],
+                        'rate': round(self.agreed[kind] / self.compared[kind], 3) if self.compared[kind] else None,
+                    }
+                    for kind in self.compared
+                },
+            }
+
+
+INPUT_CLASSIFIER_STATS = InputClassifierStats()
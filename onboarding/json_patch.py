@@ -0,0 +1,169 @@
+"""JSON Patch (RFC 6902) and JSON Merge Patch (RFC 7396) for config documents.
+
+Used by PATCH /config/<id> so small dashboard edits (rename a component,
+reorder tabs) are stored as delta records instead of full rewrites.
+
+A delta record is {'kind': 'json-patch' | 'merge-patch', 'patch': ...};
+apply_delta() applies one and returns a new document without mutating the input.
+"""
+
+import copy
+import re
+
+JSON_PATCH = 'json-patch'
+MERGE_PATCH = 'merge-patch'
+
+_MISSING = object()
+
+# RFC 6901 array index: no leading zeros, ASCII digits only ('²'.isdigit() is True)
+_ARRAY_INDEX = re.compile(r'0|[1-9][0-9]*')
+
+
+class PatchError(ValueError):
+    """Raised when a patch is malformed or can't be applied to the document."""
+
+
+# ──────────────────────────────────────────────────────────────────────
+# JSON Pointer (RFC 6901)
+# ──────────────────────────────────────────────────────────────────────
+
+def _parse_pointer(pointer):
+    if not isinstance(pointer, str):
+        raise PatchError(f'Pointer must be a string: {pointer!r}')
+    if pointer == '':
+        return []
+    if not pointer.startswith('/'):
+        raise PatchError(f'Pointer must start with "/": {pointer}')
+    return [t.replace('~1', '/').replace('~0', '~') for t in pointer[1:].split('/')]
+
+
+def _array_index(container, token, allow_end=False):
+    if token == '-' and allow_end:
+        return len(container)
+    if not _ARRAY_INDEX.fullmatch(token):
+        raise PatchError(f'Invalid array index: {token}')
+    index = int(token)
+    limit = len(container) if allow_end else len(container) - 1
+    if index > limit:
+        raise PatchError(f'Array index out of range: {token}')
+    return index
+
+
+def _resolve(doc, tokens):
+    node = doc
+    for token in tokens:
+        if isinstance(node, dict):
+            if token not in node:
+                raise PatchError(f'Path not found: /{"/".join(tokens)}')
+            node = node[token]
+        elif isinstance(node, list):
+            node = node[_array_index(node, token)]
+        else:
+            raise PatchError(f'Path not found: /{"/".join(tokens)}')
+    return node
+
+
+def _get(doc, pointer):
+    return _resolve(doc, _parse_pointer(pointer))
+
+
+def _add(doc, pointer, value):
+    tokens = _parse_pointer(pointer)
+    if not tokens:
+        return value
+    parent = _resolve(doc, tokens[:-1])
+    key = tokens[-1]
+    if isinstance(parent, dict):
+        parent[key] = value
+    elif isinstance(parent, list):
+        parent.insert(_array_index(parent, key, allow_end=True), value)
+    else:
+        raise PatchError(f'Cannot add to non-container at {pointer}')
+    return doc
+
+
+def _remove(doc, pointer):
+    tokens = _parse_pointer(pointer)
+    if not tokens:
+        raise PatchError('Cannot remove the whole document')
+    parent = _resolve(doc, tokens[:-1])
+    key = tokens[-1]
+    if isinstance(parent, dict):
+        if key not in parent:
+            raise PatchError(f'Path not found: {pointer}')
+        return doc, parent.pop(key)
+    if isinstance(parent, list):
+        return doc, parent.pop(_array_index(parent, key))
+    raise PatchError(f'Path not found: {pointer}')
+
+
+# ──────────────────────────────────────────────────────────────────────
+# Patch application
+# ──────────────────────────────────────────────────────────────────────
+
+def apply_json_patch(doc, operations):
+    """Apply an RFC 6902 operation list. Returns a new document; doc is untouched.
+    The whole patch is atomic — any failing operation raises PatchError."""
+    if not isinstance(operations, list):
+        raise PatchError('JSON Patch must be an array of operations')
+    doc = copy.deepcopy(doc)
+    for op in operations:
+        if not isinstance(op, dict) or 'op' not in op or 'path' not in op:
+            raise PatchError(f'Invalid operation: {op!r}')
+        name, path = op['op'], op['path']
+        if name in ('add', 'replace', 'test') and 'value' not in op:
+            raise PatchError(f'"{name}" operation requires a value')
+
+        if name == 'add':
+            doc = _add(doc, path, copy.deepcopy(op['value']))
+        elif name == 'remove':
+            doc, _ = _remove(doc, path)
+        elif name == 'replace':
+            if not _parse_pointer(path):
+                doc = copy.deepcopy(op['value'])
+                continue
+            _get(doc, path)  # must exist
+            doc, _ = _remove(doc, path)
+            doc = _add(doc, path, copy.deepcopy(op['value']))
+        elif name == 'move':
+            source = op.get('from')
+            if source is None:
+                raise PatchError('"move" operation requires "from"')
+            if path != source and path.startswith(source + '/'):
+                raise PatchError('Cannot move a value into one of its children')
+            doc, value = _remove(doc, source)
+            doc = _add(doc, path, value)
+        elif name == 'copy':
+            source = op.get('from')
+            if source is None:
+                raise PatchError('"copy" operation requires "from"')
+            doc = _add(doc, path, copy.deepcopy(_get(doc, source)))
+        elif name == 'test':
+            if _get(doc, path) != op['value']:
+                raise PatchError(f'Test failed at {path}')
+        else:
+            raise PatchError(f'Unknown operation: {name}')
+    return doc
+
+
+def apply_merge_patch(target, patch):
+    """Apply an RFC 7396 merge patch. Returns a new document; target is untouched."""
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+    result = copy.deepcopy(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_merge_patch(result.get(key, _MISSING), value)
+    return result
+
+
+def apply_delta(doc, delta):
+    """Apply one stored delta record ({'kind', 'patch'}) to a document."""
+    kind = delta.get('kind')
+    if kind == JSON_PATCH:
+        return apply_json_patch(doc, delta.get('patch'))
+    if kind == MERGE_PATCH:
+        return apply_merge_patch(doc, delta.get('patch'))
+    raise PatchError(f'Unknown delta kind: {kind}')
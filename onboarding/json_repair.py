@@ -0,0 +1,144 @@
+"""Tolerant JSON extraction for model output.
+
+The config and website-copy replies are meant to be one JSON object, but the
+model sometimes wraps it in a sentence, leaves a trailing comma, drops a
+comma between two lines, writes Python's True/None, or stops at max_tokens
+half-way through. A bare json.loads() failed the whole /configure for any of
+those. extract_json() instead:
+
+    locates     the first top-level object or array, skipping a ```json
+                fence or chatty preamble, and ignoring anything after it
+    detects     truncation — a value still open when the text ends — and
+                raises TruncatedJSON, so the caller can ask for the rest
+                (prompts.continuation_request) rather than start over
+    repairs     trailing commas, missing commas between values on separate
+                lines, and True/False/None, outside strings only; raw
+                newlines and tabs inside strings are accepted as they are
+
+It returns the value and the list of repairs made, for the metrics. Output
+that still doesn't parse raises JSONRepairError, a ValueError, which
+CallPolicy treats as retryable.
+"""
+
+import json
+import re
+
+_OPENERS = '{['
+_PYTHON_LITERALS = {'True': 'true', 'False': 'false', 'None': 'null'}
+_WORD = re.compile(r'[A-Za-z_]\w*|-?\d[\d.eE+-]*')
+_FENCE = re.compile(r'^\s*```[a-zA-Z]*\s*')
+
+
+class JSONRepairError(ValueError):
+    """Model output with no parseable JSON value, even after repairs."""
+
+
+class TruncatedJSON(JSONRepairError):
+    """The JSON value was still open when the text ended."""
+
+
+def _span(text):
+    """(start, end) of the first top-level object or array — end is None when
+    the text ends before it closes. Raises JSONRepairError if there's none."""
+    start = next((i for i, c in enumerate(text) if c in _OPENERS), None)
+    if start is None:
+        raise JSONRepairError('no JSON object in the reply')
+    depth = 0
+    in_string = escape = False
+    for i in range(start, len(text)):
+        c = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif c == '\\':
+                escape = True
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c in '{[':
+            depth += 1
+        elif c in '}]':
+            depth -= 1
+            if depth == 0:
+                return start, i + 1
+    return start, None
+
+
+def is_truncated(text):
+    """True if text starts a JSON value that never closes."""
+    try:
+        return _span(text)[1] is None
+    except JSONRepairError:
+        return False
+
+
+def _ends_value(char):
+    """True if char (the last one outside whitespace) can end a JSON value."""
+    return bool(char) and (char in '"}]' or char.isalnum())
+
+
+def _repair(candidate):
+    """candidate with the common defects fixed outside strings. Returns (text, repairs)."""
+    out = []
+    repairs = []
+    last = ''  # last significant character written outside strings
+    i = 0
+    while i < len(candidate):
+        c = candidate[i]
+        if c == '"':
+            end = i + 1
+            while end < len(candidate) and candidate[end] != '"':
+                end += 2 if candidate[end] == '\\' else 1
+            if _ends_value(last):
+                out.append(',')
+                repairs.append('missing_comma')
+            out.append(candidate[i:end + 1])
+            last = '"'
+            i = end + 1
+            continue
+        if c in '}]' and last == ',':
+            # Drop the trailing comma (and keep the whitespace after it)
+            cut = max(j for j, part in enumerate(out) if part == ',')
+            del out[cut]
+            repairs.append('trailing_comma')
+        elif c in '{[' and _ends_value(last):
+            out.append(',')
+            repairs.append('missing_comma')
+        word = _WORD.match(candidate, i) if (c.isalnum() or c == '-') else None
+        if word:
+            token = word.group()
+            if token in _PYTHON_LITERALS:
+                token = _PYTHON_LITERALS[token]
+                repairs.append('python_literal')
+            out.append(token)
+            last = token[-1]
+            i = word.end()
+            continue
+        out.append(c)
+        if not c.isspace():
+            last = c
+        i += 1
+    return ''.join(out), repairs
+
+
+def extract_json(text):
+    """(value, repairs) for the JSON value in a model reply. Raises
+    TruncatedJSON if it's cut off, JSONRepairError if it won't parse."""
+    text = _FENCE.sub('', text, count=1)
+    start, end = _span(text)
+    if end is None:
+        raise TruncatedJSON(f'reply ends inside the JSON value ({len(text) - start} chars in)')
+    repairs = ['preamble'] if text[:start].strip() else []
+    if text[end:].strip().strip('`').strip():
+        repairs.append('trailing_text')
+    candidate = text[start:end]
+    try:
+        return json.loads(candidate, strict=False), repairs
+    except json.JSONDecodeError:
+        pass
+    repaired, fixes = _repair(candidate)
+    try:
+        return json.loads(repaired, strict=False), repairs + fixes
+    except json.JSONDecodeError as e:
+        raise JSONRepairError(f'unparseable JSON after repairs: {e}') from e
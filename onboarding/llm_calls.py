@@ -0,0 +1,300 @@
+"""Latency budgets, retries, hedging and circuit breaking for model calls.
+
+A single slow Anthropic response used to hold a worker until the gunicorn
+timeout, and one malformed reply failed the whole request. Every model call
+now goes through a CallPolicy:
+
+    budget      total seconds for the call, retries and hedges included;
+                each attempt gets the remaining budget as its SDK timeout
+    retries     extra attempts after a retryable failure (timeouts,
+                connection errors, 429/5xx/529, unparseable output), with
+                full-jitter exponential backoff that must fit in the budget
+    hedge       when an attempt runs past the p95 of this call's recent
+                latencies, a second identical request starts and the first
+                to succeed wins (non-streaming calls only — two streams
+                would both emit tabs)
+    breaker     after consecutive failures the policy fails fast for a cool-
+                down, then lets one trial call through (half-open)
+
+When the policy gives up it raises CallFailed, and the caller degrades to its
+deterministic output (the raw template, a generic dashboard, default copy).
+
+The attempt function takes the attempt's timeout in seconds and returns the
+parsed result, so a reply that fails to parse is retried like any other
+failure. Breaker state and latencies are per worker process.
+"""
+
+import asyncio
+import collections
+import concurrent.futures
+import contextlib
+import contextvars
+import random
+import threading
+import time
+
+import anthropic
+
+# Hedge only once this many latencies are known, and never sooner than the floor
+_HEDGE_MIN_SAMPLES = 20
+_HEDGE_MIN_DELAY = 1.0
+_LATENCY_WINDOW = 200
+
+_BACKOFF_BASE = 0.5
+_BACKOFF_CAP = 8.0
+# Don't start a retry with less budget left than this
+_MIN_ATTEMPT_SECONDS = 1.0
+
+# Hedged sync calls run on these threads so the request thread can wait on both
+_hedge_pool = concurrent.futures.ThreadPoolExecutor(max_workers=16, thread_name_prefix='llm-hedge')
+
+
+class CallFailed(Exception):
+    """The model call gave up: budget spent, circuit open, or a non-retryable error."""
+
+
+class CircuitOpen(CallFailed):
+    pass
+
+
+class AttemptTimeout(TimeoutError):
+    """A streamed attempt ran past its timeout (the SDK's only bounds gaps between chunks)."""
+
+
+def is_retryable(error):
+    if isinstance(error, (anthropic.APIConnectionError, TimeoutError, ValueError)):
+        return True  # connection errors and timeouts, and malformed output
+    if isinstance(error, anthropic.APIStatusError):
+        return error.status_code in (408, 409, 429) or error.status_code >= 500
+    return False
+
+
+class CallPolicy:
+    """Budget, retry, hedge and breaker settings plus live state for one kind of call. Thread-safe."""
+
+    def __init__(self, name, budget, retries=2, hedge=True, breaker_threshold=5, breaker_reset=30.0, metrics=None):
+        self.name = name
+        self.budget = budget
+        self.metrics = metrics
+        self.retries = retries
+        self.hedge = hedge
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        self._lock = threading.Lock()
+        self._latencies = collections.deque(maxlen=_LATENCY_WINDOW)
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._probing = False
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.retried = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.rejected = 0
+        self.breaker_opens = 0
+
+    def _count(self, counter, amount=1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    # ── breaker ───────────────────────────────────────────────────────
+
+    def _admit(self):
+        with self._lock:
+            self.calls += 1
+            if self._opened_at is not None:
+                cooling = time.monotonic() - self._opened_at < self.breaker_reset
+                if cooling or self._probing:
+                    self.rejected += 1
+                    raise CircuitOpen(f"{self.name}: circuit open after {self._consecutive_failures} failures")
+                self._probing = True  # half-open: this call is the trial
+
+    def _succeeded(self, latency):
+        with self._lock:
+            self.successes += 1
+            self._latencies.append(latency)
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def _failed(self, error):
+        with self._lock:
+            self.failures += 1
+            self._consecutive_failures += 1
+            if self._probing or self._consecutive_failures >= self.breaker_threshold:
+                if self._opened_at is None or self._probing:
+                    self.breaker_opens += 1
+                self._opened_at = time.monotonic()
+            self._probing = False
+        print(f"Model call {self.name} failed, falling back: {error!r}")
+
+    # ── timing ────────────────────────────────────────────────────────
+
+    def p95(self):
+        with self._lock:
+            if len(self._latencies) < _HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def hedge_delay(self, hedge):
+        """Seconds before a hedged request, or None when this call shouldn't hedge."""
+        if not (self.hedge and hedge):
+            return None
+        p95 = self.p95()
+        return None if p95 is None else max(p95, _HEDGE_MIN_DELAY)
+
+    def _backoff(self, attempt, deadline, error):
+        """Jittered delay before the next attempt, or None if the policy should stop."""
+        if attempt >= self.retries or not is_retryable(error):
+            return None
+        delay = random.uniform(0, min(_BACKOFF_CAP, _BACKOFF_BASE * 2 ** attempt))
+        if time.monotonic() + delay + _MIN_ATTEMPT_SECONDS >= deadline:
+            return None
+        print(f"Model call {self.name} attempt {attempt + 1} failed ({error!r}) — retrying in {delay:.1f}s")
+        self._count('retried')
+        return delay
+
+    # ── metrics ───────────────────────────────────────────────────────
+
+    @contextlib.contextmanager
+    def _recorded(self):
+        """The call's llm_metrics CallRecord (None without metrics), current
+        for the attempts and finished when the call returns or gives up."""
+        if self.metrics is None:
+            yield None
+            return
+        record, token = self.metrics.start(self.name)
+        outcome = 'failed'
+        try:
+            yield record
+            outcome = 'ok'
+        finally:
+            self.metrics.finish(record, token, outcome)
+
+    @staticmethod
+    def _note_failure(record, error, retrying):
+        if record is not None:
+            record.attempt_failed(error)
+            if retrying:
+                record.retries += 1
+
+    # ── threads ───────────────────────────────────────────────────────
+
+    def call(self, attempt_fn, hedge=True):
+        """attempt_fn(timeout)'s result within the budget. Raises CallFailed."""
+        self._admit()
+        with self._recorded() as record:
+            deadline = time.monotonic() + self.budget
+            attempt = 0
+            while True:
+                started = time.monotonic()
+                try:
+                    value = self._attempt(attempt_fn, deadline - started, self.hedge_delay(hedge), record)
+                except Exception as e:
+                    delay = self._backoff(attempt, deadline, e)
+                    self._note_failure(record, e, delay is not None)
+                    if delay is None:
+                        self._failed(e)
+                        raise CallFailed(f"{self.name}: {e}") from e
+                    time.sleep(delay)
+                    attempt += 1
+                    continue
+                self._succeeded(time.monotonic() - started)
+                return value
+
+    def _attempt(self, attempt_fn, timeout, hedge_delay, record=None):
+        if hedge_delay is None or hedge_delay >= timeout:
+            return attempt_fn(timeout)
+        # Pool threads run in a copy of this context, so attempts see the current CallRecord
+        first = _hedge_pool.submit(contextvars.copy_context().run, attempt_fn, timeout)
+        done, _ = concurrent.futures.wait([first], timeout=hedge_delay)
+        if done:
+            return first.result()
+        self._count('hedged')
+        if record is not None:
+            record.hedged = True
+        second = _hedge_pool.submit(contextvars.copy_context().run, attempt_fn, timeout - hedge_delay)
+        pending, error = {first, second}, None
+        while pending:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        self._count('hedge_wins')
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    # ── coroutines ────────────────────────────────────────────────────
+
+    async def acall(self, attempt_fn, hedge=True):
+        """call() for a coroutine function attempt_fn(timeout). The losing
+        hedge is cancelled rather than left to finish."""
+        self._admit()
+        with self._recorded() as record:
+            deadline = time.monotonic() + self.budget
+            attempt = 0
+            while True:
+                started = time.monotonic()
+                try:
+                    value = await self._aattempt(attempt_fn, deadline - started, self.hedge_delay(hedge), record)
+                except Exception as e:
+                    delay = self._backoff(attempt, deadline, e)
+                    self._note_failure(record, e, delay is not None)
+                    if delay is None:
+                        self._failed(e)
+                        raise CallFailed(f"{self.name}: {e}") from e
+                    await asyncio.sleep(delay)
+                    attempt += 1
+                    continue
+                self._succeeded(time.monotonic() - started)
+                return value
+
+    async def _aattempt(self, attempt_fn, timeout, hedge_delay, record=None):
+        if hedge_delay is None or hedge_delay >= timeout:
+            return await asyncio.wait_for(attempt_fn(timeout), timeout)
+        first = asyncio.ensure_future(attempt_fn(timeout))
+        done, _ = await asyncio.wait([first], timeout=hedge_delay)
+        if done:
+            return first.result()
+        self._count('hedged')
+        if record is not None:
+            record.hedged = True
+        second = asyncio.ensure_future(attempt_fn(timeout - hedge_delay))
+        pending, error = {first, second}, None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    raise AttemptTimeout(f"{self.name}: no reply within {timeout:.0f}s")
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self._count('hedge_wins')
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self):
+        p95 = self.p95()
+        with self._lock:
+            return {
+                'name': self.name,
+                'budget_seconds': self.budget,
+                'state': 'closed' if self._opened_at is None else 'open',
+                'calls': self.calls,
+                'successes': self.successes,
+                'failures': self.failures,
+                'retried': self.retried,
+                'hedged': self.hedged,
+                'hedge_wins': self.hedge_wins,
+                'rejected': self.rejected,
+                'breaker_opens': self.breaker_opens,
+                'p95_seconds': round(p95, 3) if p95 is not None else None,
+            }
+
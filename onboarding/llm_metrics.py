@@ -0,0 +1,312 @@
+"""Tokens, cost and latency for every model call.
+
+The app couldn't tell which calls dominate latency or the bill — it printed
+raw responses and nothing else. Each CallPolicy call now opens a CallRecord,
+and the attempts inside it report what happened:
+
+    LLMMetrics.start(policy)        opens the record for one logical call
+                                    (CallPolicy does this; a contextvar makes
+                                    it current for the attempts, hedges too)
+    LLMMetrics.attempt(prompt, model)
+        .first_token()              streamed attempts, on the first chunk
+        .done(usage)                tokens from the response's usage
+    LLMMetrics.continued()          a cut-off reply was resumed (json_repair)
+    LLMMetrics.repaired(repairs)    a malformed reply was repaired
+    LLMMetrics.finish(record, token, outcome)
+
+A finished record has the prompt, its PROMPT_VERSIONS version, the model,
+input/output/cache-read/cache-write tokens summed over every attempt (a
+retry or a losing hedge is billed too), the cost from MODEL_PRICES, time to
+first token and total latency measured from the start of the call (retries
+included; a non-streamed response arrives all at once, so its ttft is when
+it returned), attempts, retries, whether it hedged, how many attempts
+failed to parse, continuation requests, and the repairs made to the output.
+
+Records are aggregated per (prompt, model) into counters and histograms,
+served in the Prometheus text format by render(), and appended one JSON
+object per line to the ledger file when there is one. Aggregates are per
+worker process; the ledger is shared (each line is one small append).
+"""
+
+import contextvars
+import json
+import threading
+import time
+
+from prompts import PROMPT_VERSIONS
+
+# USD per million tokens, matched on the longest model-name prefix
+MODEL_PRICES = {
+    'claude-sonnet-4': {'input': 3.0, 'output': 15.0, 'cache_read': 0.30, 'cache_creation': 3.75},
+    'claude-haiku-4-5': {'input': 1.0, 'output': 5.0, 'cache_read': 0.10, 'cache_creation': 1.25},
+}
+
+TOKEN_KINDS = ('input', 'output', 'cache_read', 'cache_creation')
+# Token kind → the response usage field it's read from
+_USAGE_FIELDS = {
+    'input': 'input_tokens',
+    'output': 'output_tokens',
+    'cache_read': 'cache_read_input_tokens',
+    'cache_creation': 'cache_creation_input_tokens',
+}
+
+# Histogram bucket upper bounds
+SECONDS_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
+TOKEN_BUCKETS = (10, 50, 100, 250, 500, 1000, 2000, 4000, 8000)
+
+_current = contextvars.ContextVar('llm_call_record', default=None)
+
+
+def call_cost(model, tokens):
+    """Dollars for {kind: tokens} at model's prices (0 for an unpriced model)."""
+    prefix = max((p for p in MODEL_PRICES if (model or '').startswith(p)), key=len, default=None)
+    if prefix is None:
+        return 0.0
+    prices = MODEL_PRICES[prefix]
+    return sum(tokens[kind] * prices[kind] for kind in TOKEN_KINDS) / 1_000_000
+
+
+class CallRecord:
+    """One logical model call: every attempt, retry and hedge inside a CallPolicy call."""
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.prompt = None
+        self.model = None
+        self.started = time.monotonic()
+        self.tokens = dict.fromkeys(TOKEN_KINDS, 0)
+        self.ttft = None
+        self.latency = None
+        self.attempts = 0
+        self.retries = 0
+        self.hedged = False
+        self.parse_failures = 0
+        self.errors = 0
+        self.continuations = 0
+        self.repairs = []
+        self.outcome = None
+        self._lock = threading.Lock()
+
+    def attempt_failed(self, error):
+        """Count a failed attempt; ValueError means output that didn't parse."""
+        with self._lock:
+            if isinstance(error, ValueError):
+                self.parse_failures += 1
+            else:
+                self.errors += 1
+
+    def entry(self):
+        """The record as a ledger line's fields."""
+        return {
+            'ts': round(time.time(), 3),
+            'policy': self.policy,
+            'prompt': self.prompt or self.policy,
+            'prompt_version': PROMPT_VERSIONS.get(self.prompt),
+            'model': self.model,
+            'outcome': self.outcome,
+            **{f'{kind}_tokens': count for kind, count in self.tokens.items()},
+            'cost': round(call_cost(self.model, self.tokens), 6),
+            'ttft': round(self.ttft, 3) if self.ttft is not None else None,
+            'latency': round(self.latency, 3),
+            'attempts': self.attempts,
+            'retries': self.retries,
+            'hedged': self.hedged,
+            'parse_failures': self.parse_failures,
+            'errors': self.errors,
+            'continuations': self.continuations,
+            'repairs': self.repairs,
+        }
+
+
+class Attempt:
+    """One request to the model within the current CallRecord (no-op outside one)."""
+
+    def __init__(self, record):
+        self.record = record
+
+    def first_token(self):
+        record = self.record
+        if record is not None:
+            with record._lock:
+                if record.ttft is None:
+                    record.ttft = time.monotonic() - record.started
+
+    def done(self, usage):
+        record = self.record
+        if record is None:
+            return
+        self.first_token()
+        with record._lock:
+            for kind, field in _USAGE_FIELDS.items():
+                record.tokens[kind] += getattr(usage, field, None) or 0
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+
+class LLMMetrics:
+    """Per-(prompt, model) counters and histograms of finished calls, plus the
+    optional JSONL ledger. Thread-safe."""
+
+    # name → (buckets, help text)
+    HISTOGRAMS = {
+        'llm_call_latency_seconds': (SECONDS_BUCKETS, 'Seconds from the start of a call to its result or failure.'),
+        'llm_call_ttft_seconds': (SECONDS_BUCKETS, 'Seconds from the start of a call to its first output token.'),
+        'llm_call_input_tokens': (TOKEN_BUCKETS, 'Input tokens per call, cached ones included.'),
+        'llm_call_output_tokens': (TOKEN_BUCKETS, 'Output tokens per call.'),
+    }
+
+    def __init__(self, ledger_path=None):
+        self.ledger_path = ledger_path
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def start(self, policy):
+        """Open a CallRecord and make it current. Returns (record, reset token)."""
+        record = CallRecord(policy)
+        return record, _current.set(record)
+
+    def attempt(self, prompt, model):
+        record = _current.get()
+        if record is not None:
+            with record._lock:
+                record.attempts += 1
+                record.prompt = record.prompt or prompt
+                record.model = record.model or model
+        return Attempt(record)
+
+    def continued(self):
+        record = _current.get()
+        if record is not None:
+            with record._lock:
+                record.continuations += 1
+
+    def repaired(self, repairs):
+        record = _current.get()
+        if record is not None and repairs:
+            with record._lock:
+                record.repairs.extend(repairs)
+
+    def finish(self, record, reset_token, outcome):
+        """Close record with outcome ('ok' or 'failed'), aggregate it and write its ledger line."""
+        _current.reset(reset_token)
+        record.outcome = outcome
+        record.latency = time.monotonic() - record.started
+        entry = record.entry()
+        key = (entry['prompt'], entry['model'] or 'unknown')
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    'calls': {}, 'attempts': 0, 'retries': 0, 'hedged': 0, 'parse_failures': 0,
+                    'continuations': 0, 'repaired': 0, 'repairs': {},
+                    'tokens': dict.fromkeys(TOKEN_KINDS, 0), 'cost': 0.0,
+                    'histograms': {name: _Histogram(buckets) for name, (buckets, _) in self.HISTOGRAMS.items()},
+                }
+            series['calls'][outcome] = series['calls'].get(outcome, 0) + 1
+            for counter in ('attempts', 'retries', 'parse_failures', 'continuations'):
+                series[counter] += entry[counter]
+            series['hedged'] += int(record.hedged)
+            series['repaired'] += int(bool(record.repairs))
+            for kind in record.repairs:
+                series['repairs'][kind] = series['repairs'].get(kind, 0) + 1
+            for kind in TOKEN_KINDS:
+                series['tokens'][kind] += record.tokens[kind]
+            series['cost'] += call_cost(record.model, record.tokens)
+            histograms = series['histograms']
+            histograms['llm_call_latency_seconds'].observe(record.latency)
+            if record.ttft is not None:
+                histograms['llm_call_ttft_seconds'].observe(record.ttft)
+            if record.attempts:
+                histograms['llm_call_input_tokens'].observe(
+                    record.tokens['input'] + record.tokens['cache_read'] + record.tokens['cache_creation'])
+                histograms['llm_call_output_tokens'].observe(record.tokens['output'])
+        if self.ledger_path:
+            self._append(entry)
+        return entry
+
+    def _append(self, entry):
+        try:
+            with open(self.ledger_path, 'a') as f:
+                f.write(json.dumps(entry) + '\n')
+        except OSError as e:
+            print(f"LLM ledger write failed: {e}")
+
+    def summary(self):
+        """{prompt: {model, calls, cost, mean latency, tokens, output fixes}} for /llm-stats."""
+        with self._lock:
+            return {
+                prompt: {
+                    'model': model,
+                    'calls': dict(series['calls']),
+                    'cost': round(series['cost'], 4),
+                    'mean_latency_seconds': round(
+                        series['histograms']['llm_call_latency_seconds'].sum
+                        / series['histograms']['llm_call_latency_seconds'].count, 3),
+                    'tokens': dict(series['tokens']),
+                    'parse_failures': series['parse_failures'],
+                    'continuations': series['continuations'],
+                    'repaired': series['repaired'],
+                }
+                for (prompt, model), series in self._series.items()
+            }
+
+    def render(self):
+        """Every series in the Prometheus text exposition format."""
+        with self._lock:
+            series = sorted(self._series.items())
+            lines = []
+
+            def metric(name, kind, help_text, samples):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.extend(samples)
+
+            def labels(prompt, model, **extra):
+                pairs = [('prompt', prompt), ('model', model)] + list(extra.items())
+                return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+
+            metric('llm_calls_total', 'counter', 'Model calls by outcome.', [
+                f"llm_calls_total{labels(p, m, outcome=outcome)} {count}"
+                for (p, m), s in series for outcome, count in sorted(s['calls'].items())])
+            for counter, help_text in (
+                    ('attempts', 'Requests sent to the model, retries and hedges included.'),
+                    ('retries', 'Attempts retried after a failure.'),
+                    ('hedged', 'Calls that sent a hedged second request.'),
+                    ('parse_failures', 'Attempts whose output failed to parse.'),
+                    ('continuations', 'Requests resuming a reply cut off at max_tokens.'),
+                    ('repaired', 'Calls whose output needed repairs to parse.')):
+                metric(f'llm_{counter}_total', 'counter', help_text, [
+                    f"llm_{counter}_total{labels(p, m)} {s[counter]}" for (p, m), s in series])
+            metric('llm_tokens_total', 'counter', 'Tokens by kind (cache reads and writes are input tokens).', [
+                f"llm_tokens_total{labels(p, m, kind=kind)} {s['tokens'][kind]}"
+                for (p, m), s in series for kind in TOKEN_KINDS])
+            metric('llm_repairs_total', 'counter', 'Repairs made to model output, by kind.', [
+                f"llm_repairs_total{labels(p, m, kind=kind)} {count}"
+                for (p, m), s in series for kind, count in sorted(s['repairs'].items())])
+            metric('llm_cost_dollars_total', 'counter', 'Estimated spend from MODEL_PRICES.', [
+                f"llm_cost_dollars_total{labels(p, m)} {s['cost']:.6f}" for (p, m), s in series])
+
+            for name, (_, help_text) in self.HISTOGRAMS.items():
+                samples = []
+                for (p, m), s in series:
+                    histogram = s['histograms'][name]
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        samples.append(f"{name}_bucket{labels(p, m, le=bound)} {count}")
+                    samples.append(f"{name}_bucket{labels(p, m, le='+Inf')} {histogram.count}")
+                    samples.append(f"{name}_sum{labels(p, m)} {histogram.sum:.6f}")
+                    samples.append(f"{name}_count{labels(p, m)} {histogram.count}")
+                metric(name, 'histogram', help_text, samples)
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,808 @@
+"""Prompt assembly for the config-generation calls, laid out for prompt caching.
+
+Almost all of the analyze_business prompt — color rules, view rules, pipeline
+stages, the component registry, industry templates, examples — is the same on
+every request, and so is each beauty_body template. Anthropic prompt caching
+reuses the processed prefix of a request up to a block marked with
+cache_control, so the static text lives in system blocks and the per-request
+details (description, business type) go last, in the user message:
+
+    analyze_business:       system [rules ⟨cache⟩]                 user [description]
+    analyze_with_template:  system [rules, template JSON ⟨cache⟩]  user [description, type]
+    chat:                   system [chat rules ⟨cache⟩]            user [summary ⟨cache⟩], recent turns
+
+Templates are fixed dicts, so each type's prefix is byte-for-byte stable and
+gets its own cache entry. Prefixes shorter than the model's minimum cacheable
+length (1024 tokens for Sonnet) are silently not cached; the usage counters
+show that as calls with neither cache reads nor cache writes.
+
+analyze_business answers in config_dsl's compact line format rather than
+config JSON — output tokens, not the cached input, set the call's latency.
+
+PROMPT_CACHE_STATS counts cache reads and writes from each response's usage,
+per prompt, for /cache-stats.
+
+PROMPT_VERSIONS is part of every response_cache key — bump a prompt's version
+when its wording changes so responses to the old wording stop matching. The
+version is also recorded with each call in llm_metrics' ledger.
+"""
+
+import json
+import re
+import threading
+
+from conversation import compact_chat
+from website_copy import NAME_PLACEHOLDER
+
+CONFIG_MODEL = "claude-sonnet-4-20250514"
+# Chat, input check and website copy — ~10x cheaper than Sonnet
+FAST_MODEL = "claude-haiku-4-5-20251001"
+
+CACHE_CONTROL = {'type': 'ephemeral'}
+
+PROMPT_VERSIONS = {
+    'analyze_business': 2,
+    'analyze_with_template': 1,
+    'website_copy': 1,
+    'check_input': 1,
+    'chat': 1,
+}
+
+
+def _cached_block(text):
+    return {'type': 'text', 'text': text, 'cache_control': CACHE_CONTROL}
+
+
+# ============================================================
+# analyze_business
+# ============================================================
+
+ANALYZE_BUSINESS_SYSTEM = """Analyze a business and create a custom dashboard configuration. The business description is in the user message.
+
+LANGUAGE: The description may be in any language. Extract the business_name in the user's original language. All tab labels and component labels should be in English (the dashboard UI is English).
+
+## OUTPUT FORMAT
+
+Return ONLY the config in this compact line format (no JSON, no markdown, no code blocks):
+
+name: <extracted or generated business name>
+type: <one of: barber, barbershop, salon, hair_salon, nail_salon, lash_brow, makeup_artist, med_spa, landscaping, restaurant, cafe, retail, fitness, auto, cleaning, photography, tutoring, pet_grooming, dental, construction, real_estate, freelancer, martial_arts, legal, professional, accounting, consulting, medical, veterinary, plumbing, electrical, catering, event_planning, hotel, spa, bakery, florist, daycare, moving, pest_control, hvac, roofing, tattoo, music_studio, dance_studio, yoga, crossfit, coworking, property_management, insurance, recruiting, other>
+colors: <sidebar_bg> <sidebar_icons> <sidebar_buttons> <sidebar_text> <background> <buttons> <cards> <text> <headings> <borders>
+tab: <tab label> | <icon>
+<component id> | <label> | <view code> | <stage>, <stage>, ...
+... more tab lines, each followed by its component lines ...
+summary: <one sentence describing what was configured>
+
+- colors: exactly 10 hex values without "#", in the order shown
+- tab lines come in display order; each tab's components follow on their own lines
+- component lines: id from the COMPONENT REGISTRY | label (leave empty to use the standard name) | view code | pipeline stages (pipeline only, comma-separated)
+- view codes: p = pipeline, c = calendar, k = cards, l = list, t = table, r = route
+- every component line MUST have a view code; trailing empty fields can be left off
+
+Example:
+name: Tony's Cuts
+type: barbershop
+colors: 1A1A2E A0AEC0 3B82F6 E2E8F0 F5F5F5 3B82F6 FFFFFF 1A1A1A 111827 E5E7EB
+tab: Dashboard | home
+tab: Clients | people
+clients | Clients | p | New Client, Regular, VIP, Ambassador
+tab: Schedule | calendar
+calendar | Schedule | c
+summary: Solo barber setup with a client journey, one schedule and payments.
+
+## COLOR GENERATION RULES
+
+Generate a cohesive color palette that matches the business personality. The sidebar_bg is the dominant brand color.
+
+**Industry color guidance:**
+- Barber/tattoo/auto: Dark & bold — sidebar_bg: #1A1A2E or #0F172A, buttons: electric blue/red
+- Salon/spa/yoga: Soft & elegant — sidebar_bg: #2D2B3D or #1E293B, buttons: rose/purple/teal
+- Medical/dental: Clean & trustworthy — sidebar_bg: #1E3A5F or #0F4C81, buttons: #3B82F6 blue
+- Landscaping/garden: Natural & earthy — sidebar_bg: #1B4332 or #14532D, buttons: #22C55E green
+- Restaurant/bakery/cafe: Warm & inviting — sidebar_bg: #3C1518 or #1C1917, buttons: #F59E0B amber
+- Construction/electrical/plumbing: Industrial & sturdy — sidebar_bg: #1E293B or #0C1222, buttons: #F59E0B or #EF4444
+- Legal/accounting/consulting: Professional & refined — sidebar_bg: #1E293B or #0F172A, buttons: #6366F1 indigo
+- Fitness/martial arts/crossfit: Energetic & bold — sidebar_bg: #0F172A or #1A1A2E, buttons: #EF4444 red or #F97316 orange
+- Photography/creative: Modern & minimal — sidebar_bg: #18181B or #1C1917, buttons: #8B5CF6 purple
+- Real estate: Sophisticated — sidebar_bg: #1E293B, buttons: #0EA5E9 sky blue
+- Retail: Inviting & commercial — sidebar_bg: #1E1B4B or #0F172A, buttons: #8B5CF6 or #EC4899
+- Pet/vet: Friendly & warm — sidebar_bg: #1E3A3A or #164E63, buttons: #14B8A6 teal
+- Events/catering: Celebratory — sidebar_bg: #2D1B4E or #1E1B4B, buttons: #A855F7 purple or #EC4899 pink
+- Moving/cleaning: Dependable — sidebar_bg: #1E293B, buttons: #3B82F6 blue
+- Education/tutoring/dance: Inspiring — sidebar_bg: #1E293B or #1B2E4B, buttons: #6366F1 indigo
+- Property management: Professional — sidebar_bg: #1E293B, buttons: #0EA5E9
+
+**Rules:**
+- NEVER use #ce0707, #DC2626, or #EF4444 as the buttons color — these are generic defaults. Each business MUST get a unique, industry-appropriate accent color from the guidance above.
+- sidebar_bg should ALWAYS be dark (near-black with a color tint)
+- sidebar_text should ALWAYS be light (#E2E8F0 or #F1F5F9)
+- sidebar_icons should be muted light (#A0AEC0 or #94A3B8)
+- background should be light gray (#F5F5F5 or #F8FAFC)
+- cards should be white (#FFFFFF)
+- text should be dark (#1A1A1A or #111827)
+- buttons should be the ONE accent color that defines the brand — pick from the industry guidance above, do NOT default to red
+- sidebar_buttons should match or complement the buttons color
+
+## VIEW ASSIGNMENT RULES
+
+Every component line MUST have a view code. Use these defaults:
+- **pipeline**: clients, leads, jobs, workflows, cases, tickets, waivers, memberships (when tracking status flow). Clients should ALWAYS default to pipeline — every business has a client journey (new → active → loyal, belt stages, rewards tiers, etc.). Use "contacts" component with "list" view for the general address book. Memberships pipeline: stages = plan names (e.g. Basic, Premium, VIP), cards = members.
+- **calendar**: calendar, appointments, schedules, shifts, classes, reservations, social_media
+- **cards**: staff, equipment, fleet, tables, rooms, menus, recipes, courses, packages, venues, portfolios, galleries, listings, images, reviews
+- **list**: contacts, todos, messages, notes, announcements, checklists, knowledge, community, chat_widget
+- **route**: routes (map view with territory polygons and stop lists — only for field service businesses like landscaping, plumbing, cleaning, pest control, delivery)
+- **table**: everything else (products, inventory, invoices, payments, expenses, payroll, estimates, vendors, assets, contracts, documents, uploads, forms, signatures, orders, attendance, inspections, permits, prescriptions, treatments, properties, guests, campaigns, loyalty, surveys, subscriptions, time_tracking, reputation, portal)
+
+## PIPELINE STAGES
+
+When a component uses the pipeline view (p), also list 3-6 industry-specific stage names in its stages field.
+
+**clients pipeline stages by industry (REQUIRED — every clients component must have stages):**
+- Martial arts: ["White Belt", "Yellow Belt", "Orange Belt", "Green Belt", "Blue Belt", "Brown Belt", "Black Belt"]
+- Salon/spa: ["New Client", "Regular", "VIP", "Ambassador"]
+- Fitness/gym: ["Trial", "New Member", "Active", "Loyal", "Champion"]
+- Retail: ["First Purchase", "Returning", "Regular", "Gold Member", "VIP"]
+- Restaurant/cafe: ["First Visit", "Returning", "Regular", "Loyalty Member"]
+- Real estate: ["Prospect", "Showing", "Offer", "Under Contract", "Closed"]
+- Medical/dental: ["New Patient", "Active", "Ongoing Care", "Recall"]
+- Contractor/landscaping: ["Estimate", "Scheduled", "In Progress", "Complete", "Recurring"]
+- Legal/accounting: ["Prospect", "Onboarding", "Active Client", "Retainer"]
+- Pet grooming/vet: ["New Pet", "Regular", "Frequent", "Premium"]
+- Photography: ["Inquiry", "Booked", "Shoot Complete", "Delivered"]
+- Education/tutoring: ["Enrolled", "In Progress", "Advanced", "Graduated"]
+- General: ["New", "Active", "Loyal", "VIP"]
+
+**leads stages by industry:**
+- General: ["New", "Contacted", "Qualified", "Proposal", "Won"]
+- Contractor: ["Inquiry", "Estimate Sent", "Approved", "Scheduled", "Complete"]
+- Salon/fitness: ["Inquiry", "Consulted", "Trial", "Member"]
+- Real estate: ["New Lead", "Showing", "Offer", "Under Contract", "Closed"]
+
+**jobs/work orders stages:**
+- General: ["New", "In Progress", "Review", "Complete", "Invoiced"]
+- Contractor: ["Estimated", "Approved", "Scheduled", "In Progress", "Complete", "Invoiced"]
+
+**cases stages:**
+- Legal: ["Filed", "Discovery", "Negotiation", "Trial", "Closed"]
+- Recruiting: ["Sourced", "Screening", "Interview", "Offer", "Placed"]
+
+**tickets stages:**
+- General: ["New", "In Progress", "Waiting", "Resolved"]
+
+**waivers stages:**
+- General: ["Draft", "Sent", "Viewed", "Signed"]
+
+Example component lines with pipeline:
+clients | Students | p | White Belt, Yellow Belt, Green Belt, Blue Belt, Brown Belt, Black Belt
+leads | Prospects | p | Inquiry, Consulted, Trial, Member
+
+## COMPONENT REGISTRY (68 components available)
+
+**People - Managing contacts and relationships:**
+- clients: Client pipeline — tracks client journey through stages (belt ranks, loyalty tiers, sales stages). Use this for your PRIMARY customer/member/student/patient list.
+- contacts: Contact directory — every name, phone number, and email in your CRM. Use this as the general address book alongside the clients pipeline.
+- leads: Leads pipeline, prospect tracking, conversion funnel
+- staff: Staff cards, employee management, roles
+- vendors: Vendor list, supplier contacts, ordering
+- guests: Guest list with RSVP status, party size, dietary preferences
+
+**Things - Physical items and inventory:**
+- products: Product catalog with SKU, stock levels, pricing
+- inventory: Stock tracking, low stock alerts, reorder points
+- equipment: Equipment list, maintenance tracking, assignments
+- assets: Asset management, depreciation, location tracking
+- listings: Property listings with address, price, bedrooms, status
+- properties: Rental property management, tenants, leases
+- venues: Venue management with capacity, address, amenities
+
+**Time - Scheduling and calendar:**
+- calendar: Calendar view (day/week/month), event management
+- appointments: Appointment booking, availability, confirmations
+- schedules: Schedule grid, recurring events, team schedules
+- shifts: Shift scheduler, staff assignments, coverage
+- time_tracking: Employee hours, billable time, project tracking
+
+**Money - Financial management:**
+- invoices: Invoice creation, tracking, payment status
+- payments: Payment processing, transaction history
+- expenses: Expense logging, categories, receipts
+- payroll: Payroll management, pay periods, deductions
+- estimates: Quotes, proposals, estimate-to-invoice conversion
+- packages: Service menu — bookable services customers see during booking. Each service has a name, price, and duration
+- subscriptions: Recurring subscription management, billing cycles
+
+**Tasks - Work management:**
+- todos: Task checklists, due dates, priorities
+- jobs: Job cards, work orders, job tracking
+- projects: Project boards, milestones, team assignments
+- workflows: Workflow automation, process templates
+- cases: Legal case management, case tracking, court dates
+- checklists: Task checklists with completion tracking, assignees
+
+**Communication - Messaging and notes:**
+- messages: Message inbox, client communication
+- notes: Notes editor, internal memos
+- announcements: Announcement feed, team updates
+- reviews: Review management, reputation tracking
+- campaigns: Marketing campaigns (email/social/ad), reach, conversions
+- loyalty: Loyalty programs, points, tiers, rewards
+- surveys: Customer surveys, responses, completion rates
+- tickets: Support tickets with priority, status, assignee
+- knowledge: FAQ articles, help docs, categories
+- community: Member forum, discussions, events
+- chat_widget: Website live chat, lead capture, auto-responses
+- social_media: Social media scheduling, content calendar, analytics
+- reputation: Review aggregation from Google, Yelp, Facebook
+
+**Files - Document management:**
+- documents: File manager, folders, sharing
+- contracts: Contract management, signatures, renewals
+- images: Image gallery, before/after photos
+- uploads: Upload manager, file attachments
+- portfolios: Portfolio showcase, case studies, project gallery
+- galleries: Photo galleries with client access, proofing
+
+**Signing & Compliance:**
+- waivers: Waiver templates, digital signatures, print copies, expiry tracking
+- forms: Custom forms, intake forms, questionnaires, submissions
+- signatures: E-signature tracking, signed documents, countersigning
+
+**Hospitality & Food:**
+- reservations: Table/room/resource reservations with date/time
+- tables: Restaurant table status (open/occupied/reserved), capacity
+- menus: Menu items, categories, pricing, dietary flags
+- orders: Order management, customer, items, total, status
+- rooms: Room management for hotels/spas/studios, hourly rates
+- recipes: Recipe management, ingredients, portions, cost, prep time
+
+**Education & Programs:**
+- classes: Class schedules, enrollment, instructors, capacity
+- membership_plans: Plan management — name, price, description, features, interval. Use cards view. Always paired with `memberships` as sub-tabs.
+- memberships: Members pipeline — stages ARE the plans (e.g. Basic, Premium, VIP), cards ARE the members. Move member = change plan. Use pipeline view. Always paired with `membership_plans` in a "Memberships" tab.
+- courses: Course catalog, modules, duration, progress
+- attendance: Check-in logs, participation tracking
+
+**Field Service:**
+- inspections: Inspection checklists, inspector, pass/fail results
+- routes: Service routes, stops, driver, vehicle, ETAs
+- fleet: Vehicle fleet, make/model, mileage, next service
+- permits: Building/work permits, authority, status, expiry
+
+**Health & Medical:**
+- prescriptions: Medication prescriptions, dosage, frequency, refills
+- treatments: Treatment plans, provider, follow-up care
+
+**Digital & Online:**
+- client_portal: Client-facing portal for schedule, billing, progress, documents, account
+
+## AVAILABLE ICONS
+
+home, people, box, clock, dollar, check, chat, folder, briefcase, star, tool, calendar, mail, file, target, truck, users, grid, calculator, wallet, edit, megaphone, image, upload, layout, clipboard, archive, rotate, settings, chart, zap, heart, shield, globe, package, book, shopping-cart, map
+
+## INDUSTRY TEMPLATES (use as starting points, customize based on details)
+
+**Barber/Salon:**
+- Dashboard: (empty — platform-managed)
+- Clients: clients (Clients, view: pipeline, stages: ["New Client", "Regular", "VIP", "Ambassador"]), loyalty (Rewards)
+- Schedule: calendar (Schedule, view: calendar)
+- Services: packages (Service Menu, view: cards)
+- Staff: staff (Barbers/Stylists), shifts (Shifts, view: table) [if multiple staff]
+- Payments: payments (Payments), invoices (Receipts)
+
+**Landscaping:**
+- Dashboard: (empty — platform-managed)
+- Customers: clients (Customers, view: pipeline, stages: ["Estimate", "Scheduled", "In Progress", "Complete", "Recurring"]), leads (Leads)
+- Jobs: calendar (Schedule, view: calendar), jobs (Jobs), estimates (Estimates), routes (Routes)
+- Crew: staff (Crew), shifts (Assignments, view: table), equipment (Equipment), fleet (Vehicles)
+- Billing: invoices (Invoices), payments (Payments), expenses (Expenses)
+
+**Restaurant/Cafe:**
+- Dashboard: (empty — platform-managed)
+- Reservations: calendar (Schedule, view: calendar), tables (Table Layout), waitlist (Waitlist)
+- Menu: menus (Menu Items), recipes (Recipes), inventory (Inventory)
+- Orders: orders (Online Orders), loyalty (Loyalty Program)
+- Team: staff (Staff, view: cards), shifts (Shifts, view: table), tip_pools (Tips)
+- Finances: payments (Sales), invoices (Invoices), expenses (Expenses), suppliers (Suppliers)
+
+**Martial Arts Studio:**
+- Dashboard: (empty — platform-managed)
+- Students: clients (Students, view: pipeline, stages: use belt stages user provides e.g. ["White Belt", "Yellow Belt", "Orange Belt", "Green Belt", "Blue Belt", "Brown Belt", "Black Belt"]), contacts (Families, view: list)
+- Schedule: calendar (Schedule, view: calendar)
+- Memberships: membership_plans (Plans, view: cards), memberships (Members, view: pipeline, stages: ["Basic", "Advanced", "Elite", "Cancelled"])
+- Programs: classes (Class Types, view: cards), waivers (Waivers, view: pipeline), client_portal (Client Portal)
+- Team: staff (Instructors), shifts (Staff Shifts, view: table)
+- Billing: payments (Payments), invoices (Invoices)
+
+**Fitness Studio/Gym:**
+- Dashboard: (empty — platform-managed)
+- Members: clients (Members, view: pipeline, stages: ["Trial", "New Member", "Active", "Loyal", "Champion"]), leads (Prospects)
+- Memberships: membership_plans (Plans, view: cards), memberships (Members, view: pipeline, stages: ["Day Pass", "Basic", "Premium", "VIP", "Cancelled"])
+- Schedule: calendar (Schedule, view: calendar)
+- Programs: classes (Class Types, view: cards), waivers (Waivers), client_portal (Client Portal)
+- Team: staff (Trainers), shifts (Staff Schedule, view: table)
+- Billing: payments (Payments), invoices (Invoices)
+
+**Real Estate:**
+- Dashboard: (empty — platform-managed)
+- Leads: leads (Leads), clients (Clients)
+- Properties: listings (Listings), properties (Properties), images (Photos)
+- Pipeline: jobs (Deals), todos (Tasks)
+- Documents: documents (Documents), contracts (Contracts), signatures (Signatures)
+
+**Freelancer/Consultant:**
+- Dashboard: (empty — platform-managed)
+- Clients: clients (Clients), leads (Prospects), client_portal (Client Portal)
+- Projects: projects (Projects), time_tracking (Time Tracking)
+- Billing: invoices (Invoices), payments (Payments), estimates (Quotes)
+- Files: documents (Documents), contracts (Contracts)
+
+**Retail Store:**
+- Dashboard: (empty — platform-managed)
+- Products: products (Products), inventory (Inventory), orders (Orders)
+- Customers: clients (Customers, view: pipeline, stages: ["First Purchase", "Returning", "Regular", "Gold Member", "VIP"]), leads (Leads), loyalty (Loyalty Program)
+- Sales: invoices (Invoices), payments (Payments)
+- Staff: staff (Staff), shifts (Shifts)
+
+**Auto Shop:**
+- Dashboard: (empty — platform-managed)
+- Customers: clients (Customers)
+- Schedule: calendar (Schedule, view: calendar), jobs (Work Orders)
+- Parts: inventory (Parts), products (Products), inspections (Inspections)
+- Billing: invoices (Invoices), payments (Payments), estimates (Estimates)
+
+**Cleaning Service:**
+- Dashboard: (empty — platform-managed)
+- Clients: clients (Clients), leads (Leads)
+- Jobs: jobs (Jobs), routes (Routes), checklists (Checklists)
+- Team: staff (Cleaners), shifts (Assignments), fleet (Vehicles)
+- Billing: invoices (Invoices), payments (Payments), subscriptions (Subscriptions)
+
+**Photography/Creative:**
+- Dashboard: (empty — platform-managed)
+- Clients: clients (Clients), leads (Inquiries)
+- Schedule: calendar (Schedule, view: calendar)
+- Gallery: galleries (Client Galleries), portfolios (Portfolio), images (Photos)
+- Business: invoices (Invoices), contracts (Contracts), payments (Payments)
+
+**Tutoring/Education:**
+- Dashboard: (empty — platform-managed)
+- Students: clients (Students), leads (Inquiries), attendance (Attendance), client_portal (Student Portal)
+- Schedule: calendar (Schedule, view: calendar)
+- Materials: documents (Curriculum), notes (Session Notes), courses (Courses)
+- Memberships: membership_plans (Plans, view: cards), memberships (Enrolled Students, view: pipeline, stages: ["Trial", "Monthly", "Semester", "Annual", "Cancelled"])
+- Billing: invoices (Invoices), payments (Payments)
+
+**Pet Grooming/Veterinary:**
+- Dashboard: (empty — platform-managed)
+- Clients: clients (Pet Parents), notes (Pet Profiles)
+- Schedule: calendar (Schedule, view: calendar)
+- Medical: treatments (Treatments), prescriptions (Prescriptions) [vet only]
+- Team: staff (Groomers/Vets), shifts (Schedule, view: table)
+- Payments: payments (Payments), invoices (Receipts)
+
+**Dental/Medical:**
+- Dashboard: (empty — platform-managed)
+- Patients: clients (Patients), forms (Intake Forms), client_portal (Patient Portal)
+- Schedule: calendar (Schedule, view: calendar)
+- Clinical: treatments (Treatment Plans), prescriptions (Prescriptions), notes (Notes)
+- Records: documents (Records), waivers (Consent Forms), signatures (Signatures)
+- Billing: invoices (Invoices), payments (Payments)
+- Staff: staff (Staff), shifts (Schedule, view: table)
+
+**Construction/Electrical/Plumbing:**
+- Dashboard: (empty — platform-managed)
+- Clients: clients (Clients), leads (Leads)
+- Projects: jobs (Work Orders), schedules (Timeline), estimates (Estimates)
+- Resources: staff (Crew), equipment (Equipment), fleet (Vehicles), inventory (Materials)
+- Compliance: inspections (Inspections), permits (Permits), checklists (Safety Checklists)
+- Billing: invoices (Invoices), payments (Payments), expenses (Expenses)
+
+**Event Planning/Catering:**
+- Dashboard: (empty — platform-managed)
+- Clients: clients (Clients), leads (Inquiries), guests (Guest Lists)
+- Events: calendar (Schedule, view: calendar), venues (Venues)
+- Vendors: vendors (Vendors), menus (Menus) [catering]
+- Business: invoices (Invoices), payments (Payments), contracts (Contracts)
+
+**Legal/Accounting:**
+- Dashboard: (empty — platform-managed)
+- Clients: clients (Clients), leads (Prospects), client_portal (Client Portal)
+- Cases: cases (Cases), documents (Documents), contracts (Contracts)
+- Work: time_tracking (Time Tracking), todos (Tasks)
+- Billing: invoices (Invoices), payments (Payments), estimates (Proposals)
+
+**Hotel/Spa:**
+- Dashboard: (empty — platform-managed)
+- Guests: clients (Guests), reservations (Reservations, view: table), client_portal (Guest Portal)
+- Schedule: calendar (Schedule, view: calendar), rooms (Rooms)
+- Services: treatments (Treatments), packages (Packages)
+- Staff: staff (Staff), shifts (Shifts, view: table)
+- Billing: invoices (Invoices), payments (Payments)
+
+## RULES FOR GOOD CONFIGS
+
+1. **ONE universal calendar — NO redundant sub-tabs.** The calendar component has built-in filter chips (All | Appointments | Classes | Shifts) and a view toggle (calendar/list). It already shows ALL time-based events with color coding (Appointment=blue, Class=purple, Shift=green).
+   Do NOT add appointments, classes, shifts, schedules, or reservations as sub-components on the same tab as a calendar — they are REDUNDANT because the calendar already displays them via filter chips.
+   Non-time entities (rooms, tables, equipment, venues, jobs) are fine alongside the calendar.
+   The ONLY component that should have view: "calendar" is the "calendar" component itself.
+   If you need a class-type catalog or shift management, put them on a SEPARATE tab (e.g., Programs for class types, Team for shifts).
+   Example for a fitness Schedule tab — just the calendar, nothing else:
+   - calendar | Schedule | c
+2. **ALWAYS start with a Dashboard tab** but with NO component lines. Dashboard is platform-managed and will be populated by the system. The AI should include the Dashboard tab entry (for nav) but with no components.
+3. **Use 3-5 user tabs** (plus Dashboard = 4-6 total) - small businesses need simplicity
+4. **Each tab should have 1-4 components** - don't overwhelm
+5. **Use industry-appropriate labels:**
+   - Barber: "Clients" not "Customers"
+   - Restaurant: "Guests" or "Reservations" not "Clients"
+   - Fitness: "Members" not "Clients"
+   - Medical: "Patients" not "Clients"
+   - Construction: "Projects" not "Jobs"
+6. **Solo operators don't need Staff tabs** - only add if they mention employees/team
+7. **Match complexity to business size (tab counts EXCLUDE Dashboard):**
+   - Solo: 3 tabs + Dashboard = 4 total, 4-6 components
+   - Small team (2-5): 4 tabs + Dashboard = 5 total, 6-10 components
+   - Larger team: 5-6 tabs + Dashboard = 6-7 total, 8-14 components
+8. **Group logically by workflow, not by component category**
+9. **Use industry-specific components when relevant:**
+   - Restaurant/cafe: reservations, tables, menus, orders, recipes
+   - Fitness/martial arts: classes, memberships, waivers, attendance
+   - Medical/dental: treatments, prescriptions, forms (intake)
+   - Construction/electrical/plumbing: inspections, permits, fleet, checklists
+   - Real estate: listings, properties
+   - Photography/creative: galleries, portfolios
+   - Events/catering: venues, guests, menus
+   - Legal: cases, time_tracking
+   - Salon/barber: loyalty, packages, galleries (showcase cuts/styles)
+   - Nail tech/lash/brows: galleries (showcase work)
+   - Tattoo artist: portfolios or galleries (showcase art)
+   - Landscaping/cleaning/detailing: galleries (before/after photos)
+   - Restaurant/bakery/food truck: galleries (food photos)
+   - Florist/wedding planner: galleries (arrangements/events)
+   - Interior design/architecture: portfolios (project showcase)
+   - Service businesses with vehicles: fleet, routes
+10. **Waivers are important for physical activities** - martial arts, fitness, sports, adventure
+11. **ALWAYS prefer industry-specific components over generic ones:**
+    - Restaurant with food = MUST use menus, recipes (not just products)
+    - Hotel with spa = MUST use rooms, treatments (not just appointments)
+    - Moving company = MUST use fleet, routes, checklists (not just jobs)
+    - Catering = MUST use menus, recipes, guests (not just products, clients)
+    - Property mgmt = MUST use properties, inspections (not just clients, tickets)
+    - Recruiting = MUST use cases for placements, time_tracking for billing
+    - Tattoo/piercing = MUST use waivers, portfolios or galleries
+    - Nail tech/lash/brows/salon/barber = MUST use galleries (to showcase work on website)
+    - Landscaping/cleaning/auto detailing = MUST use galleries (before/after photos)
+    - Restaurant/bakery/food truck = MUST use galleries (food photos)
+    - Florist/wedding/event planner = MUST use galleries (arrangements/events)
+    - Interior design/architecture = MUST use portfolios (project showcase)
+    - Any business that showcases visual work = MUST use galleries or portfolios (connects to website gallery widget automatically)
+    - Any business with vehicles/trucks = MUST use fleet
+    - Any business with food/cooking = MUST use recipes
+    - Any business with class schedules = MUST use classes (not just appointments)
+12. **Pipeline stages MUST reflect what the user describes:**
+    - If user mentions belt stages (white, yellow, orange, green, blue, brown, black) → use THOSE as stages, not generic CRM stages
+    - If user mentions tiers (Bronze, Silver, Gold) → use those
+    - If user describes their own process → use their words
+    - The system auto-colors stages based on color words in the name (e.g. "White Belt" → white, "Gold Plan" → gold, "Black Belt" → black)
+    - Generic CRM stages (New, Active, Loyal, VIP) are ONLY for businesses with no specific progression described
+    - ALWAYS include the stages on pipeline components: clients | Students | p | White Belt, Yellow Belt, Orange Belt, Green Belt, Blue Belt, Brown Belt, Black Belt
+13. **Membership program uses TWO sub-tabs in its own "Memberships" tab:**
+    - `membership_plans` (label: "Plans", view: cards) — create/manage plans with name, price, description, features
+    - `memberships` (label: "Members", view: pipeline) — stages = plan names, cards = members
+    - ALWAYS give memberships its own tab labeled "Memberships" — never nest inside another tab.
+    - Any business with recurring memberships (fitness, martial arts, salon, spa, tutoring, yoga, dance) should use this.
+    - Example:
+      membership_plans | Plans | k
+      memberships | Members | p | Basic, Premium, VIP, Cancelled
+14. **Kids/family businesses need Families, not Prospects:**
+    - Kids martial arts, daycare, tutoring, dance → use contacts as "Families" or "Parents & Guardians" (view: list)
+    - Do NOT add leads/prospects pipeline for businesses that primarily serve families with children
+    - The parent/guardian is the one paying, signing waivers, and communicating — so family contact info is essential
+    - Only add leads/prospects if the user specifically mentions needing a sales pipeline
+15. **Client Portal sub-tab for client-facing businesses:**
+    - Studios (martial arts, dance, yoga, fitness, boxing, music) → add `client_portal` sub-tab in the Programs tab
+    - Professional services (legal, accounting, consulting, medical, dental, spa) → add `client_portal` sub-tab in the Clients tab
+    - DO NOT add portal for: restaurants, cafes, retail, food trucks, bars (no repeat-client portal needed)
+    - The portal lets clients view their schedule, billing, progress, documents, and account
+    - Example: client_portal | Client Portal | r
+16. **Programs tab should default to pipeline view:**
+    - Programs represent client journeys (belt progression, membership tiers, course levels)
+    - Use pipeline view as the default for the main component in Programs tab
+    - Example for martial arts: programs | Programs | p | White Belt, Yellow Belt, Green Belt, Blue Belt, Red Belt, Black Belt
+17. **Maximum 7 user-configured tabs** (+ Dashboard = 8 total). If more are needed, consolidate related functions into one tab with sub-components.
+18. **Services + Calendar + Staff family group:**
+    - `packages` (Service Menu), `calendar`, and `staff` form a logical unit for appointment-based businesses
+    - If a business offers bookable services, ensure it has all three: packages (Service Menu) + calendar + staff
+    - The booking flow connects them: customer picks service → picks date/time → optionally picks staff member
+    - Appointment-based businesses: salon, barber, spa, med spa, lash/brow, tattoo, pet grooming, massage, dental, chiropractic, photography
+
+## GOOD vs BAD CONFIG EXAMPLES
+
+**GOOD - Solo Barber "Tony's Cuts":**
+tab: Dashboard | home
+tab: Clients | people
+clients | Clients | p | New Client, Regular, VIP, Ambassador
+tab: Schedule | calendar
+calendar | Schedule | c
+tab: Payments | dollar
+payments | Payments | t
+Why it's good: Simple, 4 tabs, Dashboard empty (platform-managed), ONE calendar on Schedule (no redundant appointments sub-tab), all views explicit.
+
+**BAD - Same barber:**
+tab: People | people
+clients | Clients
+leads | Leads
+staff | Staff
+vendors | Vendors
+tab: Money | dollar
+invoices | Invoices
+payments | Payments
+expenses | Expenses
+payroll | Payroll
+estimates | Estimates
+Why it's bad: Generic labels, too many components, includes Staff/Payroll for a solo barber, no Dashboard tab, no view codes.
+
+**GOOD - Landscaping company with 5 crew:**
+tab: Dashboard | home
+tab: Customers | people
+clients | Customers | p | Estimate, Scheduled, In Progress, Complete, Recurring
+leads | Leads | p | Inquiry, Estimate Sent, Approved, Scheduled, Complete
+tab: Jobs | briefcase
+calendar | Schedule | c
+jobs | Jobs | p | Estimated, Approved, Scheduled, In Progress, Complete, Invoiced
+estimates | Estimates | t
+tab: Crew | users
+staff | Crew | k
+shifts | Assignments | t
+tab: Billing | dollar
+invoices | Invoices | t
+payments | Payments | t
+Why it's good: Dashboard empty (platform-managed), ONE calendar on Jobs tab, no redundant sub-tabs alongside calendar, shifts on Crew tab (not calendar tab), all views explicit."""
+
+
+def analyze_business_request(description):
+    """messages.create() kwargs (minus model/max_tokens) for a from-scratch config."""
+    return {
+        'system': [_cached_block(ANALYZE_BUSINESS_SYSTEM)],
+        'messages': [{'role': 'user', 'content': (
+            f"Business description: {description}\n\n"
+            "Now analyze the business description and create a perfect config."
+        )}],
+    }
+
+
+# ============================================================
+# analyze_with_template
+# ============================================================
+
+TEMPLATE_SYSTEM = """You are customizing a business platform template for a specific business.
+The business description and business type are in the user message; the starting template follows these instructions.
+
+Your job is to CUSTOMIZE the template for the specific business described. Return ONLY valid JSON.
+
+## RULES:
+1. **NEVER remove components with "_locked": true** — these are essential and must stay
+2. **You CAN remove tabs marked "_removable": true** if the business is solo (no staff/team mentioned)
+3. **Customize labels** to match the business (e.g. "Staff" → "Barbers", "Clients" → "Pets & Owners")
+4. **Add components** the user specifically mentioned that aren't in the template
+5. **Remove unlocked components** the user clearly doesn't need
+6. **Keep the tab structure** — don't reorganize tabs, just add/remove within them
+7. **Set pipeline stages** if the user described specific progression (belt ranks, loyalty tiers, etc.)
+8. **Extract the business name** from the description — keep it in the SAME LANGUAGE the user wrote in
+9. **Tab and component labels should be in English** — the dashboard UI is English, only business_name stays in the user's language
+
+## OUTPUT FORMAT:
+Return the FULL config as JSON (same structure as template):
+{
+    "business_name": "extracted business name",
+    "business_type": "the business type from the user message",
+    "tabs": [ ... customized tabs ... ],
+    "summary": "one sentence about what was configured"
+}
+
+Do NOT include "colors" — colors are handled separately.
+Keep "_locked" and "_removable" flags on components — they'll be stripped later.
+Every component MUST have a "view" field."""
+
+
+def template_request(description, template, business_type):
+    """messages.create() kwargs (minus model/max_tokens) for customizing a template.
+    Templates come from fixed dicts, so each type renders to the same cached text."""
+    template_text = f"Here is the starting template (JSON):\n{json.dumps(template, indent=2)}"
+    return {
+        'system': [
+            {'type': 'text', 'text': TEMPLATE_SYSTEM},
+            _cached_block(template_text),
+        ],
+        'messages': [{'role': 'user', 'content': (
+            f"Business description: {description}\n"
+            f"Business type: {business_type}\n\n"
+            "Customize the template for this business."
+        )}],
+    }
+
+
+# ============================================================
+# Responses
+# ============================================================
+
+def strip_code_fences(raw):
+    """Model output with a surrounding ```json fence removed, if present."""
+    cleaned = raw.strip()
+    if cleaned.startswith("```"):
+        cleaned = re.sub(r'^```json?\n?', '', cleaned)
+        cleaned = re.sub(r'\n?```$', '', cleaned)
+    return cleaned
+
+
+def continuation_request(request, partial):
+    """request (messages.create() kwargs) resumed after partial, the part of the
+    reply already received. partial goes in as a prefilled assistant turn, so
+    the model writes only the missing tail; a prefill can't end in whitespace."""
+    return {**request, 'messages': request['messages'] + [{'role': 'assistant', 'content': partial.rstrip()}]}
+
+
+class PromptCacheStats:
+    """Per-prompt prompt-cache counters from response usage. Thread-safe.
+
+    A call is a hit when any input tokens were read from the cache, a write
+    when the prefix was processed and stored, and uncached when neither
+    happened (prefix too short, or caching not applied)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._prompts = {}
+
+    def record(self, prompt, usage):
+        read = getattr(usage, 'cache_read_input_tokens', None) or 0
+        written = getattr(usage, 'cache_creation_input_tokens', None) or 0
+        uncached = getattr(usage, 'input_tokens', None) or 0
+        with self._lock:
+            counts = self._prompts.setdefault(prompt, {
+                'calls': 0, 'hits': 0, 'writes': 0, 'uncached': 0,
+                'cache_read_input_tokens': 0, 'cache_creation_input_tokens': 0, 'input_tokens': 0,
+            })
+            counts['calls'] += 1
+            if read:
+                counts['hits'] += 1
+            elif written:
+                counts['writes'] += 1
+            else:
+                counts['uncached'] += 1
+            counts['cache_read_input_tokens'] += read
+            counts['cache_creation_input_tokens'] += written
+            counts['input_tokens'] += uncached
+        print(f"Prompt cache [{prompt}]: read {read}, wrote {written}, uncached {uncached} input tokens")
+
+    def stats(self):
+        with self._lock:
+            prompts = {}
+            for prompt, counts in self._prompts.items():
+                total = (counts['cache_read_input_tokens'] + counts['cache_creation_input_tokens']
+                         + counts['input_tokens'])
+                prompts[prompt] = dict(
+                    counts,
+                    hit_rate=round(counts['hits'] / counts['calls'], 4),
+                    cached_token_share=round(counts['cache_read_input_tokens'] / total, 4) if total else None,
+                )
+            return {'name': 'prompt', 'prompts': prompts}
+
+
+PROMPT_CACHE_STATS = PromptCacheStats()
+
+
+# ============================================================
+# Chat, input check, website copy
+# ============================================================
+
+CHAT_SYSTEM_PROMPT = """You're a CTO helping someone build their business platform. Short, casual, helpful.
+
+LANGUAGE RULE: Always respond in the SAME LANGUAGE the user writes in. If they write in Spanish, respond in Spanish. If they write in French, respond in French. If they write in English, respond in English. Match their language exactly throughout the entire conversation.
+
+You need to gather these details (ask about them one at a time, across multiple messages):
+1. Business name
+2. What they do — specific services, products, or programs they offer
+3. Who their customers are (clients, students, patients, members, pet owners, etc.)
+4. Team size — solo, small team, or larger. Who works there? (instructors, techs, stylists, etc.)
+5. What's their biggest headache right now? (scheduling chaos, lost leads, manual invoicing, etc.)
+6. Do they track any kind of progression or stages? (client journey, belt ranks, loyalty tiers, project phases, etc.)
+
+Your style:
+- One short question at a time — never ask multiple questions in the same message
+- Show genuine interest in their business. Relate to what they share.
+- If they mention a pain point, briefly explain how the platform fixes it, then move to the next question
+- If they're just starting out, help them think through what they'll need
+- No fluff, no corporate talk
+- NEVER rush — ask at least 4 questions before deciding you have enough info
+
+IMPORTANT: Do NOT say READY_TO_BUILD until you have gathered at least 5 of the 6 details above. The more context you gather, the better system you can build. Be thorough.
+
+When you genuinely have enough detail (at least 5 items covered across the conversation), respond with EXACTLY: "READY_TO_BUILD"
+
+Examples:
+- "Nice! What's the business called?"
+- "Cool — so what kind of services do you offer there?"
+- "And who are your typical customers? Families, individuals, businesses?"
+- "Got it. Is it just you running things, or do you have a team?"
+- "What's the biggest pain point right now? Like what takes up too much of your time?"
+- "Do your clients go through any kind of stages or progression? Like new → regular → VIP, or belt ranks, or anything like that?"
+"""
+
+# Answer READY_TO_BUILD without a model call once the user has sent this many messages
+CHAT_MAX_USER_MESSAGES = 10
+
+
+def chat_limit_reached(messages):
+    return sum(1 for m in messages if m.get('role') == 'user') >= CHAT_MAX_USER_MESSAGES
+
+
+def chat_request(messages):
+    """messages.create() kwargs (minus model/max_tokens) for a chat turn. Older
+    turns are replaced by a summary of the facts gathered (conversation.py),
+    which is cached along with the system prompt."""
+    summary, recent = compact_chat(messages)
+    if summary is None:
+        return {'system': [_cached_block(CHAT_SYSTEM_PROMPT)], 'messages': messages}
+    return {
+        'system': [_cached_block(CHAT_SYSTEM_PROMPT)],
+        'messages': [{'role': 'user', 'content': [_cached_block(summary)]}] + recent,
+    }
+
+
+def check_input_request(description):
+    """messages.create() kwargs (minus model/max_tokens) for the DETAILED/VAGUE check."""
+    prompt = f"""Analyze this business description and determine if it has enough detail to configure a business platform.
+
+Description: "{description}"
+
+A DETAILED description must include ALL of these:
+- Business name (a specific name, not just the type)
+- Specific services or products offered
+- Who their customers are
+- Team size or structure
+- At least one workflow detail (how they handle clients, scheduling, billing, etc.)
+
+If ANY of these is missing, respond "VAGUE". Only respond "DETAILED" if the description is truly comprehensive with all 5 elements.
+
+Most single-sentence descriptions should be "VAGUE" — we want to ask follow-up questions to build a better system.
+
+Respond with ONLY one word: "DETAILED" or "VAGUE" """
+    return {'messages': [{"role": "user", "content": prompt}]}
+
+
+def is_detailed(text):
+    return "DETAILED" in text.strip().upper()
+
+
+WEBSITE_COPY_SYSTEM = "You generate website marketing copy for small businesses. Return ONLY valid JSON, no markdown."
+
+
+def website_copy_request(business_name, business_type, description):
+    """messages.create() kwargs (minus model/max_tokens) for the website copy.
+    business_type may be None and business_name may be NAME_PLACEHOLDER when
+    the call runs speculatively, before the config is known."""
+    type_text = business_type or 'infer it from the description'
+    name_note = ''
+    if business_name == NAME_PLACEHOLDER:
+        name_note = f"\nThe business name isn't known yet — write {NAME_PLACEHOLDER} wherever it belongs."
+    return {
+        'system': WEBSITE_COPY_SYSTEM,
+        'messages': [{
+            "role": "user",
+            "content": f"""Business: {business_name} (Type: {type_text})
+Description: {description}{name_note}
+
+Return JSON:
+{{
+  "hero_headline": "powerful headline, 4-8 words, no quotes",
+  "hero_subheadline": "one compelling sentence about the business",
+  "hero_cta": "call to action button text, 2-4 words",
+  "about_title": "about section heading",
+  "about_text": "2-3 engaging sentences about what makes this business special",
+  "features_title": "section heading for key selling points",
+  "features": ["selling point 1 (1-2 sentences)", "selling point 2 (1-2 sentences)", "selling point 3 (1-2 sentences)"],
+  "cta_headline": "motivating call to action heading",
+  "cta_text": "short persuasive sentence",
+  "cta_button": "action button text, 2-4 words"
+}}"""
+        }],
+    }
@@ -0,0 +1,272 @@
+"""Disk-backed cache of LLM responses, shared by all gunicorn workers.
+
+Demo traffic, retries after a failed /configure and QA runs send the same
+descriptions over and over, and every one used to cost a full model call.
+Responses are cached in SQLite under a key built from:
+
+    kind (which call) + model + prompt version + normalized description + extras
+
+The description is casefolded and runs of whitespace/punctuation collapse to
+one space, so "Solo nail tech, doing gel & acrylics!" and "solo nail tech
+doing gel acrylics" share an entry. Extras carry whatever else the prompt
+depends on (business type, template fingerprint, business name).
+
+Entries expire after a TTL and the table is kept under a byte budget by
+evicting the least recently used rows. Only successful, parsed responses are
+stored — callers' fallbacks never reach the cache. A bypass skips the lookup
+but still stores the fresh response, so it also refreshes the entry.
+
+Identical calls that arrive while the first is still running are coalesced
+(singleflight.py): within a worker they share the one call's result, and
+across workers they wait on a per-key file lock next to the database and then
+read the entry the first worker stored. RESPONSE_COALESCE=0 turns this off.
+
+Cache failures (locked or unwritable database) are logged and treated as
+misses; they never fail the request.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from singleflight import SingleFlight
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Hits only refresh last_used when it is older than this, so hot entries
+# don't turn every read into a write
+_TOUCH_INTERVAL = 60.0
+
+# Evict down to this fraction of the budget so a full cache doesn't evict on every put
+_EVICT_TO = 0.9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    compute_seconds REAL NOT NULL,
+    size INTEGER NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+"""
+
+
+def normalize_description(text):
+    """Casefolded, with whitespace and punctuation runs collapsed to single spaces."""
+    return re.sub(r'[\W_]+', ' ', (text or '').casefold()).strip()
+
+
+def response_key(kind, model, prompt_version, description, *extra):
+    parts = [kind, model, str(prompt_version), normalize_description(description)]
+    parts.extend(str(part) for part in extra)
+    return hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
+
+
+def fingerprint(value):
+    """Short stable hash of a JSON-serializable value, for use as a key extra."""
+    return hashlib.sha1(json.dumps(value, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+
+class ResponseCache:
+    """TTL + byte-bounded LRU cache of JSON-serializable responses. Thread-safe."""
+
+    name = 'response'
+
+    def __init__(self, db_path, ttl_seconds=DEFAULT_TTL_SECONDS, max_bytes=DEFAULT_MAX_BYTES, enabled=True,
+                 coalesce=True):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.bypassed = 0
+        self.evictions = 0
+        self.errors = 0
+        self.saved_seconds = 0.0
+        self.flight = SingleFlight(os.path.join(os.path.dirname(db_path), 'inflight'), enabled=coalesce)
+
+    def _conn(self):
+        # Opened lazily so importing app.py never touches the volume
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            folder = os.path.dirname(self.db_path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=2.0)
+            conn.execute('PRAGMA journal_mode=WAL')
+            # A lost entry only costs a model call
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _count(self, counter, amount=1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    # ── lookups ───────────────────────────────────────────────────────
+
+    def get(self, key, count_miss=True):
+        """Cached value for key, or None on a miss (including expired entries)."""
+        now = time.time()
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                'SELECT created, last_used, compute_seconds, value FROM responses WHERE key = ?', (key,),
+            ).fetchone()
+            if row is None:
+                if count_miss:
+                    self._count('misses')
+                return None
+            created, last_used, compute_seconds, value = row
+            if now - created > self.ttl_seconds:
+                with conn:
+                    conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self._count('expired')
+                self._count('misses')
+                return None
+            if now - last_used > _TOUCH_INTERVAL:
+                with conn:
+                    conn.execute('UPDATE responses SET last_used = ? WHERE key = ?', (now, key))
+        except sqlite3.Error as e:
+            print(f"Response cache read failed ({e}) — treating as a miss")
+            self._count('errors')
+            self._count('misses')
+            return None
+        with self._lock:
+            self.hits += 1
+            self.saved_seconds += compute_seconds
+        return json.loads(value)
+
+    def put(self, key, kind, value, compute_seconds=0.0):
+        encoded = json.dumps(value, separators=(',', ':'))
+        now = time.time()
+        try:
+            conn = self._conn()
+            with conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO responses (key, kind, created, last_used, compute_seconds, size, value) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (key, kind, now, now, compute_seconds, len(encoded), encoded),
+                )
+            self._evict(conn, now)
+        except sqlite3.Error as e:
+            print(f"Response cache write failed ({e}) — response not cached")
+            self._count('errors')
+
+    def _evict(self, conn, now):
+        with conn:
+            expired = conn.execute('DELETE FROM responses WHERE created < ?', (now - self.ttl_seconds,)).rowcount
+            total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+            evicted = 0
+            if total > self.max_bytes:
+                excess = total - int(self.max_bytes * _EVICT_TO)
+                victims = []
+                for key, size in conn.execute('SELECT key, size FROM responses ORDER BY last_used'):
+                    if excess <= 0:
+                        break
+                    victims.append((key,))
+                    excess -= size
+                conn.executemany('DELETE FROM responses WHERE key = ?', victims)
+                evicted = len(victims)
+        if expired:
+            self._count('expired', expired)
+        if evicted:
+            self._count('evictions', evicted)
+
+    def get_or_compute(self, kind, model, prompt_version, description, compute, extra=(), bypass=False):
+        """compute()'s result, served from the cache when an entry matches.
+
+        Exceptions from compute() propagate and nothing is stored. With
+        bypass=True the lookup is skipped but the fresh result is stored.
+        Concurrent identical calls share one compute()."""
+        key = response_key(kind, model, prompt_version, description, *extra)
+        if not self.enabled:
+            return self.flight.do(key, compute)
+        if bypass:
+            self._count('bypassed')
+            return self.flight.do(key + ':bypass', lambda: self._compute_and_put(key, kind, compute))
+        cached = self.get(key)
+        if cached is not None:
+            print(f"Response cache hit: {kind}")
+            return cached
+        return self.flight.do(
+            key, lambda: self._compute_and_put(key, kind, compute),
+            # Another worker may have stored it while we waited for the lock
+            recheck=lambda: self.get(key, count_miss=False),
+        )
+
+    def _compute_and_put(self, key, kind, compute):
+        started = time.monotonic()
+        value = compute()
+        self.put(key, kind, value, time.monotonic() - started)
+        return value
+
+    async def aget_or_compute(self, kind, model, prompt_version, description, compute, extra=(), bypass=False):
+        """get_or_compute() for a coroutine function compute; the SQLite
+        lookup and store run on a thread so they never block the event loop."""
+        key = response_key(kind, model, prompt_version, description, *extra)
+        if not self.enabled:
+            return await self.flight.ado(key, compute)
+        if bypass:
+            self._count('bypassed')
+            return await self.flight.ado(key + ':bypass', lambda: self._acompute_and_put(key, kind, compute))
+        cached = await asyncio.to_thread(self.get, key)
+        if cached is not None:
+            print(f"Response cache hit: {kind}")
+            return cached
+        return await self.flight.ado(
+            key, lambda: self._acompute_and_put(key, kind, compute),
+            recheck=lambda: asyncio.to_thread(self.get, key, False),
+        )
+
+    async def _acompute_and_put(self, key, kind, compute):
+        started = time.monotonic()
+        value = await compute()
+        await asyncio.to_thread(self.put, key, kind, value, time.monotonic() - started)
+        return value
+
+    def clear(self):
+        with self._conn() as conn:
+            conn.execute('DELETE FROM responses')
+
+    def stats(self):
+        entries = size = None
+        if self.enabled:
+            try:
+                entries, size = self._conn().execute(
+                    'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses',
+                ).fetchone()
+            except sqlite3.Error:
+                pass
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'enabled': self.enabled,
+                'entries': entries,
+                'bytes': size,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'bypassed': self.bypassed,
+                'evictions': self.evictions,
+                'errors': self.errors,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'saved_seconds': round(self.saved_seconds, 2),
+            }
@@ -0,0 +1,223 @@
+"""Single-flight coalescing of identical in-flight model calls.
+
+A double-click on "Build", a frontend retry or a load test sends the same
+/configure or /check-input body while the first request is still waiting on
+the model. The response cache only helps once that call has finished; until
+then every duplicate starts its own upstream request and spends rate limit.
+
+SingleFlight runs one call per key at a time:
+
+    within a worker   the first caller (the leader) runs the call; callers
+                      arriving with the same key wait for it and get a copy
+                      of its result (taken before the leader returns, so
+                      the leader may mutate its own), or its exception
+    across workers    with a lock_dir, the leader also holds an flock on
+                      <lock_dir>/<key>.lock while it runs. A leader in
+                      another worker waits for that lock, then calls
+                      recheck() — ResponseCache passes a lookup in the shared
+                      cache — and returns what the first worker stored
+                      instead of calling the model again.
+
+Lock waits are bounded by lock_timeout; past that the caller runs its own
+call rather than hang behind a stuck worker. Lock files are removed on
+release.
+"""
+
+import asyncio
+import copy
+import fcntl
+import os
+import threading
+import time
+
+# Longer than a slow config call, shorter than the gunicorn timeout
+DEFAULT_LOCK_TIMEOUT = 100.0
+
+_LOCK_POLL_SECONDS = 0.05
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """Per-key call coalescing for threads (do) and coroutines (ado). Thread-safe."""
+
+    name = 'singleflight'
+
+    def __init__(self, lock_dir=None, lock_timeout=DEFAULT_LOCK_TIMEOUT, enabled=True):
+        self.lock_dir = lock_dir
+        self.lock_timeout = lock_timeout
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> _Call, for threads
+        self._tasks = {}  # (loop, key) -> Task, for coroutines
+        self.leaders = 0
+        self.coalesced = 0
+        self.shared_across_workers = 0
+        self.lock_waits = 0
+        self.lock_timeouts = 0
+        self.lock_wait_seconds = 0.0
+
+    def _count(self, counter, amount=1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    # ── threads ───────────────────────────────────────────────────────
+
+    def do(self, key, fn, recheck=None):
+        """fn()'s result, shared with every concurrent do() for the same key.
+
+        recheck() is called under the cross-worker lock before fn(); a
+        non-None result is returned instead of calling fn()."""
+        if not self.enabled:
+            return fn()
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.value)
+
+        try:
+            value = self._run_locked(key, fn, recheck)
+            # Followers copy a private snapshot — the leader's caller may
+            # mutate its result (run_configure does) while they copy
+            call.value = copy.deepcopy(value)
+            return value
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def _run_locked(self, key, fn, recheck):
+        if self.lock_dir is None or recheck is None:
+            return fn()
+        started = time.monotonic()
+        while True:
+            f, path = self._try_file_lock(key)
+            if f is not None or time.monotonic() - started > self.lock_timeout:
+                break
+            time.sleep(_LOCK_POLL_SECONDS)
+        if not self._record_wait(f, started):
+            return fn()
+        try:
+            value = recheck()
+            if value is not None:
+                self._count('shared_across_workers')
+                return value
+            return fn()
+        finally:
+            _release_file_lock(f, path)
+
+    def _record_wait(self, f, started):
+        """Count a contended lock wait. False if it timed out without the lock."""
+        waited = time.monotonic() - started
+        if waited > _LOCK_POLL_SECONDS:
+            self._count('lock_waits')
+            self._count('lock_wait_seconds', waited)
+        if f is None:
+            print(f"Single-flight lock wait timed out after {waited:.0f}s — calling anyway")
+            self._count('lock_timeouts')
+            return False
+        return True
+
+    def _try_file_lock(self, key):
+        """(open file, path) holding the key's flock, or (None, path) if another process holds it."""
+        os.makedirs(self.lock_dir, exist_ok=True)
+        path = os.path.join(self.lock_dir, key + '.lock')
+        f = open(path, 'a')
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            f.close()
+            return None, path
+        # The previous holder unlinks the file on release; if that happened
+        # after we opened it, our lock is on an orphaned inode
+        try:
+            if os.fstat(f.fileno()).st_ino == os.stat(path).st_ino:
+                return f, path
+        except FileNotFoundError:
+            pass
+        f.close()
+        return None, path
+
+    # ── coroutines ────────────────────────────────────────────────────
+
+    async def ado(self, key, fn, recheck=None):
+        """do() for a coroutine function fn (and recheck). The shared call
+        runs as its own task, so a caller that disconnects doesn't cancel it
+        for the others; file-lock polling never blocks the event loop."""
+        if not self.enabled:
+            return await fn()
+        slot = (asyncio.get_running_loop(), key)
+        with self._lock:
+            task = self._tasks.get(slot)
+            leader = task is None
+            if leader:
+                task = self._tasks[slot] = asyncio.ensure_future(self._arun_locked(key, fn, recheck))
+                task.add_done_callback(lambda _: self._forget(slot))
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+        # The task's result stays untouched; every caller, the leader too, gets its own copy
+        return copy.deepcopy(await asyncio.shield(task))
+
+    def _forget(self, slot):
+        with self._lock:
+            self._tasks.pop(slot, None)
+
+    async def _arun_locked(self, key, fn, recheck):
+        if self.lock_dir is None or recheck is None:
+            return await fn()
+        started = time.monotonic()
+        while True:
+            f, path = await asyncio.to_thread(self._try_file_lock, key)
+            if f is not None or time.monotonic() - started > self.lock_timeout:
+                break
+            await asyncio.sleep(_LOCK_POLL_SECONDS)
+        if not self._record_wait(f, started):
+            return await fn()
+        try:
+            value = await recheck()
+            if value is not None:
+                self._count('shared_across_workers')
+                return value
+            return await fn()
+        finally:
+            _release_file_lock(f, path)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'name': self.name,
+                'enabled': self.enabled,
+                'in_flight': len(self._calls) + len(self._tasks),
+                'leaders': self.leaders,
+                'coalesced': self.coalesced,
+                'shared_across_workers': self.shared_across_workers,
+                'lock_waits': self.lock_waits,
+                'lock_timeouts': self.lock_timeouts,
+                'lock_wait_seconds': round(self.lock_wait_seconds, 2),
+            }
+
+
+def _release_file_lock(f, path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    f.close()  # releases the flock
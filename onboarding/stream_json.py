@@ -0,0 +1,145 @@
+"""Incremental JSON parsing for streamed model output.
+
+The config call returns one JSON object, but /configure/stream wants each
+tab as soon as the model closes it. IncrementalJSONParser takes the text in
+whatever chunks the stream delivers and reports every value that completes
+at a shallow path:
+
+    parser = IncrementalJSONParser(max_depth=2)
+    parser.feed('{"business_name": "Crumbs", "tabs": [{"id": "tab_1"')
+        → [(('business_name',), 'Crumbs')]
+    parser.feed('}, {"id": "tab_2"}]}')
+        → [(('tabs', 0), {'id': 'tab_1'}), (('tabs', 1), {'id': 'tab_2'}), (('tabs',), [...])]
+
+Only values at depth <= max_depth are decoded; deeper ones are just scanned.
+Anything before the first '{' or '[' (a ```json fence, a stray sentence) and
+after the top-level value closes is ignored. A completed value that fails to
+decode is skipped — the caller still parses the full text at the end and
+reports the error there.
+"""
+
+import json
+
+_WHITESPACE = ' \t\r\n'
+_SCALAR_END = ',}]' + _WHITESPACE
+
+
+class IncrementalJSONParser:
+    """Push parser over a single top-level JSON object or array."""
+
+    def __init__(self, max_depth=2):
+        self.max_depth = max_depth
+        self.text = ''
+        self.done = False
+        self._pos = 0
+        # One frame per open container: [kind, start offset, path component, current key, array index]
+        self._stack = []
+        self._string_start = None
+        self._string_is_key = False
+        self._escape = False
+        self._scalar_start = None
+
+    def feed(self, chunk):
+        """Scan another chunk. Returns [(path, value)] for values completed in it."""
+        self.text += chunk
+        completed = []
+        text = self.text
+        i = self._pos
+        while i < len(text) and not self.done:
+            c = text[i]
+
+            if self._string_start is not None:
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    start, self._string_start = self._string_start, None
+                    if self._string_is_key:
+                        self._stack[-1][3] = json.loads(text[start:i + 1])
+                    else:
+                        self._complete(start, i + 1, completed)
+                i += 1
+                continue
+
+            if self._scalar_start is not None:
+                if c not in _SCALAR_END:
+                    i += 1
+                    continue
+                start, self._scalar_start = self._scalar_start, None
+                self._complete(start, i, completed)
+                # fall through: c is a delimiter to handle below
+
+            if not self._stack:
+                if c in '{[':
+                    self._stack.append([c, i, None, None, -1])
+                i += 1
+                continue
+
+            if c == '"':
+                top = self._stack[-1]
+                self._string_is_key = top[0] == '{' and top[3] is None
+                if not self._string_is_key:
+                    self._begin_value()
+                self._string_start = i
+            elif c in '{[':
+                component = self._begin_value()
+                self._stack.append([c, i, component, None, -1])
+            elif c in '}]':
+                frame = self._stack.pop()
+                if not self._stack:
+                    self.done = True
+                else:
+                    self._complete(frame[1], i + 1, completed, frame[2])
+            elif c == ',':
+                top = self._stack[-1]
+                if top[0] == '{':
+                    top[3] = None
+            elif c == ':' or c in _WHITESPACE:
+                pass
+            else:
+                self._begin_value()
+                self._scalar_start = i
+            i += 1
+
+        self._pos = i
+        return completed
+
+    def _begin_value(self):
+        """Path component of a value starting in the current container."""
+        top = self._stack[-1]
+        if top[0] == '[':
+            top[4] += 1
+            return top[4]
+        return top[3]
+
+    def _complete(self, start, end, completed, component=None):
+        top = self._stack[-1]
+        if component is None:
+            component = top[4] if top[0] == '[' else top[3]
+        path = tuple(frame[2] for frame in self._stack[1:]) + (component,)
+        if len(path) > self.max_depth:
+            return
+        try:
+            completed.append((path, json.loads(self.text[start:end])))
+        except ValueError:
+            pass
+
+
+class JSONTabStream:
+    """Tabs of a streamed config JSON: feed() returns [(index, tab)] for each
+    tabs[] entry that closed in the chunk. Same interface as
+    config_dsl.ConfigDSLParser, so the stream helpers take either."""
+
+    def __init__(self):
+        self._parser = IncrementalJSONParser(max_depth=2)
+
+    @property
+    def text(self):
+        return self._parser.text
+
+    def feed(self, chunk):
+        return [
+            (path[1], value) for path, value in self._parser.feed(chunk)
+            if len(path) == 2 and path[0] == 'tabs' and isinstance(value, dict)
+        ]
@@ -0,0 +1,227 @@
+"""Rule-based template customization — the template path without a model call.
+
+analyze_with_template sends the whole template to Sonnet, and for most
+descriptions the answer is the template with the same few edits:
+
+    solo or team        a solo operator loses the _removable staff tab; a team
+                        keeps it, retitled if the description names the role
+                        ("our stylists", "3 groomers")
+    labels              "customers", "patients", "appointments"... relabel the
+                        people tab and the bookings pipeline
+    business name       extract_business_name()'s phrase match
+    components          features named in the description ("track inventory",
+                        "a loyalty program") are added from KEYWORD_COMPONENTS;
+                        "no retail" drops an unlocked one
+
+customize_template() applies those edits and scores how sure it is.
+Anything the rules can't account for — a request they don't recognise, solo
+and team signals together, custom pipeline stages, a description that isn't
+English — lowers the confidence, and below the caller's threshold the model
+call runs as before. Chat answers are read as chat_facts(), not as the
+labelled lines configure_description() adds: the rules see the user's own
+words, and the stages question counts only when it wasn't answered "no". No business name zeroes it: the model always names the
+business, and a config shipped as 'My Business' is worse than a model call.
+"""
+
+import copy
+import re
+
+from config_dsl import COMPONENTS
+from conversation import chat_facts
+from website_copy import extract_business_name
+
+# component id → (description keywords, icon of the tab it joins)
+KEYWORD_COMPONENTS = {
+    'inventory': (('inventory', 'stock', 'supplies'), 'box'),
+    'products': (('retail', 'products', 'merch'), 'box'),
+    'waivers': (('waiver', 'consent form'), 'box'),
+    'loyalty': (('loyalty', 'rewards', 'punch card'), 'people'),
+    'memberships': (('membership',), 'people'),
+    'forms': (('intake form', 'questionnaire'), 'people'),
+    'reviews': (('reviews', 'testimonials'), 'people'),
+    'messages': (('text reminders', 'reminders', 'messaging'), 'people'),
+    'campaigns': (('marketing', 'promotions', 'email campaigns', 'newsletter'), 'people'),
+    'waitlist': (('waitlist', 'wait list', 'walk-ins', 'walk ins'), 'calendar'),
+    'classes': (('classes', 'workshops'), 'calendar'),
+    'time_tracking': (('timesheets', 'time tracking', 'clock in'), 'calendar'),
+    'social_media': (('social media', 'instagram', 'tiktok'), 'image'),
+    'estimates': (('quotes', 'estimates'), 'dollar'),
+    'expenses': (('expenses',), 'dollar'),
+    'payroll': (('payroll', 'commission'), 'dollar'),
+    'subscriptions': (('subscription',), 'dollar'),
+}
+
+# Description word → label for the people tab, if the template calls it one of these
+PEOPLE_LABELS = {'clients': 'Clients', 'customers': 'Customers', 'patients': 'Patients', 'guests': 'Guests'}
+# Description word → label for the bookings pipeline, if the template calls it one of these
+BOOKING_LABELS = {'appointments': 'Appointments', 'bookings': 'Bookings', 'sessions': 'Sessions'}
+# Team roles the staff tab can be retitled to
+STAFF_TITLES = {
+    'nail techs': 'Nail Techs', 'nail technicians': 'Nail Techs', 'lash techs': 'Lash Techs',
+    'barbers': 'Barbers', 'stylists': 'Stylists', 'artists': 'Artists', 'therapists': 'Therapists',
+    'estheticians': 'Estheticians', 'injectors': 'Injectors', 'providers': 'Providers',
+    'groomers': 'Groomers', 'bathers': 'Bathers',
+}
+
+_SOLO = re.compile(
+    r"\b(?:solo|just me|by myself|on my own|one[- ](?:person|woman|man)|i'?m the only|only me"
+    r"|independent|booth rent(?:er|al)?|suite rent(?:er|al)?|home[- ]based|from (?:my|our) home)\b",
+    re.IGNORECASE,
+)
+_TEAM = re.compile(
+    r"\b(?:team|staff|employees?|employ|hire|hiring|crew|co-?workers"
+    r"|(?:\d+|two|three|four|five|six|seven|eight|nine|ten|several|multiple)\s+(?:\w+\s+)?"
+    r"(?:chairs|stations|people|employees|locations|" + '|'.join(t.split()[-1] for t in STAFF_TITLES) + r")"
+    r"|(?:our|my)\s+(?:\w+\s+)?(?:" + '|'.join(t.split()[-1] for t in STAFF_TITLES) + r"))\b",
+    re.IGNORECASE,
+)
+_NEGATION = r"\b(?:no|not|don'?t|do not|doesn'?t|never|without)\s+(?:\w+\s+){0,2}?"
+# Something the user asked for — each one has to be recognised, or the model decides
+_REQUEST = re.compile(
+    r"\b(?:need|needs|want|wants|would like|track|tracking|manage|managing|keep track of|organi[sz]e|handle)\b"
+    r"([^.;!?\n]*)",
+    re.IGNORECASE,
+)
+# Custom pipeline progressions are rule 7 of the template prompt — the model's job
+_STAGES = re.compile(r"\b(?:stages|steps|tiers|levels|ranks|belts|phases)\b", re.IGNORECASE)
+# A chat answer that turns the question down ("not really", "nope")
+_NO_ANSWER = re.compile(r"^\W*(?:no|nope|nah|not really|not yet|none|never|n/a)\b", re.IGNORECASE)
+_ENGLISH = re.compile(r"\b(?:the|a|an|and|i|i'm|my|we|our|for|with|from|of|to|in|at|on|is|do)\b", re.IGNORECASE)
+
+# Confidence lost per thing the rules can't account for
+_PENALTIES = {
+    'mixed_team_signals': 0.4,
+    'custom_stages': 0.4,
+    'unrecognised_request': 0.35,
+    'not_english': 0.5,
+    'long_description': 0.2,
+    # Not a doubt but a gap only the model fills — always ask it
+    'no_business_name': 1.0,
+}
+_LONG_DESCRIPTION_WORDS = 80
+
+
+def _mentions(text, keyword):
+    return re.search(rf"\b{re.escape(keyword)}s?\b", text, re.IGNORECASE) is not None
+
+
+def _negated(text, keyword):
+    return re.search(rf"{_NEGATION}{re.escape(keyword)}s?\b", text, re.IGNORECASE) is not None
+
+
+def _find_tab(config, icon):
+    return next((tab for tab in config['tabs'] if tab.get('icon') == icon), None)
+
+
+def _staff_tab(config):
+    return next((tab for tab in config['tabs']
+                 if tab.get('_removable') and any(c.get('id') == 'staff' for c in tab['components'])), None)
+
+
+def customize_template(description, template, business_type, conversation_history=None):
+    """Apply the common edits to a template locally.
+
+    Returns (config, confidence, reasons): the customized config (same shape
+    and flags as analyze_with_template's output), a 0–1 confidence that the
+    model would have made the same edits, and a note per deduction.
+    description is the user's own text, without configure_description()'s
+    labelled lines — the chat's facts come from conversation_history."""
+    config = copy.deepcopy(template)
+    reasons = []
+    confidence = 1.0
+
+    def doubt(kind, detail):
+        nonlocal confidence
+        confidence -= _PENALTIES[kind]
+        reasons.append(detail)
+
+    facts = chat_facts(conversation_history)
+    text = ' '.join([description] + [m.get('content', '') for m in conversation_history or []
+                                     if m.get('role') == 'user' and isinstance(m.get('content'), str)])
+    words = text.split()
+    english = len(_ENGLISH.findall(text))
+    accented = any(ch.isalpha() and not ch.isascii() for ch in text)
+    # Terse English ("solo lash tech") has no function words either, so only longer text counts
+    if (accented and english < 2) or (len(words) >= 10 and not english):
+        doubt('not_english', 'description is not in English')
+    if len(words) > _LONG_DESCRIPTION_WORDS:
+        doubt('long_description', f'{len(words)}-word description')
+    stages_answer = facts.get('stages')
+    if _STAGES.search(text) or (stages_answer and not _NO_ANSWER.match(stages_answer)):
+        doubt('custom_stages', 'custom pipeline stages requested')
+
+    # Solo or team
+    solo, team = _SOLO.search(text), _TEAM.search(text)
+    if solo and team:
+        doubt('mixed_team_signals', f'both solo ({solo.group(0)!r}) and team ({team.group(0)!r}) mentioned')
+    staff_tab = _staff_tab(config)
+    if staff_tab and not team:
+        config['tabs'].remove(staff_tab)
+    elif staff_tab:
+        # Plural only — "a makeup artist" is the business, "our artists" the team
+        titles = {label for word, label in STAFF_TITLES.items()
+                  if re.search(rf"\b{word}\b", text, re.IGNORECASE)}
+        if len(titles) == 1:
+            title = titles.pop()
+            staff_tab['label'] = title
+            for comp in staff_tab['components']:
+                if comp.get('id') == 'staff':
+                    comp['label'] = title
+
+    # Labels
+    people_tab = _find_tab(config, 'people')
+    people = [label for word, label in PEOPLE_LABELS.items() if _mentions(text, word.rstrip('s'))]
+    if people_tab and people_tab['label'] in PEOPLE_LABELS.values() and len(people) == 1:
+        people_tab['label'] = people[0]
+    bookings = [label for word, label in BOOKING_LABELS.items() if _mentions(text, word.rstrip('s'))]
+    for tab in config['tabs']:
+        for comp in tab['components']:
+            if comp.get('id') == 'clients' and comp['label'] in BOOKING_LABELS.values() and len(bookings) == 1:
+                comp['label'] = bookings[0]
+
+    # Requested and unwanted components
+    present = {comp['id'] for tab in config['tabs'] for comp in tab['components']}
+    added = []
+    for comp_id, (keywords, icon) in KEYWORD_COMPONENTS.items():
+        mentioned = [k for k in keywords if _mentions(text, k)]
+        if not mentioned:
+            continue
+        if any(_negated(text, k) for k in mentioned):
+            for tab in config['tabs']:
+                tab['components'] = [c for c in tab['components'] if c['id'] != comp_id or c.get('_locked')]
+            continue
+        if comp_id in present:
+            continue
+        tab = _find_tab(config, icon) or _find_tab(config, 'people')
+        label, view = COMPONENTS[comp_id]
+        tab['components'].append({'id': comp_id, 'label': label, 'view': view})
+        present.add(comp_id)
+        added.append(label)
+
+    # Every request has to be something the rules know about
+    known = {k for keywords, _ in KEYWORD_COMPONENTS.values() for k in keywords}
+    known |= set(PEOPLE_LABELS) | set(BOOKING_LABELS) | set(STAFF_TITLES)
+    known |= {word.lower() for tab in template['tabs'] for c in tab['components']
+              for word in re.findall(r'[a-zA-Z]{4,}', c['label'])}
+    known |= {'schedule', 'calendar', 'booking', 'payment', 'invoice', 'service', 'gallery', 'photo',
+              'portfolio', 'contact', 'staff', 'team', 'business'}
+    for request in _REQUEST.finditer(text):
+        clause = request.group(1)
+        if clause.strip() and not any(_mentions(clause, k.rstrip('s')) for k in known):
+            doubt('unrecognised_request', f'unrecognised request {request.group(0).strip()[:60]!r}')
+
+    business_name = extract_business_name(description, conversation_history) or facts.get('name')
+    if not business_name:
+        doubt('no_business_name', 'no business name found')
+    config['business_name'] = business_name or 'My Business'
+    config['business_type'] = business_type
+
+    setup = 'team' if team else 'solo'
+    summary = f"{business_type.replace('_', ' ').title()} setup for a {setup} business"
+    if added:
+        summary += f", with {', '.join(added)} added"
+    config['summary'] = summary + '.'
+
+    for index, tab in enumerate(config['tabs'], 1):
+        tab['id'] = f'tab_{index}'
+    return config, round(max(confidence, 0.0), 2), reasons
@@ -0,0 +1,350 @@
+"""Tests for the asyncio entry point.
+The Anthropic and dashboard clients are replaced with local fakes — no API calls."""
+
+import asyncio
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+# analyze_business output in the compact line format (config_dsl.py)
+CONFIG_TEXT = """name: Pipe Pros
+type: plumbing
+tab: Dashboard | home
+tab: Jobs | briefcase
+jobs | Jobs | p | New, Done
+summary: Plumbing setup.
+"""
+
+
+class FakeStream:
+    def __init__(self, text):
+        self.text = text
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @property
+    async def text_stream(self):
+        for i in range(0, len(self.text), 25):
+            await asyncio.sleep(0)
+            yield self.text[i:i + 25]
+
+    async def get_final_message(self):
+        return SimpleNamespace(usage=SimpleNamespace(input_tokens=1), stop_reason='end_turn')
+
+
+class FakeMessages:
+    """Answers by max_tokens, the way the routes size their calls."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.error = None
+        self.requests = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def create(self, **kwargs):
+        self.requests.append(kwargs)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        if self.error:
+            raise self.error
+        text = {10: 'DETAILED', 256: 'What is it called?', 800: json.dumps({'hero_headline': 'Hi'})}.get(
+            kwargs['max_tokens'], CONFIG_TEXT)
+        return SimpleNamespace(content=[SimpleNamespace(text=text)], usage=SimpleNamespace(input_tokens=1),
+                               stop_reason='end_turn')
+
+    def stream(self, **kwargs):
+        return FakeStream(CONFIG_TEXT)
+
+
+@pytest.fixture
+def asgi_app(tmp_path, monkeypatch):
+    import app as onboarding
+    import asgi
+    from copy_corpus import CopyCorpus
+    from response_cache import ResponseCache
+
+    monkeypatch.setattr(onboarding, 'CONFIGS_FOLDER', str(tmp_path))
+    monkeypatch.setattr(onboarding, 'response_cache', ResponseCache(str(tmp_path / 'responses.db'), enabled=False))
+    monkeypatch.setattr(onboarding, 'COPY_CORPUS', CopyCorpus(str(tmp_path / 'copy_corpus.db')))
+    monkeypatch.setattr(onboarding, 'save_config', lambda config, history=None: 'local123')
+    monkeypatch.setenv('DASHBOARD_URL', 'http://dashboard.test')
+    messages = FakeMessages()
+    monkeypatch.setattr(onboarding, 'aclaude', SimpleNamespace(messages=messages))
+
+    def dashboard(request):
+        return httpx.Response(200, json={'success': True, 'data': {'id': 'supa-1'}})
+
+    monkeypatch.setattr(onboarding, 'http_client', httpx.AsyncClient(transport=httpx.MockTransport(dashboard)))
+    return asgi.app, messages
+
+
+async def _post_all(app, requests):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://onboarding.test') as client:
+        return await asyncio.gather(*[client.post(path, json=body) for path, body in requests])
+
+
+# ============================================================
+# Concurrency
+# ============================================================
+def test_model_calls_overlap_in_one_process(asgi_app):
+    app, messages = asgi_app
+    messages.delay = 0.2
+    responses = asyncio.run(_post_all(app, [
+        ('/chat', {'messages': [{'role': 'user', 'content': f'hi {i}'}]}) for i in range(50)
+    ]))
+    assert all(r.json() == {'success': True, 'response': 'What is it called?'} for r in responses)
+    assert messages.peak == 50
+
+
+# ============================================================
+# Routes
+# ============================================================
+def test_check_input_and_chat_cap(asgi_app):
+    app, _ = asgi_app
+    capped = [{'role': 'user', 'content': 'x'}] * 10
+    vague, borderline, chat = asyncio.run(_post_all(app, [
+        ('/check-input', {'description': 'Plumbing company'}),  # answered locally
+        ('/check-input', {'description': 'Pipe Pros does repairs for homeowners with a crew of 4, billed by the job'}),
+        ('/chat', {'messages': capped}),
+    ]))
+    assert vague.json() == {'success': True, 'detailed': False}
+    assert borderline.json() == {'success': True, 'detailed': True}  # the fake model's answer
+    assert chat.json() == {'success': True, 'response': 'READY_TO_BUILD'}
+
+
+def test_long_chats_reach_the_model_compacted(asgi_app):
+    app, messages = asgi_app
+    turns = [{'role': 'user' if i % 2 == 0 else 'assistant', 'content': f'turn {i}'} for i in range(15)]
+    (response,) = asyncio.run(_post_all(app, [('/chat', {'messages': turns})]))
+    assert response.json()['success'] is True
+    sent = messages.requests[0]['messages']
+    assert len(sent) < 8
+    assert sent[-1] == turns[-1]
+
+
+def test_configure_matches_flask_payload(asgi_app):
+    app, _ = asgi_app
+    (response,) = asyncio.run(_post_all(app, [('/configure', {'description': 'Plumbing company called Pipe Pros'})]))
+    payload = response.json()
+    assert payload['success'] is True
+    assert payload['config_id'] == 'supa-1'
+    assert payload['config_path'] == 'model'
+    assert payload['redirect_url'] == 'http://dashboard.test/dashboard'
+    jobs = payload['config']['tabs'][1]['components'][0]
+    assert [s['name'] for s in jobs['pipeline']['stages']] == ['New', 'Done']
+    assert payload['website_data']['pages'] >= 1
+
+
+def test_template_match_skips_the_config_call(asgi_app):
+    app, messages = asgi_app
+    (response,) = asyncio.run(_post_all(app, [('/configure', {'description': 'Solo barber called Fade Factory'})]))
+    payload = response.json()
+    assert payload['config_path'] == 'rules'
+    assert payload['config']['business_name'] == 'Fade Factory'
+    assert 'Barbers' not in [tab['label'] for tab in payload['config']['tabs']]
+    assert messages.peak <= 1  # website copy only
+
+
+def test_nameless_template_match_asks_the_model(asgi_app, monkeypatch):
+    import anthropic
+    import app as onboarding
+    from fake_llm import FakeLLM, create_app
+
+    app, _ = asgi_app
+    transport = httpx.ASGITransport(app=create_app(FakeLLM(time_scale=0)))
+    monkeypatch.setattr(onboarding, 'aclaude', anthropic.AsyncAnthropic(
+        api_key='fake', base_url='http://fake.test', max_retries=0,
+        http_client=httpx.AsyncClient(transport=transport)))
+    (response,) = asyncio.run(_post_all(app, [('/configure', {'description': 'Solo barber working from home'})]))
+    payload = response.json()
+    assert payload['config_path'] == 'template_model'  # not 'rules', which would ship 'My Business'
+
+
+def test_chat_facts_keep_a_template_match_on_the_rules(asgi_app):
+    from test_template_customizer import NAIL_CHAT
+
+    app, _ = asgi_app
+    body = {'description': 'I run a nail salon', 'conversation_history': NAIL_CHAT}
+    (response,) = asyncio.run(_post_all(app, [('/configure', body)]))
+    payload = response.json()
+    assert payload['config_path'] == 'rules'
+    assert payload['config']['business_name'] == 'Polished by Pia'
+
+
+def test_corpus_copy_takes_the_copy_call_off_configure(asgi_app):
+    import app as onboarding
+    from website_copy import NAME_PLACEHOLDER
+
+    app, messages = asgi_app
+    onboarding.COPY_CORPUS.add('barbershop', 'warm', {'hero_headline': f'Fresh cuts at {NAME_PLACEHOLDER}'}, 'test-model')
+    (response,) = asyncio.run(_post_all(app, [('/configure', {'description': 'Solo barber called Fade Factory'})]))
+    payload = response.json()
+    assert payload['config_path'] == 'rules'
+    assert payload['website_data']['pages'] >= 1
+    assert onboarding.COPY_CORPUS.stats()['hits'] == 1
+    assert messages.requests == []
+
+
+def test_configure_falls_back_when_the_model_is_down(asgi_app, monkeypatch):
+    import app as onboarding
+    from llm_calls import CallPolicy
+
+    app, messages = asgi_app
+    messages.error = TimeoutError('model unavailable')
+    monkeypatch.setattr(onboarding, 'LLM_POLICIES', {
+        name: CallPolicy(name, budget=1, retries=0) for name in onboarding.LLM_POLICIES})
+    (response,) = asyncio.run(_post_all(app, [('/configure', {'description': 'Plumbing company called Pipe Pros'})]))
+    payload = response.json()
+    assert payload['success'] is True
+    assert payload['config_path'] == 'fallback'
+    assert payload['config']['business_name'] == 'Pipe Pros'
+    assert [tab['label'] for tab in payload['config']['tabs']] == ['Dashboard', 'Clients', 'Schedule', 'Billing']
+    assert payload['website_data']['pages'] >= 1  # default copy
+
+
+def test_configure_against_the_fake_backend(asgi_app, monkeypatch):
+    import anthropic
+    import app as onboarding
+    from fake_llm import FakeLLM, create_app
+
+    app, _ = asgi_app
+    fake = FakeLLM(seed=1, time_scale=0)
+    transport = httpx.ASGITransport(app=create_app(fake))
+    monkeypatch.setattr(onboarding, 'aclaude', anthropic.AsyncAnthropic(
+        api_key='fake', base_url='http://fake.test', max_retries=0,
+        http_client=httpx.AsyncClient(transport=transport)))
+    configured, streamed = asyncio.run(_post_all(app, [
+        ('/configure', {'description': 'Plumbing company called Pipe Pros'}),
+        ('/configure/stream', {'description': 'Plumbing company called Drain Kings'}),
+    ]))
+    payload = configured.json()
+    assert payload['config_path'] == 'model'
+    assert payload['config']['business_name'] == 'Pipe Pros'
+    assert payload['website_data']['pages'] >= 1
+    assert streamed.text.rstrip().split('\n\n')[-1].startswith('event: done')
+    assert sum(counts['requests'] for counts in fake.stats().values()) == 4
+
+
+def test_cut_off_replies_are_continued_and_repaired(asgi_app, monkeypatch):
+    import app as onboarding
+    from llm_calls import CallPolicy
+    from llm_metrics import LLMMetrics
+
+    _, messages = asgi_app
+    metrics = LLMMetrics()
+    monkeypatch.setattr(onboarding, 'LLM_METRICS', metrics)
+    monkeypatch.setattr(onboarding, 'LLM_POLICIES', {
+        name: CallPolicy(name, budget=5, metrics=metrics) for name in onboarding.LLM_POLICIES})
+    replies = [('{"hero_headline": "Fix it fast", "features": ["One",', 'max_tokens'), (' "Two",]}', 'end_turn')]
+
+    async def create(**kwargs):
+        messages.requests.append(kwargs)
+        text, stop_reason = replies[len(messages.requests) - 1]
+        return SimpleNamespace(content=[SimpleNamespace(text=text)], usage=SimpleNamespace(output_tokens=5),
+                               stop_reason=stop_reason)
+
+    monkeypatch.setattr(messages, 'create', create)
+    copy = asyncio.run(onboarding.request_website_copy('Pipe Pros', 'plumbing', 'Plumbing company'))
+    assert copy == {'hero_headline': 'Fix it fast', 'features': ['One', 'Two']}
+    assert messages.requests[1]['messages'][-1] == {'role': 'assistant', 'content': replies[0][0]}
+    summary = metrics.summary()['website_copy']
+    assert (summary['continuations'], summary['repaired'], summary['calls']) == (1, 1, {'ok': 1})
+    assert summary['tokens']['output'] == 10
+
+
+def test_configure_stream_events(asgi_app):
+    app, _ = asgi_app
+    (response,) = asyncio.run(_post_all(app, [('/configure/stream', {'description': 'Plumbing company'})]))
+    assert response.headers['content-type'].startswith('text/event-stream')
+    events = [block.split('\n')[0].split(': ', 1)[1] for block in response.text.split('\n\n') if block]
+    assert events[:3] == ['stage', 'tab', 'tab']
+    assert events[-1] == 'done'
+    assert 'config' in events
+
+
+def test_metrics_cover_calls_made_through_asgi(asgi_app, monkeypatch):
+    import app as onboarding
+    from llm_calls import CallPolicy
+    from llm_metrics import LLMMetrics
+
+    app, _ = asgi_app
+    metrics = LLMMetrics()
+    monkeypatch.setattr(onboarding, 'LLM_METRICS', metrics)
+    monkeypatch.setattr(onboarding, 'LLM_POLICIES', {
+        name: CallPolicy(name, budget=5, metrics=metrics) for name in onboarding.LLM_POLICIES})
+    monkeypatch.setenv('ADMIN_API_KEY', 'secret')
+    asyncio.run(_post_all(app, [
+        ('/chat', {'messages': [{'role': 'user', 'content': 'hi'}]}),
+        ('/configure', {'description': 'Plumbing company called Pipe Pros'}),
+    ]))
+    assert set(metrics.summary()) == {'chat', 'analyze_business', 'website_copy'}
+
+    async def get():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://onboarding.test') as client:
+            return await client.get('/metrics', headers={'X-Admin-Key': 'secret'})
+
+    response = asyncio.run(get())
+    assert response.headers['content-type'].startswith('text/plain')
+    assert 'llm_calls_total{prompt="chat",model="claude-haiku-4-5-20251001",outcome="ok"} 1' in response.text
+
+
+def test_malformed_bodies_get_a_400(asgi_app):
+    app, messages = asgi_app
+
+    async def post_all():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://onboarding.test') as client:
+            return await asyncio.gather(*[client.post(path, content=body, headers={'Content-Type': 'application/json'})
+                                          for path in ('/chat', '/check-input', '/configure', '/configure/stream')
+                                          for body in ('{"messages": [', '["not", "an", "object"]', b'\xff')])
+
+    responses = asyncio.run(post_all())
+    assert [r.status_code for r in responses] == [400] * 12
+    assert all(r.json() == {'success': False, 'error': 'Request body must be a JSON object.'} for r in responses)
+    assert messages.requests == []
+
+
+# ============================================================
+# Flask routes
+# ============================================================
+def test_flask_routes_run_the_same_pipeline(asgi_app):
+    import app as onboarding
+
+    app, messages = asgi_app
+    client = onboarding.app.test_client()
+    chat = client.post('/chat', json={'messages': [{'role': 'user', 'content': 'hi'}]})
+    assert chat.get_json() == {'success': True, 'response': 'What is it called?'}
+    configured = client.post('/configure', json={'description': 'Plumbing company called Pipe Pros'}).get_json()
+    (expected,) = asyncio.run(_post_all(app, [('/configure', {'description': 'Plumbing company called Pipe Pros'})]))
+    expected = expected.json()
+    assert configured.pop('website_data')['pages'] >= 1  # the website varies run to run
+    assert configured == {key: value for key, value in expected.items() if key != 'website_data'}
+
+    streamed = client.post('/configure/stream', json={'description': 'Plumbing company'}).get_data(as_text=True)
+    assert streamed.rstrip().split('\n\n')[-1].startswith('event: done')
+    bad = client.post('/configure', data='{"description":', content_type='application/json')
+    assert (bad.status_code, bad.get_json()) == (400, {'success': False, 'error': 'Request body must be a JSON object.'})
+
+
+def test_other_routes_are_served_by_flask(asgi_app):
+    app, _ = asgi_app
+    transport = httpx.ASGITransport(app=app)
+
+    async def get():
+        async with httpx.AsyncClient(transport=transport, base_url='http://onboarding.test') as client:
+            return await client.get('/cache-stats')
+
+    assert asyncio.run(get()).status_code == 401  # Flask's admin check
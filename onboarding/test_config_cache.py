@@ -0,0 +1,52 @@
+"""Unit tests for the validator-checked, byte-bounded LRU cache."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from config_cache import LRUCache, file_validator
+
+
+def test_hit_miss_and_stale_validator():
+    cache = LRUCache('test', max_bytes=1000)
+    assert cache.get('a', 1) is None
+    cache.put('a', {'x': 1}, 1, 10)
+    assert cache.get('a', 1) == {'x': 1}
+    # Version moved on (another worker wrote) — treated as a miss and dropped
+    assert cache.get('a', 2) is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['stale']) == (1, 2, 1)
+    assert stats['entries'] == 0
+
+
+def test_evicts_least_recently_used_by_bytes():
+    cache = LRUCache('test', max_bytes=100)
+    cache.put('a', 'A', 1, 40)
+    cache.put('b', 'B', 1, 40)
+    cache.get('a', 1)             # a is now most recent
+    cache.put('c', 'C', 1, 40)    # over budget → evict b
+    assert cache.get('b', 1) is None
+    assert cache.get('a', 1) == 'A'
+    assert cache.get('c', 1) == 'C'
+    assert cache.stats()['bytes'] == 80
+    assert cache.stats()['evictions'] == 1
+
+
+def test_oversized_entry_not_cached():
+    cache = LRUCache('test', max_bytes=10)
+    cache.put('big', 'X', 1, 11)
+    assert cache.get('big', 1) is None
+
+
+def test_invalidate_and_file_validator(tmp_path):
+    path = tmp_path / 'w.json'
+    assert file_validator(str(path)) is None
+    path.write_text('{}')
+    validator = file_validator(str(path))
+    assert validator[1] == 2
+
+    cache = LRUCache('test')
+    cache.put('w', {}, validator, 2)
+    cache.invalidate('w')
+    assert cache.get('w', validator) is None
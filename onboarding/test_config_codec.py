@@ -0,0 +1,94 @@
+"""Unit tests for the compact config codec.
+Runs against temp directories — no Flask app or API calls."""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from config_codec import MAGIC, ConfigCodec, benchmark, build_dictionary, template_samples
+from config_store import FileConfigStore, SQLiteConfigStore
+from durable_io import GroupCommitJournal
+
+
+def _config():
+    config = template_samples()[0]
+    config.update({'id': 'abc12345', 'business_name': 'Bella Nails'})
+    return config
+
+
+# ============================================================
+# Encode / decode
+# ============================================================
+def test_roundtrip_and_size(tmp_path):
+    codec = ConfigCodec(str(tmp_path), 'zdict')
+    config = _config()
+    raw = codec.encode(config)
+    assert raw.startswith(MAGIC)
+    assert codec.decode(raw) == config
+    assert len(raw) < len(json.dumps(config, separators=(',', ':'))) / 4
+
+
+def test_plain_json_decodes_with_either_setting(tmp_path):
+    for name in ('json', 'zdict'):
+        codec = ConfigCodec(str(tmp_path), name)
+        assert codec.decode('{"id": "a"}') == {'id': 'a'}
+        assert codec.decode(b'{"id": "a"}') == {'id': 'a'}
+    assert ConfigCodec(str(tmp_path)).encode({'id': 'a'}, indent=2) == '{\n  "id": "a"\n}'
+
+
+def test_retraining_keeps_old_documents_readable(tmp_path):
+    codec = ConfigCodec(str(tmp_path), 'zdict')
+    old = codec.encode(_config())
+    new_id = codec.install_dictionary(build_dictionary([_config()] * 3))
+    new = codec.encode(_config())
+    assert new[len(MAGIC):len(MAGIC) + 8].decode() == new_id != old[len(MAGIC):len(MAGIC) + 8].decode()
+
+    # A fresh worker reads both from the dictionary files on disk
+    reader = ConfigCodec(str(tmp_path))
+    assert reader.decode(old) == reader.decode(new) == _config()
+
+
+def test_dictionary_falls_back_to_ranked_units_for_large_corpora():
+    many = []
+    for i in range(40):
+        for sample in template_samples():
+            many.append(dict(sample, id=f'{i:08d}', business_name=f'Biz {i}'))
+    assert 0 < len(build_dictionary(many)) <= 32 * 1024
+
+
+def test_benchmark_reports_every_format(tmp_path):
+    rows = benchmark(template_samples(), ConfigCodec(str(tmp_path), 'zdict'), rounds=1)
+    sizes = {row['format']: row['avg_bytes'] for row in rows}
+    assert sizes['zlib + dict'] < sizes['zlib (no dict)'] < sizes['json compact'] < sizes['json indent=2']
+
+
+# ============================================================
+# Stores
+# ============================================================
+@pytest.mark.parametrize('backend', ['file', 'sqlite'])
+def test_stores_write_compact_and_read_plain(tmp_path, backend):
+    codec = ConfigCodec(str(tmp_path / 'codec'), 'zdict')
+    if backend == 'file':
+        plain = FileConfigStore(str(tmp_path))
+        store = FileConfigStore(str(tmp_path), codec=codec)
+    else:
+        plain = SQLiteConfigStore(str(tmp_path / 'configs.db'))
+        store = SQLiteConfigStore(str(tmp_path / 'configs.db'), codec=codec)
+
+    plain.put('old', dict(_config(), id='old'))
+    store.put('new', _config())
+    assert store.get('old') == dict(_config(), id='old')
+    assert store.get('new') == _config()
+    assert plain.get('new') == _config()  # any codec setting decodes compact documents
+
+
+def test_binary_documents_replay_from_journal(tmp_path):
+    journal = GroupCommitJournal(str(tmp_path), window_ms=0)
+    journal._append_frame([('write', str(tmp_path / 'a.bin'), b'\x00RPZ\xff')])
+    GroupCommitJournal(str(tmp_path)).recover()
+    with open(tmp_path / 'a.bin', 'rb') as f:
+        assert f.read() == b'\x00RPZ\xff'
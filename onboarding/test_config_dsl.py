@@ -0,0 +1,130 @@
+"""Unit tests for the compact config line format.
+No API calls — model output is written out by hand."""
+
+import json
+import os
+import random
+import re
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from config_dsl import COMPONENTS, ConfigDSLParser, DSLError, parse_config_dsl
+from prompts import ANALYZE_BUSINESS_SYSTEM
+
+OUTPUT = """name: Green Acres
+type: landscaping
+colors: 1B4332 A0AEC0 22C55E E2E8F0 F5F5F5 22c55e FFFFFF 1A1A1A 111827 E5E7EB
+tab: Dashboard | home
+tab: Customers | people
+clients | Customers | p | Estimate, Scheduled, In Progress, Complete
+leads | | p
+tab: Jobs | briefcase
+calendar | Schedule | c
+jobs | Jobs | p | New, In Progress, Complete
+estimates | Estimates | t
+summary: Landscaping crew setup.
+"""
+
+
+# ============================================================
+# Expansion
+# ============================================================
+def test_expands_to_full_config():
+    config = parse_config_dsl(OUTPUT)
+    assert config['business_name'] == 'Green Acres'
+    assert config['business_type'] == 'landscaping'
+    assert config['colors']['sidebar_bg'] == '#1B4332'
+    assert config['colors']['buttons'] == '#22C55E'
+    assert len(config['colors']) == 10
+    assert config['summary'] == 'Landscaping crew setup.'
+    assert config['tabs'][0] == {'id': 'tab_1', 'label': 'Dashboard', 'icon': 'home', 'components': []}
+    assert config['tabs'][1]['components'] == [
+        {'id': 'clients', 'label': 'Customers', 'view': 'pipeline',
+         'stages': ['Estimate', 'Scheduled', 'In Progress', 'Complete']},
+        {'id': 'leads', 'label': 'Leads', 'view': 'pipeline'},
+    ]
+    assert [t['id'] for t in config['tabs']] == ['tab_1', 'tab_2', 'tab_3']
+    assert [c['view'] for c in config['tabs'][2]['components']] == ['calendar', 'pipeline', 'table']
+
+
+def test_is_several_times_shorter_than_json():
+    config = parse_config_dsl(OUTPUT)
+    assert len(json.dumps(config, indent=4)) > 3 * len(OUTPUT)
+
+
+def test_json_output_is_still_accepted():
+    config = {'business_name': 'Crumbs', 'tabs': [{'id': 'tab_1', 'components': []}]}
+    assert parse_config_dsl(json.dumps(config)) == config
+
+
+# ============================================================
+# Validation against the registry
+# ============================================================
+def test_invalid_lines_are_dropped_or_defaulted():
+    parser = ConfigDSLParser()
+    parser.feed("""```
+invoices | Invoices | t
+tab: Work | sparkles
+jobs | Work Orders | x | A, B
+jobs | Again | p
+widgets | |
+flash_designs | Flash | k
+- notes | Notes | l | ignored, stages
+colors: 1B4332 nothex 3B8
+""")
+    config = parser.close()
+    assert config['tabs'][0]['icon'] == 'folder'
+    assert config['tabs'][0]['components'] == [
+        {'id': 'jobs', 'label': 'Work Orders', 'view': 'pipeline', 'stages': ['A', 'B']},
+        {'id': 'flash_designs', 'label': 'Flash', 'view': 'cards'},  # custom entity, fully specified
+        {'id': 'notes', 'label': 'Notes', 'view': 'list'},
+    ]
+    assert config['colors'] == {'sidebar_bg': '#1B4332', 'sidebar_buttons': '#3B8'}
+    assert len(parser.problems) == 6
+
+
+def test_output_without_tabs_is_an_error():
+    with pytest.raises(DSLError):
+        parse_config_dsl('I need more detail about the business first.')
+
+
+def test_prompt_registry_and_examples_match():
+    registry = ANALYZE_BUSINESS_SYSTEM.split('## COMPONENT REGISTRY')[1].split('## AVAILABLE ICONS')[0]
+    assert set(re.findall(r'^- (\w+):', registry, re.M)) <= set(COMPONENTS)
+
+    example = ANALYZE_BUSINESS_SYSTEM.split('Example:\n', 1)[1].split('\n\n')[0]
+    parser = ConfigDSLParser()
+    parser.feed(example)
+    config = parser.close()
+    assert not parser.problems
+    assert config['business_name'] == "Tony's Cuts"
+
+
+# ============================================================
+# Streaming
+# ============================================================
+def test_tabs_stream_as_the_next_one_starts():
+    parser = ConfigDSLParser()
+    assert parser.feed('name: Green Acres\ntab: Dashboard | home\nta') == []
+    assert parser.feed('b: Cust') == [(0, {'id': 'tab_1', 'label': 'Dashboard', 'icon': 'home', 'components': []})]
+    assert parser.feed('omers | people\nclients | | p\n') == []
+    (index, tab), = parser.feed('summary:')
+    assert parser.feed(' done') == []
+    assert (index, tab['label'], tab['components'][0]['label']) == (1, 'Customers', 'Clients')
+    assert parser.close()['summary'] == 'done'
+
+
+def test_any_chunking_gives_the_same_tabs():
+    whole = parse_config_dsl(OUTPUT)
+    rng = random.Random(3)
+    for _ in range(30):
+        parser, streamed, i = ConfigDSLParser(), [], 0
+        while i < len(OUTPUT):
+            size = rng.randint(1, 12)
+            streamed += parser.feed(OUTPUT[i:i + size])
+            i += size
+        assert parser.close() == whole
+        assert [tab for _, tab in streamed] == whole['tabs']
@@ -0,0 +1,142 @@
+"""Unit tests for the sharded CONFIGS_FOLDER layout, migration and packing.
+Runs against temp directories — no Flask app or API calls."""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import config_layout
+import website_store
+from config_store import FileConfigStore, config_etag
+from transcripts import append_messages, load_transcript
+
+
+def _config(config_id):
+    return {'id': config_id, 'created_at': '2026-01-01T10:00:00', 'business_name': f'Biz {config_id}', 'tabs': []}
+
+
+def _write_flat(folder, config_id, config):
+    with open(os.path.join(folder, f'{config_id}.json'), 'w') as f:
+        json.dump(config, f, indent=2)
+    with open(os.path.join(folder, f'{config_id}.etag'), 'w') as f:
+        f.write(config_etag(config))
+
+
+def _age(path, days):
+    old = time.time() - days * 86400
+    os.utime(path, (old, old))
+
+
+# ============================================================
+# Paths
+# ============================================================
+def test_shard_paths_fan_out_two_levels(tmp_path):
+    path = config_layout.sharded_path(str(tmp_path), 'abc12345', 'abc12345.json')
+    top, sub = config_layout.shard_prefix('abc12345')
+    assert path == os.path.join(str(tmp_path), top, sub, 'abc12345.json')
+    assert len(top) == len(sub) == 2
+
+
+def test_config_id_for_filenames():
+    assert config_layout.config_id_for('abc.json') == 'abc'
+    assert config_layout.config_id_for('abc_website.body.gz') == 'abc'
+    assert config_layout.config_id_for('abc.transcript.jsonl') == 'abc'
+    assert config_layout.config_id_for('configs.json') is None
+    assert config_layout.config_id_for('.write.lock') is None
+    assert config_layout.config_id_for('journal.wal') is None
+
+
+# ============================================================
+# Store reads and writes
+# ============================================================
+def test_new_writes_are_sharded_and_flat_configs_still_read(tmp_path):
+    store = FileConfigStore(str(tmp_path))
+    _write_flat(str(tmp_path), 'old', _config('old'))
+    assert store.get('old') == _config('old')
+
+    store.put('new', _config('new'))
+    assert os.path.exists(store.path_for('new'))
+    assert not os.path.exists(tmp_path / 'new.json')
+
+    # Rewriting a flat config moves it into its shard
+    store.put('old', dict(_config('old'), business_name='Renamed'))
+    assert not os.path.exists(tmp_path / 'old.json')
+    assert store.get('old')['business_name'] == 'Renamed'
+    assert {c['id'] for c in store.list_configs()['items']} == {'old', 'new'}
+
+
+# ============================================================
+# Online migration
+# ============================================================
+def test_migrate_moves_every_per_config_file(tmp_path):
+    folder = str(tmp_path)
+    store = FileConfigStore(folder)
+    _write_flat(folder, 'a1', _config('a1'))
+    with open(tmp_path / 'a1.transcript.jsonl', 'w') as f:
+        f.write('{"role":"user","content":"hi"}\n')
+    with open(tmp_path / 'a1_website.json', 'w') as f:
+        json.dump({'pages': []}, f)
+    with open(tmp_path / 'configs.json', 'w') as f:
+        f.write('{}')
+
+    version_before = store.version('a1')
+    assert config_layout.migrate_flat_files(store, log=lambda msg: None) == 4
+
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        [config_layout.shard_prefix('a1')[0], 'configs.json', 'journal.wal', '.write.lock'])
+    assert store.get('a1') == _config('a1')
+    assert store.version('a1') != version_before
+    assert load_transcript(folder, 'a1') == [{'role': 'user', 'content': 'hi'}]
+    assert website_store.legacy_path(folder, 'a1').startswith(config_layout.shard_dir(folder, 'a1'))
+
+
+def test_flat_and_sharded_transcripts_are_concatenated(tmp_path):
+    folder = str(tmp_path)
+    with open(tmp_path / 'a1.transcript.jsonl', 'w') as f:
+        f.write('{"role":"user","content":"first"}\n')
+    pointer = append_messages(folder, 'a1', [{'role': 'assistant', 'content': 'second'}])
+    assert pointer['message_count'] == 2
+    assert [m['content'] for m in load_transcript(folder, 'a1')] == ['first', 'second']
+
+
+# ============================================================
+# Cold packing
+# ============================================================
+def test_pack_cold_configs_and_read_back(tmp_path):
+    store = FileConfigStore(str(tmp_path))
+    for config_id in ('c1', 'c2', 'hot'):
+        store.put(config_id, _config(config_id))
+    for config_id in ('c1', 'c2'):
+        _age(store.path_for(config_id), 60)
+
+    assert config_layout.pack_cold_configs(store, cold_days=30, log=lambda msg: None) == 2
+    assert not os.path.exists(store.path_for('c1'))
+    assert os.path.exists(store.path_for('hot'))
+
+    assert store.get('c1') == _config('c1')
+    assert store.etag('c1') == config_etag(_config('c1'))
+    assert {c['id'] for c in store.list_configs()['items']} == {'c1', 'c2', 'hot'}
+
+    # A write shadows the packed copy
+    store.put('c1', dict(_config('c1'), business_name='Warm again'))
+    assert store.get('c1')['business_name'] == 'Warm again'
+
+
+def test_repack_drops_shadowed_entries(tmp_path):
+    store = FileConfigStore(str(tmp_path))
+    store.put('c1', _config('c1'))
+    _age(store.path_for('c1'), 60)
+    config_layout.pack_cold_configs(store, cold_days=30, log=lambda msg: None)
+
+    store.put('c1', dict(_config('c1'), business_name='Newer'))
+    _age(store.path_for('c1'), 60)
+    config_layout.pack_cold_configs(store, cold_days=30, log=lambda msg: None)
+
+    pack_dir = os.path.join(str(tmp_path), config_layout.shard_prefix('c1')[0])
+    index = config_layout.read_pack_index(pack_dir)
+    assert index['generation'] == 2
+    assert [n for n in os.listdir(pack_dir) if n.endswith('.seg')] == ['pack-2.seg']
+    assert store.get('c1')['business_name'] == 'Newer'
@@ -0,0 +1,184 @@
+"""Unit tests for the config store backends (file + SQLite).
+Runs against temp directories — no Flask app or API calls."""
+
+import json
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from config_store import FileConfigStore, SQLiteConfigStore, VersionConflict, config_etag
+
+
+def _config(config_id, business_type, created_at, owner_id=None):
+    return {
+        'id': config_id,
+        'created_at': created_at,
+        'business_name': f'Biz {config_id}',
+        'business_type': business_type,
+        'owner_id': owner_id,
+        'tabs': [{'id': 'tab_1', 'label': 'Dashboard', 'icon': 'home', 'components': []}],
+    }
+
+
+@pytest.fixture(params=['file', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'file':
+        return FileConfigStore(str(tmp_path))
+    return SQLiteConfigStore(str(tmp_path / 'configs.db'))
+
+
+# ============================================================
+# Primary-key round trip
+# ============================================================
+def test_put_get_roundtrip(store):
+    config = _config('a1', 'nail_salon', '2026-01-01T10:00:00')
+    store.put('a1', config)
+    assert store.get('a1') == config
+    assert store.get('missing') is None
+
+
+# ============================================================
+# Listing — filters, ordering and cursor pagination
+# ============================================================
+def test_list_filters_and_pagination(store):
+    for i in range(5):
+        store.put(f'n{i}', _config(f'n{i}', 'nail_salon', f'2026-01-0{i + 1}T00:00:00'))
+    store.put('b0', _config('b0', 'barbershop', '2026-01-03T12:00:00', owner_id='user_1'))
+
+    page = store.list_configs(business_type='nail_salon', limit=2)
+    assert [c['id'] for c in page['items']] == ['n4', 'n3']
+    assert page['next_cursor']
+
+    page2 = store.list_configs(business_type='nail_salon', limit=2, cursor=page['next_cursor'])
+    assert [c['id'] for c in page2['items']] == ['n2', 'n1']
+
+    page3 = store.list_configs(business_type='nail_salon', limit=2, cursor=page2['next_cursor'])
+    assert [c['id'] for c in page3['items']] == ['n0']
+    assert page3['next_cursor'] is None
+
+    owned = store.list_configs(owner_id='user_1')
+    assert [c['id'] for c in owned['items']] == ['b0']
+
+    recent = store.list_configs(created_after='2026-01-03T00:00:00')
+    assert {c['id'] for c in recent['items']} == {'n2', 'n3', 'n4', 'b0'}
+
+
+def test_list_rejects_bad_cursor(store):
+    with pytest.raises(ValueError):
+        store.list_configs(cursor='not-a-cursor')
+
+
+def test_set_owner(store):
+    store.put('c1', _config('c1', 'spa', '2026-02-01T00:00:00'))
+    assert store.set_owner('c1', 'user_9') is True
+    assert store.get('c1')['owner_id'] == 'user_9'
+    assert store.set_owner('missing', 'user_9') is False
+
+
+# ============================================================
+# SQLite lazily imports legacy one-file-per-config documents
+# ============================================================
+def test_sqlite_reads_through_legacy_files(tmp_path):
+    legacy = _config('old1', 'barbershop', '2025-12-01T00:00:00')
+    with open(tmp_path / 'old1.json', 'w') as f:
+        json.dump(legacy, f, indent=2)
+
+    store = SQLiteConfigStore(str(tmp_path / 'configs.db'), legacy_folder=str(tmp_path))
+    assert store.get('old1') == legacy
+    # Now indexed in the database
+    assert [c['id'] for c in store.list_configs(business_type='barbershop')['items']] == ['old1']
+
+
+# ============================================================
+# Versions change on every write (cache validation token)
+# ============================================================
+def test_version_changes_on_write(store):
+    assert store.version('v1') is None
+    config = _config('v1', 'spa', '2026-03-01T00:00:00')
+    store.put('v1', config)
+    first = store.version('v1')
+    loaded, version, size = store.get_versioned('v1')
+    assert loaded == config and version == first and size > 0
+
+    config['business_name'] = 'Renamed Spa and Wellness'
+    store.put('v1', config)
+    assert store.version('v1') != first
+
+
+# ============================================================
+# Delta records — applied on read, compacted into the base
+# ============================================================
+def test_append_delta_and_compact(store):
+    config = _config('d1', 'spa', '2026-03-01T00:00:00')
+    store.put('d1', config)
+
+    rename = {'kind': 'merge-patch', 'patch': {'business_name': 'Calm Spa'}}
+    version = store.version('d1')
+    assert store.append_delta('d1', rename, version, dict(config, business_name='Calm Spa')) == 1
+    assert store.get('d1')['business_name'] == 'Calm Spa'
+    assert store.list_configs()['items'][0]['business_name'] == 'Calm Spa'
+
+    # Stale version → conflict, nothing appended
+    with pytest.raises(VersionConflict):
+        store.append_delta('d1', rename, version, config)
+
+    relabel = {'kind': 'json-patch', 'patch': [{'op': 'replace', 'path': '/tabs/0/label', 'value': 'Home'}]}
+    assert store.append_delta('d1', relabel, store.version('d1'), config) == 2
+
+    store.compact('d1')
+    compacted = store.get('d1')
+    assert compacted['business_name'] == 'Calm Spa'
+    assert compacted['tabs'][0]['label'] == 'Home'
+    # Deltas are gone: the next append starts a fresh log
+    assert store.append_delta('d1', rename, store.version('d1'), compacted) == 1
+
+
+def test_concurrent_patches_in_one_group_commit(tmp_path):
+    # Both land in one 50ms batch with the same expected version: one wins, the other conflicts
+    store = FileConfigStore(str(tmp_path), group_commit_ms=50)
+    config = _config('c1', 'spa', '2026-03-01T00:00:00')
+    store.put('c1', config)
+    version = store.version('c1')
+    results = {}
+
+    def patch(key):
+        delta = {'kind': 'merge-patch', 'patch': {key: 1}}
+        try:
+            results[key] = store.append_delta('c1', delta, version, dict(config, **{key: 1}))
+        except VersionConflict:
+            results[key] = 'conflict'
+
+    threads = [threading.Thread(target=patch, args=(key,)) for key in ('x', 'y')]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(results.values(), key=str) == [1, 'conflict']
+    (winner,) = [key for key, result in results.items() if result == 1]
+    stored = store.get('c1')
+    assert stored[winner] == 1
+    assert ('x' in stored) != ('y' in stored)
+
+
+# ============================================================
+# ETags are recorded at write time and track content, not layout
+# ============================================================
+def test_etag_recorded_on_write(store):
+    assert store.etag('e1') is None
+    config = _config('e1', 'spa', '2026-03-01T00:00:00')
+    store.put('e1', config)
+    first = store.etag('e1')
+    assert first == config_etag(config)
+
+    patched = dict(config, business_name='New Name')
+    store.append_delta('e1', {'kind': 'merge-patch', 'patch': {'business_name': 'New Name'}},
+                       store.version('e1'), patched)
+    assert store.etag('e1') == config_etag(patched) != first
+
+    store.compact('e1')
+    assert store.etag('e1') == config_etag(patched)
@@ -0,0 +1,98 @@
+"""Unit tests for chat fact extraction and compaction — no API calls."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from conversation import chat_facts, compact_chat, configure_description
+from prompts import CHAT_SYSTEM_PROMPT, chat_request
+from templates.registry import detect_template_type
+
+CHAT = [
+    {'role': 'user', 'content': 'Hey, I want to set up my barbershop'},
+    {'role': 'assistant', 'content': "Nice! What's the business called?"},
+    {'role': 'user', 'content': 'Kings Cuts'},
+    {'role': 'assistant', 'content': 'Cool — so what kind of services do you offer there?'},
+    {'role': 'user', 'content': 'cuts, fades, beard trims'},
+    {'role': 'assistant', 'content': 'And who are your typical customers? Families, individuals, businesses?'},
+    {'role': 'user', 'content': 'guys in the neighborhood, some kids'},
+    {'role': 'assistant', 'content': 'Got it. Is it just you running things, or do you have a team?'},
+    {'role': 'user', 'content': 'me and two other barbers'},
+    {'role': 'assistant', 'content': 'Do your clients go through any kind of stages or progression?'},
+    {'role': 'user', 'content': 'walk-in, regular, VIP'},
+    {'role': 'assistant', 'content': 'Love it. Anything else you want the system to handle?'},
+    {'role': 'user', 'content': 'gift cards maybe'},
+]
+
+
+# ============================================================
+# Facts
+# ============================================================
+def test_facts_follow_the_questions():
+    assert chat_facts(CHAT) == {
+        'opening': 'Hey, I want to set up my barbershop',
+        'name': 'Kings Cuts',
+        'services': 'cuts, fades, beard trims',
+        'customers': 'guys in the neighborhood, some kids',
+        'team': 'me and two other barbers',
+        'stages': 'walk-in, regular, VIP',
+        'other': 'gift cards maybe',
+    }
+
+
+def test_name_from_a_longer_reply():
+    facts = chat_facts([
+        {'role': 'user', 'content': 'I do nails from home'},
+        {'role': 'assistant', 'content': "What's the name of the business?"},
+        {'role': 'user', 'content': "It's called Gloss Box, been running it two years now"},
+    ])
+    assert facts['name'] == 'Gloss Box'
+
+
+def test_configure_description_adds_labelled_facts():
+    description = configure_description('my barbershop', CHAT)
+    assert description.startswith('my barbershop\n\nFrom the chat:\n- Business name: "Kings Cuts"\n')
+    assert '- Team: me and two other barbers' in description
+    assert configure_description('my barbershop', []) == 'my barbershop'
+    assert detect_template_type(description) == ('barbershop', 'beauty_body')
+
+
+# ============================================================
+# Compaction
+# ============================================================
+def test_short_chats_are_sent_whole():
+    assert compact_chat(CHAT[:7]) == (None, CHAT[:7])
+    request = chat_request(CHAT[:3])
+    assert request['messages'] == CHAT[:3]
+    assert request['system'][0]['text'] == CHAT_SYSTEM_PROMPT
+    assert request['system'][0]['cache_control'] == {'type': 'ephemeral'}
+
+
+def test_long_chats_keep_a_bounded_tail():
+    for count in range(9, len(CHAT) + 1, 2):
+        summary, recent = compact_chat(CHAT[:count])
+        assert summary is not None
+        assert 4 <= len(recent) <= 6
+        assert recent == CHAT[count - len(recent):count]
+        assert recent[0]['role'] == 'assistant'
+
+
+def test_summary_carries_the_older_facts():
+    summary, recent = compact_chat(CHAT[:9])
+    assert 'Business name: "Kings Cuts"' in summary
+    assert 'Services: cuts, fades, beard trims' in summary
+    assert 'Questions you asked before the messages below: 2' in summary
+    assert 'Not covered before the messages below: Customers, Team, Biggest headache, Stages' in summary
+
+    messages = chat_request(CHAT[:9])['messages']
+    assert messages[0]['role'] == 'user'
+    assert messages[0]['content'][0]['cache_control'] == {'type': 'ephemeral'}
+    assert [m['role'] for m in messages] == ['user', 'assistant', 'user', 'assistant', 'user']
+
+
+def test_summary_is_stable_for_two_turns():
+    # The cached prefix only changes every second exchange
+    first, _ = compact_chat(CHAT[:9])
+    assert compact_chat(CHAT[:11])[0] == first
+    assert compact_chat(CHAT[:13])[0] != first
@@ -0,0 +1,113 @@
+"""Tests for the pre-generated website-copy corpus. Batches run against the
+local Messages API stand-in — no API calls."""
+
+import asyncio
+import json
+import os
+import sys
+
+import anthropic
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from copy_corpus import CopyCorpus, batch_requests, check_copy, corpus_description, pick_variant, run_batch
+from fake_llm import FakeLLM, create_app
+from prompts import FAST_MODEL, PROMPT_VERSIONS
+from website_copy import NAME_PLACEHOLDER
+
+
+def _copy(headline):
+    return {
+        'hero_headline': headline, 'hero_subheadline': f'{NAME_PLACEHOLDER} fixes leaks fast.',
+        'hero_cta': 'Book Now', 'about_title': f'About {NAME_PLACEHOLDER}', 'about_text': 'We show up on time.',
+        'features_title': 'Why us', 'features': ['Licensed', 'Insured', f'{NAME_PLACEHOLDER} guarantees it'],
+        'cta_headline': 'Dripping tap?', 'cta_text': 'Call today.', 'cta_button': 'Get a Quote',
+    }
+
+
+def _client(fake):
+    transport = httpx.ASGITransport(app=create_app(fake))
+    return anthropic.AsyncAnthropic(api_key='fake', base_url='http://fake.test', max_retries=0,
+                                    http_client=httpx.AsyncClient(transport=transport))
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    return CopyCorpus(str(tmp_path / 'copy_corpus.db'))
+
+
+# ============================================================
+# Lookups
+# ============================================================
+def test_lookup_personalizes_the_matching_variant(corpus):
+    corpus.add('plumbing', 'warm', _copy('Your neighbourhood plumber'), FAST_MODEL)
+    corpus.add('plumbing', 'premium', _copy('Plumbing, done beautifully'), FAST_MODEL)
+    corpus.add('plumbing', 'practical', _copy('Fixed today, fairly priced'), FAST_MODEL)
+
+    copy = corpus.lookup('Pipe Pros', 'plumbing', 'Affordable emergency plumbing called Pipe Pros')
+    assert copy['hero_headline'] == 'Fixed today, fairly priced'
+    assert copy['about_title'] == 'About Pipe Pros'
+    assert copy['features'][2] == 'Pipe Pros guarantees it'
+    assert NAME_PLACEHOLDER not in json.dumps(copy)
+    assert corpus.lookup('Drip', 'plumbing', 'Upscale boutique plumbing')['hero_headline'] == 'Plumbing, done beautifully'
+
+
+def test_untoned_descriptions_get_a_stable_variant():
+    variants = ['practical', 'premium', 'warm']
+    picks = {pick_variant(variants, f'Plumbing company number {i}') for i in range(30)}
+    assert picks == set(variants)
+    assert pick_variant(variants, 'Plumbing company!') == pick_variant(variants, 'plumbing  company')
+
+
+def test_misses(corpus):
+    assert corpus.lookup('Pipe Pros', 'plumbing', 'Plumbing company') is None
+    assert not os.path.exists(corpus.db_path)
+
+    corpus.add('plumbing', 'warm', _copy('Old prompt'), FAST_MODEL, prompt_version=PROMPT_VERSIONS['website_copy'] - 1)
+    assert corpus.lookup('Pipe Pros', 'plumbing', 'Plumbing company') is None
+    assert corpus.lookup('Pipe Pros', None, 'Plumbing company') is None
+    corpus.add('plumbing', 'warm', _copy('Current prompt'), FAST_MODEL)
+    assert corpus.lookup('Pipe Pros', 'bakery', 'Bakery') is None
+    assert CopyCorpus(corpus.db_path, enabled=False).lookup('Pipe Pros', 'plumbing', 'Plumbing') is None
+
+    stats = corpus.stats()
+    assert (stats['entries'], stats['hits'], stats['misses']) == (1, 0, 3)
+
+
+def test_incomplete_copy_is_rejected():
+    assert check_copy(_copy('Hi'))
+    with pytest.raises(ValueError):
+        check_copy({**_copy('Hi'), 'cta_button': ''})
+    with pytest.raises(ValueError):
+        check_copy({**_copy('Hi'), 'features': 'Licensed'})
+    with pytest.raises(ValueError):
+        check_copy(json.loads(json.dumps(_copy('Hi')).replace(NAME_PLACEHOLDER, 'Pipe Pros')))
+    with pytest.raises(ValueError):
+        check_copy({**_copy('Hi'), 'cta_text': 'Visit us in [[CITY]]'})
+
+
+# ============================================================
+# Batch generation
+# ============================================================
+def test_batch_fills_the_corpus(corpus):
+    requests = batch_requests([('plumbing', 'warm'), ('plumbing', 'premium'), ('bakery', 'warm')], FAST_MODEL)
+    assert requests[0]['custom_id'] == 'plumbing--warm'
+    assert corpus_description('plumbing', 'warm') in requests[0]['params']['messages'][0]['content']
+
+    fake = FakeLLM(time_scale=0)
+    assert asyncio.run(run_batch(_client(fake), corpus, requests, poll_seconds=0)) == (3, 0)
+    assert fake.stats()[FAST_MODEL]['requests'] == 3
+    assert sorted(corpus.variants('plumbing')) == ['premium', 'warm']
+    assert corpus.lookup('Pipe Pros', 'plumbing', 'Plumbing company')['hero_headline'] == 'Welcome to Pipe Pros'
+
+
+def test_failed_and_unusable_results_are_skipped(corpus):
+    requests = batch_requests([('plumbing', 'warm'), ('bakery', 'warm')], FAST_MODEL)
+    broken = FakeLLM({'': {'error_rate': 1.0}}, time_scale=0)
+    assert asyncio.run(run_batch(_client(broken), corpus, requests, poll_seconds=0)) == (0, 2)
+
+    malformed = FakeLLM({'': {'malformed_rate': 1.0}}, seed=2, time_scale=0)
+    assert asyncio.run(run_batch(_client(malformed), corpus, requests, poll_seconds=0)) == (0, 2)
+    assert corpus.variants('plumbing') == {}
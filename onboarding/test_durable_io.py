@@ -0,0 +1,154 @@
+"""Unit tests for atomic writes and the group-commit journal.
+Runs against temp directories — no Flask app or API calls."""
+
+import json
+import os
+import sys
+import threading
+import time
+import zlib
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from durable_io import (
+    GroupCommitJournal, LatencyHistogram, atomic_write, JOURNAL_NAME, _FRAME_HEADER,
+)
+
+
+# ============================================================
+# atomic_write
+# ============================================================
+def test_atomic_write_replaces_and_leaves_no_temp_files(tmp_path):
+    path = str(tmp_path / 'a.json')
+    atomic_write(path, '{"v": 1}')
+    atomic_write(path, b'{"v": 2}', durable=False)
+    with open(path) as f:
+        assert json.load(f) == {'v': 2}
+    assert os.listdir(tmp_path) == ['a.json']
+
+
+# ============================================================
+# Group commit
+# ============================================================
+@pytest.mark.parametrize('mode', ['full', 'relaxed', 'off'])
+def test_commit_materializes_files(tmp_path, mode):
+    journal = GroupCommitJournal(str(tmp_path), mode=mode, window_ms=0)
+    target = str(tmp_path / 'x.json')
+    journal.commit([('write', target, 'hello')])
+    with open(target) as f:
+        assert f.read() == 'hello'
+    journal.commit([('delete', target)])
+    assert not os.path.exists(target)
+
+
+def test_concurrent_commits_share_fsyncs(tmp_path):
+    journal = GroupCommitJournal(str(tmp_path), mode='full', window_ms=20)
+    threads = [
+        threading.Thread(target=journal.commit, args=([('write', str(tmp_path / f'{i}.json'), str(i))],))
+        for i in range(16)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for i in range(16):
+        with open(tmp_path / f'{i}.json') as f:
+            assert f.read() == str(i)
+    stats = journal.stats()
+    assert stats['commit_latency_ms']['count'] == 16
+    assert stats['fsyncs'] < 16
+
+
+def test_failed_precondition_rejects_only_that_commit(tmp_path):
+    journal = GroupCommitJournal(str(tmp_path), window_ms=0)
+
+    def conflict():
+        raise ValueError('moved')
+
+    with pytest.raises(ValueError):
+        journal.commit([('write', str(tmp_path / 'a.json'), 'a')], precondition=conflict)
+    journal.commit([('write', str(tmp_path / 'b.json'), 'b')])
+    assert not os.path.exists(tmp_path / 'a.json')
+    assert os.path.exists(tmp_path / 'b.json')
+
+
+# ============================================================
+# Crash recovery
+# ============================================================
+def _frame(ops):
+    payload = json.dumps(ops).encode('utf-8')
+    return _FRAME_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def test_recover_replays_complete_frames_and_drops_torn_tail(tmp_path):
+    # Simulate a crash after the journal fsync but before materialization
+    with open(tmp_path / JOURNAL_NAME, 'wb') as f:
+        f.write(_frame([['write', 'a.json', 'first']]))
+        f.write(_frame([['write', 'a.json', 'second'], ['write', 'b.json', 'b']]))
+        f.write(_frame([['write', 'c.json', 'torn']])[:-3])
+
+    journal = GroupCommitJournal(str(tmp_path))
+    journal.recover()
+
+    with open(tmp_path / 'a.json') as f:
+        assert f.read() == 'second'
+    assert os.path.exists(tmp_path / 'b.json')
+    assert not os.path.exists(tmp_path / 'c.json')
+    assert os.path.getsize(tmp_path / JOURNAL_NAME) == 0
+
+
+def test_relaxed_mode_checkpoints_after_sync_seconds(tmp_path):
+    journal = GroupCommitJournal(str(tmp_path), mode='relaxed', window_ms=0, sync_seconds=0.1)
+    journal.commit([('write', str(tmp_path / 'a.json'), 'a')])
+    assert os.path.getsize(tmp_path / JOURNAL_NAME) > 0
+    assert journal.fsyncs == 0
+    deadline = time.monotonic() + 2
+    while journal.checkpoints == 0 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert journal.checkpoints == 1  # no further writes needed
+    assert os.path.getsize(tmp_path / JOURNAL_NAME) == 0
+
+
+def test_append_after_another_workers_torn_frame(tmp_path):
+    journal = GroupCommitJournal(str(tmp_path), window_ms=0)
+    journal.commit([('write', str(tmp_path / 'a.json'), 'a')])
+    # Another worker crashed mid-append
+    with open(tmp_path / JOURNAL_NAME, 'ab') as f:
+        f.write(_frame([['write', 'torn.json', 'torn']])[:-3])
+    journal.commit([('write', str(tmp_path / 'b.json'), 'b')])
+
+    frames, good_end = journal._read_frames()
+    assert [frame[0][1] for frame in frames] == ['a.json', 'b.json']
+    assert good_end == os.path.getsize(tmp_path / JOURNAL_NAME)
+
+    # A restart replays both frames
+    os.remove(tmp_path / 'b.json')
+    GroupCommitJournal(str(tmp_path)).recover()
+    with open(tmp_path / 'b.json') as f:
+        assert f.read() == 'b'
+
+
+def test_checkpoint_truncates_journal(tmp_path):
+    journal = GroupCommitJournal(str(tmp_path), window_ms=0, checkpoint_bytes=1)
+    journal.commit([('write', str(tmp_path / 'a.json'), 'a')])
+    assert journal.checkpoints == 1
+    assert os.path.getsize(tmp_path / JOURNAL_NAME) == 0
+
+
+# ============================================================
+# Histogram
+# ============================================================
+def test_latency_histogram_percentiles():
+    hist = LatencyHistogram(buckets=(1, 10, 100))
+    for ms in [0.5] * 90 + [50] * 9 + [5000]:
+        hist.observe(ms)
+    snap = hist.snapshot()
+    assert snap['count'] == 100
+    assert snap['p50'] == 1
+    assert snap['p95'] == 100
+    assert snap['p99'] == 100
+    assert hist.percentile(100) == 5000
+    assert snap['buckets']['le_inf'] == 1
@@ -0,0 +1,139 @@
+"""Tests for the local Messages API stand-in, through the real SDK over an
+in-process transport — no API calls."""
+
+import asyncio
+import json
+import os
+import sys
+
+import anthropic
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from config_dsl import parse_config_dsl
+from copy_corpus import check_copy
+from fake_llm import FakeLLM, create_app, reply_for
+from json_repair import extract_json
+from prompts import (CONFIG_MODEL, FAST_MODEL, analyze_business_request, chat_request, check_input_request,
+                     is_detailed, template_request, website_copy_request)
+from templates.registry import detect_template_type, get_template
+from website_copy import NAME_PLACEHOLDER
+
+
+def _client(fake):
+    transport = httpx.ASGITransport(app=create_app(fake))
+    return anthropic.AsyncAnthropic(api_key='fake', base_url='http://fake.test', max_retries=0,
+                                    http_client=httpx.AsyncClient(transport=transport))
+
+
+def _create(fake, model=FAST_MODEL, max_tokens=800, **request):
+    async def create():
+        return await _client(fake).messages.create(model=model, max_tokens=max_tokens, **request)
+    return asyncio.run(create())
+
+
+# ============================================================
+# Replies
+# ============================================================
+def test_config_replies_parse():
+    text, structured = reply_for(analyze_business_request('Plumbing company called Pipe Pros'))
+    config = parse_config_dsl(text)
+    assert structured
+    assert config['business_name'] == 'Pipe Pros'
+    assert [tab['label'] for tab in config['tabs']] == ['Dashboard', 'Clients', 'Schedule', 'Billing']
+
+    barber = parse_config_dsl(reply_for(analyze_business_request('Barbershop called Kings Cuts'))[0])
+    assert barber['business_type'] == 'barbershop'
+    assert 'Gallery' in [tab['label'] for tab in barber['tabs']]
+
+
+def test_template_reply_customizes_the_sent_template():
+    template, _ = get_template(*detect_template_type('barbershop'))
+    text, _ = reply_for(template_request('Solo barber called Fade Factory', template, 'barbershop'))
+    config = json.loads(text)
+    assert config['business_name'] == 'Fade Factory'
+    assert 'Barbers' not in [tab['label'] for tab in config['tabs']]
+
+
+def test_copy_check_and_chat_replies():
+    copy, repairs = extract_json(reply_for(website_copy_request('Pipe Pros', 'plumbing', 'Plumbing company'))[0])
+    assert 'Pipe Pros' in copy['hero_headline']
+    assert repairs == []
+    check_copy(extract_json(reply_for(website_copy_request(NAME_PLACEHOLDER, 'plumbing', 'Plumbing company'))[0])[0])
+    assert not is_detailed(reply_for(check_input_request('barber'))[0])
+
+    chat = [{'role': 'user', 'content': 'I run a barbershop'}]
+    assert reply_for(chat_request(chat)) == ("Nice! What's the business called?", False)
+    for i in range(10):
+        chat.append({'role': 'assistant' if i % 2 == 0 else 'user', 'content': f'turn {i}'})
+    assert reply_for(chat_request(chat))[0] == 'READY_TO_BUILD'
+
+
+# ============================================================
+# Messages API
+# ============================================================
+def test_create_and_stream_through_the_sdk():
+    fake = FakeLLM(seed=1, time_scale=0)
+    request = website_copy_request('Pipe Pros', 'plumbing', 'Plumbing company')
+    message = _create(fake, **request)
+    assert extract_json(message.content[0].text)[0]['hero_cta'] == 'Book Now'
+    assert message.stop_reason == 'end_turn'
+
+    async def stream():
+        async with _client(fake).messages.stream(
+                model=CONFIG_MODEL, max_tokens=4096, **analyze_business_request('Plumbing company')) as s:
+            chunks = [chunk async for chunk in s.text_stream]
+            return chunks, await s.get_final_message()
+
+    chunks, final = asyncio.run(stream())
+    assert len(chunks) > 10
+    assert parse_config_dsl(''.join(chunks))['business_type'] == 'other'
+    assert final.usage.output_tokens == fake.stats()[CONFIG_MODEL]['output_tokens']
+
+
+def test_cached_blocks_are_written_then_read():
+    fake = FakeLLM(time_scale=0)
+    first = _create(fake, max_tokens=4096, **analyze_business_request('Plumbing company'))
+    second = _create(fake, max_tokens=4096, **analyze_business_request('Bakery'))
+    assert first.usage.cache_creation_input_tokens > 1000
+    assert second.usage.cache_read_input_tokens == first.usage.cache_creation_input_tokens
+    assert second.usage.cache_creation_input_tokens == 0
+
+
+def test_max_tokens_truncates():
+    message = _create(FakeLLM(time_scale=0), max_tokens=20, **website_copy_request('Pipe Pros', None, 'Plumbing'))
+    assert message.stop_reason == 'max_tokens'
+    assert message.usage.output_tokens == 20
+
+
+# ============================================================
+# Profiles
+# ============================================================
+def test_error_and_malformed_rates():
+    broken = FakeLLM({'': {'error_rate': 1.0}}, time_scale=0)
+    with pytest.raises(anthropic.APIStatusError) as raised:
+        _create(broken, **check_input_request('barber'))
+    assert raised.value.status_code == 529
+    assert broken.stats()[FAST_MODEL] == {'requests': 1, 'errors': 1, 'malformed': 0, 'output_tokens': 0}
+
+    malformed = FakeLLM({'claude-haiku': {'malformed_rate': 1.0}}, seed=3, time_scale=0)
+    message = _create(malformed, **website_copy_request('Pipe Pros', 'plumbing', 'Plumbing company'))
+    with pytest.raises(ValueError):
+        extract_json(message.content[0].text)
+    assert _create(malformed, max_tokens=10, **check_input_request('barber')).content[0].text == 'VAGUE'
+
+
+def test_profiles_match_the_longest_prefix():
+    fake = FakeLLM({'claude-sonnet-4': {'ttft': 3.0}})
+    assert fake.profile('claude-sonnet-4-20250514')['ttft'] == 3.0
+    assert fake.profile('claude-sonnet-3')['ttft'] == 1.2
+    assert fake.profile('other-model')['tokens_per_second'] == 80
+
+
+def test_latency_follows_the_profile():
+    fake = FakeLLM({'': {'ttft': 0.05, 'ttft_spread': 0, 'tokens_per_second': 1000, 'tps_spread': 0}})
+    _, message, ttft, per_token = fake.plan({'model': 'm', 'max_tokens': 800, **check_input_request('barber')})
+    assert (ttft, per_token) == (0.05, 0.001)
+    assert message['content'][0]['text'] == 'VAGUE'
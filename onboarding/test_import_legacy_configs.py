@@ -0,0 +1,90 @@
+"""Unit tests for the streaming legacy configs.json importer."""
+
+import io
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import import_legacy_configs as importer
+from config_store import SQLiteConfigStore
+from transcripts import load_transcript
+
+LEGACY = {
+    '624bc02f': {
+        'id': '624bc02f',
+        'created_at': '2026-01-29T22:04:39.606107',
+        'business_name': 'The Boys Mechanic Shop',
+        'business_type': 'service',
+        'modules_needed': ['crm', 'sale_management', 'calendar'],
+        'labels': {'contacts': 'Customers', 'calendar': 'Appointments'},
+        'sample_contacts': [{'name': 'Mike Johnson', 'email': 'mike.johnson@email.com'}],
+        'summary': 'Mobile auto mechanic.',
+        'conversation_history': [{'role': 'user', 'content': 'mechanic'}],
+    },
+}
+
+
+def _legacy_file(tmp_path, count):
+    records = {}
+    for i in range(count):
+        record = json.loads(json.dumps(LEGACY['624bc02f']))
+        record['id'] = f'id{i:04d}'
+        record['business_name'] = f'Café Ñandú {i}'  # multi-byte chars across chunk edges
+        records[record['id']] = record
+    path = tmp_path / 'configs.json'
+    path.write_text(json.dumps(records, indent=2, ensure_ascii=False), encoding='utf-8')
+    return path, records
+
+
+def test_streaming_parser_small_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(importer, 'CHUNK_SIZE', 7)
+    path, records = _legacy_file(tmp_path, 25)
+    with open(path, 'rb') as f:
+        parsed = {key: value for key, value, _ in importer.iter_legacy_records(f)}
+    assert parsed == records
+
+
+def test_parser_resumes_from_yielded_offset(tmp_path):
+    path, records = _legacy_file(tmp_path, 5)
+    with open(path, 'rb') as f:
+        offsets = [(key, end) for key, _, end in importer.iter_legacy_records(f)]
+        resumed = [key for key, _, _ in importer.iter_legacy_records(f, offsets[1][1])]
+    assert resumed == [key for key, _ in offsets[2:]]
+    assert list(importer.iter_legacy_records(io.BytesIO(b' { } '))) == []
+
+
+def test_upgrade_legacy_record():
+    config, history = importer.upgrade_legacy_record('624bc02f', LEGACY['624bc02f'])
+    labels = [t['label'] for t in config['tabs']]
+    assert labels == ['Dashboard', 'Customers', 'Sales', 'Appointments']
+    clients = config['tabs'][1]['components'][0]
+    assert clients == {'id': 'clients', 'label': 'Customers', 'view': 'pipeline'}
+    assert config['tabs'][3]['components'][0]['label'] == 'Appointments'
+    assert 'modules_needed' not in config and 'sample_contacts' not in config
+    assert history == LEGACY['624bc02f']['conversation_history']
+
+
+def test_import_batches_checkpoint_and_resume(tmp_path):
+    path, records = _legacy_file(tmp_path, 12)
+    store = SQLiteConfigStore(str(tmp_path / 'configs.db'))
+    checkpoint = str(tmp_path / 'checkpoint.json')
+
+    state = importer.import_legacy_configs(str(path), store, str(tmp_path), batch_size=5,
+                                           checkpoint_path=checkpoint, log=lambda msg: None)
+    assert state['imported'] == 12
+    assert store.get('id0007')['business_name'] == 'Café Ñandú 7'
+    assert store.get('id0007')['transcript']['message_count'] == 1
+
+    # Re-running from the finished checkpoint is a no-op
+    state = importer.import_legacy_configs(str(path), store, str(tmp_path), batch_size=5,
+                                           checkpoint_path=checkpoint, log=lambda msg: None)
+    assert state['imported'] == 12
+
+    # Restarting from scratch skips what's already there and keeps transcripts single
+    os.remove(checkpoint)
+    state = importer.import_legacy_configs(str(path), store, str(tmp_path), batch_size=5,
+                                           checkpoint_path=checkpoint, log=lambda msg: None)
+    assert state['skipped'] == 12
+    assert len(load_transcript(str(tmp_path), 'id0003')) == 1
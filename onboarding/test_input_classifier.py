@@ -0,0 +1,64 @@
+"""Unit tests for the local /check-input pre-classifier — no API calls."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from input_classifier import InputClassifierStats, classify_input, input_elements
+
+DETAILED = (
+    "Green Acres Landscaping is my company. We offer lawn care and tree trimming for homeowners in Austin. "
+    "It's me and 3 employees. Customers call for quotes and we invoice monthly."
+)
+
+
+# ============================================================
+# Elements
+# ============================================================
+def test_finds_all_five_elements():
+    assert input_elements(DETAILED) == dict.fromkeys(('name', 'services', 'customers', 'team', 'workflow'), True)
+
+
+def test_name_needs_more_than_a_capitalised_sentence_start():
+    assert not input_elements('We run a bakery. It is busy.')['name']
+    assert input_elements('We run Crumbs & Co in town')['name']
+    assert input_elements('a bakery called crumbs? no — "Crumbs"')['name']
+
+
+# ============================================================
+# Decisions
+# ============================================================
+def test_short_or_sparse_inputs_are_vague_locally():
+    assert classify_input('barber')[0] is False
+    assert classify_input('I run a small bakery in town and sell bread')[0] is False
+
+
+def test_complete_descriptions_are_detailed_locally():
+    detailed, lean, missing = classify_input(DETAILED)
+    assert (detailed, lean, missing) == (True, True, [])
+
+
+def test_borderline_goes_to_the_model():
+    detailed, lean, missing = classify_input('Green Acres offers lawn care for homeowners with a crew of 4')
+    assert detailed is None
+    assert (lean, missing) == (False, ['workflow'])
+    # All five elements, but one short sentence — still the model's call
+    assert classify_input('Pipe Pros does repairs for homeowners with a crew of 4, billed by the job')[:2] == (None, True)
+
+
+# ============================================================
+# Stats
+# ============================================================
+def test_sources_and_agreement():
+    stats = InputClassifierStats()
+    stats.record('local', False)
+    stats.record('local', True)
+    stats.record('model', True)
+    stats.record_agreement('borderline', True, True)
+    stats.record_agreement('borderline', False, True)
+    stats.record_agreement('shadow', False, False)
+    summary = stats.stats()
+    assert summary['decisions'] == 3
+    assert summary['local_rate'] == 0.667
+    assert summary['agreement'] == {'borderline': {'compared': 2, 'rate': 0.5}, 'shadow': {'compared': 1, 'rate': 1.0}}
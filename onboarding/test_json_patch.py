@@ -0,0 +1,94 @@
+"""Unit tests for JSON Patch (RFC 6902) and merge patch (RFC 7396)."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from json_patch import (
+    JSON_PATCH,
+    MERGE_PATCH,
+    PatchError,
+    apply_delta,
+    apply_json_patch,
+    apply_merge_patch,
+)
+
+CONFIG = {
+    'id': 'abc',
+    'business_name': 'Bella Nails',
+    'tabs': [
+        {'id': 'tab_1', 'label': 'Dashboard', 'components': []},
+        {'id': 'tab_2', 'label': 'Clients', 'components': [{'id': 'clients', 'label': 'Clients'}]},
+        {'id': 'tab_3', 'label': 'Schedule', 'components': [{'id': 'calendar', 'label': 'Calendar'}]},
+    ],
+}
+
+
+def test_rename_component_label():
+    ops = [{'op': 'replace', 'path': '/tabs/1/components/0/label', 'value': 'Guests'}]
+    patched = apply_json_patch(CONFIG, ops)
+    assert patched['tabs'][1]['components'][0]['label'] == 'Guests'
+    assert CONFIG['tabs'][1]['components'][0]['label'] == 'Clients'  # input untouched
+
+
+def test_reorder_tabs_with_move():
+    patched = apply_json_patch(CONFIG, [{'op': 'move', 'from': '/tabs/2', 'path': '/tabs/1'}])
+    assert [t['id'] for t in patched['tabs']] == ['tab_1', 'tab_3', 'tab_2']
+
+
+def test_add_remove_copy_test():
+    ops = [
+        {'op': 'test', 'path': '/business_name', 'value': 'Bella Nails'},
+        {'op': 'add', 'path': '/tabs/-', 'value': {'id': 'tab_4', 'label': 'Gallery', 'components': []}},
+        {'op': 'copy', 'from': '/tabs/3/label', 'path': '/summary'},
+        {'op': 'remove', 'path': '/tabs/0'},
+        {'op': 'add', 'path': '/a~1b', 'value': 1},
+    ]
+    patched = apply_json_patch(CONFIG, ops)
+    assert [t['id'] for t in patched['tabs']] == ['tab_2', 'tab_3', 'tab_4']
+    assert patched['summary'] == 'Gallery'
+    assert patched['a/b'] == 1
+
+
+def test_failed_test_op_is_atomic():
+    ops = [
+        {'op': 'replace', 'path': '/business_name', 'value': 'Other'},
+        {'op': 'test', 'path': '/id', 'value': 'nope'},
+    ]
+    with pytest.raises(PatchError):
+        apply_json_patch(CONFIG, ops)
+    assert CONFIG['business_name'] == 'Bella Nails'
+
+
+@pytest.mark.parametrize('ops', [
+    {'op': 'add'},
+    [{'op': 'replace', 'path': '/missing', 'value': 1}],
+    [{'op': 'remove', 'path': '/tabs/9'}],
+    [{'op': 'add', 'path': '/tabs/01', 'value': 1}],
+    [{'op': 'remove', 'path': '/tabs/²'}],
+    [{'op': 'replace', 'path': '/tabs/٣', 'value': 1}],
+    [{'op': 'frobnicate', 'path': '/id'}],
+])
+def test_invalid_patches(ops):
+    with pytest.raises(PatchError):
+        apply_json_patch(CONFIG, ops)
+
+
+def test_merge_patch():
+    patched = apply_merge_patch(CONFIG, {'business_name': 'Bella Nail Studio', 'summary': None, 'colors': {'buttons': '#E11D48'}})
+    assert patched['business_name'] == 'Bella Nail Studio'
+    assert patched['colors'] == {'buttons': '#E11D48'}
+    assert patched['tabs'] == CONFIG['tabs']
+
+    removed = apply_merge_patch({'a': {'b': 1, 'c': 2}}, {'a': {'b': None}})
+    assert removed == {'a': {'c': 2}}
+
+
+def test_apply_delta_dispatch():
+    assert apply_delta(CONFIG, {'kind': MERGE_PATCH, 'patch': {'x': 1}})['x'] == 1
+    assert apply_delta(CONFIG, {'kind': JSON_PATCH, 'patch': [{'op': 'add', 'path': '/x', 'value': 2}]})['x'] == 2
+    with pytest.raises(PatchError):
+        apply_delta(CONFIG, {'kind': 'xml-patch', 'patch': {}})
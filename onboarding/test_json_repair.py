@@ -0,0 +1,86 @@
+"""Unit tests for tolerant JSON extraction from model output — no API calls."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from json_repair import JSONRepairError, TruncatedJSON, extract_json, is_truncated
+from prompts import continuation_request
+
+CONFIG = '{"business_name": "Crumbs", "tabs": [{"id": "tab_1", "label": "Home"}]}'
+
+
+# ============================================================
+# Extraction
+# ============================================================
+def test_clean_json_needs_no_repairs():
+    assert extract_json(CONFIG) == ({'business_name': 'Crumbs', 'tabs': [{'id': 'tab_1', 'label': 'Home'}]}, [])
+    assert extract_json(f'```json\n{CONFIG}\n```')[1] == []
+
+
+def test_preamble_and_trailing_text_are_skipped():
+    value, repairs = extract_json(f'Here is the config you asked for:\n{CONFIG}\nLet me know if you want changes!')
+    assert value['business_name'] == 'Crumbs'
+    assert repairs == ['preamble', 'trailing_text']
+
+
+def test_braces_inside_strings_dont_end_the_value():
+    value, _ = extract_json('{"summary": "Tabs {a} and [b]", "quote": "say \\"hi}\\""}')
+    assert value == {'summary': 'Tabs {a} and [b]', 'quote': 'say "hi}"'}
+
+
+def test_raw_newlines_in_strings_are_accepted():
+    assert extract_json('{"about_text": "Line one\nLine two"}') == ({'about_text': 'Line one\nLine two'}, [])
+
+
+# ============================================================
+# Repairs
+# ============================================================
+def test_trailing_commas():
+    value, repairs = extract_json('{"tabs": [{"id": "tab_1",}, {"id": "tab_2"},\n],}')
+    assert value == {'tabs': [{'id': 'tab_1'}, {'id': 'tab_2'}]}
+    assert repairs == ['trailing_comma'] * 3
+
+
+def test_missing_commas_between_lines():
+    value, repairs = extract_json('{\n  "a": 1\n  "b": "x"\n  "c": [{"id": 1}\n {"id": 2}]\n}')
+    assert value == {'a': 1, 'b': 'x', 'c': [{'id': 1}, {'id': 2}]}
+    assert repairs == ['missing_comma'] * 3
+
+
+def test_python_literals_outside_strings_only():
+    value, repairs = extract_json('{"_locked": True, "stages": None, "summary": "True story", "ok": false}')
+    assert value == {'_locked': True, 'stages': None, 'summary': 'True story', 'ok': False}
+    assert repairs == ['python_literal', 'python_literal']
+
+
+def test_unrepairable_output_raises():
+    with pytest.raises(JSONRepairError):
+        extract_json("Sorry, I can't help with that.")
+    with pytest.raises(JSONRepairError):
+        extract_json('{"a": 1 2}')
+
+
+# ============================================================
+# Truncation
+# ============================================================
+def test_truncation_is_detected():
+    cut = CONFIG[:40]
+    assert is_truncated(cut)
+    assert not is_truncated(CONFIG)
+    assert not is_truncated('no json here')
+    with pytest.raises(TruncatedJSON):
+        extract_json(cut)
+    with pytest.raises(ValueError):  # retryable under CallPolicy
+        extract_json(cut)
+
+
+def test_continuation_resumes_after_the_prefill():
+    request = {'model': 'm', 'max_tokens': 10, 'messages': [{'role': 'user', 'content': 'go'}]}
+    resumed = continuation_request(request, '{"a": [1, \n')
+    assert resumed['messages'][-1] == {'role': 'assistant', 'content': '{"a": [1,'}
+    assert request['messages'] == [{'role': 'user', 'content': 'go'}]
+    assert extract_json('{"a": [1,' + ' 2]}')[0] == {'a': [1, 2]}
@@ -0,0 +1,175 @@
+"""Unit tests for latency budgets, retries, hedging and circuit breaking.
+Attempt functions are local fakes — no API calls."""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import llm_calls
+from llm_calls import CallFailed, CallPolicy, CircuitOpen
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(llm_calls, '_BACKOFF_BASE', 0.01)
+
+
+def _scripted(*outcomes):
+    """attempt(timeout) returning or raising each outcome in turn."""
+    calls = []
+
+    def attempt(timeout):
+        calls.append(timeout)
+        outcome = outcomes[min(len(calls), len(outcomes)) - 1]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    return attempt, calls
+
+
+def _seed_latencies(policy, seconds, count=20):
+    for _ in range(count):
+        policy._succeeded(seconds)
+
+
+# ============================================================
+# Retries and budget
+# ============================================================
+def test_malformed_output_is_retried():
+    policy = CallPolicy('config', budget=10)
+    attempt, calls = _scripted(ValueError('not JSON'), {'tabs': []})
+    assert policy.call(attempt) == {'tabs': []}
+    assert len(calls) == 2
+    assert calls[1] < calls[0] <= 10  # each attempt gets the remaining budget
+    assert policy.stats()['retried'] == 1
+
+
+def test_gives_up_after_retries():
+    policy = CallPolicy('chat', budget=10, retries=2)
+    attempt, calls = _scripted(TimeoutError('slow'))
+    with pytest.raises(CallFailed):
+        policy.call(attempt)
+    assert len(calls) == 3
+    assert policy.stats()['failures'] == 1
+
+
+def test_no_retry_without_budget_left():
+    policy = CallPolicy('chat', budget=0.5)
+    attempt, calls = _scripted(TimeoutError('slow'), 'late')
+    with pytest.raises(CallFailed):
+        policy.call(attempt)
+    assert len(calls) == 1
+
+
+def test_non_retryable_error_fails_at_once():
+    policy = CallPolicy('chat', budget=10)
+    attempt, calls = _scripted(KeyError('content'), 'ok')
+    with pytest.raises(CallFailed):
+        policy.call(attempt)
+    assert len(calls) == 1
+
+
+# ============================================================
+# Circuit breaker
+# ============================================================
+def test_breaker_opens_then_lets_one_trial_through():
+    policy = CallPolicy('chat', budget=10, retries=0, breaker_threshold=2, breaker_reset=0.1)
+    failing, _ = _scripted(TimeoutError('down'))
+    for _ in range(2):
+        with pytest.raises(CallFailed):
+            policy.call(failing)
+
+    working, calls = _scripted('ok')
+    with pytest.raises(CircuitOpen):
+        policy.call(working)
+    assert not calls
+    assert policy.stats()['state'] == 'open'
+
+    time.sleep(0.15)
+    assert policy.call(working) == 'ok'
+    stats = policy.stats()
+    assert (stats['state'], stats['rejected'], stats['breaker_opens']) == ('closed', 1, 1)
+
+
+def test_failed_trial_reopens_the_breaker():
+    policy = CallPolicy('chat', budget=10, retries=0, breaker_threshold=1, breaker_reset=0.05)
+    failing, calls = _scripted(TimeoutError('down'))
+    with pytest.raises(CallFailed):
+        policy.call(failing)
+    time.sleep(0.06)
+    with pytest.raises(CallFailed):
+        policy.call(failing)  # the half-open trial
+    with pytest.raises(CircuitOpen):
+        policy.call(failing)
+    assert len(calls) == 2
+    assert policy.stats()['breaker_opens'] == 2
+
+
+# ============================================================
+# Hedging
+# ============================================================
+def test_no_hedge_until_latencies_are_known():
+    policy = CallPolicy('website_copy', budget=10)
+    assert policy.hedge_delay(True) is None
+    _seed_latencies(policy, 0.5)
+    assert policy.hedge_delay(True) == llm_calls._HEDGE_MIN_DELAY
+    assert policy.hedge_delay(False) is None
+
+
+def test_hedge_wins_over_a_stuck_attempt(monkeypatch):
+    monkeypatch.setattr(llm_calls, '_HEDGE_MIN_DELAY', 0.05)
+    policy = CallPolicy('website_copy', budget=10)
+    _seed_latencies(policy, 0.01)
+    started = []
+
+    def attempt(timeout):
+        started.append(timeout)
+        if len(started) == 1:
+            time.sleep(1)
+            return 'stuck'
+        return 'hedge'
+
+    began = time.monotonic()
+    assert policy.call(attempt) == 'hedge'
+    assert time.monotonic() - began < 0.5
+    stats = policy.stats()
+    assert (stats['hedged'], stats['hedge_wins']) == (1, 1)
+
+
+def test_async_hedge_cancels_the_loser(monkeypatch):
+    monkeypatch.setattr(llm_calls, '_HEDGE_MIN_DELAY', 0.05)
+    policy = CallPolicy('check_input', budget=10)
+    _seed_latencies(policy, 0.01)
+    started, cancelled = [], []
+
+    async def attempt(timeout):
+        started.append(timeout)
+        if len(started) == 1:
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(1)
+                raise
+        return 'hedge'
+
+    assert asyncio.run(policy.acall(attempt)) == 'hedge'
+    assert cancelled == [1]
+    assert policy.stats()['hedge_wins'] == 1
+
+
+def test_async_attempt_is_bounded_by_the_budget():
+    policy = CallPolicy('chat', budget=0.1, retries=0)
+
+    async def attempt(timeout):
+        await asyncio.sleep(5)
+
+    began = time.monotonic()
+    with pytest.raises(CallFailed):
+        asyncio.run(policy.acall(attempt))
+    assert time.monotonic() - began < 1
+
@@ -0,0 +1,135 @@
+"""Unit tests for per-call model metrics. Attempts report fake usage — no API calls."""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import llm_calls
+from llm_calls import CallFailed, CallPolicy
+from llm_metrics import LLMMetrics, call_cost
+
+SONNET = 'claude-sonnet-4-20250514'
+HAIKU = 'claude-haiku-4-5-20251001'
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(llm_calls, '_BACKOFF_BASE', 0.01)
+
+
+def _usage(input_tokens=100, output_tokens=50, cache_read=0, cache_creation=0):
+    return SimpleNamespace(input_tokens=input_tokens, output_tokens=output_tokens,
+                           cache_read_input_tokens=cache_read, cache_creation_input_tokens=cache_creation)
+
+
+def _model_attempt(metrics, prompt, model, *outputs, usage=None):
+    """attempt(timeout) that records usage and returns/raises each output in turn."""
+    calls = []
+
+    def attempt(timeout):
+        calls.append(timeout)
+        recorded = metrics.attempt(prompt, model)
+        recorded.done(usage or _usage())
+        output = outputs[min(len(calls), len(outputs)) - 1]
+        if isinstance(output, Exception):
+            raise output
+        return output
+    return attempt
+
+
+# ============================================================
+# Records
+# ============================================================
+def test_one_record_per_call_with_retries_and_parse_failures(tmp_path):
+    ledger = tmp_path / 'llm.jsonl'
+    metrics = LLMMetrics(str(ledger))
+    policy = CallPolicy('config', budget=5, retries=2, metrics=metrics)
+    attempt = _model_attempt(metrics, 'analyze_business', SONNET, ValueError('bad json'), {'tabs': []},
+                             usage=_usage(20, 400, cache_read=3000))
+    assert policy.call(attempt) == {'tabs': []}
+
+    (entry,) = [json.loads(line) for line in ledger.read_text().splitlines()]
+    assert entry['prompt'] == 'analyze_business'
+    assert entry['prompt_version'] == 2
+    assert (entry['model'], entry['outcome'], entry['policy']) == (SONNET, 'ok', 'config')
+    assert (entry['attempts'], entry['retries'], entry['parse_failures'], entry['errors']) == (2, 1, 1, 0)
+    assert (entry['input_tokens'], entry['output_tokens'], entry['cache_read_tokens']) == (40, 800, 6000)
+    assert entry['cost'] == pytest.approx((40 * 3 + 800 * 15 + 6000 * 0.3) / 1e6)
+    assert 0 <= entry['ttft'] <= entry['latency']
+
+
+def test_failed_calls_are_recorded():
+    metrics = LLMMetrics()
+    policy = CallPolicy('check_input', budget=5, retries=1, metrics=metrics)
+    with pytest.raises(CallFailed):
+        policy.call(_model_attempt(metrics, 'check_input', HAIKU, TimeoutError('slow')))
+    summary = metrics.summary()['check_input']
+    assert summary['calls'] == {'failed': 1}
+    assert summary['model'] == HAIKU
+
+
+def test_attempts_outside_a_call_are_ignored():
+    metrics = LLMMetrics()
+    metrics.attempt('chat', HAIKU).done(_usage())
+    assert metrics.summary() == {}
+
+
+def test_hedged_attempts_are_billed_to_one_call(monkeypatch):
+    metrics = LLMMetrics()
+    policy = CallPolicy('website_copy', budget=5, metrics=metrics)
+    monkeypatch.setattr(policy, 'hedge_delay', lambda hedge: 0.05)
+    calls = []
+
+    def attempt(timeout):
+        calls.append(timeout)
+        metrics.attempt('website_copy', HAIKU).done(_usage(10, 10))
+        if len(calls) == 1:
+            time.sleep(0.3)
+        return len(calls)
+
+    assert policy.call(attempt) == 2
+    summary = metrics.summary()['website_copy']
+    assert summary['calls'] == {'ok': 1}
+    assert summary['tokens']['input'] == 20
+    assert 'llm_hedged_total{prompt="website_copy",model="%s"} 1' % HAIKU in metrics.render()
+
+
+def test_async_calls_and_streamed_ttft():
+    metrics = LLMMetrics()
+    policy = CallPolicy('config', budget=5, metrics=metrics)
+
+    async def attempt(timeout):
+        recorded = metrics.attempt('analyze_with_template', SONNET)
+        await asyncio.sleep(0.02)
+        recorded.first_token()
+        await asyncio.sleep(0.05)
+        recorded.done(_usage())
+        return 'ok'
+
+    async def both():
+        return await asyncio.gather(policy.acall(attempt), policy.acall(attempt))
+
+    assert asyncio.run(both()) == ['ok', 'ok']
+    text = metrics.render()
+    prompt_labels = f'prompt="analyze_with_template",model="{SONNET}"'
+    assert f'llm_calls_total{{{prompt_labels},outcome="ok"}} 2' in text
+    assert f'llm_call_ttft_seconds_bucket{{{prompt_labels},le="0.1"}} 2' in text
+    assert f'llm_call_latency_seconds_bucket{{{prompt_labels},le="0.1"}} 2' in text
+    assert f'llm_call_latency_seconds_count{{{prompt_labels}}} 2' in text
+
+
+# ============================================================
+# Cost
+# ============================================================
+def test_costs_by_model():
+    tokens = {'input': 1_000_000, 'output': 0, 'cache_read': 0, 'cache_creation': 0}
+    assert call_cost(SONNET, tokens) == 3.0
+    assert call_cost(HAIKU, tokens) == 1.0
+    assert call_cost('some-other-model', tokens) == 0.0
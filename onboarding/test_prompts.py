@@ -0,0 +1,76 @@
+"""Unit tests for cache-friendly prompt assembly and prompt-cache accounting.
+No API calls — usage objects are stand-ins."""
+
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from prompts import (ANALYZE_BUSINESS_SYSTEM, CACHE_CONTROL, PromptCacheStats, TEMPLATE_SYSTEM,
+                     analyze_business_request, strip_code_fences, template_request)
+from templates.beauty_body import get_beauty_body_template
+
+
+def _usage(read=0, written=0, uncached=0):
+    return SimpleNamespace(cache_read_input_tokens=read, cache_creation_input_tokens=written,
+                           input_tokens=uncached)
+
+
+# ============================================================
+# Request layout
+# ============================================================
+def test_analyze_business_prefix_is_static_and_cached():
+    first = analyze_business_request('A bakery called Crumbs')
+    second = analyze_business_request('A plumbing company with 4 vans')
+    assert first['system'] == second['system']
+    assert first['system'][-1]['cache_control'] == CACHE_CONTROL
+    assert 'Crumbs' in first['messages'][-1]['content']
+    assert 'Crumbs' not in str(first['system'])
+
+
+def test_analyze_business_system_has_no_leftover_fstring_escapes():
+    assert '{{' not in ANALYZE_BUSINESS_SYSTEM and '}}' not in ANALYZE_BUSINESS_SYSTEM
+    assert '{description}' not in ANALYZE_BUSINESS_SYSTEM
+    assert 'name: <extracted or generated business name>' in ANALYZE_BUSINESS_SYSTEM
+    assert '## COMPONENT REGISTRY' in ANALYZE_BUSINESS_SYSTEM
+
+
+def test_template_prefix_is_stable_per_type():
+    barber, _ = get_beauty_body_template('barbershop')
+    spa, _ = get_beauty_body_template('spa')
+    one = template_request('Fade Room, two chairs', barber, 'barbershop')
+    two = template_request('Solo, walk-ins only', get_beauty_body_template('barbershop')[0], 'barbershop')
+    other = template_request('Fade Room, two chairs', spa, 'spa')
+
+    assert one['system'] == two['system']
+    assert one['system'][0]['text'] == TEMPLATE_SYSTEM == other['system'][0]['text']
+    assert one['system'][1] != other['system'][1]
+    assert one['system'][1]['cache_control'] == CACHE_CONTROL
+    assert 'cache_control' not in one['system'][0]
+    assert 'Fade Room' in one['messages'][-1]['content']
+    assert 'barbershop' in one['messages'][-1]['content']
+
+
+def test_strip_code_fences():
+    assert strip_code_fences('```json\n{"a": 1}\n```') == '{"a": 1}'
+    assert strip_code_fences('  {"a": 1}  ') == '{"a": 1}'
+
+
+# ============================================================
+# Cache accounting
+# ============================================================
+def test_prompt_cache_stats_counts_hits_writes_and_uncached():
+    stats = PromptCacheStats()
+    stats.record('analyze_business', _usage(written=9000, uncached=40))
+    stats.record('analyze_business', _usage(read=9000, uncached=35))
+    stats.record('analyze_with_template', _usage(uncached=1100))
+    stats.record('analyze_with_template', SimpleNamespace(input_tokens=900))  # older SDK usage shape
+
+    prompts = stats.stats()['prompts']
+    business = prompts['analyze_business']
+    assert (business['calls'], business['hits'], business['writes'], business['uncached']) == (2, 1, 1, 0)
+    assert business['hit_rate'] == 0.5
+    assert business['cached_token_share'] == round(9000 / 18075, 4)
+    template = prompts['analyze_with_template']
+    assert (template['calls'], template['uncached'], template['hit_rate']) == (2, 2, 0.0)
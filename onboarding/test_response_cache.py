@@ -0,0 +1,125 @@
+"""Unit tests for the disk-backed model response cache.
+Runs against temp directories — no Flask app or API calls."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import response_cache as rc
+from response_cache import ResponseCache, normalize_description, response_key
+
+MODEL = 'claude-sonnet-4-20250514'
+
+
+def _counting(value):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return value
+    return compute, calls
+
+
+# ============================================================
+# Keys
+# ============================================================
+def test_normalized_descriptions_share_a_key():
+    assert normalize_description('  Solo nail tech, doing GEL & acrylics!\n') == 'solo nail tech doing gel acrylics'
+    assert response_key('k', MODEL, 1, 'Solo nail tech, doing gel & acrylics!') == \
+        response_key('k', MODEL, 1, 'solo nail tech   doing gel acrylics')
+
+
+def test_model_version_kind_and_extras_split_keys():
+    base = response_key('analyze_business', MODEL, 1, 'a bakery')
+    assert base != response_key('analyze_business', MODEL, 2, 'a bakery')
+    assert base != response_key('analyze_business', 'claude-haiku-4-5-20251001', 1, 'a bakery')
+    assert base != response_key('check_input', MODEL, 1, 'a bakery')
+    assert base != response_key('analyze_business', MODEL, 1, 'a bakery', 'Crumbs')
+
+
+# ============================================================
+# Lookups
+# ============================================================
+def test_hit_after_miss_and_across_instances(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'r.db'))
+    compute, calls = _counting({'business_name': 'Crumbs'})
+    assert cache.get_or_compute('analyze_business', MODEL, 1, 'A bakery.', compute) == {'business_name': 'Crumbs'}
+    assert cache.get_or_compute('analyze_business', MODEL, 1, 'a   BAKERY', compute) == {'business_name': 'Crumbs'}
+    # Another worker sees the same entry
+    other = ResponseCache(str(tmp_path / 'r.db'))
+    assert other.get_or_compute('analyze_business', MODEL, 1, 'a bakery', compute) == {'business_name': 'Crumbs'}
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+
+
+def test_falsy_values_are_cached(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'r.db'))
+    compute, calls = _counting(False)
+    assert cache.get_or_compute('check_input', MODEL, 1, 'a bakery', compute) is False
+    assert cache.get_or_compute('check_input', MODEL, 1, 'a bakery', compute) is False
+    assert len(calls) == 1
+
+
+def test_failures_are_not_cached(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'r.db'))
+
+    def failing():
+        raise ValueError('not JSON')
+
+    with pytest.raises(ValueError):
+        cache.get_or_compute('analyze_business', MODEL, 1, 'a bakery', failing)
+    assert cache.stats()['entries'] == 0
+
+
+def test_bypass_skips_lookup_but_refreshes(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'r.db'))
+    cache.get_or_compute('k', MODEL, 1, 'a bakery', lambda: 'old')
+    assert cache.get_or_compute('k', MODEL, 1, 'a bakery', lambda: 'new', bypass=True) == 'new'
+    assert cache.get_or_compute('k', MODEL, 1, 'a bakery', lambda: 'unused') == 'new'
+    assert cache.stats()['bypassed'] == 1
+
+
+def test_disabled_cache_always_computes(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'r.db'), enabled=False)
+    compute, calls = _counting('x')
+    cache.get_or_compute('k', MODEL, 1, 'a bakery', compute)
+    cache.get_or_compute('k', MODEL, 1, 'a bakery', compute)
+    assert len(calls) == 2
+    assert not os.path.exists(tmp_path / 'r.db')
+
+
+# ============================================================
+# Expiry and eviction
+# ============================================================
+def test_entries_expire_after_ttl(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rc.time, 'time', lambda: now[0])
+    cache = ResponseCache(str(tmp_path / 'r.db'), ttl_seconds=60)
+    compute, calls = _counting('x')
+    cache.get_or_compute('k', MODEL, 1, 'a bakery', compute)
+    now[0] += 61
+    cache.get_or_compute('k', MODEL, 1, 'a bakery', compute)
+    assert len(calls) == 2
+    assert cache.stats()['expired'] == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rc.time, 'time', lambda: now[0])
+    cache = ResponseCache(str(tmp_path / 'r.db'), max_bytes=350)
+    value = 'x' * 98  # 100 bytes encoded
+    for name in ('a', 'b', 'c'):
+        cache.get_or_compute('k', MODEL, 1, name, lambda: value)
+        now[0] += rc._TOUCH_INTERVAL + 1
+    cache.get_or_compute('k', MODEL, 1, 'a', lambda: 'unused')  # touch a
+    now[0] += 1
+    cache.get_or_compute('k', MODEL, 1, 'd', lambda: value)  # 400 bytes → evict to <= 315
+
+    assert cache.stats()['evictions'] == 1
+    assert cache.get(response_key('k', MODEL, 1, 'b')) is None
+    for name in ('a', 'c', 'd'):
+        assert cache.get(response_key('k', MODEL, 1, name)) == value
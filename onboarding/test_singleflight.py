@@ -0,0 +1,229 @@
+"""Unit tests for single-flight coalescing of identical in-flight calls.
+Threads, coroutines and forked processes against temp directories — no API calls."""
+
+import asyncio
+import fcntl
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from response_cache import ResponseCache, response_key
+from singleflight import SingleFlight
+
+MODEL = 'claude-sonnet-4-20250514'
+
+
+def _slow(value, calls, delay=0.2):
+    def compute():
+        calls.append(1)
+        time.sleep(delay)
+        return value
+    return compute
+
+
+def _in_threads(count, target):
+    results = [None] * count
+
+    def run(i):
+        try:
+            results[i] = target()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+# ============================================================
+# Within a worker
+# ============================================================
+def test_concurrent_threads_share_one_call():
+    flight, calls = SingleFlight(), []
+    results = _in_threads(10, lambda: flight.do('k', _slow({'tabs': []}, calls)))
+    assert len(calls) == 1
+    assert all(r == {'tabs': []} for r in results)
+    # Followers get copies — one caller mutating its config can't affect another
+    results[0]['tabs'].append('x')
+    assert sum(1 for r in results if r['tabs']) == 1
+    stats = flight.stats()
+    assert (stats['leaders'], stats['coalesced'], stats['in_flight']) == (1, 9, 0)
+
+
+class _SlowCopy:
+    """Takes a while to deepcopy, so the leader can run on while followers copy."""
+
+    def __deepcopy__(self, memo):
+        time.sleep(0.1)
+        return _SlowCopy()
+
+
+def test_leader_mutating_its_result_doesnt_reach_followers():
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def compute():
+        started.set()
+        time.sleep(0.1)
+        return {'slow': _SlowCopy(), 'tabs': []}
+
+    def leader():
+        config = flight.do('k', compute)
+        config['tabs'].append('finalized')  # run_configure post-processes in place
+        config['extra'] = True
+        return config
+
+    results = {}
+
+    def follower():
+        started.wait()
+        try:
+            results['follower'] = flight.do('k', compute)
+        except Exception as e:  # "dictionary changed size during iteration"
+            results['follower'] = e
+
+    thread = threading.Thread(target=follower)
+    thread.start()
+    lead = leader()
+    thread.join()
+    assert lead['tabs'] == ['finalized']
+    assert results['follower']['tabs'] == []
+    assert 'extra' not in results['follower']
+
+
+def test_coroutine_leader_mutating_its_result_doesnt_reach_followers():
+    flight = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.05)
+        return {'tabs': []}
+
+    async def leader():
+        config = await flight.ado('k', compute)
+        config['tabs'].append('finalized')
+        return config
+
+    async def main():
+        return await asyncio.gather(leader(), flight.ado('k', compute), flight.ado('k', compute))
+
+    lead, *followers = asyncio.run(main())
+    assert lead == {'tabs': ['finalized']}
+    assert followers == [{'tabs': []}, {'tabs': []}]
+
+
+def test_leader_exception_reaches_every_caller():
+    flight = SingleFlight()
+
+    def failing():
+        time.sleep(0.1)
+        raise ValueError('not JSON')
+
+    results = _in_threads(5, lambda: flight.do('k', failing))
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flight.do('k', lambda: 'fresh') == 'fresh'  # failures aren't remembered
+
+
+def test_coroutines_share_one_call_and_survive_leader_cancel():
+    flight, calls = SingleFlight(), []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return ['ok']
+
+    async def main():
+        leader = asyncio.ensure_future(flight.ado('k', compute))
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(flight.ado('k', compute)) for _ in range(20)]
+        await asyncio.sleep(0.01)
+        leader.cancel()  # the client that started the call disconnects
+        return await asyncio.gather(*followers)
+
+    assert asyncio.run(main()) == [['ok']] * 20
+    assert len(calls) == 1
+    assert flight.stats()['in_flight'] == 0
+
+
+def test_disabled_runs_every_call():
+    flight, calls = SingleFlight(enabled=False), []
+    _in_threads(3, lambda: flight.do('k', _slow('x', calls, 0.05)))
+    assert len(calls) == 3
+
+
+# ============================================================
+# Through the response cache
+# ============================================================
+def test_duplicate_cache_misses_call_once(tmp_path):
+    cache, calls = ResponseCache(str(tmp_path / 'r.db')), []
+    compute = _slow({'detailed': True}, calls)
+    results = _in_threads(8, lambda: cache.get_or_compute('check_input', MODEL, 1, 'a bakery', compute))
+    assert results == [{'detailed': True}] * 8
+    assert len(calls) == 1
+    assert cache.stats()['entries'] == 1
+    assert not os.listdir(tmp_path / 'inflight')  # lock files are cleaned up
+
+
+def test_coalesces_with_cache_disabled(tmp_path):
+    cache, calls = ResponseCache(str(tmp_path / 'r.db'), enabled=False), []
+    _in_threads(4, lambda: cache.get_or_compute('k', MODEL, 1, 'a bakery', _slow('x', calls)))
+    assert len(calls) == 1
+    assert not os.path.exists(tmp_path / 'r.db')
+
+
+def test_waits_for_another_worker_and_reads_its_result(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'r.db'))
+    key = response_key('analyze_business', MODEL, 1, 'a bakery')
+    os.makedirs(tmp_path / 'inflight')
+    other_worker = open(tmp_path / 'inflight' / f'{key}.lock', 'a')
+    fcntl.flock(other_worker, fcntl.LOCK_EX)
+
+    calls = []
+    waiting = threading.Thread(target=lambda: calls.append(
+        cache.get_or_compute('analyze_business', MODEL, 1, 'A bakery!', _slow('mine', calls, 0))))
+    waiting.start()
+    time.sleep(0.2)
+    ResponseCache(str(tmp_path / 'r.db')).put(key, 'analyze_business', 'theirs')
+    os.unlink(tmp_path / 'inflight' / f'{key}.lock')
+    other_worker.close()
+    waiting.join()
+
+    assert calls == ['theirs']
+    stats = cache.flight.stats()
+    assert (stats['shared_across_workers'], stats['lock_waits']) == (1, 1)
+
+
+def _worker(db_path, log_path, barrier):
+    cache = ResponseCache(db_path)
+
+    def compute():
+        with open(log_path, 'a') as f:
+            f.write('call\n')
+        time.sleep(0.3)
+        return {'business_name': 'Crumbs'}
+
+    barrier.wait()
+    assert cache.get_or_compute('analyze_business', MODEL, 1, 'a bakery', compute) == {'business_name': 'Crumbs'}
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='needs fork')
+def test_forked_workers_share_one_call(tmp_path):
+    ctx = multiprocessing.get_context('fork')
+    barrier = ctx.Barrier(3)
+    log_path = str(tmp_path / 'calls.log')
+    workers = [ctx.Process(target=_worker, args=(str(tmp_path / 'r.db'), log_path, barrier)) for _ in range(3)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join(10)
+    assert [w.exitcode for w in workers] == [0, 0, 0]
+    with open(log_path) as f:
+        assert f.read() == 'call\n'
@@ -0,0 +1,114 @@
+"""Unit tests for incremental JSON parsing of streamed config output.
+No API calls — the stream is a string fed in chunks."""
+
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from stream_json import IncrementalJSONParser
+
+CONFIG = {
+    'business_name': 'Crumbs "The Bakery" \\ Co',
+    'business_type': 'bakery',
+    'rating': -1.5e3,
+    'solo': True,
+    'notes': None,
+    'tabs': [
+        {'id': 'tab_1', 'label': 'Dashboard', 'components': []},
+        {'id': 'tab_2', 'label': 'Orders', 'components': [
+            {'id': 'orders', 'view': 'pipeline', 'stages': ['New', 'Baking', 'Ready']},
+        ]},
+    ],
+    'colors': {'sidebar_bg': '#3C1518'},
+}
+
+
+def _feed_in_chunks(text, sizes):
+    parser = IncrementalJSONParser(max_depth=2)
+    completed, i = [], 0
+    while i < len(text):
+        size = next(sizes)
+        completed += parser.feed(text[i:i + size])
+        i += size
+    return parser, completed
+
+
+# ============================================================
+# Parsing
+# ============================================================
+def test_any_chunking_reports_the_same_values():
+    text = '```json\n' + json.dumps(CONFIG, indent=2) + '\n```'
+    rng = random.Random(7)
+    expected = None
+    for _ in range(50):
+        parser, completed = _feed_in_chunks(text, iter(lambda: rng.randint(1, 9), None))
+        assert parser.done
+        expected = expected or completed
+        assert completed == expected
+
+    fields = {path[0]: value for path, value in expected if len(path) == 1}
+    assert fields == CONFIG
+    assert [value for path, value in expected if path[:1] == ('tabs',) and len(path) == 2] == CONFIG['tabs']
+    assert ('colors', 'sidebar_bg') in [path for path, _ in expected]
+    assert not [path for path, _ in expected if len(path) > 2]
+
+
+def test_tabs_are_reported_as_soon_as_they_close():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"business_name": "Crumbs", "tabs": [{"id": "tab_1", "label": "Da') == \
+        [(('business_name',), 'Crumbs')]
+    assert parser.feed('shboard"}, {"id": ') == [(('tabs', 0), {'id': 'tab_1', 'label': 'Dashboard'})]
+    assert parser.feed('"tab_2"}') == [(('tabs', 1), {'id': 'tab_2'})]
+    assert not parser.done
+
+
+def test_leading_prose_and_trailing_text_are_ignored():
+    parser = IncrementalJSONParser()
+    completed = parser.feed('Here you go:\n{"a": [1, 2]}\nLet me know! {"b": 1}')
+    assert completed == [(('a', 0), 1), (('a', 1), 2), (('a',), [1, 2])]
+    assert parser.done
+
+
+# ============================================================
+# Per-tab post-processing
+# ============================================================
+def test_tab_preview_matches_whole_config_processing():
+    from app import TabPreview, consolidate_calendars, transform_pipeline_stages
+
+    tabs = [
+        {'id': 'tab_1', 'label': 'Dashboard', 'components': [{'id': 'calendar', 'view': 'calendar'}]},
+        {'id': 'tab_2', 'label': 'Jobs', 'components': [
+            {'id': 'calendar', 'view': 'calendar'}, {'id': 'appointments', 'view': 'calendar'},
+            {'id': 'jobs', 'view': 'pipeline', 'stages': ['Quote', 'Gold Job']},
+        ]},
+        {'id': 'tab_3', 'label': 'Crew', 'components': [
+            {'id': 'shifts', 'view': 'calendar', '_locked': True},
+        ]},
+    ]
+    events = []
+    preview = TabPreview(lambda event, data: events.append(data))
+    preview.add(0, tabs[0])
+    preview.add(2, tabs[2])  # out of order — ignored, flush() catches up
+    preview.add(1, tabs[1])
+    preview.flush(tabs)
+
+    whole = transform_pipeline_stages(consolidate_calendars({'tabs': json.loads(json.dumps(tabs))}))
+    for tab in whole['tabs']:
+        for comp in tab['components']:
+            comp.pop('_locked', None)
+    assert [e['index'] for e in events] == [0, 1, 2]
+    assert [e['tab'] for e in events] == whole['tabs']
+    assert tabs[2]['components'][0]['_locked'] is True  # the model's tabs aren't mutated
+
+
+def test_json_tab_stream_reports_only_tabs():
+    from stream_json import JSONTabStream
+
+    stream = JSONTabStream()
+    text = json.dumps(CONFIG)
+    tabs = stream.feed(text[:len(text) // 2]) + stream.feed(text[len(text) // 2:])
+    assert tabs == list(enumerate(CONFIG['tabs']))
+    assert stream.text == text
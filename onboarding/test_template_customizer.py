@@ -0,0 +1,117 @@
+"""Unit tests for rule-based template customization — no API calls."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from conversation import configure_description
+from templates.customizer import customize_template
+from templates.registry import detect_template_type, get_template
+
+
+def _customize(description, history=None):
+    business_type, family = detect_template_type(description)
+    template, _ = get_template(business_type, family)
+    return customize_template(description, template, business_type, history)
+
+
+def _labels(config):
+    return [tab['label'] for tab in config['tabs']]
+
+
+def _component_ids(config):
+    return [comp['id'] for tab in config['tabs'] for comp in tab['components']]
+
+
+# ============================================================
+# Edits
+# ============================================================
+def test_solo_operator_loses_the_staff_tab():
+    config, confidence, reasons = _customize("I'm a solo barber, my shop is called Fade Factory")
+    assert 'Barbers' not in _labels(config)
+    assert [tab['id'] for tab in config['tabs']] == [f'tab_{i}' for i in range(1, len(config['tabs']) + 1)]
+    assert config['business_name'] == 'Fade Factory'
+    assert config['business_type'] == 'barbershop'
+    assert (confidence, reasons) == (1.0, [])
+
+
+def test_team_keeps_staff_and_relabels():
+    config, confidence, _ = _customize(
+        'Hair salon called Shear Bliss with 6 stylists. Customers book appointments and we want a loyalty program')
+    assert _labels(config)[1] == 'Customers'
+    assert config['tabs'][1]['components'][0]['label'] == 'Appointments'
+    assert 'Stylists' in _labels(config)
+    assert 'loyalty' in _component_ids(config)
+    assert 'Loyalty added' in config['summary']
+    assert confidence == 1.0
+
+
+def test_requested_and_unwanted_components():
+    config, _, _ = _customize('A pet grooming shop called Wet Nose. We track inventory and sell no retail products')
+    ids = _component_ids(config)
+    assert 'inventory' in ids
+    assert 'products' not in ids
+    assert 'waivers' in ids  # locked components are never dropped
+
+
+def test_locked_flags_are_kept_for_validation():
+    config, _, _ = _customize('Tattoo studio called Ink Well')
+    assert all(comp.get('_locked') for comp in config['tabs'][1]['components'] if comp['id'] == 'clients')
+
+
+# ============================================================
+# Confidence
+# ============================================================
+def test_unclear_descriptions_lower_confidence():
+    _, mixed, reasons = _customize("Nail salon called Gloss, I'm solo but hiring soon")
+    assert mixed < 0.7 and 'solo' in reasons[0]
+
+    _, stages, _ = _customize('Day spa called Calm with membership tiers Bronze, Silver and Gold')
+    assert stages < 0.7
+
+    _, unknown, reasons = _customize('Makeup artist called Glow, I need help with destination weddings abroad')
+    assert unknown < 0.7 and 'unrecognised request' in reasons[0]
+
+    _, foreign, _ = _customize('Tengo un nail salon llamado "Brillo" en Madrid, trabajo sola')
+    assert foreign < 0.7
+
+
+def test_missing_name_goes_to_the_model():
+    config, confidence, reasons = _customize('Solo lash tech working from home')
+    assert config['business_name'] == 'My Business'
+    assert confidence == 0.0
+    assert reasons == ['no business name found']
+
+
+def test_name_from_the_chat():
+    config, _, _ = _customize('Barbershop', [{'role': 'user', 'content': 'It is called "Kings Cuts"'}])
+    assert config['business_name'] == 'Kings Cuts'
+
+
+# ============================================================
+# From a chat
+# ============================================================
+NAIL_CHAT = [
+    {'role': 'user', 'content': 'I run a nail salon'},
+    {'role': 'assistant', 'content': "Fun! What's the business called?"},
+    {'role': 'user', 'content': 'Polished by Pia'},
+    {'role': 'assistant', 'content': 'Is it just you running things, or do you have a team?'},
+    {'role': 'user', 'content': 'just me'},
+    {'role': 'assistant', 'content': 'Do your clients go through any kind of stages or progression?'},
+    {'role': 'user', 'content': 'not really'},
+]
+
+
+def test_config_from_a_chat():
+    # What run_configure does: the labelled facts pick the template, the rules read the chat
+    business_type, family = detect_template_type(configure_description('I run a nail salon', NAIL_CHAT))
+    template, _ = get_template(business_type, family)
+    config, confidence, reasons = customize_template('I run a nail salon', template, business_type, NAIL_CHAT)
+    assert (confidence, reasons) == (1.0, [])
+    assert config['business_name'] == 'Polished by Pia'
+    assert 'staff' not in _component_ids(config)
+
+    stages = NAIL_CHAT[:-1] + [{'role': 'user', 'content': 'first visit, regular, VIP'}]
+    _, confidence, reasons = customize_template('I run a nail salon', template, business_type, stages)
+    assert reasons == ['custom pipeline stages requested']
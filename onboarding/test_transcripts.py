@@ -0,0 +1,44 @@
+"""Unit tests for append-only transcript segments."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from transcripts import (
+    append_messages,
+    load_transcript,
+    split_legacy_transcript,
+    transcript_filename,
+)
+
+CHAT = [
+    {'role': 'user', 'content': 'I run a nail salon'},
+    {'role': 'assistant', 'content': "Nice! What's the business called?"},
+]
+
+
+def test_append_and_lazy_load(tmp_path):
+    pointer = append_messages(str(tmp_path), 'abc', CHAT)
+    assert pointer == {'path': transcript_filename('abc'), 'message_count': 2}
+
+    pointer = append_messages(str(tmp_path), 'abc', [{'role': 'user', 'content': 'Bella Nails'}])
+    assert pointer['message_count'] == 3
+    assert load_transcript(str(tmp_path), 'abc')[-1]['content'] == 'Bella Nails'
+    assert load_transcript(str(tmp_path), 'missing') == []
+
+
+def test_torn_last_line_is_skipped(tmp_path):
+    append_messages(str(tmp_path), 'abc', CHAT)
+    with open(tmp_path / transcript_filename('abc'), 'a') as f:
+        f.write('{"role": "user", "cont')
+    assert load_transcript(str(tmp_path), 'abc') == CHAT
+
+
+def test_split_legacy_transcript(tmp_path):
+    config = {'id': 'old', 'tabs': [], 'conversation_history': CHAT}
+    assert split_legacy_transcript(str(tmp_path), 'old', config) is True
+    assert 'conversation_history' not in config
+    assert config['transcript']['message_count'] == 2
+    assert load_transcript(str(tmp_path), 'old') == CHAT
+    assert split_legacy_transcript(str(tmp_path), 'old', config) is False
@@ -0,0 +1,116 @@
+"""Unit tests for speculative website-copy generation.
+The copy request is a local stub — no API calls."""
+
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from website_copy import NAME_PLACEHOLDER, CopyPool, SpeculativeCopy, extract_business_name
+
+
+def _stub_copy(business_name, business_type, description):
+    return {'hero_headline': f'Welcome to {business_name}', 'features': [f'{business_name} cares'],
+            'business_type': business_type}
+
+
+def _regenerate(calls):
+    def regenerate(business_name, business_type):
+        calls.append((business_name, business_type))
+        return {'hero_headline': 'regenerated'}
+    return regenerate
+
+
+# ============================================================
+# Name extraction
+# ============================================================
+def test_extract_business_name():
+    assert extract_business_name('I own a nail salon called Bella Nails in Austin') == 'Bella Nails'
+    assert extract_business_name('barbershop named The Fade Room.') == 'The Fade Room'
+    assert extract_business_name('A spa', [{'role': 'user', 'content': 'It\'s "Serenity Spa"'}]) == 'Serenity Spa'
+    assert extract_business_name('I run a small bakery') is None
+
+
+# ============================================================
+# Reconciliation
+# ============================================================
+def test_placeholder_is_replaced_with_final_name():
+    calls = []
+    spec = SpeculativeCopy(_stub_copy, 'a nail salon', 'nail_salon')
+    copy = spec.resolve('Bella Nails', 'nail_salon', _regenerate(calls))
+    assert copy['hero_headline'] == 'Welcome to Bella Nails'
+    assert copy['features'] == ['Bella Nails cares']
+    assert NAME_PLACEHOLDER not in str(copy)
+    assert calls == []
+
+
+def test_matching_guess_is_used_as_is():
+    calls = []
+    spec = SpeculativeCopy(_stub_copy, 'salon called Bella Nails', 'nail_salon', 'Bella Nails')
+    assert spec.resolve('bella nails', 'nail_salon', _regenerate(calls))['hero_headline'] == 'Welcome to Bella Nails'
+    assert calls == []
+
+
+def test_unguessed_type_is_accepted():
+    calls = []
+    spec = SpeculativeCopy(_stub_copy, 'a plumbing company', None)
+    assert spec.resolve('Pipe Pros', 'plumber', _regenerate(calls))['hero_headline'] == 'Welcome to Pipe Pros'
+    assert calls == []
+
+
+def test_wrong_guess_regenerates():
+    calls = []
+    spec = SpeculativeCopy(_stub_copy, 'a salon', 'salon')
+    assert spec.resolve('Bella Nails', 'nail_salon', _regenerate(calls)) == {'hero_headline': 'regenerated'}
+
+    spec = SpeculativeCopy(_stub_copy, 'called Bella', 'nail_salon', 'Bella')
+    spec.resolve('Bella Nails', 'nail_salon', _regenerate(calls))
+    assert calls == [('Bella Nails', 'nail_salon'), ('Bella Nails', 'nail_salon')]
+
+
+def test_failed_speculative_call_regenerates():
+    def failing(*args):
+        raise RuntimeError('overloaded')
+
+    calls = []
+    spec = SpeculativeCopy(failing, 'a spa', 'spa')
+    assert spec.resolve('Serenity', 'spa', _regenerate(calls)) == {'hero_headline': 'regenerated'}
+    assert calls == [('Serenity', 'spa')]
+
+
+def test_copy_runs_concurrently_with_the_caller():
+    release = threading.Event()
+
+    def slow_copy(*args):
+        release.wait(5)
+        return {'hero_headline': 'done'}
+
+    spec = SpeculativeCopy(slow_copy, 'a spa', 'spa', 'Serenity')
+    assert not spec.future.done()  # the caller keeps going (the config call) meanwhile
+    release.set()
+    assert spec.resolve('Serenity', 'spa', _regenerate([])) == {'hero_headline': 'done'}
+
+
+def test_busy_pool_goes_sequential():
+    release = threading.Event()
+
+    def slow_copy(*args):
+        release.wait(5)
+        return {'hero_headline': 'done'}
+
+    pool, calls = CopyPool(1), []
+    abandoned = SpeculativeCopy(slow_copy, 'a salon', 'salon', pool=pool)
+    # A wrong guess can't stop the running call — it keeps the thread
+    assert abandoned.resolve('Bella Nails', 'nail_salon', _regenerate(calls)) == {'hero_headline': 'regenerated'}
+
+    spec = SpeculativeCopy(slow_copy, 'a spa', 'spa', 'Serenity', pool=pool)
+    assert spec.future is None  # not queued behind the abandoned call
+    assert spec.resolve('Serenity', 'spa', _regenerate(calls)) == {'hero_headline': 'regenerated'}
+    assert pool.stats() == {'threads': 1, 'started': 1, 'skipped': 1}
+
+    release.set()
+    abandoned.future.result(5)
+    spec = SpeculativeCopy(_stub_copy, 'a spa', 'spa', 'Serenity', pool=pool)
+    assert spec.resolve('Serenity', 'spa', _regenerate(calls))['hero_headline'] == 'Welcome to Serenity'
+    assert len(calls) == 2
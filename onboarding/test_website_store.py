@@ -0,0 +1,69 @@
+"""Unit tests for pre-serialized website payload storage."""
+
+import gzip
+import json
+import os
+import sys
+
+from werkzeug.datastructures import Accept
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import website_store
+from config_store import content_etag
+
+WEBSITE_DATA = {'format': 'freeform', 'version': 1, 'pages': [{'id': 'home', 'sections': []}], 'elements': []}
+
+
+def test_save_writes_body_variants_and_etag(tmp_path):
+    etag = website_store.save_website_data(str(tmp_path), 'abc', WEBSITE_DATA)
+    body_path = website_store.body_path(str(tmp_path), 'abc')
+
+    with open(body_path, 'rb') as f:
+        body = f.read()
+    assert json.loads(body) == {'success': True, 'data': WEBSITE_DATA}
+    assert etag == content_etag(body) == website_store.read_etag(str(tmp_path), 'abc')
+    with open(body_path + '.gz', 'rb') as f:
+        assert gzip.decompress(f.read()) == body
+
+
+def test_choose_variant_follows_accept_encoding(tmp_path):
+    website_store.save_website_data(str(tmp_path), 'abc', WEBSITE_DATA)
+    base = website_store.body_path(str(tmp_path), 'abc')
+
+    path, encoding = website_store.choose_variant(str(tmp_path), 'abc', Accept([('gzip', 1)]))
+    assert (path, encoding) == (base + '.gz', 'gzip')
+
+    path, encoding = website_store.choose_variant(str(tmp_path), 'abc', Accept([]))
+    assert (path, encoding) == (base, None)
+
+    if website_store.brotli is not None:
+        _, encoding = website_store.choose_variant(str(tmp_path), 'abc', Accept([('gzip', 1), ('br', 1)]))
+        assert encoding == 'br'
+
+    assert website_store.choose_variant(str(tmp_path), 'missing', Accept([])) is None
+
+
+def test_variant_etags_are_distinct():
+    etags = {website_store.variant_etag('abc', enc) for enc in ('br', 'gzip', None)}
+    assert len(etags) == 3
+
+
+def test_served_etag_matches_the_bytes_read(tmp_path):
+    folder = str(tmp_path)
+    first = website_store.save_website_data(folder, 'abc', WEBSITE_DATA)
+    # A save racing the read: new bodies are in place, the .etag file is still the old one
+    newer = dict(WEBSITE_DATA, version=2)
+    etag_path = website_store.etag_path(folder, 'abc')
+    with open(etag_path) as f:
+        old_etag_file = f.read()
+    second = website_store.save_website_data(folder, 'abc', newer)
+    with open(etag_path, 'w') as f:
+        f.write(old_etag_file)
+    assert website_store.read_etag(folder, 'abc') == first
+
+    for accept, encoding in ((Accept([]), None), (Accept([('gzip', 1)]), 'gzip')):
+        path, chosen = website_store.choose_variant(folder, 'abc', accept)
+        body, etag = website_store.read_variant(path, chosen)
+        assert chosen == encoding
+        assert etag == website_store.variant_etag(second, encoding)
@@ -0,0 +1,80 @@
+"""Onboarding chat transcripts — one append-only JSONL segment per config.
+
+The config document only keeps a pointer and a message count:
+    'transcript': {'path': '<id>.transcript.jsonl', 'message_count': 12}
+so config reads never deserialize the chat. Each line of the segment is one
+message ({"role": ..., "content": ...}); segments are only ever appended to.
+
+Appends go to the config's shard directory (config_layout.py). A segment
+written before the sharded layout may still sit in the flat folder; it holds
+the older messages, so readers take it first.
+"""
+
+import json
+import os
+
+from config_layout import candidate_paths
+
+TRANSCRIPT_SUFFIX = '.transcript.jsonl'
+
+
+def transcript_filename(config_id):
+    return f'{config_id}{TRANSCRIPT_SUFFIX}'
+
+
+def append_messages(folder, config_id, messages):
+    """Append messages to the config's segment. Returns the transcript pointer
+    ({'path', 'message_count'}) to store on the config document."""
+    path = _segment_paths(folder, config_id)[-1]
+    if messages:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        lines = ''.join(json.dumps(m, separators=(',', ':')) + '\n' for m in messages)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+    return {
+        'path': transcript_filename(config_id),
+        'message_count': count_messages(folder, config_id),
+    }
+
+
+def _segment_paths(folder, config_id):
+    """Flat (older) then sharded (current) segment path, oldest first."""
+    return list(reversed(candidate_paths(folder, config_id, transcript_filename(config_id))))
+
+
+def count_messages(folder, config_id):
+    count = 0
+    for path in _segment_paths(folder, config_id):
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                count += sum(1 for line in f if line.strip())
+    return count
+
+
+def load_transcript(folder, config_id):
+    """Read every message in the segment. Returns [] if there is none.
+    A torn last line (crash mid-append) is skipped rather than failing the read."""
+    messages = []
+    for path in _segment_paths(folder, config_id):
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    messages.append(json.loads(line))
+                except ValueError:
+                    print(f"Skipping unreadable transcript line for {config_id}")
+    return messages
+
+
+def split_legacy_transcript(folder, config_id, config):
+    """Move an embedded conversation_history (pre-segment configs) out into
+    the config's segment. Mutates config; returns True if anything moved."""
+    if 'conversation_history' not in config:
+        return False
+    history = config.pop('conversation_history') or []
+    config['transcript'] = append_messages(folder, config_id, history)
+    return True
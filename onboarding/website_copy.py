@@ -0,0 +1,191 @@
+"""Speculative website-copy generation for /configure.
+
+The website copy call only needs the business name, type and description,
+so /configure starts it before the dashboard-config call instead of after.
+The name and type come from cheap local guesses: detect_template_type() for
+the type, and a phrase match such as "called Bella Nails" for the name. If
+no name is found, the copy is written around a placeholder. Once the config is
+back, resolve() reconciles the guesses with the final values:
+
+    type or name guessed and different from the final one → regenerate
+    no name guessed                                       → substitute the final
+                                                            name for the placeholder
+    speculative call failed                               → regenerate
+
+Regenerating costs no more than the old sequential flow.
+
+/configure uses AsyncSpeculativeCopy, a task on the async client.
+SpeculativeCopy is for synchronous callers: its calls run on a CopyPool, one
+thread each. cancel() can't stop a call that is already running, so an
+abandoned call keeps its thread until it returns; with every thread busy a
+new call isn't queued behind them — the copy is made after the config, as
+in the sequential flow.
+"""
+
+import asyncio
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+NAME_PLACEHOLDER = '[[BUSINESS_NAME]]'
+
+_NAME_WORD = r"[A-Z0-9][\w'’&.-]*"
+_NAME_PATTERNS = [
+    # "called Bella Nails", "named The Fade Room"
+    re.compile(rf"\b(?:called|named)\s+[\"“']?((?:The\s+)?{_NAME_WORD}(?:\s+(?:{_NAME_WORD}|of|and|&|de|la))*)"),
+    # A quoted name: "Bella Nails"
+    re.compile(r"[\"“]([^\"”\n]{2,40})[\"”]"),
+]
+
+
+
+def extract_business_name(description, conversation_history=None):
+    """Best-effort business name from the description or the user's chat turns."""
+    texts = [description or '']
+    texts += [m.get('content', '') for m in conversation_history or []
+              if m.get('role') == 'user' and isinstance(m.get('content'), str)]
+    for pattern in _NAME_PATTERNS:
+        for text in texts:
+            match = pattern.search(text)
+            if match:
+                name = match.group(1).strip(" .,!?'\"")
+                if name:
+                    return name
+    return None
+
+
+def replace_business_name(copy, old, new):
+    """Swap old for new in every string of the copy dict (lists included)."""
+    if isinstance(copy, str):
+        return copy.replace(old, new)
+    if isinstance(copy, list):
+        return [replace_business_name(item, old, new) for item in copy]
+    if isinstance(copy, dict):
+        return {key: replace_business_name(value, old, new) for key, value in copy.items()}
+    return copy
+
+
+class CopyPool:
+    """Threads for speculative copy calls. submit() never queues: with every
+    thread busy it returns None and the caller goes sequential. Thread-safe."""
+
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='website-copy')
+        self._free = threading.BoundedSemaphore(max_workers)
+        self._lock = threading.Lock()
+        self.started = 0
+        self.skipped = 0
+
+    def submit(self, fn, *args):
+        """A future for fn(*args) on a free thread, or None if there is none."""
+        if not self._free.acquire(blocking=False):
+            with self._lock:
+                self.skipped += 1
+            return None
+        with self._lock:
+            self.started += 1
+        try:
+            future = self._executor.submit(self._run, fn, *args)
+        except BaseException:
+            self._free.release()
+            raise
+        # A call cancelled before it started never reaches _run's release
+        future.add_done_callback(lambda f: f.cancelled() and self._free.release())
+        return future
+
+    def _run(self, fn, *args):
+        # Freed before the result is set, so whoever waits on it can submit again
+        try:
+            return fn(*args)
+        finally:
+            self._free.release()
+
+    def stats(self):
+        with self._lock:
+            return {'threads': self.max_workers, 'started': self.started, 'skipped': self.skipped}
+
+
+# For callers that don't pass a pool: a2wsgi's default thread count. Threads only start on first use.
+DEFAULT_COPY_THREADS = 10
+_default_pool = CopyPool(DEFAULT_COPY_THREADS)
+
+
+class SpeculativeCopy:
+    """A website-copy request started before the final config is known.
+
+    request_copy(business_name, business_type, description) must raise on
+    failure — resolve() falls back to the caller's non-raising generator.
+    With no free thread in pool nothing starts and resolve() regenerates.
+    """
+
+    def __init__(self, request_copy, description, business_type, business_name=None, pool=None):
+        self.business_type = business_type
+        self.business_name = business_name
+        self.started = time.monotonic()
+        self.future = (pool or _default_pool).submit(
+            request_copy, business_name or NAME_PLACEHOLDER, business_type, description,
+        )
+        if self.future is None:
+            print("Speculative website copy skipped — every copy thread is busy")
+
+    def _guess_was_wrong(self, business_name, business_type):
+        type_changed = self.business_type and self.business_type != business_type
+        name_changed = self.business_name and self.business_name.casefold() != (business_name or '').casefold()
+        if type_changed or name_changed:
+            print(f"Speculative copy was for {self.business_name!r} ({self.business_type}), "
+                  f"config is {business_name!r} ({business_type}) — regenerating")
+            return True
+        return False
+
+    def _finish(self, copy, business_name, waited):
+        print(f"Speculative website copy ready {time.monotonic() - self.started:.2f}s after start, "
+              f"waited {time.monotonic() - waited:.2f}s after the config")
+        if self.business_name:
+            return copy
+        return replace_business_name(copy, NAME_PLACEHOLDER, business_name)
+
+    def resolve(self, business_name, business_type, regenerate):
+        """Website copy for the final name and type.
+        regenerate(business_name, business_type) is the sequential fallback."""
+        if self.future is None:
+            return regenerate(business_name, business_type)
+        if self._guess_was_wrong(business_name, business_type):
+            # A wrong guess can't be patched safely — the name may also be an ordinary word
+            self.future.cancel()
+            return regenerate(business_name, business_type)
+
+        waited = time.monotonic()
+        try:
+            copy = self.future.result()
+        except Exception as e:
+            print(f"Speculative website copy failed, regenerating: {e}")
+            return regenerate(business_name, business_type)
+        return self._finish(copy, business_name, waited)
+
+
+class AsyncSpeculativeCopy(SpeculativeCopy):
+    """SpeculativeCopy for the asyncio path: request_copy is a coroutine
+    function, run as a task on the running loop; regenerate is awaited."""
+
+    def __init__(self, request_copy, description, business_type, business_name=None):
+        self.business_type = business_type
+        self.business_name = business_name
+        self.started = time.monotonic()
+        self.future = asyncio.ensure_future(
+            request_copy(business_name or NAME_PLACEHOLDER, business_type, description),
+        )
+
+    async def resolve(self, business_name, business_type, regenerate):
+        if self._guess_was_wrong(business_name, business_type):
+            self.future.cancel()
+            return await regenerate(business_name, business_type)
+
+        waited = time.monotonic()
+        try:
+            copy = await self.future
+        except Exception as e:
+            print(f"Speculative website copy failed, regenerating: {e}")
+            return await regenerate(business_name, business_type)
+        return self._finish(copy, business_name, waited)
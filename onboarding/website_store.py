@@ -0,0 +1,136 @@
+"""Website payload storage — pre-serialized, pre-compressed response bodies.
+
+/configure builds the FreeForm website payload once; GET /website-data/<id>
+serves it many times. So the response body is serialized once at generation
+time and written next to its gzip and brotli variants:
+
+    <id>_website.body      {"success":true,"data":{...}} (identity)
+    <id>_website.body.gz   gzip -9
+    <id>_website.body.br   brotli q11 (only if the brotli package is installed)
+    <id>_website.etag      content hash of the identity body
+
+Reads pick the best variant the client accepts and send its bytes as-is —
+no JSON parse or re-encode. The ETag sent with them is derived from those
+bytes (an encoded variant is decompressed to hash it), not read from the
+.etag file: a save rewrites the body before its ETag, so a reader racing it
+could otherwise pair the new body with the old validator and a client would
+cache the mismatch. The .etag file only answers If-None-Match without
+touching the payload; if it lags a save, the client briefly keeps the
+previous body. Payloads saved before this layout existed live in
+<id>_website.json (bare website_data) and are served through the legacy path.
+
+Files are written to the config's shard directory (config_layout.py); copies
+still in the flat folder are read until the migration moves them.
+"""
+
+import gzip
+import json
+import os
+
+from config_layout import locate, sharded_path
+from config_store import content_etag
+from durable_io import atomic_write
+
+try:
+    import brotli
+except ImportError:  # optional — gzip still covers every browser
+    brotli = None
+
+# Preferred first when the client accepts several
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+# Suffix appended to the identity ETag for each encoded variant, so every
+# representation has its own strong validator
+ETAG_SUFFIXES = {'br': '-br', 'gzip': '-gzip', None: ''}
+
+
+def body_path(folder, config_id):
+    """Where save_website_data() writes the identity body."""
+    return sharded_path(folder, config_id, f'{config_id}_website.body')
+
+
+def etag_path(folder, config_id):
+    return sharded_path(folder, config_id, f'{config_id}_website.etag')
+
+
+def legacy_path(folder, config_id):
+    """Existing bare website_data file (sharded or flat); the sharded path if there is none."""
+    name = f'{config_id}_website.json'
+    return locate(folder, config_id, name) or sharded_path(folder, config_id, name)
+
+
+def _current_etag_path(folder, config_id):
+    # The ETag is written last, so whichever directory has one has a complete set
+    return locate(folder, config_id, f'{config_id}_website.etag')
+
+
+def save_website_data(folder, config_id, website_data):
+    """Serialize and compress the payload once. Returns the identity ETag."""
+    body = json.dumps({'success': True, 'data': website_data}, separators=(',', ':')).encode('utf-8')
+    base = body_path(folder, config_id)
+
+    variants = {'': body, '.gz': gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(body, quality=11)
+    for suffix, data in variants.items():
+        atomic_write(base + suffix, data)
+    if brotli is None and os.path.exists(base + '.br'):
+        os.remove(base + '.br')  # don't serve a stale variant from an older payload
+
+    # Written last: readers treat the ETag as the signal that the variants are complete
+    etag = content_etag(body)
+    atomic_write(etag_path(folder, config_id), etag)
+
+    # The sharded set now shadows any flat copy — ETag first, like the migration
+    for name in ('_website.etag', '_website.body', '_website.body.gz', '_website.body.br', '_website.json'):
+        flat = os.path.join(folder, f'{config_id}{name}')
+        if os.path.exists(flat):
+            os.remove(flat)
+    return etag
+
+
+def read_etag(folder, config_id):
+    """ETag written alongside the payload, or None."""
+    path = _current_etag_path(folder, config_id)
+    if path is None:
+        return None
+    try:
+        with open(path, 'r') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def choose_variant(folder, config_id, accept_encodings):
+    """Pick the stored file to send for this request's Accept-Encoding.
+
+    Returns (path, content_encoding) — content_encoding is None for identity —
+    or None if there is no pre-serialized payload for this config.
+    """
+    marker = _current_etag_path(folder, config_id)
+    if marker is None:
+        return None
+    base = marker[:-len('.etag')] + '.body'
+    if not os.path.exists(base):
+        return None
+    for encoding, suffix in ENCODINGS:
+        if accept_encodings.quality(encoding) > 0 and os.path.exists(base + suffix):
+            return base + suffix, encoding
+    return base, None
+
+
+def variant_etag(etag, encoding):
+    return etag + ETAG_SUFFIXES[encoding]
+
+
+def read_variant(path, encoding):
+    """(bytes, ETag) for a stored variant, the ETag computed from those bytes."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if encoding == 'gzip':
+        identity = gzip.decompress(data)
+    elif encoding == 'br':
+        identity = brotli.decompress(data)
+    else:
+        identity = data
+    return data, variant_etag(content_etag(identity), encoding)